@@ -4,8 +4,10 @@ import importlib
 
 _LAZY_IMPORTS = {
     "DataVendor":         ("findatapy.market.datavendor",         "DataVendor"),
+    "DownloadLedger":     ("findatapy.market.downloadledger",     "DownloadLedger"),
     "IOEngine":           ("findatapy.market.ioengine",           "IOEngine"),
     "SpeedCache":         ("findatapy.market.ioengine",           "SpeedCache"),
+    "RedisConnectionManager": ("findatapy.market.ioengine",       "RedisConnectionManager"),
     "Market":             ("findatapy.market.market",             "Market"),
     "FXVolFactory":       ("findatapy.market.market",             "FXVolFactory"),
     "FXCrossFactory":     ("findatapy.market.market",             "FXCrossFactory"),
@@ -0,0 +1,226 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pandas as pd
+
+from findatapy.market.marketdatarequest import MarketDataRequest
+from findatapy.util import DataConstants, LoggerManager
+
+constants = DataConstants()
+
+
+class RequestBatch(object):
+    """A MarketDataRequest which fetches the tickers of one or more of the
+    original MarketDataRequests in one go
+    """
+
+    def __init__(self, md_request, indices):
+        self.md_request = md_request
+        self.indices = indices
+
+
+class BatchPlanner(object):
+    """Plans how to fetch a list of MarketDataRequests, merging those which
+    only differ by their tickers (ie. the same data_source, freq, cut,
+    fields, dates etc.) into fewer, larger requests, each with up to the
+    maximum number of tickers for that data source. The DataFrame for each
+    merged request can then be split back out for each original request.
+    """
+
+    def __init__(self, max_tickers=None):
+        self._max_tickers = max_tickers
+
+    def _get_max_tickers(self, data_source):
+        if self._max_tickers is not None:
+            return self._max_tickers
+
+        return constants.market_batch_max_tickers.get(
+            str(data_source), constants.market_batch_max_tickers["other"])
+
+    def _is_batchable(self, md_request):
+        # Requests with per ticker properties, or which are split into
+        # single ticker requests anyway, aren't merged
+        pretransformation = md_request.pretransformation
+
+        if pretransformation is not None \
+                and not isinstance(pretransformation, list):
+            pretransformation = [pretransformation]
+
+        return md_request.tickers is not None \
+               and (pretransformation is None
+                    or all(p is None for p in pretransformation)) \
+               and md_request.abstract_curve is None \
+               and not md_request.freeform_md_request \
+               and md_request.split_request_chunks == 0
+
+    def plan(self, md_request_list):
+        """Groups the MarketDataRequests into batches
+
+        Parameters
+        ----------
+        md_request_list : list of MarketDataRequest
+            Requests to fetch
+
+        Returns
+        -------
+        list of RequestBatch
+        """
+        groups = {}
+        batch_list = []
+
+        for i, md_request in enumerate(md_request_list):
+            if self._is_batchable(md_request):
+                key = md_request.generate_batch_key()
+
+                if key not in groups:
+                    groups[key] = []
+                    batch_list.append(groups[key])
+
+                groups[key].append(i)
+            else:
+                batch_list.append([i])
+
+        request_batch_list = []
+
+        for indices in batch_list:
+            if len(indices) == 1:
+                request_batch_list.append(
+                    RequestBatch(md_request_list[indices[0]], indices))
+
+                continue
+
+            max_tickers = self._get_max_tickers(
+                md_request_list[indices[0]].data_source)
+
+            # Pack whole requests into chunks of up to max_tickers
+            chunk = []
+            chunk_tickers = set()
+
+            for i in indices:
+                tickers = set(md_request_list[i].tickers)
+
+                if chunk and len(chunk_tickers | tickers) > max_tickers:
+                    request_batch_list.append(
+                        self._merge(md_request_list, chunk))
+
+                    chunk = []
+                    chunk_tickers = set()
+
+                chunk.append(i)
+                chunk_tickers = chunk_tickers | tickers
+
+            request_batch_list.append(self._merge(md_request_list, chunk))
+
+        return request_batch_list
+
+    def _merge(self, md_request_list, indices):
+        if len(indices) == 1:
+            return RequestBatch(md_request_list[indices[0]], indices)
+
+        tickers = []
+        vendor_tickers = []
+
+        has_vendor_tickers = md_request_list[indices[0]].vendor_tickers \
+                             is not None
+
+        for i in indices:
+            md_request = md_request_list[i]
+
+            if has_vendor_tickers:
+                ticker_list = zip(md_request.tickers,
+                                  md_request.vendor_tickers)
+            else:
+                ticker_list = zip(md_request.tickers,
+                                  [None] * len(md_request.tickers))
+
+            for t, v in ticker_list:
+                if t not in tickers:
+                    tickers.append(t)
+                    vendor_tickers.append(v)
+
+        md_request = MarketDataRequest(md_request=md_request_list[indices[0]])
+        md_request.tickers = tickers
+
+        if md_request.pretransformation is not None:
+            md_request.pretransformation = [None] * len(tickers)
+
+        if has_vendor_tickers:
+            md_request.vendor_tickers = vendor_tickers
+
+        return RequestBatch(md_request, indices)
+
+    def split(self, md_request, data_frame):
+        """Gets the columns for an original MarketDataRequest from the
+        DataFrame of a merged request
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Original request
+        data_frame : DataFrame
+            Returned for the merged request
+
+        Returns
+        -------
+        DataFrame
+        """
+        if data_frame is None:
+            return None
+
+        columns = [f"{t}.{f}" for t in md_request.tickers
+                   for f in md_request.fields]
+        columns = [c for c in columns if c in data_frame.columns]
+
+        return data_frame[columns]
+
+    def explain(self, md_request_list):
+        """Explains how a list of MarketDataRequests would be fetched (eg.
+        for debugging), with one row for each call to the data source
+
+        Parameters
+        ----------
+        md_request_list : list of MarketDataRequest
+            Requests to fetch
+
+        Returns
+        -------
+        DataFrame
+        """
+        rows = []
+
+        for request_batch in self.plan(md_request_list):
+            md_request = request_batch.md_request
+
+            rows.append({"data_source": md_request.data_source,
+                         "category": md_request.category,
+                         "freq": md_request.freq,
+                         "cut": md_request.cut,
+                         "fields": ",".join(md_request.fields),
+                         "start_date": md_request.start_date,
+                         "finish_date": md_request.finish_date,
+                         "requests": request_batch.indices,
+                         "no_of_tickers": len(md_request.tickers),
+                         "tickers": ",".join(md_request.tickers)})
+
+        df = pd.DataFrame(rows)
+        df.index.name = "call"
+
+        logger = LoggerManager().getLogger(__name__)
+        logger.debug(f"{len(md_request_list)} requests will be fetched "
+                     f"with {len(rows)} calls")
+
+        return df
@@ -17,9 +17,16 @@ __author__ = "saeedamen"  # Saeed Amen
 
 import abc
 import copy
+import hashlib
+import os
+
+import concurrent.futures
+from collections import deque
+
+import pandas as pd
 
 from findatapy.market.marketdatarequest import MarketDataRequest
-from findatapy.util import ConfigManager, LoggerManager
+from findatapy.util import ConfigManager, DataConstants, LoggerManager
 
 
 class DataVendor(object):
@@ -27,6 +34,10 @@ class DataVendor(object):
 
     """
 
+    # Does the vendor pass each of its requests through the RequestGovernor
+    # for its data source? Otherwise every load_ticker call is governed
+    governs_own_requests = False
+
     def __init__(self):
         self.config = ConfigManager().get_instance()
         # self.config = None
@@ -290,5 +301,360 @@ class DataVendor(object):
 
         return tickers_converted
 
+    def filter_requested_columns(self, data_frame, md_request):
+        """Selects only the columns for the tickers/fields in the
+        MarketDataRequest (in the same order), ignoring any which are missing
+
+        Parameters
+        ----------
+        data_frame : DataFrame
+            Data with columns of the form ticker.field
+        md_request : MarketDataRequest
+            contains the tickers and fields requested
+
+        Returns
+        -------
+        DataFrame
+        """
+        if data_frame is None:
+            return None
+
+        tickers = md_request.tickers
+        fields = md_request.fields
+
+        if isinstance(tickers, str): tickers = [tickers]
+        if isinstance(fields, str): fields = [fields]
+
+        columns = [f"{t}.{f}" for t in tickers for f in fields
+                   if f"{t}.{f}" in data_frame.columns]
+
+        if not columns:
+            return data_frame
+
+        return data_frame[columns]
+
+    def stream_map(self, func, args_list, thread_no=1, window=None):
+        """Calls a function on each set of arguments in a thread pool,
+        yielding the results in the same order as the arguments. Only a
+        window of calls are ever in flight (or waiting to be yielded), so
+        the memory used is bounded, even for very long lists of arguments
+        (eg. every hour of a year of tick data)
+
+        Parameters
+        ----------
+        func : function
+            Function to call
+        args_list : iterable of tuples
+            Arguments for each call
+        thread_no : int
+            Number of threads to use
+        window : int (optional)
+            Maximum number of calls in flight (default: 2 * thread_no)
+
+        Returns
+        -------
+        generator
+        """
+        if window is None:
+            window = 2 * thread_no
+
+        window = max(window, 1)
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(thread_no, 1))
+
+        futures = deque()
+
+        try:
+            for args in args_list:
+                futures.append(executor.submit(func, *args))
+
+                if len(futures) >= window:
+                    yield futures.popleft().result()
+
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            # If the caller stops early, don't bother with queued calls
+            for f in futures:
+                f.cancel()
+
+            executor.shutdown(wait=True)
+
+    def create_async_http_engine(self, data_source, retries=5,
+                                 timeout_seconds=10, headers=None):
+        """Creates an AsyncHTTPEngine for downloading many files from a
+        data source, using the concurrency settings in DataConstants and the
+        RequestGovernor for that data source
+
+        Parameters
+        ----------
+        data_source : str
+            eg. "dukascopy" or "fxcm"
+        retries : int
+            Number of times to try each URL
+        timeout_seconds : float
+            Timeout for each request
+        headers : dict (optional)
+            HTTP headers to send
+
+        Returns
+        -------
+        AsyncHTTPEngine
+            None if the HTTP engine is set to "thread" for this data source
+            or aiohttp isn't installed
+        """
+        from findatapy.util.asynchttp import AsyncHTTPEngine
+
+        constants = DataConstants()
+
+        if constants.market_http_engine.get(data_source, "thread") \
+                != "asyncio":
+            return None
+
+        if not AsyncHTTPEngine.is_available():
+            logger = LoggerManager().getLogger(__name__)
+            logger.debug("aiohttp is not installed, so using threads for "
+                         f"{data_source} downloads")
+
+            return None
+
+        from findatapy.util.governor import RequestGovernor
+
+        # Pacing is done by the governor for the data source, so it's shared
+        # with any other downloads
+        return AsyncHTTPEngine(
+            max_concurrency=constants.market_http_max_concurrency.get(
+                data_source, 4),
+            timeout_seconds=timeout_seconds, retries=retries,
+            parse_thread_no=constants.market_http_parse_thread_no,
+            headers=headers,
+            governor=RequestGovernor.get_governor(data_source))
+
+    def create_download_ledger(self, data_source, name, start_date=None,
+                               finish_date=None):
+        """Creates a DownloadLedger for a download, which is persisted under
+        temp_folder/ledger (if market_download_ledger is set), so reruns of
+        a failed download only fetch the missing units
+
+        Parameters
+        ----------
+        data_source : str
+            eg. "dukascopy" or "fxcm"
+        name : str
+            Name for the download eg. ticker
+        start_date : datetime (optional)
+            Start of the download
+        finish_date : datetime (optional)
+            Finish of the download
+
+        Returns
+        -------
+        DownloadLedger
+        """
+        from findatapy.market.downloadledger import DownloadLedger
+
+        constants = DataConstants()
+
+        folder = None
+
+        if constants.market_download_ledger:
+            # Include the date range, so downloads of the same ticker for
+            # different dates (eg. running at the same time) each have their
+            # own ledger
+            for d in [start_date, finish_date]:
+                if d is not None:
+                    name = name + "_" \
+                           + pd.Timestamp(d).strftime("%Y%m%d%H%M%S")
+
+            folder = os.path.join(constants.temp_folder, "ledger",
+                                  f"{data_source}_{name}")
+
+        return DownloadLedger(folder)
+
+    def get_time_windows(self, start_date, finish_date, window_size):
+        """Splits a time range into consecutive windows
+
+        Parameters
+        ----------
+        start_date : datetime
+            Start of the range
+        finish_date : datetime
+            Finish of the range
+        window_size : str or Timedelta
+            Size of each window eg. "1D" or "7D"
+
+        Returns
+        -------
+        list of (datetime, datetime)
+        """
+        start = pd.Timestamp(start_date)
+        finish = pd.Timestamp(finish_date)
+        window_size = pd.Timedelta(window_size)
+
+        windows = []
+
+        while start < finish:
+            end = min(start + window_size, finish)
+            windows.append((start.to_pydatetime(), end.to_pydatetime()))
+
+            start = end
+
+        return windows
+
+    def stitch_windows(self, df_list):
+        """Concatenates the DataFrames for consecutive time windows,
+        removing any rows which overlap with the previous window (eg. if the
+        data source includes the end time of each window)
+
+        Parameters
+        ----------
+        df_list : list of DataFrame
+            For each window, in order (None if there's no data)
+
+        Returns
+        -------
+        DataFrame
+        """
+        stitched = []
+        last = None
+
+        for df in df_list:
+            if df is None or df.empty:
+                continue
+
+            if last is not None:
+                df = df[df.index > last]
+
+                if df.empty:
+                    continue
+
+            stitched.append(df)
+            last = df.index.max()
+
+        if not stitched:
+            return None
+
+        return pd.concat(stitched)
+
+    def download_governed(self, download_func, md_request, data_source):
+        """Downloads a MarketDataRequest, holding a request from the
+        RequestGovernor for the data source (if it has any limits) while
+        it's downloading
+
+        Parameters
+        ----------
+        download_func : function
+            Downloads a MarketDataRequest
+        md_request : MarketDataRequest
+            Vendor request
+        data_source : str
+            eg. "bloomberg"
+
+        Returns
+        -------
+        DataFrame
+        """
+        from findatapy.util.governor import RequestGovernor
+
+        governor = RequestGovernor.get_governor(data_source)
+
+        if governor is None:
+            return download_func(md_request)
+
+        with governor.request():
+            return download_func(md_request)
+
+    def download_windowed(self, md_request, download_func, data_source):
+        """Downloads a long intraday or tick request as time windows of
+        market_window_size for the data source (eg. days or weeks). The
+        windows are downloaded in parallel (up to market_thread_no for the
+        data source) using a DownloadLedger, so if a window fails (raises an
+        exception) only that window is downloaded again, and then they are
+        stitched together in order. A window which returns None has no data
+        (eg. a weekend), so it isn't downloaded again.
+
+        Each window holds a request from the RequestGovernor for the data
+        source, so vendors which use this should set governs_own_requests.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Vendor request
+        download_func : function
+            Downloads a MarketDataRequest for a single window
+        data_source : str
+            eg. "bloomberg"
+
+        Returns
+        -------
+        DataFrame
+        """
+        constants = DataConstants()
+
+        freq = "tick" if md_request.freq in ["tick", "second"] \
+            else "intraday"
+
+        window_size = constants.market_window_size.get(
+            data_source, {}).get(freq)
+
+        if window_size is None or md_request.start_date is None \
+                or md_request.finish_date is None:
+            return self.download_governed(download_func, md_request,
+                                          data_source)
+
+        windows = self.get_time_windows(md_request.start_date,
+                                        md_request.finish_date, window_size)
+
+        if len(windows) <= 1:
+            return self.download_governed(download_func, md_request,
+                                          data_source)
+
+        logger = LoggerManager().getLogger(__name__)
+        logger.info(f"Splitting {data_source} {md_request.freq} request "
+                    f"into {len(windows)} windows of {window_size}")
+
+        def download_window(window):
+            md_request_window = copy.copy(md_request)
+            md_request_window.start_date = window[0]
+            md_request_window.finish_date = window[1]
+
+            df = self.download_governed(download_func, md_request_window,
+                                        data_source)
+
+            # Vendors return None when there's no data for a window (eg. a
+            # weekend), which the ledger records as an empty window (vendors
+            # raise when the request fails, so the window is retried)
+            if df is None:
+                return pd.DataFrame()
+
+            return df
+
+        def get_window_key(window):
+            return window[0].strftime("%Y%m%d%H%M%S") + "_" \
+                   + window[1].strftime("%Y%m%d%H%M%S")
+
+        # Name the ledger by what we are downloading and the date range of
+        # the request, so concurrent requests don't share a ledger
+        name = hashlib.md5(str((md_request.tickers, md_request.fields,
+                                md_request.freq, md_request.freq_mult))
+                           .encode("utf-8")).hexdigest()[:16]
+
+        thread_no = constants.market_thread_no.get(
+            data_source, constants.market_thread_no["other"])
+
+        ledger = self.create_download_ledger(
+            data_source, freq + "_" + name, md_request.start_date,
+            md_request.finish_date)
+
+        df_list = ledger.download(windows, fetch_func=download_window,
+                                  key_func=get_window_key,
+                                  thread_no=thread_no,
+                                  retries=constants.market_window_retries,
+                                  retry_sleep=
+                                  constants.market_window_retry_sleep)
+
+        return self.stitch_windows(df_list)
+
     def get_lower_case_list(self, lst):
         return [k.lower() for k in lst]
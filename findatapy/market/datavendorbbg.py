@@ -15,7 +15,6 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 import abc
-from operator import itemgetter
 
 import pandas as pd
 import numpy as np
@@ -43,6 +42,10 @@ class DataVendorBBG(DataVendor):
 
     """
 
+    # Each daily/reference request and each window of an intraday request
+    # holds a request from the governor, rather than the whole load_ticker
+    governs_own_requests = True
+
     def __init__(self):
         super(DataVendorBBG, self).__init__()
 
@@ -182,10 +185,13 @@ class DataVendorBBG(DataVendor):
             md_request_vendor.tickers = \
             md_request_vendor.tickers[0]
 
+            # Long requests are split into windows, downloaded in parallel
             if md_request.freq in ['tick', 'second']:
-                data_frame = self.download_tick(md_request_vendor)
+                data_frame = self.download_windowed(
+                    md_request_vendor, self.download_tick, "bloomberg")
             else:
-                data_frame = self.download_intraday(md_request_vendor)
+                data_frame = self.download_windowed(
+                    md_request_vendor, self.download_intraday, "bloomberg")
 
             if data_frame is not None:
                 if data_frame.empty:
@@ -217,7 +223,8 @@ class DataVendorBBG(DataVendor):
     def get_daily_data(self, md_request, md_request_vendor):
         logger = LoggerManager().getLogger(__name__)
 
-        data_frame = self.download_daily(md_request_vendor)
+        data_frame = self.download_governed(self.download_daily,
+                                            md_request_vendor, "bloomberg")
 
         # Convert from vendor to findatapy tickers/fields
         if data_frame is not None:
@@ -284,7 +291,8 @@ class DataVendorBBG(DataVendor):
             "Requesting ref for " + md_request_vendor.tickers[
                 0] + " etc.")
 
-        data_frame = self.download_ref(md_request_vendor)
+        data_frame = self.download_governed(self.download_ref,
+                                            md_request_vendor, "bloomberg")
 
         logger.debug("Waiting for ref...")
 
@@ -410,7 +418,10 @@ import abc
 import copy
 import collections
 import datetime
+import itertools
+import queue
 import re
+import threading
 
 try:
     import blpapi  # obtainable from Bloomberg website
@@ -420,8 +431,6 @@ except:
 from findatapy.util.dataconstants import DataConstants
 from findatapy.market.datavendorbbg import DataVendorBBG
 
-from collections import defaultdict
-
 
 class DataVendorBBGOpen(DataVendorBBG):
     """Calls the Bloomberg Open API to download market data: daily, intraday
@@ -491,6 +500,8 @@ class DataVendorBBGOpen(DataVendorBBG):
 
     def kill_session(self):
         # TODO not really needed, because we automatically kill sessions
+        BBGSessionManager.shutdown_session_manager()
+
         BBGLowLevelDaily().kill_session(None)
         BBGLowLevelRef().kill_session(None)
         BBGLowLevelIntraday().kill_session(None)
@@ -499,6 +510,477 @@ class DataVendorBBGOpen(DataVendorBBG):
 ###############################################################################
 #### Lower level code to interact with Bloomberg Open API
 
+_UTC = datetime.timezone.utc
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _get_timestamp_ns(t):
+    # Quicker than creating a pd.Timestamp for every date/datetime returned
+    # by blpapi (tz aware datetimes are converted to UTC)
+    if hasattr(t, "hour"):
+        if t.tzinfo is not None:
+            t = t.astimezone(_UTC).replace(tzinfo=None)
+
+        return ((t.toordinal() - _EPOCH_ORDINAL) * 86400 + t.hour * 3600
+                + t.minute * 60 + t.second) * 1000000000 \
+               + t.microsecond * 1000
+
+    if hasattr(t, "toordinal"):
+        return (t.toordinal() - _EPOCH_ORDINAL) * 86400000000000
+
+    return pd.Timestamp(t).value
+
+
+class ColumnarBlock(object):
+    """Accumulates the rows of a time series directly into growable NumPy
+    arrays, one for each column, plus an int64 array of timestamps (ns),
+    rather than building Python lists/dicts for every element. The
+    DataFrame is only created once at the end, with to_data_frame.
+
+    Columns are float64 by default (missing values are NaN) and are
+    converted to object arrays if a non-numerical value is set.
+    """
+
+    def __init__(self, columns=None, dtypes=None, capacity=1024):
+        self._capacity = max(capacity, 1)
+        self._size = 0
+        self._timestamps = np.empty(self._capacity, dtype=np.int64)
+        self._columns = {}
+
+        if columns is not None:
+            if dtypes is None:
+                dtypes = [np.float64] * len(columns)
+
+            for c, dtype in zip(columns, dtypes):
+                self._columns[c] = self._create_array(dtype, self._capacity)
+
+        self._arrays = list(self._columns.values())
+
+    def __len__(self):
+        return self._size
+
+    def _create_array(self, dtype, capacity):
+        dtype = np.dtype(dtype)
+
+        if dtype == np.float64:
+            return np.full(capacity, np.nan)
+        elif dtype == object:
+            return np.full(capacity, None, dtype=object)
+
+        return np.zeros(capacity, dtype=dtype)
+
+    def reserve(self, rows):
+        """Makes sure there's space for more rows, without growing
+
+        Parameters
+        ----------
+        rows : int
+            Number of rows we are about to add
+        """
+        capacity = self._size + rows
+
+        if capacity <= self._capacity:
+            return
+
+        # At least double, so we don't keep copying
+        self._capacity = max(capacity, self._capacity * 2)
+
+        timestamps = np.empty(self._capacity, dtype=np.int64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        self._timestamps = timestamps
+
+        for c, arr in self._columns.items():
+            new_arr = self._create_array(arr.dtype, self._capacity)
+            new_arr[:self._size] = arr[:self._size]
+
+            self._columns[c] = new_arr
+
+        self._arrays = list(self._columns.values())
+
+    def add_row(self, timestamp):
+        """Adds a row (with every column missing)
+
+        Parameters
+        ----------
+        timestamp : datetime/date
+            Time of the row
+
+        Returns
+        -------
+        int
+            Index of the row, to set values with
+        """
+        if self._size == self._capacity:
+            self.reserve(1)
+
+        self._timestamps[self._size] = _get_timestamp_ns(timestamp)
+        self._size = self._size + 1
+
+        return self._size - 1
+
+    def set(self, column, row, value):
+        """Sets the value of a column in a row
+
+        Parameters
+        ----------
+        column : str
+            Column name (added if it's new)
+        row : int
+            Index of the row
+        value : object
+            Value
+        """
+        arr = self._columns.get(column)
+
+        if arr is None:
+            arr = self._create_array(np.float64, self._capacity)
+
+            self._columns[column] = arr
+            self._arrays = list(self._columns.values())
+
+        if arr.dtype != object and not isinstance(value, (float, int)):
+            arr = arr.astype(object)
+
+            self._columns[column] = arr
+            self._arrays = list(self._columns.values())
+
+        arr[row] = value
+
+    def append_row(self, timestamp, values):
+        """Adds a row with a value for every column (in the order of the
+        columns)
+
+        Parameters
+        ----------
+        timestamp : datetime/date
+            Time of the row
+        values : tuple
+            Value for each column
+        """
+        row = self.add_row(timestamp)
+
+        for arr, v in zip(self._arrays, values):
+            arr[row] = v
+
+    def get_first_timestamp(self):
+        return pd.Timestamp(self._timestamps[0])
+
+    def get_last_timestamp(self):
+        return pd.Timestamp(self._timestamps[self._size - 1])
+
+    def to_data_frame(self):
+        """Creates a DataFrame from the rows (without spare capacity)
+
+        Returns
+        -------
+        DataFrame
+        """
+        n = self._size
+
+        index = pd.DatetimeIndex(
+            self._timestamps[:n].copy().view("datetime64[ns]"))
+
+        return pd.DataFrame({c: arr[:n] for c, arr in self._columns.items()},
+                            index=index)
+
+
+class BBGSessionTerminated(Exception):
+    pass
+
+
+class BBGPendingRequest(object):
+    """A request which has been sent on a pooled Bloomberg session. The
+    session routes the responses for it here (by CorrelationId).
+    """
+
+    def __init__(self, pooled_session, cid_value):
+        self._pooled_session = pooled_session
+        self._cid_value = cid_value
+        self._queue = queue.Queue()
+
+    def put(self, item):
+        self._queue.put(item)
+
+    def responses(self, timeout=None):
+        """Yields the messages in each (partial) response, until the final
+        response
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for each response
+
+        Returns
+        -------
+        generator of (list, bool)
+            Messages and whether this is the final response
+        """
+        while True:
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._pooled_session.cancel(self._cid_value)
+
+                raise Exception("Timed out waiting for Bloomberg to respond")
+
+            if isinstance(item, Exception):
+                raise item
+
+            yield item
+
+            if item[1]:
+                return
+
+
+class BBGPooledSession(object):
+    """A Bloomberg session with //blp/refdata already open, which can have
+    many requests in flight at the same time. A dispatcher thread reads
+    every event from the session and routes the messages to the request
+    with the same CorrelationId.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._alive = True
+
+        self.PARTIAL_RESPONSE = blpapi.Event.PARTIAL_RESPONSE
+        self.RESPONSE = blpapi.Event.RESPONSE
+        self.SESSION_STATUS = blpapi.Event.SESSION_STATUS
+        self.SESSION_TERMINATED = blpapi.Name("SessionTerminated")
+
+        self._thread = threading.Thread(target=self._dispatch, daemon=True)
+        self._thread.start()
+
+    def is_alive(self):
+        return self._alive
+
+    def get_in_flight(self):
+        with self._lock:
+            return len(self._pending)
+
+    def send(self, send_func, cid_value):
+        """Sends a request on this session
+
+        Parameters
+        ----------
+        send_func : function
+            Called with (session, CorrelationId) to send the request
+        cid_value : int
+            Unique value for the CorrelationId
+
+        Returns
+        -------
+        BBGPendingRequest
+        """
+        pending = BBGPendingRequest(self, cid_value)
+
+        with self._lock:
+            if not self._alive:
+                raise BBGSessionTerminated("Bloomberg session terminated")
+
+            self._pending[cid_value] = pending
+
+        try:
+            send_func(self._session, blpapi.CorrelationId(cid_value))
+        except:
+            self.cancel(cid_value)
+
+            raise
+
+        return pending
+
+    def cancel(self, cid_value):
+        with self._lock:
+            self._pending.pop(cid_value, None)
+
+    def _dispatch(self):
+        logger = LoggerManager().getLogger(__name__)
+
+        while self._alive:
+            try:
+                # Use a timeout, so we can notice if we've been stopped
+                event = self._session.nextEvent(500)
+            except Exception as e:
+                self._terminate(str(e))
+
+                return
+
+            event_type = event.eventType()
+
+            if event_type in [self.PARTIAL_RESPONSE, self.RESPONSE]:
+                is_final = event_type == self.RESPONSE
+
+                messages = {}
+
+                for msg in event:
+                    for cid in msg.correlationIds():
+                        messages.setdefault(cid.value(), []).append(msg)
+
+                for cid_value, msg_list in messages.items():
+                    with self._lock:
+                        if is_final:
+                            pending = self._pending.pop(cid_value, None)
+                        else:
+                            pending = self._pending.get(cid_value)
+
+                    if pending is not None:
+                        pending.put((msg_list, is_final))
+
+            elif event_type == self.SESSION_STATUS:
+                for msg in event:
+                    if msg.messageType() == self.SESSION_TERMINATED:
+                        logger.warning("Bloomberg session terminated")
+
+                        self._terminate("Bloomberg session terminated")
+
+                        return
+
+    def _terminate(self, reason):
+        with self._lock:
+            self._alive = False
+
+            pending_list = list(self._pending.values())
+            self._pending = {}
+
+        # Requests in flight fail, so they can be sent again on another
+        # session
+        for pending in pending_list:
+            pending.put(BBGSessionTerminated(reason))
+
+    def stop(self):
+        self._terminate("Bloomberg session stopped")
+
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=1)
+
+        try:
+            self._session.stop()
+        except:
+            pass
+
+
+class BBGSessionManager(object):
+    """Keeps a small pool of warm Bloomberg sessions (with //blp/refdata
+    already open), which are shared by every thread, so we don't pay the
+    cost of starting a session for every request. Requests are sent on the
+    session with the fewest requests in flight (starting another session if
+    they are all busy and the pool isn't full). Sessions which are
+    terminated are dropped from the pool and replaced when needed.
+    """
+
+    _session_manager = None
+    _session_manager_lock = threading.Lock()
+
+    def __init__(self, pool_size=None, start_session_func=None):
+        if pool_size is None:
+            pool_size = DataConstants().bbg_session_pool_size
+
+        self._pool_size = max(pool_size, 1)
+        self._start_session_func = start_session_func
+
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._cid_counter = itertools.count(1)
+
+        self._sessions_started = 0
+
+    @staticmethod
+    def get_session_manager(start_session_func=None):
+        """Gets the BBGSessionManager shared by this process
+
+        Parameters
+        ----------
+        start_session_func : function
+            Starts a new Bloomberg session
+
+        Returns
+        -------
+        BBGSessionManager
+        """
+        with BBGSessionManager._session_manager_lock:
+            if BBGSessionManager._session_manager is None:
+                BBGSessionManager._session_manager = BBGSessionManager(
+                    start_session_func=start_session_func)
+
+            return BBGSessionManager._session_manager
+
+    @staticmethod
+    def shutdown_session_manager():
+        """Stops every pooled session"""
+        with BBGSessionManager._session_manager_lock:
+            if BBGSessionManager._session_manager is not None:
+                BBGSessionManager._session_manager.shutdown()
+
+            BBGSessionManager._session_manager = None
+
+    def get_sessions_started(self):
+        return self._sessions_started
+
+    def _start_session(self):
+        logger = LoggerManager().getLogger(__name__)
+
+        session = self._start_session_func()
+
+        if session is None:
+            raise Exception("Failed to start Bloomberg session")
+
+        if not session.openService("//blp/refdata"):
+            try:
+                session.stop()
+            except:
+                pass
+
+            raise Exception("Failed to open //blp/refdata")
+
+        self._sessions_started = self._sessions_started + 1
+
+        logger.info(f"Started pooled Bloomberg session "
+                    f"{self._sessions_started}")
+
+        return BBGPooledSession(session)
+
+    def _get_session(self):
+        with self._lock:
+            self._sessions = [s for s in self._sessions if s.is_alive()]
+
+            pooled_session = None
+
+            if self._sessions:
+                pooled_session = min(self._sessions,
+                                     key=lambda s: s.get_in_flight())
+
+            if pooled_session is None or (
+                    pooled_session.get_in_flight() > 0
+                    and len(self._sessions) < self._pool_size):
+                pooled_session = self._start_session()
+                self._sessions.append(pooled_session)
+
+            return pooled_session
+
+    def send_request(self, send_func):
+        """Sends a request on one of the pooled sessions
+
+        Parameters
+        ----------
+        send_func : function
+            Called with (session, CorrelationId) to send the request
+
+        Returns
+        -------
+        BBGPendingRequest
+        """
+        return self._get_session().send(send_func, next(self._cid_counter))
+
+    def shutdown(self):
+        with self._lock:
+            for pooled_session in self._sessions:
+                pooled_session.stop()
+
+            self._sessions = []
+
+
 class BBGLowLevelTemplate:  # in order that the init function works in
     # child classes
 
@@ -516,6 +998,8 @@ class BBGLowLevelTemplate:  # in order that the init function works in
         return
 
     def load_time_series(self, md_request):
+        if DataConstants().bbg_session_pool:
+            return self.load_time_series_pooled(md_request)
 
         # if(BBGLowLevelTemplate._session is None):
         logger = LoggerManager().getLogger(__name__)
@@ -603,15 +1087,85 @@ class BBGLowLevelTemplate:  # in order that the init function works in
 
         return data_frame
 
-    def event_loop(self, session):
-        not_done = True
+    def load_time_series_pooled(self, md_request):
+        """Downloads from Bloomberg using the warm sessions kept by
+        BBGSessionManager. Every request is sent before waiting for any
+        responses, so they are all in flight at the same time.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Vendor request
+
+        Returns
+        -------
+        DataFrame
+        """
+        logger = LoggerManager().getLogger(__name__)
+        constants = DataConstants()
 
-        data_frame_slice = None
+        session_manager = BBGSessionManager.get_session_manager(
+            start_session_func=self.start_bloomberg_session)
+
+        def send(opt):
+            return session_manager.send_request(
+                lambda session, cid: self.send_bar_request(session, None,
+                                                           opt, cid))
+
+        options = self.fill_options(md_request)
+
+        # In some instances we might split the options if need to have
+        # different overrides
+        options_list = options if isinstance(options, list) else [options]
+
+        pending_list = []
+
+        for opt in options_list:
+            if opt.security is not None:
+                pending_list.append(send(opt))
+            else:
+                logger.warning("No ticker or field specified!")
+                pending_list.append(None)
+
+        logger.info("Waiting for data to be returned...")
 
         data_frame_list = []
-        data_frame_cols = []
 
-        while not_done:
+        for opt, pending in zip(options_list, pending_list):
+            data_frame = None
+
+            i = 1
+
+            while pending is not None:
+                try:
+                    data_frame = self.assemble_responses(pending.responses(
+                        timeout=constants.bbg_session_request_timeout))
+
+                    break
+                except BBGSessionTerminated as e:
+                    if i >= constants.bbg_session_retries:
+                        raise
+
+                    logger.warning(f"{e}, sending request again... try {i}")
+
+                    pending = send(opt)
+                    i = i + 1
+
+            data_frame_list.append(data_frame)
+
+        if isinstance(options, list):
+            return Calculations().join(data_frame_list)
+
+        return data_frame_list[0]
+
+    def event_loop(self, session):
+        return self.assemble_responses(self.get_session_responses(session))
+
+    def get_session_responses(self, session):
+        """Yields the messages of each (partial) response on a session,
+        until the final response (or the session is terminated)
+        """
+        while True:
             # nextEvent() method can be called with timeout to let
             # the program catch Ctrl-C between arrivals of new events
             event = session.nextEvent()  # removed time out
@@ -619,18 +1173,56 @@ class BBGLowLevelTemplate:  # in order that the init function works in
 
             # Bloomberg will send us responses in chunks
             if event.eventType() == blpapi.Event.PARTIAL_RESPONSE:
-                # logger.info("Processing Bloomberg Partial Response")
-                data_frame_slice = self.process_response_event(event)
+                yield event, False
             elif event.eventType() == blpapi.Event.RESPONSE:
-                # logger.info("Processing Bloomberg Full Response")
-                data_frame_slice = self.process_response_event(event)
-                not_done = False
-            else:
+                yield event, True
+
+                return
+            elif event.eventType() == blpapi.Event.SESSION_STATUS:
                 for msg in event:
-                    if event.eventType() == blpapi.Event.SESSION_STATUS:
+                    if msg.messageType() == self.SESSION_TERMINATED:
+                        return
+
+    def assemble_responses(self, responses):
+        """Combines the (partial) responses to a request into a DataFrame
+
+        Parameters
+        ----------
+        responses : iterable
+            (messages, is_final) for each response
+
+        Returns
+        -------
+        DataFrame
+        """
+        builder = self.create_builder()
+
+        # Append the messages directly into a columnar builder, and only
+        # create a DataFrame at the end
+        if builder is not None:
+            logger = LoggerManager().getLogger(__name__)
+
+            for messages, is_final in responses:
+                for msg in messages:
+                    if msg.hasElement(self.RESPONSE_ERROR):
+                        logger.error("REQUEST FAILED: " + str(
+                            msg.getElement(self.RESPONSE_ERROR)))
+                        continue
 
-                        if msg.messageType() == self.SESSION_TERMINATED:
-                            not_done = False
+                    self.append_message(builder, msg)
+
+            data_frame = self.build_data_frame(builder)
+
+            if data_frame is None:
+                logger.warning("No elements for ticker.")
+
+            return data_frame
+
+        data_frame_list = []
+        data_frame_cols = []
+
+        for messages, is_final in responses:
+            data_frame_slice = self.process_response_event(messages)
 
             # Append DataFrame only if not empty
             if data_frame_slice is not None:
@@ -764,11 +1356,27 @@ class BBGLowLevelTemplate:  # in order that the init function works in
     def fill_options(self, md_request):
         pass
 
-    @abc.abstractmethod
-    def process_message(self, msg):
-        # To be implemented by subclass
+    def create_builder(self):
+        """Creates a builder to accumulate the messages for a request,
+        returns None if the messages are processed into DataFrame slices
+        (with process_message) instead
+        """
+        return None
+
+    def append_message(self, builder, msg):
+        # To be implemented by subclass, if it has a builder
         return
 
+    def build_data_frame(self, builder):
+        # To be implemented by subclass, if it has a builder
+        return
+
+    def process_message(self, msg):
+        builder = self.create_builder()
+        self.append_message(builder, msg)
+
+        return self.build_data_frame(builder)
+
     # Create request for data
     @abc.abstractmethod
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -914,55 +1522,63 @@ class BBGLowLevelDaily(BBGLowLevelTemplate):
 
         return options_list
 
-    def process_message(self, msg):
-
-        constants = DataConstants()
-        # Process received events
+    def create_builder(self):
+        # ColumnarBlock for each ticker
+        return {}
 
-        # SLOW loop (careful, not all the fields will be returned every time
-        # hence need to include the field name in the tuple)
-        # perhaps try to run in parallel?
+    def append_message(self, builder, msg):
         logger = LoggerManager().getLogger(__name__)
 
-
         ticker = msg.getElement('securityData').getElement(
             'security').getValue()
         fieldData = msg.getElement('securityData').getElement('fieldData')
 
-        data = defaultdict(dict)
+        # Occasionally BBG seems to return a ticker more than once?
+        if ticker in builder:
+            return
+
+        block = ColumnarBlock(capacity=fieldData.numValues())
 
         # FASTER avoid calling getValue/getElement methods in blpapi,
-        # very slow, better to cache variables
+        # very slow, better to cache variables (careful, not all the fields
+        # will be returned every time, hence set by field name)
         for i in range(fieldData.numValues()):
             mini_field_data = fieldData.getValue(i)
-            date = mini_field_data.getElement(0).getValue()
+            row = block.add_row(mini_field_data.getElement(0).getValue())
 
             for j in range(1, mini_field_data.numElements()):
                 field_value = mini_field_data.getElement(j)
 
-                data[(str(field_value.name()), ticker)][
-                    date] = field_value.getValue()
+                block.set(str(field_value.name()), row,
+                          field_value.getValue())
 
-        # ORIGINAL repeated calling getValue/getElement much slower
-        # for i in range(fieldData.numValues()):
-        #     for j in range(1, fieldData.getValue(i).numElements()):
-        #         data[(str(fieldData.getValue(i).getElement(j).name()),
-        #         ticker)][fieldData.getValue(i).getElement(0).getValue()] \
-        #             = fieldData.getValue(i).getElement(j).getValue()
+        # If obsolete ticker could return no values
+        if len(block) == 0:
+            return
 
-        data_frame = pd.DataFrame(data)
+        builder[ticker] = block
 
-        # If obsolete ticker could return no values
-        if data_frame.empty:
+        logger.info("Read: " + ticker + ' ' + str(
+            block.get_first_timestamp()) + ' - '
+                    + str(block.get_last_timestamp()))
+
+    def build_data_frame(self, builder):
+        data_frame_list = []
+
+        for ticker, block in builder.items():
+            data_frame = block.to_data_frame()
+            data_frame.columns = pd.MultiIndex.from_tuples(
+                [(c, ticker) for c in data_frame.columns])
+
+            data_frame_list.append(data_frame)
+
+        if data_frame_list == []:
             return None
-        else:
-            # data_frame.columns = pd.MultiIndex.from_tuples(data,
-            # names=['field', 'ticker'])
-            data_frame.index = pd.to_datetime(data_frame.index)
-            logger.info("Read: " + ticker + ' ' + str(
-                data_frame.index.min()) + ' - ' + str(data_frame.index.max()))
+        elif len(data_frame_list) == 1:
+            return data_frame_list[0]
 
-        return data_frame
+        # Outer join on the dates
+        return pd.concat(data_frame_list, axis=1)
 
     # Create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -1149,38 +1765,40 @@ class BBGLowLevelIntraday(BBGLowLevelTemplate):
 
         return options
 
-    # iterate through Bloomberg output creating a DataFrame output
-    # implements abstract method
-    def process_message(self, msg):
-        data = msg.getElement(self.BAR_DATA).getElement(self.BAR_TICK_DATA)
+    def create_builder(self):
+        return ColumnarBlock(
+            columns=["open", "high", "low", "close", "volume", "events"],
+            dtypes=[np.float64, np.float64, np.float64, np.float64, np.int64,
+                    np.int64])
 
-        logger = LoggerManager().getLogger(__name__)
+    # iterate through Bloomberg output appending into the builder
+    def append_message(self, builder, msg):
+        data = msg.getElement(self.BAR_DATA).getElement(self.BAR_TICK_DATA)
 
-        data_vals = list(data.values())
+        builder.reserve(data.numValues())
 
-        # Each price time point has multiple fields - marginally quicker
-        tuple = [([bar.getElementAsFloat(self.OPEN),
-                   bar.getElementAsFloat(self.HIGH),
-                   bar.getElementAsFloat(self.LOW),
-                   bar.getElementAsFloat(self.CLOSE),
-                   bar.getElementAsInteger(self.VOLUME),
-                   bar.getElementAsInteger(self.NUM_EVENTS)],
-                   bar.getElementAsDatetime(self.TIME)) for bar in data_vals]
+        # Each price time point has multiple fields
+        for bar in data.values():
+            builder.append_row(bar.getElementAsDatetime(self.TIME),
+                               (bar.getElementAsFloat(self.OPEN),
+                                bar.getElementAsFloat(self.HIGH),
+                                bar.getElementAsFloat(self.LOW),
+                                bar.getElementAsFloat(self.CLOSE),
+                                bar.getElementAsInteger(self.VOLUME),
+                                bar.getElementAsInteger(self.NUM_EVENTS)))
 
-        data_table = list(map(itemgetter(0), tuple))
-        time_list = list(map(itemgetter(1), tuple))
+    def build_data_frame(self, builder):
+        logger = LoggerManager().getLogger(__name__)
 
-        try:
-            logger.info("Dates between " + str(time_list[0]) + " - " + str(
-                time_list[-1]))
-        except:
+        if len(builder) == 0:
             logger.info("No dates retrieved")
             return None
 
+        logger.info("Dates between " + str(builder.get_first_timestamp())
+                    + " - " + str(builder.get_last_timestamp()))
+
         # create pandas dataframe with the Bloomberg output
-        return pd.DataFrame(data=data_table, index=time_list,
-                            columns=["open", "high", "low", "close", "volume",
-                                     "events"])
+        return builder.to_data_frame()
 
     # Implement abstract method: create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -1252,45 +1870,34 @@ class BBGLowLevelTick(BBGLowLevelTemplate):
 
         return options
 
-    # iterate through Bloomberg output creating a DataFrame output
-    # implements abstract method
-    def process_message(self, msg):
-        data = msg.getElement(self.TICK_DATA).getElement(self.TICK_DATA)
-        logger = LoggerManager().getLogger(__name__)
-
-        #  logger.info("Processing tick data for " + str(self._options.security))
+    def create_builder(self):
+        return ColumnarBlock(columns=["close", "ticksize"],
+                             dtypes=[np.float64, np.int64])
 
-        data_vals = data.values()
+    # iterate through Bloomberg output appending into the builder
+    def append_message(self, builder, msg):
+        data = msg.getElement(self.TICK_DATA).getElement(self.TICK_DATA)
 
-        # for item in list(data_vals):
-        #     if item.hasElement(self.COND_CODE):
-        #         cc = item.getElementAsString(self.COND_CODE)
-        #     else:
-        #         cc = ""
-        #
-        #     # each price time point has multiple fields - marginally quicker
-        #     tuple.append(([item.getElementAsFloat(self.VALUE),
-        #                     item.getElementAsInteger(self.TICK_SIZE)],
-        #                     item.getElementAsDatetime(self.TIME)))
+        builder.reserve(data.numValues())
 
-        # slightly faster this way (note, we are skipping trade & CC fields)
-        tuple = [([item.getElementAsFloat(self.VALUE),
-                   item.getElementAsInteger(self.TICK_SIZE)],
-                  item.getElementAsDatetime(self.TIME)) for item in data_vals]
+        # Note, we are skipping trade & CC fields
+        for item in data.values():
+            builder.append_row(item.getElementAsDatetime(self.TIME),
+                               (item.getElementAsFloat(self.VALUE),
+                                item.getElementAsInteger(self.TICK_SIZE)))
 
-        data_table = list(map(itemgetter(0), tuple))
-        time_list = list(map(itemgetter(1), tuple))
+    def build_data_frame(self, builder):
+        logger = LoggerManager().getLogger(__name__)
 
-        try:
-            logger.info("Dates between " + str(time_list[0]) + " - " + str(
-                time_list[-1]))
-        except:
+        if len(builder) == 0:
             logger.info("No dates retrieved")
             return None
 
+        logger.info("Dates between " + str(builder.get_first_timestamp())
+                    + " - " + str(builder.get_last_timestamp()))
+
         # create pandas dataframe with the Bloomberg output
-        return pd.DataFrame(data=data_table, index=time_list,
-                            columns=["close", "ticksize"])
+        return builder.to_data_frame()
 
     # Implement abstract method: create request for data
     def send_bar_request(self, session, eventQueue, options, cid):
@@ -15,10 +15,17 @@ __author__ = "shihhau"  # Shih Hau
 # limitations under the License.
 #
 
+import datetime
+import json
+import time as time_library
+
 import pandas
+import requests
 
 from findatapy.market.datavendor import DataVendor
-from findatapy.util import LoggerManager
+from findatapy.util import DataConstants, LoggerManager, RequestGovernor
+
+constants = DataConstants()
 
 
 class DataVendorBitcoincharts(DataVendor):
@@ -120,12 +127,193 @@ class DataVendorPoloniex(DataVendor):
 
 ###############################################################################
 
-class DataVendorBinance(DataVendor):
+class DataVendorCrypto(DataVendor):
+    """Shared pagination engine for the crypto exchanges, which only return
+    a limited number of rows (eg. klines) for each request.
+
+    For klines, the page windows are computed up front from the bar size
+    and the page limit (rather than from the last timestamp of the previous
+    page), so the pages can be fetched concurrently, paced by the
+    RequestGovernor for the exchange (rather than sleeping between pages).
+    Trades/quotes, which can't be split up front, are paged one after
+    another with a cursor instead. Either way, the pages are accumulated in
+    a list and concatenated once.
+    """
+
+    # Every request for a page goes through the RequestGovernor
+    governs_own_requests = True
+
+    data_source = None
+
+    def __init__(self):
+        super(DataVendorCrypto, self).__init__()
+
+    def get_page_limit(self):
+        return constants.crypto_page_limit[self.data_source]
+
+    def get_page_windows(self, start_time, finish_time, bar_size,
+                         limit=None):
+        """Splits a time range into windows, each with up to limit bars
+
+        Parameters
+        ----------
+        start_time : int or datetime
+            Start of the range
+        finish_time : int or datetime
+            End of the range (inclusive)
+        bar_size : int or timedelta
+            Size of each bar, in the same units as the times (eg. ms)
+        limit : int (optional)
+            Maximum number of bars in each page (default: page limit for the
+            exchange)
+
+        Returns
+        -------
+        list of tuples
+            (start, finish) of each window, both inclusive
+        """
+        if limit is None:
+            limit = self.get_page_limit()
+
+        page_size = limit * bar_size
+
+        window_list = []
+
+        while start_time <= finish_time:
+            window_list.append(
+                (start_time,
+                 min(start_time + page_size - bar_size, finish_time)))
+
+            start_time = start_time + page_size
+
+        return window_list
+
+    def fetch_page(self, fetch_page_func, *args):
+        """Fetches a page through the RequestGovernor for the exchange,
+        retrying (and backing off for all threads) if it fails
+
+        Parameters
+        ----------
+        fetch_page_func : function
+            Downloads a page
+        args
+            Arguments for fetch_page_func
+
+        Returns
+        -------
+        object
+            Page returned by fetch_page_func
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        governor = RequestGovernor.get_governor(self.data_source)
+
+        for i in range(constants.crypto_page_retries):
+            try:
+                if governor is None:
+                    return fetch_page_func(*args)
+
+                with governor.request():
+                    return fetch_page_func(*args)
+            except Exception as e:
+                if i == constants.crypto_page_retries - 1:
+                    raise
+
+                logger.warning(f"Failed to download page {args} from "
+                               f"{self.data_source}, retrying: {str(e)}")
+
+                # Back off (for all threads), in case we're being throttled
+                if governor is not None:
+                    governor.throttled()
+                else:
+                    time_library.sleep(constants.crypto_page_retry_sleep)
+
+    def fetch_windowed_pages(self, fetch_page_func, start_time, finish_time,
+                             bar_size, limit=None):
+        """Fetches every page window of a time range concurrently (up to
+        market_thread_no for the exchange)
+
+        Parameters
+        ----------
+        fetch_page_func : function
+            Downloads a page with (start, finish) of a window, returning a
+            DataFrame
+        start_time : int or datetime
+            Start of the range
+        finish_time : int or datetime
+            End of the range (inclusive)
+        bar_size : int or timedelta
+            Size of each bar, in the same units as the times (eg. ms)
+        limit : int (optional)
+            Maximum number of bars in each page
+
+        Returns
+        -------
+        DataFrame
+            None if there is no data
+        """
+        window_list = self.get_page_windows(start_time, finish_time,
+                                            bar_size, limit=limit)
+
+        thread_no = constants.market_thread_no.get(
+            self.data_source, constants.market_thread_no["other"])
+
+        page_list = list(self.stream_map(
+            lambda s, f: self.fetch_page(fetch_page_func, s, f),
+            window_list, thread_no=thread_no))
+
+        return self._concat_pages(page_list)
+
+    def fetch_cursor_pages(self, fetch_page_func, cursor):
+        """Fetches pages one after another, each with the cursor returned
+        by the previous page
+
+        Parameters
+        ----------
+        fetch_page_func : function
+            Downloads a page with the cursor, returning (DataFrame, cursor
+            for next page or None after the last page)
+        cursor : object
+            Cursor for the first page
+
+        Returns
+        -------
+        DataFrame
+            None if there is no data
+        """
+        page_list = []
+
+        while cursor is not None:
+            page, next_cursor = self.fetch_page(fetch_page_func, cursor)
+
+            page_list.append(page)
+
+            # Stop if the exchange doesn't move the cursor on
+            if next_cursor == cursor:
+                break
+
+            cursor = next_cursor
+
+        return self._concat_pages(page_list)
+
+    def _concat_pages(self, page_list):
+        page_list = [p for p in page_list if p is not None and len(p) > 0]
+
+        if len(page_list) == 0:
+            return None
+
+        return pandas.concat(page_list, ignore_index=True)
+
+
+###############################################################################
+
+class DataVendorBinance(DataVendorCrypto):
     """Class for reading in data from various web sources into findatapy
     library including
     """
 
-    # Data limit = 500
+    # Data limit = 1000
+    data_source = 'binance'
 
     def __init__(self):
         super(DataVendorBinance, self).__init__()
@@ -139,41 +327,34 @@ class DataVendorBinance(DataVendor):
 
         logger.info("Request data from Binance")
 
-        import time
-        binance_url = 'https://www.binance.com/api/v1/klines?symbol={}&interval={}&startTime={}&endTime={}'
+        binance_url = 'https://www.binance.com/api/v1/klines?symbol={}&interval={}&startTime={}&endTime={}&limit={}'
         if md_request_vendor.freq == 'intraday':
             period = '1m'
+            bar_size = 60 * 1000
         if md_request_vendor.freq == 'daily':
             period = '1d'
+            bar_size = 86400 * 1000
 
-        data_frame = pandas.DataFrame(columns=[0, 1, 2, 3, 4, 5])
         start_time = int(
             md_request_vendor.start_date.timestamp() * 1000)
         finish_time = int(
             md_request_vendor.finish_date.timestamp() * 1000)
 
-        stop_flag = 0
-        while stop_flag == 0:
-            if stop_flag == 1:
-                break
-            json_url = binance_url.format(
-                md_request_vendor.tickers[0], period, start_time,
-                finish_time)
-            data_read = pandas.read_json(json_url)
-
-            if len(data_read) < 500:
-                if len(data_read) == 0 & len(data_frame) == 0:
-                    logger.warning(
-                        "Warning: No data. Please change the start_date and finish_date.")
-                    break
-                else:
-                    stop_flag = 1
-            data_frame = data_frame.append(data_read)
-            start_time = int(data_frame[0].tail(1))
-            time_library.sleep(2)
+        limit = self.get_page_limit()
 
-        if (len(data_frame) == 0):
-            return data_frame
+        def fetch_klines(page_start, page_finish):
+            return pandas.read_json(binance_url.format(
+                md_request_vendor.tickers[0], period, page_start,
+                page_finish, limit))
+
+        data_frame = self.fetch_windowed_pages(fetch_klines, start_time,
+                                               finish_time, bar_size)
+
+        if data_frame is None:
+            logger.warning(
+                "Warning: No data. Please change the start_date and finish_date.")
+
+            return None
 
         data_frame.columns = ['open-time', 'open', 'high', 'low', 'close',
                               'volume', 'close-time', 'quote-asset-volume',
@@ -181,6 +362,7 @@ class DataVendorBinance(DataVendor):
                               'taker-buy-quote-asset-volume', 'ignore']
         data_frame['open-time'] = data_frame['open-time'] / 1000
         data_frame = data_frame.set_index('open-time')
+        data_frame = data_frame[~data_frame.index.duplicated(keep='first')]
         data_frame = data_frame.drop(['close-time', 'ignore'], axis=1)
         data_frame.index.name = 'Date'
         data_frame.index = pandas.to_datetime(data_frame.index, unit='s')
@@ -211,12 +393,13 @@ class DataVendorBinance(DataVendor):
 
 ###############################################################################
 
-class DataVendorBitfinex(DataVendor):
+class DataVendorBitfinex(DataVendorCrypto):
     """Class for reading in data from various web sources into findatapy
     library including
     """
 
     # Data limit = 1000
+    data_source = 'bitfinex'
 
     def __init__(self):
         super(DataVendorBitfinex, self).__init__()
@@ -229,40 +412,34 @@ class DataVendorBitfinex(DataVendor):
 
         logger.info("Request data from Bitfinex.")
 
-        import time
-        bitfinex_url = 'https://api.bitfinex.com/v2/candles/trade:{}:t{}/hist?start={}&end={}&limit=1000&sort=1'
+        bitfinex_url = 'https://api.bitfinex.com/v2/candles/trade:{}:t{}/hist?start={}&end={}&limit={}&sort=1'
         if md_request_vendor.freq == 'intraday':
             period = '1m'
+            bar_size = 60 * 1000
         if md_request_vendor.freq == 'daily':
             period = '1D'
+            bar_size = 86400 * 1000
 
-        data_frame = pandas.DataFrame(columns=[0, 1, 2, 3, 4, 5])
         start_time = int(
             md_request_vendor.start_date.timestamp() * 1000)
         finish_time = int(
             md_request_vendor.finish_date.timestamp() * 1000)
-        stop_flag = 0
-        while stop_flag == 0:
-            if stop_flag == 1:
-                break
-            json_url = bitfinex_url.format(period,
-                                           md_request_vendor.tickers[
-                                               0], start_time, finish_time)
-            data_read = pandas.read_json(json_url)
-            if (len(data_read) < 1000):
-                if ((len(data_read) == 0) & (len(data_frame) == 0)):
-                    break
-                else:
-                    stop_flag = 1
-            data_frame = data_frame.append(data_read)
-            start_time = int(data_frame[0].tail(1))
-            time_library.sleep(2)
 
-        if len(data_frame) == 0:
+        limit = self.get_page_limit()
+
+        def fetch_candles(page_start, page_finish):
+            return pandas.read_json(bitfinex_url.format(
+                period, md_request_vendor.tickers[0], page_start,
+                page_finish, limit))
+
+        data_frame = self.fetch_windowed_pages(fetch_candles, start_time,
+                                               finish_time, bar_size)
+
+        if data_frame is None:
             logger.warning(
                 "Warning: No data. Please change the start_date and finish_date.")
 
-        #    return data_frame
+            return None
 
         data_frame.columns = ['mts', 'open', 'close', 'high', 'low', 'volume']
         data_frame = data_frame.set_index('mts')
@@ -290,12 +467,13 @@ class DataVendorBitfinex(DataVendor):
 
 ###############################################################################
 
-class DataVendorGdax(DataVendor):
+class DataVendorGdax(DataVendorCrypto):
     """Class for reading in data from various web sources into findatapy
     library including
     """
 
-    # Data limit = 350
+    # Data limit = 300
+    data_source = 'gdax'
 
     def __init__(self):
         super(DataVendorGdax, self).__init__()
@@ -315,37 +493,25 @@ class DataVendorGdax(DataVendor):
         if md_request_vendor.freq == 'intraday':
             # 1 minute data
             period = '60'
-            dt = timedelta(minutes=1)
+            dt = datetime.timedelta(minutes=1)
         if md_request_vendor.freq == 'daily':
             period = '86400'
-            dt = timedelta(days=1)
-        limit = 350
+            dt = datetime.timedelta(days=1)
 
-        data_frame = pandas.DataFrame(columns=[0, 1, 2, 3, 4, 5])
-        stop_flag = 0
-        while stop_flag == 0:
-            if stop_flag == 1:
-                break
-            data_end_time = start_time + (limit - 1) * dt
-            if data_end_time > end_time:
-                data_end_time = end_time
-                stop_flag = 1
-            json_url = gdax_url.format(md_request_vendor.tickers[0],
-                                       start_time.isoformat(),
-                                       data_end_time.isoformat(), period)
-            data_read = pandas.read_json(json_url)
-            data_frame = data_frame.append(data_read)
-            if (len(data_read) == 0):
-                start_time = data_end_time
-            else:
-                start_time = pandas.to_datetime(int(data_read[0].head(1)),
-                                                unit='s')
-            time_library.sleep(2)
+        def fetch_candles(page_start, page_finish):
+            return pandas.read_json(gdax_url.format(
+                md_request_vendor.tickers[0], page_start.isoformat(),
+                page_finish.isoformat(), period))
 
-        if len(data_frame) == 0:
+        data_frame = self.fetch_windowed_pages(fetch_candles, start_time,
+                                               end_time, dt)
+
+        if data_frame is None:
             logger.warning(
                 "Warning: No data. Please change the start_date and finish_date.")
 
+            return None
+
         data_frame.columns = ['time', 'low', 'high', 'open', 'close', 'volume']
         data_frame = data_frame.set_index('time')
         data_frame.index = pandas.to_datetime(data_frame.index, unit='s')
@@ -371,13 +537,14 @@ class DataVendorGdax(DataVendor):
 
 ###############################################################################
 
-class DataVendorKraken(DataVendor):
+class DataVendorKraken(DataVendorCrypto):
     """Class for reading in data from various web sources into findatapy
     library including
     """
 
     # Data limit : can only get the most recent 720 rows for klines
     # Collect data from all trades data
+    data_source = 'kraken'
 
     def __init__(self):
         super(DataVendorKraken, self).__init__()
@@ -402,21 +569,15 @@ class DataVendorKraken(DataVendor):
             md_request_vendor.finish_date.timestamp() * 1e9)
 
         kraken_url = 'https://api.kraken.com/0/public/Trades?pair={}&since={}'
-        data_frame = pandas.DataFrame(
-            columns=['close', 'volume', 'time', 'buy-sell', 'market-limit',
-                     'miscellaneous'])
-        stop_flag = 0
 
-        while stop_flag == 0:
-            if stop_flag == 1:
-                break
+        # Trades can only be paged from the last trade of the previous page
+        def fetch_trades(since):
+            data_read = json.loads(requests.get(
+                kraken_url.format(md_request_vendor.tickers[0], since)).text)
 
-            json_url = kraken_url.format(md_request_vendor.tickers[0],
-                                         start_time)
-            data_read = json.loads(requests.get(json_url).text)
-            if (len(list(data_read)) == 1):
-                time_library.sleep(10)
-                data_read = json.loads(requests.get(json_url).text)
+            # Only an error is returned (eg. if we're being throttled)
+            if len(list(data_read)) == 1:
+                raise Exception(str(data_read))
 
             data_list = list(data_read['result'])[0]
             data_read = data_read['result'][data_list]
@@ -424,13 +585,24 @@ class DataVendorKraken(DataVendor):
                                   columns=['close', 'volume', 'time',
                                            'buy-sell', 'market-limit',
                                            'miscellaneous'])
-            start_time = int(df['time'].tail(1) * 1e9)
-            if (start_time > end_time):
-                stop_flag = 1
-            if (end_time < int(df['time'].head(1) * 1e9)):
-                stop_flag = 1
-            data_frame = data_frame.append(df)
-            time_library.sleep(5)
+
+            if len(df) == 0:
+                return df, None
+
+            next_since = int(df['time'].iloc[-1] * 1e9)
+
+            if next_since > end_time \
+                    or end_time < int(df['time'].iloc[0] * 1e9):
+                next_since = None
+
+            return df, next_since
+
+        data_frame = self.fetch_cursor_pages(fetch_trades, start_time)
+
+        if data_frame is None:
+            data_frame = pandas.DataFrame(
+                columns=['close', 'volume', 'time', 'buy-sell',
+                         'market-limit', 'miscellaneous'])
 
         data_frame = data_frame.set_index('time')
         data_frame.index = pandas.to_datetime(data_frame.index, unit='s')
@@ -462,12 +634,13 @@ class DataVendorKraken(DataVendor):
 
 ###############################################################################
 
-class DataVendorBitmex(DataVendor):
+class DataVendorBitmex(DataVendorCrypto):
     """Class for reading in data from various web sources into findatapy
     library including
     """
 
     # Data limit = 500,  150 calls / 5 minutes
+    data_source = 'bitmex'
 
     def __init__(self):
         super(DataVendorBitmex, self).__init__()
@@ -480,36 +653,38 @@ class DataVendorBitmex(DataVendor):
 
         logger.info("Request data from Bitmex.")
 
-        bitMEX_url = 'https://www.bitmex.com/api/v1/quote?symbol={}&count=500&reverse=false&startTime={}&endTime={}'
-        data_frame = pandas.DataFrame(
-            columns=['askPrice', 'askSize', 'bidPrice', 'bidSize', 'symbol',
-                     'timestamp'])
-        start_time = md_request_vendor.start_date.timestamp()
-        finish_time = md_request_vendor.finish_date.timestamp()
+        bitMEX_url = 'https://www.bitmex.com/api/v1/quote?symbol={}&count={}&reverse=false&startTime={}&endTime={}'
+        start_time = md_request_vendor.start_date.isoformat()
+        finish_time = md_request_vendor.finish_date.isoformat()
         symbol = md_request_vendor.tickers[0]
 
-        stop_flag = 0
-        while stop_flag == 0:
-            if stop_flag == 1:
-                break
-            json_url = bitMEX_url.format(symbol, start_time.isoformat(),
-                                         finish_time.isoformat())
-            data_read = pandas.read_json(json_url)
-            if (len(data_read) < 500):
-                stop_flag = 1
-            data_frame = data_frame.append(data_read)
-            start_time = data_read['timestamp'][data_frame.index[-1]]
-            time_library.sleep(2)
-
-        if (len(data_frame) == 0):
+        limit = self.get_page_limit()
+
+        # Quotes can only be paged from the last quote of the previous page
+        def fetch_quotes(page_start):
+            data_read = pandas.read_json(bitMEX_url.format(
+                symbol, limit, page_start, finish_time))
+
+            if len(data_read) < limit:
+                return data_read, None
+
+            return data_read, pandas.Timestamp(
+                data_read['timestamp'].iloc[-1]).isoformat()
+
+        data_frame = self.fetch_cursor_pages(fetch_quotes, start_time)
+
+        if data_frame is None:
             logger.warning(
                 "Warning: No data. Please change the start_date and finish_date.")
 
-        data_frame = data_frame.drop(columns=['symbol'])
+            return None
+
+        data_frame = data_frame[['askPrice', 'askSize', 'bidPrice', 'bidSize',
+                                 'timestamp']]
         col = ['ask-price', 'ask-size', 'bid-price', 'bid-size', 'timestamp']
         data_frame.columns = col
         data_frame = data_frame.set_index('timestamp')
-        data_frame.index = pandas.to_datetime(data_frame.index, unit='ms')
+        data_frame.index = pandas.to_datetime(data_frame.index)
         data_frame = data_frame[~data_frame.index.duplicated(keep='first')]
         data_frame.columns = [md_request.tickers[0] + '.ask-price',
                               md_request.tickers[0] + '.ask-size',
@@ -522,7 +697,7 @@ class DataVendorBitmex(DataVendor):
             field_selected[-1] = md_request.tickers[0] + '.' + \
                                  md_request_vendor.fields[i]
 
-        logger.info("Completed request from Bitfinex.")
+        logger.info("Completed request from Bitmex.")
 
         return data_frame[field_selected]
 
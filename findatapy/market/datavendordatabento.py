@@ -15,7 +15,12 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 
+import functools
+
+import pandas as pd
+
 from findatapy.market.datavendor import DataVendor
+from findatapy.util.loggermanager import LoggerManager
 
 # Databento is an optional dependency
 try:
@@ -25,6 +30,10 @@ except:
 
 class DataVendorDatabento(DataVendor):
 
+    # Each request (or window of an intraday request) holds a request from
+    # the governor, rather than the whole load_ticker
+    governs_own_requests = True
+
     def __init__(self):
         super(DataVendorDatabento, self).__init__()
 
@@ -35,7 +44,16 @@ class DataVendorDatabento(DataVendor):
 
         logger.info("Request Databento data")
 
-        data_frame = self.download_daily(md_request_vendor)
+        # Long intraday requests are split into windows, downloaded in
+        # parallel
+        if md_request_vendor.freq == "intraday":
+            data_frame = self.download_windowed(
+                md_request_vendor,
+                functools.partial(self.download_daily, raise_errors=True),
+                "databento")
+        else:
+            data_frame = self.download_governed(
+                self.download_daily, md_request_vendor, "databento")
 
         if data_frame is None or data_frame.index is []:
             return None
@@ -56,7 +74,7 @@ class DataVendorDatabento(DataVendor):
 
         return data_frame
 
-    def download_daily(self, md_request):
+    def download_daily(self, md_request, raise_errors=False):
         logger = LoggerManager().getLogger(__name__)
         trials = 0
 
@@ -80,13 +98,29 @@ class DataVendorDatabento(DataVendor):
                     # limit=1,
                 )
                 data_frame = data.to_df()
+
+                break
             except:
                 trials = trials + 1
                 logger.info(f"Attempting... {str(trials)} request to download from Databento")
 
+        if trials == 5:
+            logger.error("Couldn't download from Databento after several attempts!")
+
+            # So a window of a windowed download is retried (rather than
+            # being treated as having no data)
+            if raise_errors:
+                raise Exception(
+                    "Couldn't download from Databento after several attempts!")
+
+            return None
+
+        if data_frame is None or data_frame.empty:
+            return None
+
         data_frame = data_frame.set_index('symbol', append=True).unstack(level='symbol')
-        fields = df.columns.levels[0]
-        tickers = df.columns.levels[1]
+        fields = data_frame.columns.levels[0]
+        tickers = data_frame.columns.levels[1]
 
         new_cols = []
 
@@ -97,7 +131,4 @@ class DataVendorDatabento(DataVendor):
         data_frame.columns = new_cols
         data_frame.index.name = "Date"
 
-        if trials == 5:
-            logger.error("Couldn't download from Databento after several attempts!")
-
         return data_frame
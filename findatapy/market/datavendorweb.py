@@ -40,7 +40,9 @@ from datetime import timedelta
 from datetime import timezone
 import time as time_library
 import re
+import threading
 import concurrent.futures
+import functools
 
 import requests
 
@@ -55,12 +57,15 @@ except:
     import Quandl
 
 from findatapy.market.ioengine import IOEngine, SpeedCache
+from findatapy.market.marketdatarequest import MarketDataRequest
+from findatapy.timeseries import Calculations
 
 # Abstract class on which this is based
 from findatapy.market.datavendor import DataVendor
 
 # For logging and constants
-from findatapy.util import ConfigManager, DataConstants, LoggerManager
+from findatapy.util import ConfigManager, DataConstants, LoggerManager, \
+    RequestGovernor
 
 class DataVendorQuandl(DataVendor):
     """Reads in data from Quandl into findatapy library
@@ -194,6 +199,10 @@ class DataVendorEikon(DataVendor):
 
     """
 
+    # Each request (or window of an intraday/tick request) holds a request
+    # from the governor, rather than the whole load_ticker
+    governs_own_requests = True
+
     def __init__(self):
         super(DataVendorEikon, self).__init__()
 
@@ -206,7 +215,15 @@ class DataVendorEikon(DataVendor):
 
         logger.info("Request Eikon data")
 
-        data_frame = self.download(md_request_vendor)
+        # Long intraday/tick requests are split into windows, downloaded in
+        # parallel
+        if md_request_vendor.freq != 'daily':
+            data_frame = self.download_windowed(
+                md_request_vendor,
+                functools.partial(self.download, raise_errors=True), "eikon")
+        else:
+            data_frame = self.download_governed(self.download,
+                                                md_request_vendor, "eikon")
 
         if data_frame is None or data_frame.index is []: return None
 
@@ -251,7 +268,7 @@ class DataVendorEikon(DataVendor):
         # print(data_frame)
         return data_frame
 
-    def download(self, md_request):
+    def download(self, md_request, raise_errors=False):
         logger = LoggerManager().getLogger(__name__)
 
         trials = 0
@@ -294,6 +311,12 @@ class DataVendorEikon(DataVendor):
             logger.error(
                 "Couldn't download from Eikon after several attempts!")
 
+            # So a window of a windowed download is retried (rather than
+            # being treated as having no data)
+            if raise_errors:
+                raise Exception(
+                    "Couldn't download from Eikon after several attempts!")
+
         return data_frame
 
 ###############################################################################
@@ -685,7 +708,8 @@ constants = DataConstants()
 class DataVendorDukasCopy(DataVendor):
     """Class for downloading tick data from DukasCopy (note: past month of data 
     is not available). Selecting very large histories is not recommended as you 
-    will likely run out memory given the amount of data requested.
+    will likely run out memory given the amount of data requested. Instead
+    use load_ticker_stream, which returns the data hour by hour.
 
     Parsing of files is re-written version https://github.com/nelseric/ticks/
         parsing has been speeded up considerably
@@ -694,6 +718,20 @@ class DataVendorDukasCopy(DataVendor):
     """
     tick_name = "{symbol}/{year}/{month}/{day}/{hour}h_ticks.bi5"
 
+    # Every request for a file goes through the RequestGovernor
+    governs_own_requests = True
+
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"}
+
+    # Index of the hours cached on disk for each symbol
+    _tick_cache_index = {}
+    _tick_cache_lock = threading.Lock()
+
+    # Each tick in a bi5 file is a 20 byte big-endian record: milliseconds
+    # into the hour, ask, bid (as integers) then ask and bid volumes
+    bi5_dtype = np.dtype([('ms', '>u4'), ('ask', '>u4'), ('bid', '>u4'),
+                          ('askv', '>f4'), ('bidv', '>f4')])
+
     def __init__(self):
         super(DataVendor, self).__init__()
 
@@ -753,10 +791,48 @@ class DataVendorDukasCopy(DataVendor):
     def kill_session(self):
         return
 
+    def load_ticker_stream(self, md_request, freq="hour"):
+        """Retrieves tick data from Dukascopy as a generator of DataFrames
+        (one per hour or day), rather than one large DataFrame, so the memory
+        used is bounded by a few hours of ticks (eg. for writing to disk with
+        IOEngine.write_parquet_stream)
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            contains all the various parameters detailing time series start
+            and finish, tickers etc
+        freq : str
+            "hour" or "day" - how much data in each DataFrame
+
+        Returns
+        -------
+        generator of DataFrame
+        """
+        md_request_vendor = self.construct_vendor_md_request(md_request)
+
+        import pytz
+
+        for data_frame in self.download_tick_stream(md_request_vendor,
+                                                    freq=freq):
+            data_frame = self.translate_tick_columns(
+                data_frame, md_request, md_request_vendor)
+
+            # Only the requested fields (usually done by MarketDataGenerator)
+            data_frame = self.filter_requested_columns(data_frame,
+                                                       md_request)
+
+            yield data_frame.tz_localize(pytz.utc)
+
     def get_tick(self, md_request, md_request_vendor):
 
         data_frame = self.download_tick(md_request_vendor)
 
+        return self.translate_tick_columns(data_frame, md_request,
+                                           md_request_vendor)
+
+    def translate_tick_columns(self, data_frame, md_request,
+                               md_request_vendor):
         # convert from vendor to findatapy tickers/fields
         if data_frame is not None:
             returned_fields = data_frame.columns
@@ -779,6 +855,64 @@ class DataVendorDukasCopy(DataVendor):
 
         return data_frame
 
+    def download_tick_stream(self, md_request, freq="hour"):
+        """Downloads tick data hour by hour, yielding a DataFrame for each
+        hour (or day) in order, whilst downloading the next few hours in
+        parallel. Raises an exception if an hour can't be downloaded, rather
+        than leaving a gap.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Request with vendor tickers
+        freq : str
+            "hour" or "day" - how much data in each DataFrame
+
+        Returns
+        -------
+        generator of DataFrame
+        """
+        symbol = md_request.tickers[0]
+        logger = LoggerManager.getLogger(__name__)
+
+        logger.info(f"About to stream from Dukascopy... for {symbol}")
+
+        thread_no = 1
+
+        if constants.dukascopy_multithreading:
+            thread_no = constants.market_thread_no['dukascopy']
+
+        time_list = self.hour_range(md_request.start_date,
+                                    md_request.finish_date)
+
+        # Only stagger the first requests, rather than every hour
+        args_list = ((ti, symbol, True, i % thread_no)
+                     for i, ti in enumerate(time_list))
+
+        df_day = []
+        current_day = None
+
+        for time, df in zip(time_list, self.stream_map(
+                self.fetch_file, args_list, thread_no=thread_no)):
+
+            if freq == "day":
+                if current_day is not None and time.date() != current_day \
+                        and df_day:
+                    yield pandas.concat(df_day)
+
+                    df_day = []
+
+                current_day = time.date()
+
+                if df is not None and not df.empty:
+                    df_day.append(df)
+
+            elif df is not None and not df.empty:
+                yield df
+
+        if df_day:
+            yield pandas.concat(df_day)
+
     def download_tick(self, md_request):
 
         symbol = md_request.tickers[0]
@@ -793,7 +927,6 @@ class DataVendorDukasCopy(DataVendor):
 
         # parallel threaded (even with GIL, fast because lots of 
         # waiting for IO!)
-        from findatapy.util import SwimPool
         time_list = self.hour_range(md_request.start_date,
                                     md_request.finish_date)
 
@@ -802,54 +935,41 @@ class DataVendorDukasCopy(DataVendor):
         # when retried, avoid using)
         multi_threaded = constants.dukascopy_multithreading 
 
-        if multi_threaded:
-
-            completed = False
-
-            for i in range(1, 10):
-
-                try:
-                    # Use threading (not multiprocess interface, which has 
-                    # issues with dukascopy download)
-                    pool = SwimPool().create_pool('thread',
-                                                  constants.market_thread_no[
-                                                      'dukascopy'])
-                    results = [pool.apply_async(self.fetch_file, args=(
-                    ti, symbol, do_retrieve_df, try_time,))
-                               for try_time, ti in enumerate(time_list)]
-
-                    logger.debug(
-                        f"Attempting Dukascopy download {i}... ")
-
-                    # Have a long timeout, because internally it'll try to download several times
-                    tick_list = [p.get(
-                        timeout=constants.timeout_downloader['dukascopy']) for
-                                 p in results]
-
-                    pool.close()
-                    pool.join()
-
-                    completed = True
-
-                    break
-                except:
-                    logger.warning(
-                        f"Didn't download on {i} attempt... ")
-
-                time_library.sleep(i * 5)
-
-            if not (completed):
-                logger.warning(
-                    "Failed to download from Dukascopy after several attempts")
-
+        # Keeps track of which hours have been downloaded, so if some fail
+        # we only retry those (also across reruns), not the whole range
+        ledger = self.create_download_ledger(
+            "dukascopy", symbol, md_request.start_date, md_request.finish_date)
+
+        http_engine = self.create_async_http_engine(
+            "dukascopy", retries=constants.dukascopy_retries,
+            timeout_seconds=constants.dukascopy_mini_timeout_seconds,
+            headers=self.headers)
+
+        if http_engine is not None:
+            # All the hours are downloaded with one pooled client, paced by
+            # a token bucket (rather than sleeping before each request),
+            # which already retries each hour
+            tick_list = ledger.download(
+                time_list,
+                fetch_batch_func=lambda t: self.fetch_files_async(
+                    http_engine, t, symbol, do_retrieve_df),
+                key_func=self.get_hour_key, retries=1)
         else:
-            # fully single threaded
-            tick_list = []
-
-            time_list = list(time_list)
-            for time in time_list:
-                tick_list.append(
-                    self.fetch_file(time, symbol, do_retrieve_df, 0))
+            thread_no = 1
+
+            if multi_threaded:
+                thread_no = constants.market_thread_no['dukascopy']
+
+            # Use threading (not multiprocess interface, which has issues
+            # with dukascopy download). Have a long timeout, because
+            # internally it'll try to download several times
+            tick_list = ledger.download(
+                time_list,
+                fetch_func=lambda t: self.fetch_file(
+                    t, symbol, do_retrieve_df, t.hour % thread_no),
+                key_func=self.get_hour_key, thread_no=thread_no,
+                retries=constants.market_download_ledger_retries,
+                timeout=constants.timeout_downloader['dukascopy'])
 
         if do_retrieve_df:
             df_list = tick_list
@@ -881,10 +1001,12 @@ class DataVendorDukasCopy(DataVendor):
         except:
             return None
 
-    def fetch_file(self, time, symbol, do_retrieve_df, try_time):
-        logger = LoggerManager.getLogger(__name__)
+    def get_hour_key(self, time):
+        return time.strftime("%Y%m%d%H")
 
-        tick_path = self.tick_name.format(
+    def get_tick_path(self, time, symbol):
+        # Note: Dukascopy months start from 0
+        return self.tick_name.format(
             symbol=symbol,
             year=str(time.year).rjust(4, '0'),
             month=str(time.month - 1).rjust(2, '0'),
@@ -892,33 +1014,342 @@ class DataVendorDukasCopy(DataVendor):
             hour=str(time.hour).rjust(2, '0')
         )
 
+    def get_tick_cache_folder(self):
+        return constants.temp_folder + "/dkticks/"
+
+    def _get_tick_cache_index_path(self, symbol):
+        return self.get_tick_cache_folder() + symbol + "/index.txt"
+
+    def get_cached_hours(self, symbol):
+        """Gets the hours of tick data which are stored on disk for a
+        symbol, using an index file (which is rebuilt from the folder if it
+        is missing)
+
+        Parameters
+        ----------
+        symbol : str
+            Dukascopy symbol eg. EURUSD
+
+        Returns
+        -------
+        set of datetime
+        """
+        index_key = self.get_tick_cache_folder() + symbol
+
+        with DataVendorDukasCopy._tick_cache_lock:
+            if index_key in DataVendorDukasCopy._tick_cache_index:
+                return set(DataVendorDukasCopy._tick_cache_index[index_key])
+
+            cached_hours = set()
+
+            index_path = self._get_tick_cache_index_path(symbol)
+
+            if os.path.exists(index_path):
+                with open(index_path, "r") as f:
+                    for line in f:
+                        line = line.strip()
+
+                        if line != "":
+                            cached_hours.add(
+                                datetime.strptime(line, "%Y-%m-%d %H"))
+            else:
+                # Rebuild the index from the bi5 files already on disk
+                pattern = re.compile(
+                    r"(\d{4})/(\d{2})/(\d{2})/(\d{2})h_ticks\.bi5$")
+
+                for root, dirs, files in os.walk(index_key):
+                    for f in files:
+                        m = pattern.search(
+                            os.path.join(root, f).replace("\\", "/"))
+
+                        if m is not None:
+                            cached_hours.add(datetime(
+                                int(m.group(1)), int(m.group(2)) + 1,
+                                int(m.group(3)), int(m.group(4))))
+
+                if cached_hours:
+                    with open(index_path, "w") as f:
+                        for h in sorted(cached_hours):
+                            f.write(h.strftime("%Y-%m-%d %H") + "\n")
+
+            DataVendorDukasCopy._tick_cache_index[index_key] = cached_hours
+
+            return set(cached_hours)
+
+    def get_missing_hours(self, symbol, start_date, finish_date):
+        """Gets the hours in a date range which are not stored on disk
+
+        Parameters
+        ----------
+        symbol : str
+            Dukascopy symbol eg. EURUSD
+        start_date : datetime
+            Start date
+        finish_date : datetime
+            Finish date
+
+        Returns
+        -------
+        list of datetime
+        """
+        cached_hours = self.get_cached_hours(symbol)
+
+        return [h for h in self.hour_range(start_date, finish_date)
+                if datetime(h.year, h.month, h.day, h.hour)
+                not in cached_hours]
+
+    def read_cached_tick(self, time, symbol):
+        """Reads the raw bi5 file for an hour from disk, if we have already
+        downloaded it
+
+        Parameters
+        ----------
+        time : datetime
+            Hour to read
+        symbol : str
+            Dukascopy symbol eg. EURUSD
+
+        Returns
+        -------
+        bytes
+            None if it isn't on disk
+        """
+        out_path = self.get_tick_cache_folder() \
+                   + self.get_tick_path(time, symbol)
+
+        try:
+            if os.path.exists(out_path):
+                # Files written by older versions weren't checked, so they
+                # could be an hour which hadn't finished or an error page
+                written_time = datetime.fromtimestamp(
+                    os.path.getmtime(out_path), timezone.utc).replace(
+                    tzinfo=None)
+
+                with open(out_path, "rb") as f:
+                    tick = f.read()
+
+                if self.is_valid_cached_tick(time, tick, written_time):
+                    return tick
+
+                logger = LoggerManager.getLogger(__name__)
+                logger.debug(f"Ignoring invalid cached tick file {out_path}")
+        except Exception as e:
+            logger = LoggerManager.getLogger(__name__)
+            logger.warning(f"Couldn't read cached tick file {out_path}: {e}")
+
+        return None
+
+    def is_valid_cached_tick(self, time, tick, written_time):
+        """Checks whether raw bi5 content for an hour can be cached on disk
+        (or trusted when read back), ie. the hour had finished when it was
+        downloaded and it is a valid bi5 file (rather than an error page)
+
+        Parameters
+        ----------
+        time : datetime
+            Hour of the ticks
+        tick : bytes
+            Raw bi5 content
+        written_time : datetime
+            When the content was downloaded (UTC)
+
+        Returns
+        -------
+        bool
+        """
+        if tick is None:
+            return False
+
+        hour = datetime(time.year, time.month, time.day, time.hour)
+
+        if hour + timedelta(hours=1) > written_time:
+            return False
+
+        # Empty hours (eg. weekends) are valid, otherwise check we can
+        # decompress it
+        if len(tick) > 0:
+            try:
+                lzma.decompress(tick)
+            except:
+                return False
+
+        return True
+
+    def write_cached_tick(self, time, symbol, tick):
+        """Writes the raw bi5 file for an hour to disk and adds it to the
+        index. Only hours which have finished are written (otherwise more
+        ticks could still arrive) and only if the content is a valid bi5
+        file (rather than an error page).
+
+        Parameters
+        ----------
+        time : datetime
+            Hour which has been downloaded
+        symbol : str
+            Dukascopy symbol eg. EURUSD
+        tick : bytes
+            Raw bi5 content
+        """
+        if not self.is_valid_cached_tick(
+                time, tick, datetime.now(timezone.utc).replace(tzinfo=None)):
+            return
+
+        hour = datetime(time.year, time.month, time.day, time.hour)
+
+        out_path = self.get_tick_cache_folder() \
+                   + self.get_tick_path(time, symbol)
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+        # Write to a temporary file first, so a partially written file is
+        # never read back
+        temp_path = f"{out_path}.{threading.get_ident()}.tmp"
+
+        self.write_tick(tick, temp_path)
+        os.replace(temp_path, out_path)
+
+        # Make sure the index has been loaded before adding to it
+        self.get_cached_hours(symbol)
+
+        index_key = self.get_tick_cache_folder() + symbol
+
+        with DataVendorDukasCopy._tick_cache_lock:
+            cached_hours = DataVendorDukasCopy._tick_cache_index[index_key]
+
+            if hour not in cached_hours:
+                cached_hours.add(hour)
+
+                with open(self._get_tick_cache_index_path(symbol), "a") as f:
+                    f.write(hour.strftime("%Y-%m-%d %H") + "\n")
+
+    def fetch_file(self, time, symbol, do_retrieve_df, try_time):
+        logger = LoggerManager.getLogger(__name__)
+
+        tick_path = self.get_tick_path(time, symbol)
+
         url = constants.dukascopy_base_url + tick_path
 
-        if time.hour % 24 == 0:
-            logger.info(f"Downloading... {time} {url}")
+        tick = None
+
+        # Hours in the past never change, so use the copy on disk if we
+        # have already downloaded it (and skip the network)
+        if constants.dukascopy_read_temp_tick_disk:
+            tick = self.read_cached_tick(time, symbol)
 
-        tick = self.fetch_tick(url, try_time)
+        if tick is None:
+            if time.hour % 24 == 0:
+                logger.info(f"Downloading... {time} {url}")
 
-        # print(tick_path)
-        if constants.dukascopy_write_temp_tick_disk:
-            out_path = constants.temp_folder + "/dkticks/" + tick_path
+            tick = self.fetch_tick(url, try_time)
 
-            if not os.path.exists(out_path):
-                if not os.path.exists(os.path.dirname(out_path)):
-                    os.makedirs(os.path.dirname(out_path))
+            # Raise, so the hour is retried (rather than silently missing)
+            if tick is None:
+                raise Exception(f"Failed to download {url}")
 
-            self.write_tick(tick, out_path)
+            # print(tick_path)
+            if constants.dukascopy_write_temp_tick_disk:
+                self.write_cached_tick(time, symbol, tick)
 
         if do_retrieve_df:
-            try:
-                return self.retrieve_df(lzma.decompress(tick), symbol, time)
-            except Exception as e:
-                # print(tick_path + ' ' + str(e))
-                # print(str(e))
-                return None
+            df = self.parse_tick(tick, symbol, time)
+
+            if df is None:
+                raise Exception(f"Failed to parse {url}")
+
+            return df
 
         return tick
 
+    def parse_tick(self, tick, symbol, time):
+        """Decompresses and parses a raw bi5 file into a DataFrame
+
+        Returns
+        -------
+        DataFrame
+            Empty if there were no ticks in that hour, None if the file
+            couldn't be downloaded or parsed
+        """
+        if tick is None:
+            return None
+
+        # Hours with no ticks (eg. weekends) are empty files
+        if len(tick) == 0:
+            return self.retrieve_df(b"", symbol, time)
+
+        try:
+            return self.retrieve_df(lzma.decompress(tick), symbol, time)
+        except Exception as e:
+            # print(str(e))
+            return None
+
+    def fetch_files_async(self, http_engine, time_list, symbol,
+                          do_retrieve_df):
+        """Downloads the bi5 files for many hours with an AsyncHTTPEngine,
+        decompressing and parsing them in its worker pool. Hours which are
+        cached on disk are not downloaded again.
+
+        Parameters
+        ----------
+        http_engine : AsyncHTTPEngine
+            Engine to do the downloading
+        time_list : list of datetime
+            Hours to download
+        symbol : str
+            Dukascopy symbol eg. EURUSD
+        do_retrieve_df : bool
+            Parse into DataFrames (otherwise return the raw bi5 content)
+
+        Returns
+        -------
+        list
+            DataFrames (or raw content) in the same order as time_list
+        """
+        time_list = list(time_list)
+        tick_list = [None] * len(time_list)
+
+        def parse(time, tick):
+            if do_retrieve_df:
+                return self.parse_tick(tick, symbol, time)
+
+            return tick
+
+        download_index = []
+
+        for i, time in enumerate(time_list):
+            tick = None
+
+            if constants.dukascopy_read_temp_tick_disk:
+                tick = self.read_cached_tick(time, symbol)
+
+            if tick is None:
+                download_index.append(i)
+            else:
+                tick_list[i] = parse(time, tick)
+
+        def parse_downloaded(j, tick):
+            time = time_list[download_index[j]]
+
+            if constants.dukascopy_write_temp_tick_disk:
+                self.write_cached_tick(time, symbol, tick)
+
+            return parse(time, tick)
+
+        url_list = [constants.dukascopy_base_url
+                    + self.get_tick_path(time_list[i], symbol)
+                    for i in download_index]
+
+        # Hours which don't exist (404) have no data, like the empty files
+        # for hours with no ticks
+        downloaded = http_engine.fetch_all(
+            url_list, parse_func=parse_downloaded,
+            is_valid_func=lambda c: "error" not in c.decode("latin1"),
+            not_found_content=b"")
+
+        for i, tick in zip(download_index, downloaded):
+            tick_list[i] = tick
+
+        return tick_list
+
     def fetch_tick(self, tick_url, try_time):
         download_counter = 0
 
@@ -932,26 +1363,44 @@ class DataVendorDukasCopy(DataVendor):
         time_library.sleep(
             constants.dukascopy_try_time * try_time / 2.0)  # constants.market_thread_no['dukascopy'])
 
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"}
+        headers = self.headers
+
+        governor = RequestGovernor.get_governor("dukascopy")
 
         # Try up to 20 times to download
         while download_counter < constants.dukascopy_retries:
             try:
-                tick_request = requests.get(
-                    tick_url, headers=headers, timeout=constants.dukascopy_mini_timeout_seconds)
-
-                # If URL has not been found try again
+                if governor is None:
+                    tick_request = requests.get(
+                        tick_url, headers=headers, timeout=constants.dukascopy_mini_timeout_seconds)
+                else:
+                    governor.acquire()
+
+                    try:
+                        tick_request = requests.get(
+                            tick_url, headers=headers, timeout=constants.dukascopy_mini_timeout_seconds)
+                    finally:
+                        governor.release()
+
+                # Back off (for all threads) if we're being throttled
+                if tick_request.status_code in [429, 503] \
+                        and governor is not None:
+                    governor.throttled()
+
+                # If URL has not been found, there's no data for that hour
+                # (like the empty files for hours with no ticks), so no
+                # point retrying
                 if tick_request.status_code == 404:
                     logger.warning(
-                        f"Error downloading.. {tick_url} returned 404 URL not found message! Are you sure Dukascopy has this asset?")
+                        f"Error downloading.. {tick_url} returned 404 URL not found message, so treating as no data! Are you sure Dukascopy has this asset?")
 
-                    tick_request_content = None
+                    tick_request_content = b""
                     tick_request.close()
 
                     break
-                elif tick_request.status_code == 503:
+                elif tick_request.status_code >= 500:
                     logger.warning(
-                        f"Error downloading.. {tick_url} returned 503 and service unavailable")
+                        f"Error downloading.. {tick_url} returned {tick_request.status_code} and service unavailable")
 
                     tick_request_content = None
                     tick_request.close()
@@ -1000,14 +1449,24 @@ class DataVendorDukasCopy(DataVendor):
         return [list[i:i + n] for i in range(0, len(list), n)]
 
     def retrieve_df(self, data, symbol, epoch):
-        date, tuple = self.parse_tick_data(data, epoch)
+        date, ticks = self.parse_tick_data(data, epoch)
+
+        divisor = self.get_divisor(symbol)
+
+        # prices are returned without decimal point (need to divide), do this
+        # on the whole array at once, rather than tick by tick
+        df = pandas.DataFrame(
+            {'ask': ticks['ask'] / divisor,
+             'bid': ticks['bid'] / divisor,
+             'askv': ticks['askv'].astype(np.float64),
+             'bidv': ticks['bidv'].astype(np.float64)},
+            index=date)
 
-        df = pandas.DataFrame(data=tuple,
-                              columns=['temp', 'ask', 'bid', 'askv', 'bidv'],
-                              index=date)
-        df.drop('temp', axis=1)
         df.index.name = 'Date'
 
+        return df
+
+    def get_divisor(self, symbol):
         # Default FX divisior
         divisor = 100000.0
 
@@ -1021,11 +1480,7 @@ class DataVendorDukasCopy(DataVendor):
         elif len(symbol) > 6:
             divisor = 1.0
 
-        # prices are returned without decimal point (need to divide)
-        df['bid'] = df['bid'] / divisor
-        df['ask'] = df['ask'] / divisor
-
-        return df
+        return divisor
 
     def hour_range(self, start_date, end_date):
         delta_t = end_date - start_date
@@ -1043,27 +1498,32 @@ class DataVendorDukasCopy(DataVendor):
         return out_times
 
     def parse_tick_data(self, data, epoch):
-        import struct
+        """Decodes a decompressed bi5 payload in one go with NumPy, rather
+        than unpacking it tick by tick
 
-        # tick = namedtuple('Tick', 'Date ask bid askv bidv')
+        Parameters
+        ----------
+        data : bytes
+            Decompressed contents of an hourly bi5 file
+        epoch : datetime
+            Start of the hour the file refers to
 
-        chunks_list = self.chunks(data, 20)
-        parsed_list = []
-        date = []
+        Returns
+        -------
+        DatetimeIndex, np.ndarray (structured with bi5_dtype)
+        """
 
-        # note: Numba can speed up for loops
-        for row in chunks_list:
-            d = struct.unpack(">LLLff", row)
-            # d = struct.unpack('>3i2f', row)
-            date.append((epoch + timedelta(0, 0, 0, d[0])))
+        # Ignore any trailing partial record
+        record_no = len(data) // self.bi5_dtype.itemsize
 
-            # SLOW: no point using named tuples!
-            # row_data = tick._asdict(tick._make(d))
-            # row_data['Date'] = (epoch + timedelta(0,0,0,row_data['Date']))
+        ticks = np.frombuffer(data, dtype=self.bi5_dtype, count=record_no)
 
-            parsed_list.append(d)
+        # Each tick is stamped with milliseconds since the start of the hour
+        date = pandas.DatetimeIndex(
+            pandas.Timestamp(epoch)
+            + pandas.to_timedelta(ticks['ms'].astype(np.int64), unit='ms'))
 
-        return date, parsed_list
+        return date, ticks
 
     def chunks(self, list, n):
         if n < 1: n = 1
@@ -1090,7 +1550,7 @@ import urllib
 class DataVendorFXCM(DataVendor):
     """Class for downloading tick data from FXCM. Selecting very large
     histories is not recommended as you will likely run out memory given the 
-    amount of data requested. Loads csv.gz
+    amount of data requested (instead use load_ticker_stream). Loads csv.gz
     files from FXCM and then converts into pandas DataFrames locally.
 
     Note: no longer supported
@@ -1101,6 +1561,9 @@ class DataVendorFXCM(DataVendor):
 
     url_suffix = '.csv.gz'  ##Extension of the file name
 
+    # Every request for a file goes through the RequestGovernor
+    governs_own_requests = True
+
     def __init__(self):
         super(DataVendor, self).__init__()
 
@@ -1159,10 +1622,51 @@ class DataVendorFXCM(DataVendor):
     def kill_session(self):
         return
 
+    def load_ticker_stream(self, md_request):
+        """Retrieves tick data from FXCM as a generator of DataFrames (one
+        per week, which is how FXCM stores its files), so the memory used
+        is bounded (eg. for writing to disk with
+        IOEngine.write_parquet_stream)
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            contains all the various parameters detailing time series start
+            and finish, tickers etc
+
+        Returns
+        -------
+        generator of DataFrame
+        """
+        md_request_vendor = self.construct_vendor_md_request(md_request)
+
+        import pytz
+
+        for data_frame in self.download_tick_stream(md_request_vendor):
+            data_frame = self.translate_tick_columns(
+                data_frame, md_request, md_request_vendor)
+
+            # Only the requested fields (usually done by MarketDataGenerator)
+            data_frame = self.filter_requested_columns(data_frame,
+                                                       md_request)
+
+            # Weeks overlap the start/finish dates
+            data_frame = data_frame[
+                (data_frame.index >= md_request.start_date) &
+                (data_frame.index <= md_request.finish_date)]
+
+            if not data_frame.empty:
+                yield data_frame.tz_localize(pytz.utc)
+
     def get_tick(self, md_request, md_request_vendor):
 
         data_frame = self.download_tick(md_request_vendor)
 
+        return self.translate_tick_columns(data_frame, md_request,
+                                           md_request_vendor)
+
+    def translate_tick_columns(self, data_frame, md_request,
+                               md_request_vendor):
         # convert from vendor to findatapy tickers/fields
         if data_frame is not None:
             returned_fields = data_frame.columns
@@ -1185,6 +1689,34 @@ class DataVendorFXCM(DataVendor):
 
         return data_frame
 
+    def download_tick_stream(self, md_request):
+        """Downloads tick data week by week, yielding a DataFrame for each
+        week in order, whilst downloading the next few weeks in parallel
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Request with vendor tickers
+
+        Returns
+        -------
+        generator of DataFrame
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        symbol = md_request.tickers[0]
+
+        logger.info(f"About to stream from FXCM... for {symbol}")
+
+        week_list = self.week_range(md_request.start_date,
+                                    md_request.finish_date)
+
+        for df in self.stream_map(
+                self.fetch_file, ((week, symbol) for week in week_list),
+                thread_no=constants.market_thread_no['fxcm']):
+            if df is not None and not df.empty:
+                yield df
+
     def download_tick(self, md_request):
         logger = LoggerManager().getLogger(__name__)
 
@@ -1199,73 +1731,129 @@ class DataVendorFXCM(DataVendor):
         # parallel threaded (note: lots of waiting on IO, so even with GIL quicker!)
         week_list = self.week_range(md_request.start_date,
                                     md_request.finish_date)
-        from findatapy.util import SwimPool
 
-        pool = SwimPool().create_pool('thread',
-                                      constants.market_thread_no['fxcm'])
-        results = [pool.apply_async(self.fetch_file, args=(week, symbol)) for
-                   week in week_list]
-        df_list = [p.get() for p in results]
-        pool.close()
+        # Keeps track of which weeks have been downloaded, so reruns only
+        # download the failed/missing weeks
+        ledger = self.create_download_ledger(
+            "fxcm", symbol, md_request.start_date, md_request.finish_date)
+
+        key_func = lambda week_year: f"{week_year[1]}_{week_year[0]}"
+
+        http_engine = self.create_async_http_engine(
+            "fxcm", retries=5,
+            timeout_seconds=constants.timeout_downloader['fxcm'])
+
+        if http_engine is not None:
+            # One pooled client for every week, parsing in a worker pool
+            df_list = ledger.download(
+                week_list,
+                fetch_batch_func=lambda weeks: http_engine.fetch_all(
+                    [self.get_tick_url(week, symbol) for week in weeks],
+                    parse_func=lambda i, content:
+                        self.parse_tick_data(content)),
+                key_func=key_func, retries=1)
+        else:
+            df_list = ledger.download(
+                week_list,
+                fetch_func=lambda week: self.fetch_file(week, symbol),
+                key_func=key_func,
+                thread_no=constants.market_thread_no['fxcm'], retries=1)
 
         try:
             return pandas.concat(df_list)
         except:
             return None
 
+    def get_tick_url(self, week_year, symbol):
+        week = week_year[0]
+        year = week_year[1]
+
+        tick_path = f"{symbol}/{year}/{week}{self.url_suffix}"
+
+        return constants.fxcm_base_url + tick_path
+
     def fetch_file(self, week_year, symbol):
         logger = LoggerManager().getLogger(__name__)
         logger.info(f"Downloading... {week_year}")
 
-        week = week_year[0]
-        year = week_year[1]
+        tick_url = self.get_tick_url(week_year, symbol)
 
-        tick_path = f"{symbol}/{year}/{week}{self.url_suffix}"
+        data_frame = self.retrieve_df(tick_url)
 
-        return self.retrieve_df(constants.fxcm_base_url + tick_path)
+        # Raise, so the week is retried (rather than silently missing)
+        if data_frame is None:
+            raise Exception(f"Failed to download {tick_url}")
+
+        return data_frame
 
     def parse_datetime(self):
         pass
 
+    def parse_tick_data(self, content):
+        """Decompresses and parses a csv.gz file of ticks from FXCM
+
+        Parameters
+        ----------
+        content : bytes
+            Raw csv.gz file
+
+        Returns
+        -------
+        DataFrame
+        """
+        if content is None:
+            return None
+
+        from io import StringIO
+
+        with gzip.GzipFile(fileobj=BytesIO(content), mode='rb') as f:
+            data_frame = pandas.read_csv(
+                StringIO(f.read().decode('utf-16')), index_col=0)
+
+        # Slightly awkward date format (MM/DD/YYYY HH:MM:SS.fff), parsing
+        # it in one go is much faster than parsing each date in Python
+        data_frame.index = pandas.to_datetime(data_frame.index,
+                                              format="%m/%d/%Y %H:%M:%S.%f")
+        data_frame.columns = ['bid', 'ask']
+
+        return data_frame
+
     def retrieve_df(self, tick_url):
         i = 0
 
         logger = LoggerManager().getLogger(__name__)
 
         data_frame = None
-        from io import StringIO
+
+        governor = RequestGovernor.get_governor("fxcm")
 
         # try up to 5 times to download
         while i < 5:
             try:
-                requests = urllib.request.urlopen(tick_url)
-                buf = BytesIO(requests.read())
-
-                with gzip.GzipFile(fileobj=buf, mode='rb') as f:
+                if governor is None:
+                    content = urllib.request.urlopen(tick_url).read()
+                else:
+                    with governor.request():
+                        content = urllib.request.urlopen(tick_url).read()
 
-                    # slightly awkward date parser (much faster than using 
-                    # other Python methods)
-                    # TODO use ciso8601 library (uses C parser, slightly 
-                    #  quicker)
-                    dateparse = lambda x: datetime.datetime(int(x[6:10]),
-                                                            int(x[0:2]),
-                                                            int(x[3:5]),
-                                                            int(x[11:13]),
-                                                            int(x[14:16]),
-                                                            int(x[17:19]),
-                                                            int(x[
-                                                                20:23]) * 1000)
+                data_frame = self.parse_tick_data(content)
 
-                    data_frame = pandas.read_csv(
-                        StringIO(f.read().decode('utf-16')), index_col=0,
-                        parse_dates=True,
-                        date_parser=dateparse)
+                i = 5
+            except urllib.error.HTTPError as e:
+                # Weeks which haven't been published (eg. in the future)
+                # have no data, which isn't an error
+                if e.code == 404:
+                    logger.debug(f"No data at {tick_url}")
 
-                    data_frame.columns = ['bid', 'ask']
+                    return pandas.DataFrame(
+                        columns=['bid', 'ask'],
+                        index=pandas.DatetimeIndex([]))
 
-                    f.close()
+                # Back off (for all threads) if we're being throttled
+                if e.code in [429, 503] and governor is not None:
+                    governor.throttled()
 
-                i = 5
+                i = i + 1
             except:
                 i = i + 1
 
@@ -1318,11 +1906,101 @@ class DataVendorFlatFile(DataVendor):
     eg. backtest.fx.dukascopy.tick.NYC.EURUSD.parquet (for tick/intraday data, 
     we store each ticker in a separate file)
 
+    With data_engine="parquet_dataset:folder", data is stored in a Hive
+    partitioned Parquet dataset instead eg.
+    folder/backtest.fx.dukascopy.tick.NYC/ticker=EURUSD/year=2021/month=3/
+
     """
 
     def __init__(self):
         super(DataVendorFlatFile, self).__init__()
 
+    def get_data_engine_path(self, md_request, data_source=None):
+        """Gets the path (or library name) where the data for a
+        MarketDataRequest is stored in its data_engine
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Request with a data_engine (eg. "folder/*.parquet" or
+            "arcticdb:lmdb://folder")
+        data_source : str (optional)
+            Data source (default: md_request.data_source)
+
+        Returns
+        -------
+        str
+        """
+        data_engine = md_request.data_engine
+
+        if data_source is None:
+            data_source = md_request.data_source
+
+        # If a file path has been specified
+        if '*' in data_engine:
+            w = data_engine.split("*.")
+
+            folder = w[0]
+            file_format = w[-1]
+
+            # For intraday/tick files each ticker is stored in
+            # a separate file
+            if md_request.freq == "intraday" or \
+                    md_request.freq == "tick":
+                path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{md_request.tickers[0]}.{file_format}"
+            else:
+                path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{file_format}"
+
+            return os.path.join(folder, path)
+
+        # Otherwise a database like arcticdb has been specified
+
+        # For intraday/tick files each ticker is stored in a separate file
+        # (a Parquet dataset partitions by ticker itself)
+        if (md_request.freq == "intraday" or md_request.freq == "tick") \
+                and not data_engine.startswith("parquet_dataset"):
+            return f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{md_request.tickers[0]}"
+
+        return f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}"
+
+    def _is_arcticdb_ticker_batch(self, md_request, data_engine):
+        # Intraday/tick data in ArcticDB has a symbol for each ticker
+        return constants.arcticdb_batch_read_tickers \
+               and data_engine is not None \
+               and data_engine.startswith("arcticdb:") \
+               and (md_request.freq == "intraday"
+                    or md_request.freq == "tick") \
+               and len(md_request.tickers) > 1
+
+    def _read_arcticdb_ticker_batch(self, md_request, data_source,
+                                    io_engine):
+        """Reads the ArcticDB symbol of every ticker in a MarketDataRequest
+        with one batch read (for each library), rather than one read per
+        ticker, and joins them
+        """
+        fname_list = []
+        columns = {}
+
+        for t in md_request.tickers:
+            md_request_single = MarketDataRequest(md_request=md_request)
+            md_request_single.tickers = [t]
+
+            fname = self.get_data_engine_path(md_request_single,
+                                              data_source=data_source)
+
+            fname_list.append(fname)
+            columns[fname] = [f"{t}.{f}" for f in md_request.fields]
+
+        data_frame_list = io_engine.read_time_series_cache_batch_from_disk(
+            fname_list, engine=md_request.data_engine,
+            start_date=md_request.start_date,
+            finish_date=md_request.finish_date,
+            columns=columns,
+            arcticdb_dict=md_request.arcticdb_dict,
+            as_of=md_request.as_of)
+
+        return Calculations().join(data_frame_list, how="outer")
+
     # implement method in abstract superclass
     def load_ticker(self, md_request, index_col=0, max_workers=1,
                     col_names=None):
@@ -1350,31 +2028,8 @@ class DataVendorFlatFile(DataVendor):
 
                 logger.info(f"Request {md_request.data_source} data via {data_engine}")
 
-                # If a file path has been specified
-                if '*' in data_engine:
-                    w = data_engine.split("*.")
-
-                    folder = w[0]
-                    file_format = w[-1]
-
-                    # For intraday/tick files each ticker is stored in 
-                    # a separate file
-                    if md_request.freq == "intraday" or \
-                            md_request.freq == "tick":
-                        path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{md_request.tickers[0]}.{file_format}"
-                    else:
-                        path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{file_format}"
-
-                    full_path = os.path.join(folder, path)
-                else:
-                    # Otherwise a database like arcticdb has been specified
-
-                    # For intraday/tick files each ticker is stored in a separate file
-                    if md_request.freq == "intraday" or \
-                            md_request.freq == "tick":
-                        full_path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}.{md_request.tickers[0]}"
-                    else:
-                        full_path = f"{md_request.environment}.{md_request.category}.{data_source}.{md_request.freq}.{md_request.cut}"
+                full_path = self.get_data_engine_path(md_request,
+                                                      data_source=data_source)
 
             else:
                 logger.info(f"Request {data_source} data")
@@ -1442,7 +2097,8 @@ class DataVendorFlatFile(DataVendor):
                     full_path, engine="hdf5")
             elif ".parquet" in data_source or ".gzip" in data_source or ".parquet" in full_path:
                 # Only use caching for parquet files
-                speed_cache  = SpeedCache()
+                speed_cache = SpeedCache(
+                    engine=constants.cache_flat_files_engine)
 
                 meta_data = io_engine.get_file_properties(full_path)
 
@@ -1453,9 +2109,12 @@ class DataVendorFlatFile(DataVendor):
 
                     meta_data_file = io_engine.get_file_properties(full_path)
 
-                    if speed_cache.exists_key(full_path):
-                        meta_data_cache = speed_cache.get_meta_data(full_path)
+                    # Fetch the cached DataFrame and its metadata in one
+                    # round trip
+                    data_frame_cache, meta_data_cache = \
+                        speed_cache.get_dataframe_and_meta_data(full_path)
 
+                    if data_frame_cache is not None:
                         if meta_data_cache is not None:
                             # Parse datetime string and ensure it's in UTC
                             parsed_dt = datetime.strptime(meta_data_cache["modified_datetime"],
@@ -1470,7 +2129,7 @@ class DataVendorFlatFile(DataVendor):
                     if is_same:
                         logger.info(f"Using cached version of {full_path} for faster loading")
 
-                        data_frame = speed_cache.get_dataframe(full_path)
+                        data_frame = data_frame_cache
                     else:
                         data_frame = io_engine.read_parquet(full_path)
 
@@ -1490,7 +2149,15 @@ class DataVendorFlatFile(DataVendor):
 
                         logger.info(f"Caching version of {full_path} for faster loading in the future")
                 else:
-                    data_frame = io_engine.read_parquet(full_path)
+                    # Push down the tickers/fields and dates requested, so
+                    # only those column chunks and row groups are read
+                    columns = [f"{t}.{f}" for t in md_request.tickers
+                               for f in md_request.fields]
+
+                    data_frame = io_engine.read_parquet(
+                        full_path, columns=columns,
+                        start_date=md_request.start_date,
+                        finish_date=md_request.finish_date)
 
                 # Trim DataFrame output to just the tickers/fields requested (if specified)
                 columns = []
@@ -1505,6 +2172,9 @@ class DataVendorFlatFile(DataVendor):
 
                 if columns:
                     data_frame = data_frame[columns]
+            elif self._is_arcticdb_ticker_batch(md_request, data_engine):
+                data_frame = self._read_arcticdb_ticker_batch(
+                    md_request, data_source, io_engine)
             else:
                 columns = []
 
@@ -0,0 +1,317 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import json
+import shutil
+import threading
+import time
+import concurrent.futures
+
+import pandas as pd
+
+from findatapy.util.loggermanager import LoggerManager
+
+
+class DownloadLedger(object):
+    """Keeps track of which units of a long download (eg. hours or weeks of
+    tick data, or date windows) have completed. Completed units are written
+    to a folder next to a small manifest (manifest.jsonl, with a line
+    appended for each unit), so if a download fails part way through (or the
+    process is restarted), only the failed or missing units are downloaded
+    when it is retried/rerun. Once every unit of a download has completed,
+    the ledger folder is removed.
+
+    The folder should be specific to a download (eg. include its date
+    range), so concurrent downloads don't share a ledger.
+
+    If folder is None, the ledger is only kept in memory, so retries within
+    the same call still only download the failed units.
+    """
+
+    def __init__(self, folder=None):
+        self._folder = folder
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    def _get_manifest_path(self):
+        return os.path.join(self._folder, "manifest.jsonl")
+
+    def _get_unit_path(self, key):
+        return os.path.join(self._folder, key + ".parquet")
+
+    def _load_manifest(self):
+        if self._manifest is None:
+            self._manifest = {}
+
+            if self._folder is not None \
+                    and os.path.exists(self._get_manifest_path()):
+                try:
+                    with open(self._get_manifest_path(), "r") as f:
+                        for line in f:
+                            # The last line could be partial, if the process
+                            # was killed whilst appending it
+                            try:
+                                self._manifest.update(json.loads(line))
+                            except ValueError:
+                                pass
+                except Exception as e:
+                    logger = LoggerManager.getLogger(__name__)
+                    logger.warning(f"Couldn't read download ledger "
+                                   f"{self._folder}: {e}")
+
+        return self._manifest
+
+    def _append_manifest(self, key, rows):
+        if self._folder is None:
+            return
+
+        # Only append the new unit, rather than rewriting the whole manifest
+        # for every unit
+        with open(self._get_manifest_path(), "a") as f:
+            f.write(json.dumps({key: rows}) + "\n")
+
+    def _save_manifest(self):
+        if self._folder is None:
+            return
+
+        os.makedirs(self._folder, exist_ok=True)
+
+        # Write to a temporary file first, so the manifest is never partial
+        temp_path = self._get_manifest_path() + ".tmp"
+
+        with open(temp_path, "w") as f:
+            for key, rows in self._manifest.items():
+                f.write(json.dumps({key: rows}) + "\n")
+
+        os.replace(temp_path, self._get_manifest_path())
+
+    def get_completed(self):
+        """Gets the keys of the units which have completed
+
+        Returns
+        -------
+        set of str
+        """
+        with self._lock:
+            return set(self._load_manifest().keys())
+
+    def put(self, key, data_frame):
+        """Records that a unit has completed, storing its DataFrame (which
+        can be empty)
+
+        Parameters
+        ----------
+        key : str
+            Key for the unit
+        data_frame : DataFrame
+            Data downloaded for the unit
+        """
+        if self._folder is not None:
+            os.makedirs(self._folder, exist_ok=True)
+
+            if isinstance(data_frame, pd.DataFrame) and not data_frame.empty:
+                data_frame.to_parquet(self._get_unit_path(key))
+
+        rows = len(data_frame.index) \
+            if isinstance(data_frame, pd.DataFrame) else 0
+
+        with self._lock:
+            self._load_manifest()[key] = rows
+            self._append_manifest(key, rows)
+
+    def get(self, key):
+        """Reads the DataFrame for a completed unit
+
+        Parameters
+        ----------
+        key : str
+            Key for the unit
+
+        Returns
+        -------
+        DataFrame
+        """
+        if self._folder is None or not os.path.exists(
+                self._get_unit_path(key)):
+            return None
+
+        return pd.read_parquet(self._get_unit_path(key))
+
+    def discard(self, key_list):
+        """Removes units from the ledger (and the ledger folder when it's
+        empty)
+
+        Parameters
+        ----------
+        key_list : list of str
+            Keys for the units
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+
+            for key in key_list:
+                manifest.pop(key, None)
+
+                if self._folder is not None \
+                        and os.path.exists(self._get_unit_path(key)):
+                    os.remove(self._get_unit_path(key))
+
+            if self._folder is not None and os.path.exists(self._folder):
+                if manifest:
+                    self._save_manifest()
+                else:
+                    shutil.rmtree(self._folder, ignore_errors=True)
+
+    def download(self, unit_list, fetch_func=None, fetch_batch_func=None,
+                 key_func=str, thread_no=1, retries=5, retry_sleep=5,
+                 timeout=None):
+        """Downloads every unit which hasn't already completed, retrying
+        only those units which failed (ie. raised an exception or timed
+        out), rather than the whole list
+
+        Parameters
+        ----------
+        unit_list : list
+            Units to download (eg. hours)
+        fetch_func : function
+            Downloads a single unit, returning a DataFrame (empty if there
+            is no data for that unit), where raising an exception or
+            returning None means that unit failed
+        fetch_batch_func : function
+            Alternatively downloads a list of units in one go, returning a
+            list of DataFrames, where None means that unit failed
+        key_func : function
+            Converts a unit into a string key
+        thread_no : int
+            Number of threads to call fetch_func with
+        retries : int
+            Number of attempts for each unit
+        retry_sleep : float
+            Seconds to sleep after failures (multiplied by the attempt)
+        timeout : float
+            Seconds to wait for the next unit to finish with fetch_func,
+            before giving up on the remaining units for that attempt
+
+        Returns
+        -------
+        list of DataFrame
+            In the same order as unit_list
+        """
+        logger = LoggerManager.getLogger(__name__)
+
+        unit_list = list(unit_list)
+        key_list = [key_func(u) for u in unit_list]
+
+        results = {}
+
+        completed = self.get_completed()
+
+        for key in key_list:
+            if key in completed:
+                results[key] = self.get(key)
+
+        missing = [(u, k) for u, k in zip(unit_list, key_list)
+                   if k not in results]
+
+        if results:
+            logger.info(f"{len(results)} units already downloaded, "
+                        f"{len(missing)} to download")
+
+        for i in range(1, retries + 1):
+            if not missing:
+                break
+
+            failed = []
+
+            if fetch_batch_func is not None:
+                try:
+                    df_list = fetch_batch_func([u for u, k in missing])
+                except Exception as e:
+                    logger.warning(f"Failed to download batch: {e}")
+
+                    df_list = [None] * len(missing)
+
+                for (u, k), df in zip(missing, df_list):
+                    if df is None:
+                        failed.append((u, k))
+                    else:
+                        results[k] = df
+                        self.put(k, df)
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(thread_no, 1))
+
+                futures = {executor.submit(fetch_func, u): (u, k)
+                           for u, k in missing}
+
+                pending = set(futures.keys())
+
+                while pending:
+                    done, pending = concurrent.futures.wait(
+                        pending, timeout=timeout,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+
+                    # If nothing has finished for a while, give up on the
+                    # rest for this attempt
+                    if not done:
+                        for f in pending:
+                            f.cancel()
+                            failed.append(futures[f])
+
+                        break
+
+                    for f in done:
+                        u, k = futures[f]
+
+                        try:
+                            df = f.result()
+                        except Exception as e:
+                            logger.warning(f"Failed to download {k}: {e}")
+                            failed.append((u, k))
+
+                            continue
+
+                        # Downloads which return None have failed (rather
+                        # than having no data), so try them again
+                        if df is None:
+                            logger.warning(f"Failed to download {k}")
+                            failed.append((u, k))
+                        else:
+                            results[k] = df
+                            self.put(k, df)
+
+                # Don't wait for any stuck threads
+                executor.shutdown(wait=False)
+
+            missing = failed
+
+            if missing:
+                logger.warning(f"{len(missing)} units failed on attempt "
+                               f"{i}, will retry only those")
+
+                if i < retries:
+                    time.sleep(retry_sleep * i)
+
+        if missing:
+            logger.warning(f"Failed to download {len(missing)} units, "
+                           f"others are kept in the download ledger, so "
+                           f"rerunning will only download the missing units")
+        else:
+            self.discard(key_list)
+
+        return [results.get(k) for k in key_list]
@@ -23,11 +23,18 @@ from dateutil.parser import parse
 
 import codecs
 import glob
+import hashlib
 import shutil
 import copy
 import os.path
 
 import math
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+import concurrent.futures
 
 import numpy as np
 import pandas as pd
@@ -60,6 +67,7 @@ except:
 # pyarrow necessary for caching
 try:
     import pyarrow as pa
+    import pyarrow.dataset as pds
 except:
     pass
 
@@ -80,11 +88,181 @@ except:
 # For accessing Excel
 from openpyxl import load_workbook
 
+from findatapy.util.cachemanager import MemoryCache
 from findatapy.util.dataconstants import DataConstants
 from findatapy.util.loggermanager import LoggerManager
 
 constants = DataConstants()
 
+
+class RedisConnectionManager(object):
+    """Keeps a process-wide Redis connection pool for each (host, port, db),
+    so that every IOEngine/SpeedCache call reuses existing TCP connections,
+    rather than opening a new connection each time.
+    """
+
+    _connection_pools = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_client(db_server: str = constants.db_cache_server,
+                   db_port: int = constants.db_cache_port,
+                   db: int = 0,
+                   timeout: float = constants.db_cache_timeout):
+        """Gets a Redis client backed by the shared connection pool for this
+        server (the pool is created on the first call)
+
+        Parameters
+        ----------
+        db_server : str
+            Redis server address
+        db_port : int
+            Redis server port
+        db : int
+            Redis database number
+        timeout : float
+            Socket timeout in seconds (used when the pool is first created)
+
+        Returns
+        -------
+        redis.StrictRedis
+        """
+        pool_key = (str(db_server), int(db_port), int(db))
+
+        with RedisConnectionManager._lock:
+            if pool_key not in RedisConnectionManager._connection_pools:
+                RedisConnectionManager._connection_pools[pool_key] = \
+                    redis.ConnectionPool(host=pool_key[0], port=pool_key[1],
+                                         db=pool_key[2],
+                                         socket_timeout=timeout,
+                                         socket_connect_timeout=timeout)
+
+            connection_pool = \
+                RedisConnectionManager._connection_pools[pool_key]
+
+        return redis.StrictRedis(connection_pool=connection_pool)
+
+    @staticmethod
+    def close_all():
+        """Disconnects and removes all the pooled Redis connections
+        """
+        with RedisConnectionManager._lock:
+            for connection_pool in \
+                    RedisConnectionManager._connection_pools.values():
+                connection_pool.disconnect()
+
+            RedisConnectionManager._connection_pools = {}
+
+
+class ArcticDBConnectionManager(object):
+    """Keeps a process-wide ArcticDB connection for each connection string
+    (eg. "lmdb://folder") and the handles of the libraries opened with it,
+    so every IOEngine call reuses them, rather than connecting to the
+    storage and looking up the library each time.
+    """
+
+    _connections = {}
+    _libraries = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_arctic(arcticdb_conn_str: str):
+        """Gets the ArcticDB connection for a connection string (created on
+        the first call)
+
+        Parameters
+        ----------
+        arcticdb_conn_str : str
+            eg. "lmdb://folder" or "s3://..."
+
+        Returns
+        -------
+        arcticdb.Arctic
+        """
+        with ArcticDBConnectionManager._lock:
+            if arcticdb_conn_str not in ArcticDBConnectionManager._connections:
+                ArcticDBConnectionManager._connections[arcticdb_conn_str] = \
+                    adb.Arctic(arcticdb_conn_str)
+
+            return ArcticDBConnectionManager._connections[arcticdb_conn_str]
+
+    @staticmethod
+    def get_library(arcticdb_conn_str: str, library_name: str,
+                    create_if_missing: bool = False):
+        """Gets the handle of an ArcticDB library
+
+        Parameters
+        ----------
+        arcticdb_conn_str : str
+            eg. "lmdb://folder"
+        library_name : str
+            Library name
+        create_if_missing : bool (default: False)
+            Create the library if it doesn't exist
+
+        Returns
+        -------
+        arcticdb.library.Library
+            None if the library doesn't exist (and isn't created)
+        """
+        key = (arcticdb_conn_str, library_name)
+
+        with ArcticDBConnectionManager._lock:
+            if key in ArcticDBConnectionManager._libraries:
+                return ArcticDBConnectionManager._libraries[key]
+
+        ac = ArcticDBConnectionManager.get_arctic(arcticdb_conn_str)
+
+        with ArcticDBConnectionManager._lock:
+            if key not in ArcticDBConnectionManager._libraries:
+                if not ac.has_library(library_name):
+                    if not create_if_missing:
+                        return None
+
+                    ac.create_library(library_name)
+
+                ArcticDBConnectionManager._libraries[key] = ac[library_name]
+
+            return ArcticDBConnectionManager._libraries[key]
+
+    @staticmethod
+    def delete_library(arcticdb_conn_str: str, library_name: str):
+        """Deletes an ArcticDB library (if it exists) and its cached handle
+
+        Parameters
+        ----------
+        arcticdb_conn_str : str
+            eg. "lmdb://folder"
+        library_name : str
+            Library name
+
+        Returns
+        -------
+        bool
+            True if the library existed
+        """
+        ac = ArcticDBConnectionManager.get_arctic(arcticdb_conn_str)
+
+        with ArcticDBConnectionManager._lock:
+            ArcticDBConnectionManager._libraries.pop(
+                (arcticdb_conn_str, library_name), None)
+
+            if not ac.has_library(library_name):
+                return False
+
+            ac.delete_library(library_name)
+
+            return True
+
+    @staticmethod
+    def close_all():
+        """Removes all the cached ArcticDB connections and library handles
+        """
+        with ArcticDBConnectionManager._lock:
+            ArcticDBConnectionManager._libraries = {}
+            ArcticDBConnectionManager._connections = {}
+
+
 class IOEngine(object):
     """Write and reads time series data to disk in various formats, CSV, HDF5
     (fixed and table formats), MongoDB/Arctic and ArcticDB are supported.
@@ -191,15 +369,391 @@ class IOEngine(object):
                                         intraday_tz=intraday_tz,
                                         excel_sheet=excel_sheet)
 
-    def _is_redis_running(self, r):
-        try:
-            r.ping()
+    def _get_redis_client(self, db_server, db_port, timeout):
+        return RedisConnectionManager.get_client(
+            db_server=db_server, db_port=db_port, db=0, timeout=timeout)
+
+    def _serialize_redis(self, fname: str, data_frame: pd.DataFrame,
+                         use_cache_compression: bool = True,
+                         cache_compression: str = constants.cache_compression,
+                         cache_format: str = None):
+        """Converts a DataFrame into Parquet (or Arrow IPC) bytes ready for
+        Redis, returning the key to use (compressed objects are prefixed with
+        comp_)
+        """
+        if cache_format is None:
+            cache_format = constants.cache_format
+
+        if cache_format == "arrow":
+            compression = None
+
+            if use_cache_compression:
+                compression = constants.arrow_cache_compression
+                fname = f"comp_{fname}"
+
+            return fname, self._serialize_arrow(
+                data_frame, compression=compression).to_pybytes()
+
+        ser = io.BytesIO()
+
+        if use_cache_compression:
+            data_frame.to_parquet(ser, compression=cache_compression)
+            fname = f"comp_{fname}"
+        else:
+            data_frame.to_parquet(ser)
+
+        ser.seek(0)
+
+        return fname, ser.read()
+
+    def _deserialize_redis(self, msg):
+        if msg is None:
+            return None
+
+        # Arrow IPC buffers are read without copying (Parquet needs to be
+        # decompressed and decoded)
+        if msg[:6] == b"ARROW1":
+            data_frame, _ = self._deserialize_arrow(pa.py_buffer(msg))
+
+            return data_frame
+
+        return pd.read_parquet(io.BytesIO(msg))
+
+    ### functions to handle Arrow IPC (Feather V2) caches
+    def _serialize_arrow(self, data_frame: pd.DataFrame,
+                         meta_data: dict = None, compression: str = None):
+        """Converts a DataFrame into an Arrow IPC file buffer, with any
+        metadata stored in the schema (compression can be None, "lz4" or
+        "zstd")
+        """
+        table = pa.Table.from_pandas(data_frame)
+
+        if meta_data is not None:
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}),
+                 b"findatapy_meta_data": json.dumps(meta_data).encode("utf-8")})
+
+        sink = pa.BufferOutputStream()
+
+        with pa.ipc.new_file(sink, table.schema,
+                             options=pa.ipc.IpcWriteOptions(
+                                 compression=compression)) as writer:
+            writer.write_table(table)
+
+        return sink.getvalue()
+
+    def _deserialize_arrow(self, source, read_data: bool = True):
+        """Reads a DataFrame and its metadata from an Arrow IPC file (eg. a
+        buffer or memory mapped file), where uncompressed columns are not
+        copied until they are converted to pandas
+        """
+        reader = pa.ipc.open_file(source)
+
+        meta_data = None
+        schema_meta_data = reader.schema.metadata or {}
+
+        if b"findatapy_meta_data" in schema_meta_data:
+            meta_data = json.loads(
+                schema_meta_data[b"findatapy_meta_data"].decode("utf-8"))
+
+        if not read_data:
+            return None, meta_data
+
+        return reader.read_all().to_pandas(), meta_data
+
+    def _get_arrow_path(self, fname: str, engine: str = "arrow"):
+        # eg. engine="arrow:folder" stores fname under folder
+        if engine.startswith("arrow:"):
+            fname = os.path.join(engine.replace("arrow:", "", 1),
+                                 os.path.basename(fname))
+
+        if fname.endswith(".arrow"):
+            fname = fname[:-len(".arrow")]
+
+        folder, name = os.path.split(fname)
+
+        # Cache keys (eg. from MarketDataRequest.generate_key) can be much
+        # longer than the max file name (usually 255 bytes), so shorten them
+        # with a hash of the whole key
+        if len(name.encode("utf-8")) > constants.arrow_max_file_name_bytes:
+            name = name[:64] + "_" \
+                   + hashlib.md5(name.encode("utf-8")).hexdigest()
+
+        return os.path.join(folder, f"{name}.arrow")
+
+    def _write_arrow_file(self, path: str, data_frame: pd.DataFrame,
+                          meta_data: dict = None):
+        # Uncompressed, so the file can be memory mapped and read without
+        # copying
+        folder = os.path.dirname(path)
+
+        if folder != "":
+            os.makedirs(folder, exist_ok=True)
+
+        buffer = self._serialize_arrow(data_frame, meta_data=meta_data)
+
+        path_temp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+        with pa.OSFile(path_temp, "wb") as f:
+            f.write(buffer)
+
+        os.replace(path_temp, path)
+
+    def _read_arrow_file(self, path: str, read_data: bool = True):
+        if not os.path.exists(path):
+            return None, None
+
+        return self._deserialize_arrow(pa.memory_map(path, "r"),
+                                       read_data=read_data)
+
+    def _get_redis_manifest_key(self, fname: str):
+        return f"manifest_{fname}"
+
+    def _get_redis_chunk_key(self, fname: str, chunk_no: int):
+        return f"chunk_{chunk_no}_{fname}"
+
+    def _remove_redis_chunks(self, r, fname_list: List[str]):
+        """Removes any chunked versions of keys (the manifest and all the
+        numbered chunk keys it lists)
+        """
+        pipe = r.pipeline()
+
+        for fname in fname_list:
+            pipe.get(self._get_redis_manifest_key(fname))
+
+        manifest_list = pipe.execute()
+
+        chunk_keys = []
+
+        for fname, manifest in zip(fname_list, manifest_list):
+            if manifest is not None:
+                manifest = json.loads(manifest)
+
+                chunk_keys.extend([c["key"] for c in manifest["chunks"]])
+                chunk_keys.append(self._get_redis_manifest_key(fname))
+
+        if chunk_keys:
+            r.unlink(*chunk_keys)
+
+    def _write_redis_chunked(self, r, fname: str, data_frame: pd.DataFrame,
+                             meta_data: dict = None,
+                             use_cache_compression: bool = True,
+                             cache_compression: str = constants.cache_compression,
+                             chunk_size_mb: int = constants.redis_chunk_size_mb,
+                             cache_format: str = None):
+        """Writes a large DataFrame to Redis as several Parquet chunks stored
+        under numbered keys, with a manifest key which lists the chunks and
+        the date range of each one (so reads can skip chunks)
+
+        The manifest is written last, so readers never see a partially
+        written set of chunks
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        self._remove_redis_chunks(r, [fname])
+
+        # Remove any unchunked version of the key
+        r.unlink(fname, f"comp_{fname}")
+
+        df_list = self.chunk_dataframes(data_frame, chunk_size_mb=chunk_size_mb)
 
+        if not isinstance(df_list, list):
+            df_list = [df_list]
+
+        chunk_list = []
+
+        # Push each chunk separately, so we only need to hold one serialized
+        # chunk in memory at a time
+        for i, df_chunk in enumerate(df_list):
+            key = self._get_redis_chunk_key(fname, i)
+
+            _, msg = self._serialize_redis(
+                key, df_chunk, use_cache_compression=use_cache_compression,
+                cache_compression=cache_compression,
+                cache_format=cache_format)
+
+            r.set(key, msg)
+
+            start_date = None
+            finish_date = None
+
+            if isinstance(df_chunk.index, pd.DatetimeIndex) \
+                    and len(df_chunk.index) > 0:
+                start_date = SpeedCache.to_naive_timestamp(
+                    df_chunk.index.min()).isoformat()
+                finish_date = SpeedCache.to_naive_timestamp(
+                    df_chunk.index.max()).isoformat()
+
+            chunk_list.append({"key": key, "start_date": start_date,
+                               "finish_date": finish_date})
+
+        manifest = {"chunks": chunk_list, "rows": len(data_frame.index)}
+
+        pipe = r.pipeline()
+        pipe.set(self._get_redis_manifest_key(fname), json.dumps(manifest))
+
+        if meta_data is not None:
+            pipe.set(f"meta_{fname}", json.dumps(meta_data))
+
+        pipe.sadd(self._get_redis_index_key(), fname)
+        pipe.execute()
+
+        logger.info(f"Pushed {fname} to Redis in {len(chunk_list)} chunk(s)")
+
+    def _is_redis_chunk_in_range(self, chunk: dict, start_date=None,
+                                 finish_date=None):
+        # Chunks without a date index can never be skipped
+        if chunk["start_date"] is None or chunk["finish_date"] is None:
             return True
-        except Exception as e:
-            print(str(e))
+
+        if finish_date is not None \
+                and pd.Timestamp(chunk["start_date"]) > finish_date:
+            return False
+
+        if start_date is not None \
+                and pd.Timestamp(chunk["finish_date"]) < start_date:
             return False
 
+        return True
+
+    def _read_redis_chunked(self, r, manifest, start_date=None,
+                            finish_date=None):
+        """Reads a DataFrame stored as chunks in Redis, only fetching those
+        chunks which overlap with the date range, which are fetched in a
+        single pipeline and decoded in parallel
+        """
+        manifest = json.loads(manifest)
+
+        if start_date is not None:
+            start_date = SpeedCache.to_naive_timestamp(start_date)
+
+        if finish_date is not None:
+            finish_date = SpeedCache.to_naive_timestamp(finish_date)
+
+        chunk_list = manifest["chunks"]
+
+        keys = [c["key"] for c in chunk_list if self._is_redis_chunk_in_range(
+            c, start_date=start_date, finish_date=finish_date)]
+
+        # If no chunks overlap, we still need one to get the columns
+        is_empty = len(keys) == 0
+
+        if is_empty:
+            keys = [chunk_list[0]["key"]]
+
+        pipe = r.pipeline()
+
+        for k in keys:
+            pipe.get(k)
+
+        msg_list = pipe.execute()
+
+        # If chunks have been evicted, treat whole object as missing
+        if any(msg is None for msg in msg_list):
+            return None
+
+        if len(msg_list) == 1:
+            df_list = [self._deserialize_redis(msg_list[0])]
+        else:
+            # Parquet decoding releases the GIL, so threads help here
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(
+                    constants.redis_chunk_read_threads, len(msg_list))) as tp:
+                df_list = list(tp.map(self._deserialize_redis, msg_list))
+
+        if is_empty:
+            return df_list[0].iloc[0:0]
+
+        data_frame = pd.concat(df_list) if len(df_list) > 1 else df_list[0]
+
+        # Trim to the date range, given the edge chunks will contain other
+        # dates
+        if isinstance(data_frame.index, pd.DatetimeIndex) and \
+                (start_date is not None or finish_date is not None):
+            index = data_frame.index
+
+            if index.tz is not None:
+                index = index.tz_convert("UTC").tz_localize(None)
+
+            mask = np.ones(len(index), dtype=bool)
+
+            if start_date is not None:
+                mask &= index >= start_date
+
+            if finish_date is not None:
+                mask &= index <= finish_date
+
+            data_frame = data_frame[mask]
+
+        return data_frame
+
+    def _get_redis_index_key(self):
+        # Set which records every key that findatapy has written to Redis
+        return f"{constants.db_cache_namespace}_index"
+
+    def _unlink_redis_keys(self, r, fname_list: List[str]):
+        """Removes keys (and their compressed/metadata variants) from Redis
+        using UNLINK, which frees memory in the background, and removes them
+        from our key index
+        """
+        if not fname_list:
+            return
+
+        index_key = self._get_redis_index_key()
+
+        self._remove_redis_chunks(r, fname_list)
+
+        pipe = r.pipeline()
+
+        for fname in fname_list:
+            pipe.unlink(fname, f"comp_{fname}", f"meta_{fname}")
+            pipe.srem(index_key, fname)
+
+        pipe.execute()
+
+    def list_time_series_cache_keys(self,
+                                    engine: str = "redis",
+                                    match: str = None,
+                                    db_server: str = constants.db_server,
+                                    db_port: int = constants.db_port,
+                                    timeout: int = constants.db_timeout):
+        """Lists the keys of the time series which have been cached in Redis,
+        incrementally scanning our key index with SSCAN (rather than
+        running KEYS over the whole keyspace, which blocks the server).
+        Keys written by older versions of findatapy (before the index
+        existed) aren't listed.
+
+        Parameters
+        ----------
+        engine : str (optional)
+            "redis" - lists keys in Redis (only supported engine)
+        match : str (optional)
+            Glob style pattern to filter keys (eg. "*daily*")
+        db_server : str
+            IP address of Redis server (default "127.0.0.1")
+        db_port : int
+            Port of Redis server (default 6379)
+        timeout : int
+            Connection timeout in seconds
+
+        Returns
+        -------
+        str (generator)
+        """
+        if engine != "redis":
+            LoggerManager.getLogger(__name__).warning(
+                f"Engine '{engine}' not supported for listing keys. Only 'redis' is supported.")
+            return
+
+        r = self._get_redis_client(db_server, db_port, timeout)
+
+        for key in r.sscan_iter(self._get_redis_index_key(), match=match):
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+
+            yield key
+
     def remove_time_series_cache_on_disk(self,
                                          fname: str,
                                          engine: str = "hdf5_fixed",
@@ -207,7 +761,36 @@ class IOEngine(object):
                                          db_port: int = constants.db_port,
                                          timeout: int = 2,
                                          username: int = None,
-                                         password: int = None):
+                                         password: int = None,
+                                         arcticdb_dict: dict = None):
+        """Removes a time series from the cache (disk, Redis, ArcticDB etc.)
+
+        For Redis, fname can be a glob style pattern (eg. "*daily*") which is
+        matched against our key index, and "flush_all_keys" removes every key
+        in our index (rather than FLUSHALL, which would remove other users'
+        keys on a shared Redis). Keys written by older versions of
+        findatapy (before the index existed) are only removed by their exact
+        name, so aren't removed by a pattern or by "flush_all_keys".
+
+        Parameters
+        ----------
+        fname : str
+            Key/filename to remove (or a pattern for Redis)
+        engine : str
+            eg. "redis", "hdf5_fixed", "parquet", "arcticdb:..."
+        db_server : str
+            IP address of database server
+        db_port : int
+            Port of database server
+        timeout : int
+            Connection timeout in seconds
+        username : str
+            Username for database
+        password : str
+            Password for database
+        arcticdb_dict : dict
+            ArcticDB settings (eg. library name)
+        """
 
         logger = LoggerManager().getLogger(__name__)
 
@@ -219,47 +802,52 @@ class IOEngine(object):
             fname = os.path.basename(fname).replace(".", "_")
 
             try:
-                r = redis.StrictRedis(host=db_server, port=db_port, db=0,
-                                      socket_timeout=timeout,
-                                      socket_connect_timeout=timeout)
-
-                if not self._is_redis_running(r): return
+                r = self._get_redis_client(db_server, db_port, timeout)
 
+                # Avoid KEYS/FLUSHALL which block (and on a shared Redis
+                # would wipe other users' keys), instead incrementally scan
+                # our own index of keys and UNLINK (non-blocking delete)
                 if fname == "flush_all_keys":
-                    r.flushall()
-                else:
-                    # Allow deletion of keys by pattern matching
-                    matching_keys = r.keys(f"*{fname}")
+                    matching_keys = list(self.list_time_series_cache_keys(
+                        engine="redis", db_server=db_server, db_port=db_port,
+                        timeout=timeout))
 
-                    if matching_keys:
-                        # Use pipeline to speed up command
-                        pipe = r.pipeline()
+                    self._unlink_redis_keys(r, matching_keys)
 
-                        for key in matching_keys:
-                            pipe.delete(key)
+                    r.unlink(self._get_redis_index_key())
+                else:
+                    # Allow deletion of keys by pattern matching (and also
+                    # the exact key, in case it was written before the index)
+                    matching_keys = list(self.list_time_series_cache_keys(
+                        engine="redis", match=f"*{fname}",
+                        db_server=db_server, db_port=db_port,
+                        timeout=timeout))
 
-                        pipe.execute()
+                    if fname not in matching_keys:
+                        matching_keys.append(fname)
 
-                    # r.delete(fname)
+                    self._unlink_redis_keys(r, matching_keys)
 
             except Exception as e:
                 logger.warning(
                     f"Cannot delete non-existent key {fname} in Redis: {str(e)}")
         elif engine.startswith("arcticdb:"):
             arcticdb_conn_str = engine.replace("arcticdb:", "", 1)
-            ac = adb.Arctic(arcticdb_conn_str)
-
-            # fname = os.path.basename(fname).replace(".", "_")
-            try:
-                database = ac[fname]
-            except:
-                pass
+            library_name = IOEngine._get_arcticdb_library_name(
+                fname, arcticdb_dict)
 
-            if database is None:
-                ac.delete_library(fname)
-                logger.info(f"Deleted ArcticDB library: {fname}")
+            if library_name == fname:
+                if ArcticDBConnectionManager.delete_library(
+                        arcticdb_conn_str, library_name):
+                    logger.info(f"Deleted ArcticDB library: {fname}")
             else:
-                logger.info(f"Got ArcticDB library: {fname}")
+                # Only delete the symbol from the shared library
+                library = ArcticDBConnectionManager.get_library(
+                    arcticdb_conn_str, library_name)
+
+                if library is not None and library.has_symbol(fname):
+                    library.delete(fname)
+                    logger.info(f"Deleted ArcticDB symbol: {fname}")
 
         elif engine == "arctic":
             from arctic import Arctic
@@ -288,6 +876,20 @@ class IOEngine(object):
             c.close()
 
             logger.info(f"Deleted MongoDB library: {fname}")
+        elif engine.startswith("arrow"):
+            path = self._get_arrow_path(fname, engine)
+
+            if os.path.exists(path):
+                os.remove(path)
+
+            logger.info(f"Deleted Arrow IPC: {path}")
+        elif engine.startswith("parquet_dataset"):
+            path = self._get_parquet_dataset_path(fname, engine)
+
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+            logger.info(f"Deleted Parquet dataset: {path}")
         elif engine == "hdf5":
             h5_filename = self.get_h5_filename(fname)
 
@@ -310,6 +912,33 @@ class IOEngine(object):
 
         return arcticdb_dict
 
+    @staticmethod
+    def _get_arcticdb_library_name(fname: str, arcticdb_dict: dict = None):
+        # By default each symbol is stored in its own library of the same
+        # name, otherwise every symbol is stored in one library
+        if arcticdb_dict is not None \
+                and arcticdb_dict.get("library") is not None:
+            return arcticdb_dict["library"]
+
+        return fname
+
+    def _get_arcticdb_write_library(self, arcticdb_conn_str: str,
+                                    library_name: str, arcticdb_dict: dict):
+        logger = LoggerManager().getLogger(__name__)
+
+        if arcticdb_dict["force_create_library"]:
+            ArcticDBConnectionManager.delete_library(arcticdb_conn_str,
+                                                     library_name)
+
+            logger.info(f"Deleted any old ArcticDB library: {library_name}")
+
+        library = ArcticDBConnectionManager.get_library(
+            arcticdb_conn_str, library_name, create_if_missing=True)
+
+        logger.info(f"Got ArcticDB library: {library_name}")
+
+        return library
+
     @staticmethod
     def _filter_out_matching(data_frame: pd.DataFrame,
                              filter_out_matching: str = None):
@@ -347,7 +976,8 @@ class IOEngine(object):
             md_request=None,
             ticker: str = None,
             cloud_credentials: dict = None,
-            arcticdb_dict: dict = None):
+            arcticdb_dict: dict = None,
+            cache_format: str = None):
         """Writes Pandas data frame to disk as Parquet, HDF5 format or bcolz
         format, in Arctic or to Redis
 
@@ -365,9 +995,13 @@ class IOEngine(object):
             "hdf5_fixed" - use HDF5 fixed format, very quick, but cannot append to this
             "hdf5_table" - use HDF5 table format, slower but can append to
             "parquet" - use Parquet
+            "parquet_dataset" - use Hive partitioned Parquet dataset
+            (ticker=/year=/month=), or "parquet_dataset:folder"
             "arctic" - use deprecated Arctic/MongoDB database
             "arcticdb:conn_str" - use ArcticDB (on disk)
             "redis" - use Redis
+            "arrow" - use Arrow IPC file (or "arrow:folder"), which can be
+            memory mapped when read
         append_data : bool
             False - write a fresh copy of data on disk each time
             True - append data to disk
@@ -401,43 +1035,51 @@ class IOEngine(object):
 
             # Will fail if Redis is not installed
             try:
-                r = redis.StrictRedis(host=db_server, port=db_port, db=0,
-                                      socket_timeout=timeout,
-                                      socket_connect_timeout=timeout)
-
-                if not self._is_redis_running(r): return
+                r = self._get_redis_client(db_server, db_port, timeout)
 
-                # If Redis is alive, try pushing to it
+                # Connection errors are caught below, so don't PING Redis
+                # before every write
                 if data_frame is not None:
                     if isinstance(data_frame, pd.DataFrame):
                         mem = data_frame.memory_usage(deep="deep").sum()
                         mem_float = round(float(mem) / (1024.0 * 1024.0),
                                           3)
 
-                        if mem_float < 500:
+                        if mem_float < constants.redis_max_object_size_mb:
+                            key, msg = self._serialize_redis(
+                                fname, data_frame,
+                                use_cache_compression=use_cache_compression,
+                                cache_compression=cache_compression,
+                                cache_format=cache_format)
 
+                            # Remove any older chunked version of the key
+                            self._remove_redis_chunks(r, [fname])
 
-                            if use_cache_compression:
-                                ser = io.BytesIO()
-                                data_frame.to_parquet(ser,
-                                                     compression=cache_compression)
-                                ser.seek(0)
+                            # Write the data and metadata in one round
+                            # trip, recording the key in our index
+                            pipe = r.pipeline()
+                            pipe.set(key, msg)
 
-                                r.set(f"comp_{fname}", ser.read())
-                            else:
-                                ser = io.BytesIO()
-                                data_frame.to_parquet(ser)
-                                ser.seek(0)
-
-                                r.set(fname, ser.read())
+                            # Compression is chosen per key, so remove
+                            # any older (un)compressed version
+                            pipe.unlink(fname if key != fname
+                                        else f"comp_{fname}")
 
                             if meta_data is not None:
-                                r.set(f"meta_{fname}", json.dumps(meta_data))
+                                pipe.set(f"meta_{fname}", json.dumps(meta_data))
+
+                            pipe.sadd(self._get_redis_index_key(), fname)
+                            pipe.execute()
 
                             logger.info(f"Pushed {fname} to Redis")
                         else:
-                            logger.warn(
-                                f"Did not push {fname} to Redis, given size")
+                            # Too large for a single Redis value, so split
+                            # into several keys
+                            self._write_redis_chunked(
+                                r, fname, data_frame, meta_data=meta_data,
+                                use_cache_compression=use_cache_compression,
+                                cache_compression=cache_compression,
+                                cache_format=cache_format)
                 else:
                     logger.info(
                         f"Object {fname} is empty, not pushed to Redis.")
@@ -459,33 +1101,23 @@ class IOEngine(object):
                 logger.warning(
                     f"Could not push {fname_msg} to Redis: {error_msg}")
 
+        elif engine.startswith("arrow"):
+            if data_frame is not None:
+                self._write_arrow_file(self._get_arrow_path(fname, engine),
+                                       data_frame, meta_data=meta_data)
+
+                logger.info(f"Written Arrow IPC: {fname}")
+
         elif engine.startswith("arcticdb:"):
             arcticdb_conn_str = engine.replace("arcticdb:", "", 1)
-            ac = adb.Arctic(arcticdb_conn_str)
 
             arcticdb_dict = IOEngine._populate_arcticdb_dict(
                 arcticdb_dict=arcticdb_dict)
 
-            database = None
-
-            try:
-                database = ac[fname]
-            except:
-                pass
-
-            if database is None:
-                ac.create_library(fname)
-                logger.info(f"Created ArcticDB library: {fname}")
-            elif arcticdb_dict["force_create_library"]:
-                ac.delete_library(fname)
-                ac.create_library(fname)
-                logger.info(f"Deleted old library and created ArcticDB library: {fname}")
-            else:
-                logger.info(f"Loading existing ArcticDB library: {fname}")
-
-            # Access the library
-            library = ac[fname]
-            logger.info(f"Got ArcticDB library: {fname}")
+            library = self._get_arcticdb_write_library(
+                arcticdb_conn_str,
+                IOEngine._get_arcticdb_library_name(fname, arcticdb_dict),
+                arcticdb_dict)
 
             data_frame = IOEngine._filter_out_matching(
                 data_frame, filter_out_matching=filter_out_matching)
@@ -637,6 +1269,16 @@ class IOEngine(object):
 
             logger.info(f"Written HDF5: {fname}")
 
+        elif engine.startswith("parquet_dataset"):
+            # Only the partitions in the date range of data_frame are
+            # overwritten (or appended to)
+            mode = "append" if append_data else "overwrite"
+
+            self.write_parquet_dataset(
+                data_frame, self._get_parquet_dataset_path(fname, engine),
+                mode=mode, parquet_compression=parquet_compression)
+
+            logger.info(f"Written Parquet dataset: {fname}")
         elif engine == "parquet":
             if ".parquet" not in fname:
                 if fname[-5:] != ".gzip":
@@ -657,13 +1299,301 @@ class IOEngine(object):
 
             logger.info(f"Written CSV: {fname}")
 
-    def get_h5_filename(self, fname: str):
-        """Strips h5 off filename returning first portion of filename
+    def read_last_time_series_date_from_disk(self, fname: str,
+                                             engine: str = "hdf5",
+                                             arcticdb_dict: dict = None):
+        """Reads the last timestamp of a time series stored on disk/in a
+        database, only reading as little of the store as possible (eg. the
+        last row of an ArcticDB symbol or HDF5 table or the index of a
+        Parquet file)
 
         Parameters
         ----------
         fname : str
-            h5 filename to strip
+            Path of file/library name
+        engine : str
+            "hdf5", "parquet", "parquet_dataset", "csv" or
+            "arcticdb:conn_str" etc.
+        arcticdb_dict : dict (optional)
+            ArcticDB settings
+
+        Returns
+        -------
+        Timestamp
+            None if the store does not exist or is empty
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        index = None
+
+        try:
+            if engine.startswith("arcticdb:"):
+                library = ArcticDBConnectionManager.get_library(
+                    engine.replace("arcticdb:", "", 1),
+                    IOEngine._get_arcticdb_library_name(fname, arcticdb_dict))
+
+                if library is not None and library.has_symbol(fname):
+                    index = library.tail(fname, n=1).data.index
+
+            elif "hdf5" in engine or fname[-3:] == ".h5":
+                h5_filename = self.get_h5_filename(fname)
+
+                if self.path_exists(h5_filename):
+                    with pd.HDFStore(h5_filename, mode="r") as store:
+                        storer = store.get_storer("data")
+
+                        # Tables allow us to read just the last row
+                        if storer.is_table:
+                            nrows = storer.nrows
+                            index = store.select(
+                                "data", start=max(nrows - 1, 0)).index
+                        else:
+                            index = store.select("data").index
+
+            elif engine.startswith("parquet_dataset"):
+                last_date = self._read_last_parquet_dataset_date(
+                    self._get_parquet_dataset_path(fname, engine))
+
+                if last_date is not None:
+                    index = pd.DatetimeIndex([last_date])
+
+            elif engine == "parquet":
+                if ".parquet" not in fname and fname[-5:] != ".gzip":
+                    fname = f"{fname}.parquet"
+
+                if self.path_exists(fname):
+                    # Avoid reading any of the columns, only the index
+                    index = self.read_parquet(fname, columns=[]).index
+            else:
+                data_frame = self.read_time_series_cache_from_disk(
+                    fname, engine=engine, arcticdb_dict=arcticdb_dict)
+
+                if data_frame is not None:
+                    index = data_frame.index
+
+        except Exception as e:
+            logger.warning(
+                f"Could not read last date of {fname}: {str(e)}")
+
+        if index is None or len(index) == 0:
+            return None
+
+        return index.max()
+
+    def read_last_time_series_dates_from_disk(self, fname: str,
+                                              columns: List[str],
+                                              engine: str = "hdf5",
+                                              arcticdb_dict: dict = None):
+        """Reads the last date with data for each column of a time series
+        stored on disk/in a database (eg. when several tickers are stored
+        together, and some were added later or lag behind the others)
+
+        Parameters
+        ----------
+        fname : str
+            Path of file/library name
+        columns : str (list)
+            Columns (eg. "EURUSD.close")
+        engine : str
+            "hdf5", "parquet", "parquet_dataset", "csv" or
+            "arcticdb:conn_str" etc.
+        arcticdb_dict : dict (optional)
+            ArcticDB settings
+
+        Returns
+        -------
+        dict
+            Last date keyed by column, None for any columns not stored
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        last_date_dict = {c: None for c in columns}
+
+        try:
+            if engine.startswith("parquet_dataset"):
+                # Each ticker is stored separately, so only the latest
+                # partition of each ticker needs to be read
+                tickers = list(dict.fromkeys(
+                    [self._split_ticker_field(c)[0] for c in columns]))
+
+                ticker_dict = self._read_last_parquet_dataset_dates(
+                    self._get_parquet_dataset_path(fname, engine),
+                    tickers=tickers)
+
+                for c in columns:
+                    last_date_dict[c] = ticker_dict[
+                        self._split_ticker_field(c)[0]]
+            else:
+                if engine == "parquet" and ".parquet" not in fname \
+                        and fname[-5:] != ".gzip":
+                    fname = f"{fname}.parquet"
+
+                if engine == "parquet":
+                    # Only reads the requested columns
+                    data_frame = None
+
+                    if self.path_exists(fname):
+                        data_frame = self.read_parquet(fname, columns=columns)
+                else:
+                    data_frame = self.read_time_series_cache_from_disk(
+                        fname, engine=engine, columns=columns,
+                        arcticdb_dict=arcticdb_dict)
+
+                if data_frame is not None:
+                    for c in columns:
+                        if c in data_frame.columns:
+                            last_date_dict[c] = \
+                                data_frame[c].last_valid_index()
+
+        except Exception as e:
+            logger.warning(
+                f"Could not read last dates of {fname}: {str(e)}")
+
+        return last_date_dict
+
+    def update_time_series_cache_on_disk(
+            self, fname: str, data_frame: pd.DataFrame,
+            engine: str = "hdf5",
+            arcticdb_dict: dict = None,
+            parquet_compression: str = constants.parquet_compression,
+            cloud_credentials: dict = None):
+        """Updates a time series stored on disk/in a database with newer
+        data, which overwrites any overlapping dates (eg. from revisions),
+        and is appended after the last stored date. Columns in the store
+        which are not in data_frame are kept.
+
+        For ArcticDB this uses update and for HDF5 tables it only removes
+        and appends the overlapping rows, Parquet datasets only rewrite the
+        year/month partitions from the first date of data_frame, other
+        formats (eg. Parquet) are rewritten.
+
+        Parameters
+        ----------
+        fname : str
+            Path of file/library name
+        data_frame : DataFrame
+            New data (eg. from the last stored date onwards)
+        engine : str
+            "hdf5_table", "parquet", "parquet_dataset", "csv" or
+            "arcticdb:conn_str" etc.
+        arcticdb_dict : dict (optional)
+            ArcticDB settings
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        if data_frame is None or data_frame.empty:
+            return
+
+        data_frame = data_frame.sort_index()
+
+        start_date = data_frame.index[0]
+        finish_date = data_frame.index[-1]
+
+        def merge_stored(df_stored):
+            if df_stored is None or df_stored.empty:
+                return data_frame
+
+            # Newer values take precedence, but keep other columns stored
+            df_merged = data_frame.combine_first(df_stored)
+
+            columns = list(df_stored.columns) + \
+                      [c for c in data_frame.columns
+                       if c not in df_stored.columns]
+
+            return df_merged[columns].astype(
+                df_stored.dtypes.to_dict(), errors="ignore")
+
+        if engine.startswith("arcticdb:"):
+            arcticdb_dict = IOEngine._populate_arcticdb_dict(
+                copy.deepcopy(arcticdb_dict))
+
+            df_stored = None
+
+            if self.read_last_time_series_date_from_disk(
+                    fname, engine=engine,
+                    arcticdb_dict=arcticdb_dict) is not None:
+                df_stored = self.read_time_series_cache_from_disk(
+                    fname, engine=engine, start_date=start_date,
+                    finish_date=finish_date, arcticdb_dict=arcticdb_dict)
+
+                # Replaces the rows in the date range of the new data
+                arcticdb_dict["write_style"] = "update"
+            else:
+                arcticdb_dict["write_style"] = "write"
+
+            self.write_time_series_cache_to_disk(
+                fname, merge_stored(df_stored), engine=engine,
+                arcticdb_dict=arcticdb_dict)
+
+        elif engine.startswith("parquet_dataset"):
+            path = self._get_parquet_dataset_path(fname, engine)
+
+            # Whole partitions are rewritten, so read them from the start
+            # of the first month
+            tickers = list(dict.fromkeys(
+                [self._split_ticker_field(c)[0] for c in data_frame.columns]))
+
+            df_stored = self.read_parquet_dataset(
+                path, tickers=tickers,
+                start_date=pd.Timestamp(start_date.year, start_date.month, 1))
+
+            self.write_parquet_dataset(
+                merge_stored(df_stored), path, mode="overwrite",
+                parquet_compression=parquet_compression)
+
+        elif "hdf5" in engine or fname[-3:] == ".h5":
+            h5_filename = self.get_h5_filename(fname)
+
+            is_table = False
+
+            if self.path_exists(h5_filename):
+                with pd.HDFStore(h5_filename, mode="r") as store:
+                    is_table = store.get_storer("data").is_table
+
+            if is_table:
+                with pd.HDFStore(h5_filename, complib="zlib",
+                                 complevel=9) as store:
+                    df_stored = store.select(
+                        "data", where="index >= start_date")
+
+                    df_merged = merge_stored(df_stored)
+
+                    # Only rewrite the overlapping tail of the table
+                    store.remove("data", where="index >= start_date")
+                    store.append("data", df_merged, format="table")
+            else:
+                df_stored = None
+
+                if self.path_exists(h5_filename):
+                    df_stored = self.read_time_series_cache_from_disk(
+                        h5_filename, engine="hdf5")
+
+                self.write_time_series_cache_to_disk(
+                    fname, merge_stored(df_stored), engine="hdf5_table")
+
+        else:
+            df_stored = None
+
+            if self.read_last_time_series_date_from_disk(
+                    fname, engine=engine) is not None:
+                df_stored = self.read_time_series_cache_from_disk(
+                    fname, engine=engine)
+
+            self.write_time_series_cache_to_disk(
+                fname, merge_stored(df_stored), engine=engine,
+                parquet_compression=parquet_compression,
+                cloud_credentials=cloud_credentials)
+
+        logger.info(f"Updated {fname} from {str(start_date)} to "
+                    f"{str(finish_date)}")
+
+    def get_h5_filename(self, fname: str):
+        """Strips h5 off filename returning first portion of filename
+
+        Parameters
+        ----------
+        fname : str
+            h5 filename to strip
 
         Returns
         -------
@@ -760,6 +1690,10 @@ class IOEngine(object):
             "arcticdb" - reads from ArcticDB (on disk storage)
             "bcolz" - reads from bcolz file (not fully implemented)
             "parquet" - reads from Parquet
+            "parquet_dataset" - reads from Hive partitioned Parquet dataset
+            (or "parquet_dataset:folder")
+            "arrow" - reads from memory mapped Arrow IPC file (or
+            "arrow:folder")
         start_date : str/datetime (optional)
             Start date
         finish_date : str/datetime (optional)
@@ -795,25 +1729,25 @@ class IOEngine(object):
                 msg = None
 
                 try:
-                    r = redis.StrictRedis(host=db_server, port=db_port, db=0,
-                                          socket_timeout=timeout,
-                                          socket_connect_timeout=timeout)
-
-                    # is there a compressed key stored?)
-                    k = r.keys(f"comp_{fname_single}")
-
-                    # If so, then it means that we have stored it as a
-                    # compressed object if have more than 1 element, take the
-                    # last (which will be the latest to be added)
-                    if len(k) >= 1:
-                        k = k[-1].decode("utf-8")
-
-                        msg = r.get(k)
-                        msg = io.BytesIO(msg)
-                        msg = pd.read_parquet(msg)
+                    r = self._get_redis_client(db_server, db_port, timeout)
+
+                    # Keys are deterministic, so GET the compressed and
+                    # uncompressed versions directly (in one round trip),
+                    # rather than searching the keyspace with KEYS
+                    pipe = r.pipeline()
+                    pipe.get(f"comp_{fname_single}")
+                    pipe.get(fname_single)
+                    pipe.get(self._get_redis_manifest_key(fname_single))
+                    comp_msg, msg, manifest = pipe.execute()
+
+                    if comp_msg is not None:
+                        msg = self._deserialize_redis(comp_msg)
+                    elif manifest is not None:
+                        msg = self._read_redis_chunked(
+                            r, manifest, start_date=start_date,
+                            finish_date=finish_date)
                     else:
-                        msg = r.get(fname_single)
-                        msg = pd.read_parquet(msg.read())
+                        msg = self._deserialize_redis(msg)
 
                 except Exception as e:
                     logger.info(
@@ -826,15 +1760,31 @@ class IOEngine(object):
 
                     data_frame = msg  # pd.read_msgpack(msg)
 
+            elif engine.startswith("arrow"):
+                data_frame, _ = self._read_arrow_file(
+                    self._get_arrow_path(fname_single, engine))
+
+            elif engine.startswith("parquet_dataset"):
+                # Only reads the partitions/row groups in the date range
+                data_frame = self.read_parquet_dataset(
+                    self._get_parquet_dataset_path(fname_single, engine),
+                    columns=columns, start_date=start_date,
+                    finish_date=finish_date)
+
             elif engine.startswith("arcticdb:"):
                 arcticdb_conn_str = engine.replace("arcticdb:", "", 1)
-                ac = adb.Arctic(arcticdb_conn_str)
 
                 arcticdb_dict = IOEngine._populate_arcticdb_dict(arcticdb_dict)
 
                 # Access the library
                 try:
-                    library = ac[fname_single]
+                    library = ArcticDBConnectionManager.get_library(
+                        arcticdb_conn_str,
+                        IOEngine._get_arcticdb_library_name(
+                            fname_single, arcticdb_dict))
+
+                    if library is None:
+                        raise Exception("library does not exist")
 
                     if arcticdb_dict["allow_on_disk_filter"]:
                         date_range = None
@@ -921,11 +1871,12 @@ class IOEngine(object):
                 data_frame.index = pd.to_datetime(data_frame.index)
 
             elif self.path_exists(fname_single):
-                data_frame = self.read_parquet(fname_single)
-
-                # Can be too restrictive selecting columns
-                # data_frame = self.read_parquet(fname_single, columns=columns)
-                # data_frame = pd.read_parquet(fname_single)
+                # Only read the row groups in the date range and the columns
+                # requested (if none of the columns are in the file, reads
+                # every column)
+                data_frame = self.read_parquet(fname_single, columns=columns,
+                                               start_date=start_date,
+                                               finish_date=finish_date)
 
             data_frame_list.append(data_frame)
 
@@ -965,8 +1916,18 @@ class IOEngine(object):
 
         logger = LoggerManager.getLogger(__name__)
 
+        if engine.startswith("arrow"):
+            # Only the schema of the file needs to be read
+            if not isinstance(fname, list):
+                return self._read_arrow_file(
+                    self._get_arrow_path(fname, engine), read_data=False)[1]
+
+            return [self._read_arrow_file(
+                self._get_arrow_path(f, engine), read_data=False)[1]
+                    for f in fname]
+
         if engine != "redis":
-            logger.warning(f"Engine '{engine}' not supported for metadata retrieval. Only 'redis' is supported.")
+            logger.warning(f"Engine '{engine}' not supported for metadata retrieval. Only 'redis' and 'arrow' are supported.")
             return None
 
         meta_data_list = []
@@ -982,9 +1943,7 @@ class IOEngine(object):
             meta_data = None
 
             try:
-                r = redis.StrictRedis(host=db_server, port=db_port, db=0,
-                                     socket_timeout=timeout,
-                                     socket_connect_timeout=timeout)
+                r = self._get_redis_client(db_server, db_port, timeout)
 
                 # Try to get the metadata key
                 meta_key = f"meta_{fname_single}"
@@ -1038,33 +1997,43 @@ class IOEngine(object):
 
         logger = LoggerManager.getLogger(__name__)
 
+        if engine.startswith("arrow"):
+            return os.path.exists(self._get_arrow_path(fname, engine))
+
         if engine != "redis":
-            logger.warning(f"Engine '{engine}' not supported for existence check. Only 'redis' is supported.")
+            logger.warning(f"Engine '{engine}' not supported for existence check. Only 'redis' and 'arrow' are supported.")
             return False
 
         fname_single = os.path.basename(fname).replace(".", "_")
 
         try:
-            r = redis.StrictRedis(host=db_server, port=db_port, db=0,
-                                 socket_timeout=timeout,
-                                 socket_connect_timeout=timeout)
-
-            if not self._is_redis_running(r):
-                return False
+            r = self._get_redis_client(db_server, db_port, timeout)
 
-            # Check for both compressed and uncompressed keys
+            # Check for both compressed and uncompressed keys in one round
+            # trip
             comp_key = f"comp_{fname_single}"
 
+            pipe = r.pipeline()
+            pipe.exists(comp_key)
+            pipe.exists(fname_single)
+            pipe.exists(self._get_redis_manifest_key(fname_single))
+            comp_exists, exists, manifest_exists = pipe.execute()
+
             # First check if compressed key exists
-            if r.exists(comp_key):
+            if comp_exists:
                 logger.debug(f"Found compressed key for {fname_single} in Redis")
                 return True
 
             # Then check if regular key exists
-            if r.exists(fname_single):
+            if exists:
                 logger.debug(f"Found key for {fname_single} in Redis")
                 return True
 
+            # Finally check if it has been stored in chunks
+            if manifest_exists:
+                logger.debug(f"Found chunked key for {fname_single} in Redis")
+                return True
+
             logger.debug(f"Key {fname_single} does not exist in Redis")
             return False
 
@@ -1073,134 +2042,567 @@ class IOEngine(object):
                 f"Could not check existence for {fname_single} in Redis: {str(e)}")
             return False
 
-    ### functions for CSV reading and writing
-    def write_time_series_to_csv(self, csv_path, data_frame):
-        data_frame.to_csv(csv_path)
-
-    def read_csv_data_frame(self, f_name, freq, cutoff=None, dateparse=None,
-                            postfix=".close", intraday_tz="UTC",
-                            excel_sheet=None):
-        """Reads CSV/Excel from disk into DataFrame
+    def read_time_series_cache_with_meta_data_from_disk(
+            self, fname: str,
+            engine: str = "redis",
+            db_server: str = constants.db_server,
+            db_port: int = constants.db_port,
+            timeout: int = constants.db_timeout):
+        """Reads a time series cache and its metadata from Redis, fetching
+        the compressed, uncompressed and metadata keys in one pipelined
+        round trip (rather than separate exists/get/get meta calls)
 
         Parameters
         ----------
-        f_name : str
-            CSV/Excel file path to read
-        freq : str
-            Frequency of data to read (intraday/daily etc)
-        cutoff : DateTime (optional)
-            end date to read up to
-        dateparse : str (optional)
-            date parser to use
-        postfix : str (optional)
-            postfix to add to each columns
-        intraday_tz : str (optional)
-            timezone of file if uses intraday data
-        excel_sheet : str (optional)
-            Excel sheet to be read
+        fname : str
+            file key to read
+        engine : str (optional)
+            "redis" - reads from Redis (only supported engine)
+        db_server : str
+            IP address of Redis server (default "127.0.0.1")
+        db_port : int
+            Port of Redis server (default 6379)
+        timeout : int
+            Connection timeout in seconds
 
         Returns
         -------
-        DataFrame
+        DataFrame, dict
+            None for each if they do not exist
         """
 
-        if freq == "intraday":
+        logger = LoggerManager.getLogger(__name__)
 
-            if dateparse is None:
-                dateparse = lambda x: datetime.datetime(
-                    *map(int, [x[6:10], x[3:5], x[0:2],
-                               x[11:13], x[14:16], x[17:19]]))
-            elif dateparse == "dukascopy":
-                dateparse = lambda x: datetime.datetime(
-                    *map(int, [x[0:4], x[5:7], x[8:10],
-                               x[11:13], x[14:16], x[17:19]]))
-            elif dateparse == "c":
-                # use C library for parsing dates, several hundred times quicker
-                # requires compilation of library to install
-                import ciso8601
-                dateparse = lambda x: ciso8601.parse_datetime(x)
+        if engine.startswith("arrow"):
+            return self._read_arrow_file(self._get_arrow_path(fname, engine))
 
-            if excel_sheet is None:
-                data_frame = pd.read_csv(f_name, index_col=0, parse_dates=True,
-                                         date_parser=dateparse)
-            else:
-                data_frame = pd.read_excel(f_name, excel_sheet, index_col=0,
-                                           na_values=["NA"])
+        if engine != "redis":
+            logger.warning(f"Engine '{engine}' not supported for pipelined reads. Only 'redis' and 'arrow' are supported.")
+            return None, None
 
-            data_frame = data_frame.astype("float32")
-            data_frame.index.names = ["Date"]
+        fname_single = os.path.basename(fname).replace(".", "_")
 
-            old_cols = data_frame.columns
-            new_cols = []
+        data_frame = None
+        meta_data = None
 
-            # add ".close" to each column name
-            for col in old_cols:
-                new_cols.append(f"{col}{postfix}")
+        try:
+            r = self._get_redis_client(db_server, db_port, timeout)
 
-            data_frame.columns = new_cols
-        else:
-            # Daily data
-            if "events" in f_name:
+            pipe = r.pipeline()
+            pipe.get(f"comp_{fname_single}")
+            pipe.get(fname_single)
+            pipe.get(f"meta_{fname_single}")
+            pipe.get(self._get_redis_manifest_key(fname_single))
+            comp_msg, msg, meta_bytes, manifest = pipe.execute()
 
-                data_frame = pd.read_csv(f_name)
+            if comp_msg is not None:
+                data_frame = self._deserialize_redis(comp_msg)
+            elif msg is not None:
+                data_frame = self._deserialize_redis(msg)
+            elif manifest is not None:
+                data_frame = self._read_redis_chunked(r, manifest)
 
-                # very slow conversion
-                data_frame = data_frame.convert_objects(convert_dates="coerce")
+            if meta_bytes is not None:
+                meta_data = json.loads(meta_bytes.decode("utf-8"))
 
-            else:
-                if excel_sheet is None:
-                    try:
-                        data_frame = pd.read_csv(f_name, index_col=0,
-                                                 parse_dates=["DATE"],
-                                                 date_parser=dateparse)
-                    except:
-                        data_frame = pd.read_csv(f_name, index_col=0,
-                                                 parse_dates=["Date"],
-                                                 date_parser=dateparse)
-                else:
-                    data_frame = pd.read_excel(f_name, excel_sheet,
-                                               index_col=0, na_values=["NA"])
+            if data_frame is not None:
+                logger.info(f"Load Redis cache: {fname_single}")
 
-        # convert Date to Python datetime
-        # datetime data_frame["Date1"] = data_frame.index
+        except Exception as e:
+            logger.info(
+                f"Cache not existent for {fname_single} in Redis: {str(e)}")
 
-        # slower method: lambda x: pd.datetime.strptime(x, "%d/%m/%Y %H:%M:%S")
-        # data_frame["Date1"].apply(lambda x: datetime.datetime(int(x[6:10]), int(x[3:5]), int(x[0:2]),
-        #                                        int(x[12:13]), int(x[15:16]), int(x[18:19])))
+        return data_frame, meta_data
 
-        # data_frame.index = data_frame["Date1"]
-        # data_frame.drop("Date1")
+    def read_time_series_cache_batch_from_disk(
+            self, fname: List[str],
+            engine: str = "redis",
+            db_server: str = constants.db_server,
+            db_port: int = constants.db_port,
+            timeout: int = constants.db_timeout,
+            start_date=None,
+            finish_date=None,
+            columns=None,
+            arcticdb_dict: dict = None,
+            as_of=None) -> List[pd.DataFrame]:
+        """Reads many time series caches from Redis in a single round trip
+        (using MGET for the compressed and uncompressed keys), or many
+        ArcticDB symbols with one read_batch call for each library
 
-        # slower method: data_frame.index = pd.to_datetime(data_frame.index)
+        Parameters
+        ----------
+        fname : str (list)
+            file keys (or ArcticDB symbols) to read
+        engine : str (optional)
+            "redis" - reads from Redis
+            "arrow" - reads from Arrow IPC files (or "arrow:folder")
+            "arcticdb:conn_str" - reads from ArcticDB
+        db_server : str
+            IP address of Redis server (default "127.0.0.1")
+        db_port : int
+            Port of Redis server (default 6379)
+        timeout : int
+            Connection timeout in seconds
+        start_date : str/datetime or dict (optional)
+            Start date for ArcticDB, or a dict of them keyed by fname
+        finish_date : str/datetime or dict (optional)
+            Finish date for ArcticDB, or a dict of them keyed by fname
+        columns : str (list) or dict (optional)
+            Columns to read from ArcticDB, or a dict of them keyed by fname
+        arcticdb_dict : dict (optional)
+            ArcticDB settings
+        as_of : int/datetime (optional)
+            ArcticDB version to read
 
-        if freq == "intraday":
-            # Assume time series are already in UTC and assign this (can specify other time zones)
-            data_frame = data_frame.tz_localize(intraday_tz)
+        Returns
+        -------
+        DataFrame (list)
+            In the same order as fname, with None for any missing keys
+        """
 
-        # End cutoff date
-        if cutoff is not None:
-            if isinstance(cutoff, str):
-                cutoff = parse(cutoff)
+        logger = LoggerManager.getLogger(__name__)
 
-            data_frame = data_frame.loc[data_frame.index < cutoff]
+        if engine.startswith("arrow"):
+            return [self._read_arrow_file(self._get_arrow_path(f, engine))[0]
+                    for f in fname]
 
-        return data_frame
+        if engine.startswith("arcticdb:"):
+            return self._read_arcticdb_batch(
+                fname, engine.replace("arcticdb:", "", 1),
+                start_date=start_date, finish_date=finish_date,
+                columns=columns, arcticdb_dict=arcticdb_dict, as_of=as_of)
 
-    def find_replace_chars(self, array, to_find, replace_with):
+        if engine != "redis":
+            logger.warning(f"Engine '{engine}' not supported for batch reads. Only 'redis', 'arrow' and 'arcticdb' are supported.")
+            return [None] * len(fname)
 
-        for i in range(0, len(to_find)):
-            array = [x.replace(to_find[i], replace_with[i]) for x in array]
+        if not fname:
+            return []
 
-        return array
+        fname = [os.path.basename(f).replace(".", "_") for f in fname]
 
-    def convert_csv_data_frame(self, f_name, category, freq, cutoff=None,
-                               dateparse=None):
-        """Converts CSV file to HDF5 file
+        data_frame_list = [None] * len(fname)
+
+        try:
+            r = self._get_redis_client(db_server, db_port, timeout)
+
+            pipe = r.pipeline()
+            pipe.mget([f"comp_{f}" for f in fname])
+            pipe.mget(fname)
+            pipe.mget([self._get_redis_manifest_key(f) for f in fname])
+            comp_msg_list, msg_list, manifest_list = pipe.execute()
+
+            for i, (comp_msg, msg, manifest) in enumerate(
+                    zip(comp_msg_list, msg_list, manifest_list)):
+                if comp_msg is not None:
+                    data_frame_list[i] = self._deserialize_redis(comp_msg)
+                elif msg is not None:
+                    data_frame_list[i] = self._deserialize_redis(msg)
+                elif manifest is not None:
+                    data_frame_list[i] = self._read_redis_chunked(r, manifest)
+
+            logger.info(f"Load Redis cache for {len(fname)} keys")
+        except Exception as e:
+            logger.warning(
+                f"Could not batch read {len(fname)} keys from Redis: {str(e)}")
+
+        return data_frame_list
+
+    def write_time_series_cache_batch_to_disk(
+            self, data_frame_dict: dict,
+            meta_data_dict: dict = None,
+            engine: str = "redis",
+            db_server: str = constants.db_server,
+            db_port: int = constants.db_port,
+            timeout: int = constants.db_timeout,
+            use_cache_compression: bool = constants.use_cache_compression,
+            cache_compression: str = constants.cache_compression,
+            cache_format: str = None,
+            arcticdb_dict: dict = None):
+        """Writes many DataFrames to Redis in a single round trip (using
+        MSET), or to ArcticDB with one write_batch/append_batch/update_batch
+        call for each library (depending on arcticdb_dict["write_style"])
 
         Parameters
         ----------
-        f_name : str
-            File name to be read
+        data_frame_dict : dict
+            DataFrames to write keyed by file key (or ArcticDB symbol)
+        meta_data_dict : dict (optional)
+            Metadata dictionaries to write keyed by file key
+        engine : str (optional)
+            "redis" - writes to Redis
+            "arrow" - writes Arrow IPC files (or "arrow:folder")
+            "arcticdb:conn_str" - writes to ArcticDB
+        db_server : str
+            IP address of Redis server (default "127.0.0.1")
+        db_port : int
+            Port of Redis server (default 6379)
+        timeout : int
+            Connection timeout in seconds
+        arcticdb_dict : dict (optional)
+            ArcticDB settings
+        """
+
+        logger = LoggerManager.getLogger(__name__)
+
+        if engine.startswith("arcticdb:"):
+            self._write_arcticdb_batch(
+                data_frame_dict, engine.replace("arcticdb:", "", 1),
+                meta_data_dict=meta_data_dict, arcticdb_dict=arcticdb_dict)
+
+            return
+
+        if engine.startswith("arrow"):
+            for fname, data_frame in data_frame_dict.items():
+                meta_data = None
+
+                if meta_data_dict is not None:
+                    meta_data = meta_data_dict.get(fname)
+
+                self.write_time_series_cache_to_disk(
+                    fname, data_frame, meta_data=meta_data, engine=engine)
+
+            return
+
+        if engine != "redis":
+            logger.warning(f"Engine '{engine}' not supported for batch writes. Only 'redis', 'arrow' and 'arcticdb' are supported.")
+            return
+
+        mapping = {}
+        chunked_dict = {}
+        stale_keys = []
+
+        for fname, data_frame in data_frame_dict.items():
+            if data_frame is None:
+                continue
+
+            fname = os.path.basename(fname).replace(".", "_")
+
+            # Large DataFrames need to be split across several keys
+            if self.get_obj_size_mb(data_frame) >= \
+                    constants.redis_max_object_size_mb:
+                chunked_dict[fname] = data_frame
+
+                continue
+
+            key, msg = self._serialize_redis(
+                fname, data_frame,
+                use_cache_compression=use_cache_compression,
+                cache_compression=cache_compression,
+                cache_format=cache_format)
+
+            mapping[key] = msg
+
+            # Compression is chosen per key, so remove any older
+            # (un)compressed version
+            stale_keys.append(fname if key != fname else f"comp_{fname}")
+
+        if meta_data_dict is not None:
+            for fname, meta_data in meta_data_dict.items():
+                fname = os.path.basename(fname).replace(".", "_")
+
+                mapping[f"meta_{fname}"] = json.dumps(meta_data)
+
+        if not mapping and not chunked_dict:
+            return
+
+        index_keys = [os.path.basename(f).replace(".", "_")
+                      for f in data_frame_dict.keys()]
+
+        try:
+            r = self._get_redis_client(db_server, db_port, timeout)
+
+            for fname, data_frame in chunked_dict.items():
+                self._write_redis_chunked(
+                    r, fname, data_frame,
+                    use_cache_compression=use_cache_compression,
+                    cache_compression=cache_compression,
+                    cache_format=cache_format)
+
+            pipe = r.pipeline()
+
+            if mapping:
+                pipe.unlink(*stale_keys)
+                pipe.mset(mapping)
+
+            pipe.sadd(self._get_redis_index_key(), *index_keys)
+            pipe.execute()
+
+            logger.info(f"Pushed {len(data_frame_dict)} keys to Redis")
+        except Exception as e:
+            logger.warning(
+                f"Could not batch push {len(data_frame_dict)} keys to Redis: {str(e)}")
+
+    def _group_arcticdb_symbols(self, fname_list: List[str],
+                                arcticdb_dict: dict):
+        # Symbols in the same library can be read/written in one batch
+        library_dict = {}
+
+        for fname in fname_list:
+            library_name = IOEngine._get_arcticdb_library_name(
+                fname, arcticdb_dict)
+
+            library_dict.setdefault(library_name, []).append(fname)
+
+        return library_dict
+
+    def _read_arcticdb_batch(self, fname_list: List[str],
+                             arcticdb_conn_str: str,
+                             start_date=None, finish_date=None,
+                             columns=None, arcticdb_dict: dict = None,
+                             as_of=None):
+        logger = LoggerManager.getLogger(__name__)
+
+        arcticdb_dict = IOEngine._populate_arcticdb_dict(arcticdb_dict)
+
+        def get_for_symbol(value, fname):
+            # Can either be the same for every symbol or keyed by symbol
+            if isinstance(value, dict):
+                return value.get(fname)
+
+            return value
+
+        data_frame_dict = {}
+
+        for library_name, symbols in self._group_arcticdb_symbols(
+                fname_list, arcticdb_dict).items():
+            try:
+                library = ArcticDBConnectionManager.get_library(
+                    arcticdb_conn_str, library_name)
+
+                if library is None:
+                    logger.warning(
+                        f"ArcticDB library does not exist: {library_name}")
+
+                    continue
+
+                read_request_list = []
+
+                for fname in symbols:
+                    if arcticdb_dict["allow_on_disk_filter"]:
+                        date_range = None
+
+                        start = get_for_symbol(start_date, fname)
+                        finish = get_for_symbol(finish_date, fname)
+
+                        if start is not None and finish is not None:
+                            date_range = (start, finish)
+
+                        read_request_list.append(adb.ReadRequest(
+                            fname, as_of=as_of, date_range=date_range,
+                            columns=get_for_symbol(columns, fname)))
+                    else:
+                        read_request_list.append(
+                            adb.ReadRequest(fname, as_of=as_of))
+
+                query_builder = None
+
+                if arcticdb_dict["allow_on_disk_filter"]:
+                    query_builder = arcticdb_dict["query_builder"]
+
+                item_list = library.read_batch(read_request_list,
+                                               query_builder=query_builder)
+
+                for fname, item in zip(symbols, item_list):
+                    # Missing symbols etc. are returned as DataError
+                    if isinstance(item, adb.DataError):
+                        logger.warning(f"Could not read {fname} from "
+                                       f"ArcticDB: {str(item)}")
+                    else:
+                        data_frame_dict[fname] = item.data
+
+                logger.info(f"Read {len(symbols)} symbols from ArcticDB "
+                            f"library: {library_name}")
+
+            except Exception as e:
+                logger.warning(f"Could not batch read from ArcticDB library: "
+                               f"{library_name} {str(e)}")
+
+        return [data_frame_dict.get(f) for f in fname_list]
+
+    def _write_arcticdb_batch(self, data_frame_dict: dict,
+                              arcticdb_conn_str: str,
+                              meta_data_dict: dict = None,
+                              arcticdb_dict: dict = None):
+        logger = LoggerManager.getLogger(__name__)
+
+        arcticdb_dict = IOEngine._populate_arcticdb_dict(arcticdb_dict)
+
+        write_style = arcticdb_dict["write_style"]
+        prune_previous_versions = arcticdb_dict["prune_previous_versions"]
+
+        if meta_data_dict is None:
+            meta_data_dict = {}
+
+        fname_list = [f for f in data_frame_dict.keys()
+                      if data_frame_dict[f] is not None]
+
+        for library_name, symbols in self._group_arcticdb_symbols(
+                fname_list, arcticdb_dict).items():
+            try:
+                library = self._get_arcticdb_write_library(
+                    arcticdb_conn_str, library_name, arcticdb_dict)
+
+                if write_style == "update":
+                    item_list = library.update_batch(
+                        [adb.UpdatePayload(f, data_frame_dict[f],
+                                           metadata=meta_data_dict.get(f))
+                         for f in symbols],
+                        upsert=True,
+                        prune_previous_versions=prune_previous_versions)
+                else:
+                    payloads = [adb.WritePayload(
+                        f, data_frame_dict[f], metadata=meta_data_dict.get(f))
+                        for f in symbols]
+
+                    if write_style == "append":
+                        item_list = library.append_batch(
+                            payloads,
+                            prune_previous_versions=prune_previous_versions)
+                    else:
+                        item_list = library.write_batch(
+                            payloads,
+                            prune_previous_versions=prune_previous_versions)
+
+                for fname, item in zip(symbols, item_list):
+                    if isinstance(item, adb.DataError):
+                        logger.warning(f"Could not {write_style} {fname} to "
+                                       f"ArcticDB: {str(item)}")
+
+                logger.info(f"Batch {write_style} of {len(symbols)} symbols "
+                            f"to ArcticDB library: {library_name}")
+            except Exception as e:
+                logger.warning(f"Could not batch {write_style} to ArcticDB "
+                               f"library: {library_name} {str(e)}")
+
+    ### functions for CSV reading and writing
+    def write_time_series_to_csv(self, csv_path, data_frame):
+        data_frame.to_csv(csv_path)
+
+    def read_csv_data_frame(self, f_name, freq, cutoff=None, dateparse=None,
+                            postfix=".close", intraday_tz="UTC",
+                            excel_sheet=None):
+        """Reads CSV/Excel from disk into DataFrame
+
+        Parameters
+        ----------
+        f_name : str
+            CSV/Excel file path to read
+        freq : str
+            Frequency of data to read (intraday/daily etc)
+        cutoff : DateTime (optional)
+            end date to read up to
+        dateparse : str (optional)
+            date parser to use
+        postfix : str (optional)
+            postfix to add to each columns
+        intraday_tz : str (optional)
+            timezone of file if uses intraday data
+        excel_sheet : str (optional)
+            Excel sheet to be read
+
+        Returns
+        -------
+        DataFrame
+        """
+
+        if freq == "intraday":
+
+            if dateparse is None:
+                dateparse = lambda x: datetime.datetime(
+                    *map(int, [x[6:10], x[3:5], x[0:2],
+                               x[11:13], x[14:16], x[17:19]]))
+            elif dateparse == "dukascopy":
+                dateparse = lambda x: datetime.datetime(
+                    *map(int, [x[0:4], x[5:7], x[8:10],
+                               x[11:13], x[14:16], x[17:19]]))
+            elif dateparse == "c":
+                # use C library for parsing dates, several hundred times quicker
+                # requires compilation of library to install
+                import ciso8601
+                dateparse = lambda x: ciso8601.parse_datetime(x)
+
+            if excel_sheet is None:
+                data_frame = pd.read_csv(f_name, index_col=0, parse_dates=True,
+                                         date_parser=dateparse)
+            else:
+                data_frame = pd.read_excel(f_name, excel_sheet, index_col=0,
+                                           na_values=["NA"])
+
+            data_frame = data_frame.astype("float32")
+            data_frame.index.names = ["Date"]
+
+            old_cols = data_frame.columns
+            new_cols = []
+
+            # add ".close" to each column name
+            for col in old_cols:
+                new_cols.append(f"{col}{postfix}")
+
+            data_frame.columns = new_cols
+        else:
+            # Daily data
+            if "events" in f_name:
+
+                data_frame = pd.read_csv(f_name)
+
+                # very slow conversion
+                data_frame = data_frame.convert_objects(convert_dates="coerce")
+
+            else:
+                if excel_sheet is None:
+                    try:
+                        data_frame = pd.read_csv(f_name, index_col=0,
+                                                 parse_dates=["DATE"],
+                                                 date_parser=dateparse)
+                    except:
+                        data_frame = pd.read_csv(f_name, index_col=0,
+                                                 parse_dates=["Date"],
+                                                 date_parser=dateparse)
+                else:
+                    data_frame = pd.read_excel(f_name, excel_sheet,
+                                               index_col=0, na_values=["NA"])
+
+        # convert Date to Python datetime
+        # datetime data_frame["Date1"] = data_frame.index
+
+        # slower method: lambda x: pd.datetime.strptime(x, "%d/%m/%Y %H:%M:%S")
+        # data_frame["Date1"].apply(lambda x: datetime.datetime(int(x[6:10]), int(x[3:5]), int(x[0:2]),
+        #                                        int(x[12:13]), int(x[15:16]), int(x[18:19])))
+
+        # data_frame.index = data_frame["Date1"]
+        # data_frame.drop("Date1")
+
+        # slower method: data_frame.index = pd.to_datetime(data_frame.index)
+
+        if freq == "intraday":
+            # Assume time series are already in UTC and assign this (can specify other time zones)
+            data_frame = data_frame.tz_localize(intraday_tz)
+
+        # End cutoff date
+        if cutoff is not None:
+            if isinstance(cutoff, str):
+                cutoff = parse(cutoff)
+
+            data_frame = data_frame.loc[data_frame.index < cutoff]
+
+        return data_frame
+
+    def find_replace_chars(self, array, to_find, replace_with):
+
+        for i in range(0, len(to_find)):
+            array = [x.replace(to_find[i], replace_with[i]) for x in array]
+
+        return array
+
+    def convert_csv_data_frame(self, f_name, category, freq, cutoff=None,
+                               dateparse=None):
+        """Converts CSV file to HDF5 file
+
+        Parameters
+        ----------
+        f_name : str
+            File name to be read
         category : str
             data category of file (used in HDF5 filename)
         freq : str
@@ -1277,22 +2679,58 @@ class IOEngine(object):
     def read_parquet(self, path: str,
                      columns: List[str] = None,
                      engine: str = "pandas",
-                     cloud_credentials: dict = None):
+                     cloud_credentials: dict = None,
+                     start_date=None,
+                     finish_date=None):
         """Reads a Pandas DataFrame from a local or s3 path
 
+        If columns or start_date/finish_date are specified, these are pushed
+        down to pyarrow.dataset, so only the column chunks requested are
+        read, and row groups whose index statistics are outside the date
+        range are skipped.
+
         Parameters
         ----------
         path : str
             Path of Parquet file (can be S3)
 
+        columns : str (list)
+            Columns to read (columns which aren't in the file are ignored,
+            and if none of them are, every column is read)
+
         cloud_credentials : dict (optional)
             Credentials for logging into the cloud
 
+        start_date : str/datetime (optional)
+            Start date (inclusive) to filter the index
+
+        finish_date : str/datetime (optional)
+            Finish date (inclusive) to filter the index
+
         Returns
         -------
         DataFrame
         """
 
+        if columns is not None or start_date is not None \
+                or finish_date is not None:
+            filesystem = None
+
+            if "s3://" in path:
+                path = self.sanitize_path(path)
+                filesystem = self._create_cloud_filesystem(
+                    cloud_credentials, "s3_pyarrow")
+                path = path.replace("s3://", "")
+
+            table = self._read_parquet_dataset(
+                path, filesystem=filesystem, columns=columns,
+                start_date=start_date, finish_date=finish_date)
+
+            if engine == "pandas":
+                return table.to_pandas()
+            elif engine == "polars":
+                return pl.from_arrow(table)
+
         if "s3://" in path:
             path = self.sanitize_path(path)
 
@@ -1317,6 +2755,77 @@ class IOEngine(object):
             elif engine == "polars":
                 return pl.read_parquet(path, columns=columns)
 
+    def _get_parquet_index_columns(self, schema):
+        # Index columns stored by pandas (a RangeIndex isn't stored as a
+        # column)
+        pandas_metadata = schema.pandas_metadata
+
+        if pandas_metadata is None:
+            return []
+
+        return [c for c in pandas_metadata.get("index_columns", [])
+                if isinstance(c, str) and c in schema.names]
+
+    def _get_parquet_date_filter(self, schema, index_column, start_date=None,
+                                 finish_date=None):
+        field_type = schema.field(index_column).type
+
+        if not pa.types.is_timestamp(field_type):
+            return None
+
+        date_filter = None
+
+        for date, is_start in [(start_date, True), (finish_date, False)]:
+            if date is None:
+                continue
+
+            date = pd.Timestamp(date)
+
+            # Naive dates are assumed to be in the timezone of the index
+            # (as in Filter.filter_time_series_by_date)
+            if field_type.tz is None:
+                date = date.replace(tzinfo=None)
+            elif date.tzinfo is None:
+                date = date.tz_localize(field_type.tz)
+
+            date = pa.scalar(date, type=field_type)
+
+            if is_start:
+                expr = pds.field(index_column) >= date
+            else:
+                expr = pds.field(index_column) <= date
+
+            date_filter = expr if date_filter is None else date_filter & expr
+
+        return date_filter
+
+    def _read_parquet_dataset(self, path, filesystem=None, columns=None,
+                              start_date=None, finish_date=None):
+        dataset = pds.dataset(path, format="parquet", filesystem=filesystem)
+        schema = dataset.schema
+
+        index_columns = self._get_parquet_index_columns(schema)
+
+        if columns is not None:
+            selected = [c for c in columns
+                        if c in schema.names and c not in index_columns]
+
+            # If none of the columns are in the file, read every column
+            if columns != [] and selected == []:
+                columns = None
+            else:
+                columns = index_columns + selected
+
+        date_filter = None
+
+        if index_columns != [] and (start_date is not None
+                                    or finish_date is not None):
+            date_filter = self._get_parquet_date_filter(
+                schema, index_columns[0], start_date=start_date,
+                finish_date=finish_date)
+
+        return dataset.to_table(columns=columns, filter=date_filter)
+
     def _create_cloud_filesystem(self,
                                  cloud_credentials: dict,
                                  filesystem_type: str):
@@ -1442,117 +2951,697 @@ class IOEngine(object):
             except:
                 pass
 
-        cloud_credentials_ = self._convert_cred(cloud_credentials,
-                                                convert_to_s3fs=False)
+        cloud_credentials_ = self._convert_cred(cloud_credentials,
+                                                convert_to_s3fs=False)
+
+        # Tends to be slower than using pandas/pyarrow directly, but for very
+        # large files, we might have to split before writing to disk
+        def pyarrow_dump(df_dump, dump_path):
+            # Trying to convert large Pandas DataFrames in one go to Arrow
+            # tables can result in out-of-memory messages, so chunk them first,
+            # convert them one by one, and write to disk in chunks
+            df_list = self.chunk_dataframes(df_dump)
+
+            # Using pandas.to_parquet, does not let us pass in parameters to
+            # allow coercion of timestamps hence have to do it this way,
+            # using underlying pyarrow interface (/)
+            # ie. ns -> us
+            if not (isinstance(df_list, list)):
+                df_list = [df_list]
+
+            for path_ in dump_path:
+                path_ = self.sanitize_path(path_)
+
+                # Reference:
+                # https://stackoverflow.com/questions/47113813/using-pyarrow-how-do-you-append-to-parquet-file
+                # https://arrow.apache.org/docs/python/filesystems.html
+
+                pqwriter = None
+                counter = 1
+
+                if "s3://" in path_:
+                    s3 = self._create_cloud_filesystem(cloud_credentials_,
+                                                       "s3_pyarrow")
+
+                    path_in_s3 = path_.replace("s3://", "")
+
+                    for df_ in df_list:
+                        logger.info(
+                            f"S3 chunk... {str(counter)} of {str(len(df_list))}")
+                        table = pa.Table.from_pandas(df_)
+
+                        if pqwriter is None:
+                            pqwriter = pq.ParquetWriter(
+                                path_in_s3, table.schema,
+                                compression=parquet_compression,
+                                coerce_timestamps=constants.default_time_units,
+                                allow_truncated_timestamps=True,
+                                filesystem=s3)
+
+                        pqwriter.write_table(
+                            table,
+                            row_group_size=constants.parquet_row_group_size)
+
+                        counter = counter + 1
+
+                else:
+                    for df_ in df_list:
+                        logger.info(
+                            f"Local chunk... {str(counter)} of {str(len(df_list))}")
+                        table = pa.Table.from_pandas(df_)
+
+                        if pqwriter is None:
+                            pqwriter = pq.ParquetWriter(
+                                path_, table.schema,
+                                compression=parquet_compression,
+                                coerce_timestamps=constants.default_time_units,
+                                allow_truncated_timestamps=True)
+
+                        pqwriter.write_table(
+                            table,
+                            row_group_size=constants.parquet_row_group_size)
+
+                        counter = counter + 1
+
+                # Close the parquet writer
+                if pqwriter:
+                    pqwriter.close()
+
+                    # df.to_parquet(path, compression=parquet_compression)
+
+        if engine == "pyarrow_chunked" or use_pyarrow_directly:
+            pyarrow_dump(df, path)
+        elif engine == "pandas" or engine == "polars":
+            # First try to use Pandas/pyarrow, if fails, which can occur with
+            # large DataFrames use chunked write
+            try:
+                for p in path:
+                    p = self.sanitize_path(p)
+
+                    if "s3://" in p:
+                        # Use pyarrow's native S3FileSystem to
+                        # avoid fsspec/aiohttp asyncio issues on
+                        # Python 3.14+
+                        s3_fs = self._create_cloud_filesystem(
+                            cloud_credentials, "s3_pyarrow")
+                        p_no_scheme = p.replace("s3://", "")
+
+                        if engine == "pandas":
+                            table = pa.Table.from_pandas(df)
+                            pq.write_table(
+                                table, p_no_scheme,
+                                filesystem=s3_fs,
+                                compression=parquet_compression,
+                                coerce_timestamps=constants.default_time_units,
+                                allow_truncated_timestamps=True,
+                                row_group_size=
+                                constants.parquet_row_group_size)
+                    else:
+                        if engine == "pandas":
+                            df.to_parquet(
+                                p, compression=parquet_compression,
+                                coerce_timestamps=constants.default_time_units,
+                                allow_truncated_timestamps=True,
+                                row_group_size=
+                                constants.parquet_row_group_size)
+
+            except pyarrow.lib.ArrowMemoryError as e:
+                logger.warning(
+                    f"Could not dump using Pandas/pyarrow, will instead try chunking with pyarrow directly {str(e)}")
+
+                pyarrow_dump(df, path)
+
+    def write_parquet_stream(self,
+                             data_frame_iter,
+                             path: str = None,
+                             md_request=None,
+                             ticker: str = None,
+                             cloud_credentials: dict = None,
+                             parquet_compression: str =
+                             constants.parquet_compression) -> int:
+        """Writes DataFrames to a single Parquet file as they arrive (eg.
+        from a generator such as DataVendorDukasCopy.load_ticker_stream),
+        appending each one as row group(s) with a pyarrow ParquetWriter,
+        so we never need to hold all the data in memory
+
+        Locally, we write to a temporary file first, and then rename it, so
+        readers never see a partially written file.
+
+        Parameters
+        ----------
+        data_frame_iter : iterable of DataFrame
+            DataFrames with the same columns (later DataFrames are conformed
+            to the columns/types of the first)
+        path : str (optional)
+            Path of Parquet file (can be S3) or folder if md_request specified
+        md_request : MarketDataRequest (optional)
+            Used to create the filename, eg.
+            backtest.fx.dukascopy.tick.NYC.EURUSD.parquet
+        ticker : str (optional)
+            Ticker to use in the filename
+        cloud_credentials : dict (optional)
+            Credentials for logging into the cloud
+        parquet_compression : str (optional)
+            Parquet compression type to use when writing
+
+        Returns
+        -------
+        int
+            Number of rows written
+        """
+        logger = LoggerManager.getLogger(__name__)
+
+        if md_request is not None:
+            if path is None:
+                path = ""
+
+            if ticker is None and md_request.freq in ["intraday", "tick"]:
+                ticker = md_request.tickers[0]
+
+            path = self.path_join(path, md_request.create_category_key(
+                ticker=ticker))
+
+        if ".parquet" not in path and path[-5:] != ".gzip":
+            path = f"{path}.parquet"
+
+        path = self.sanitize_path(path)
+
+        filesystem = None
+
+        if "s3://" in path:
+            filesystem = self._create_cloud_filesystem(
+                self._convert_cred(cloud_credentials, convert_to_s3fs=False),
+                "s3_pyarrow")
+
+            path_write = path.replace("s3://", "")
+        else:
+            path_write = f"{path}.tmp"
+
+        pqwriter = None
+        schema = None
+        columns = None
+        rows = 0
+
+        try:
+            for df in data_frame_iter:
+                if df is None or df.empty:
+                    continue
+
+                if pqwriter is None:
+                    table = pa.Table.from_pandas(df)
+
+                    schema = table.schema
+                    columns = df.columns
+
+                    pqwriter = pq.ParquetWriter(
+                        path_write, schema,
+                        compression=parquet_compression,
+                        coerce_timestamps=constants.default_time_units,
+                        allow_truncated_timestamps=True,
+                        filesystem=filesystem)
+                else:
+                    table = pa.Table.from_pandas(
+                        df.reindex(columns=columns), schema=schema)
+
+                pqwriter.write_table(table)
+
+                rows = rows + len(df.index)
+
+                logger.debug(f"Written {rows} rows to {path}")
+        except:
+            # Don't leave behind a partially written temporary file
+            if pqwriter is not None:
+                pqwriter.close()
+
+                if filesystem is None and os.path.exists(path_write):
+                    os.remove(path_write)
+
+            raise
+
+        if pqwriter is not None:
+            pqwriter.close()
+        else:
+            logger.warning(f"No data to write to {path}")
+
+            return 0
+
+        if filesystem is None:
+            os.replace(path_write, path)
+
+        logger.info(f"Written {rows} rows to {path}")
+
+        return rows
+
+    ### functions to handle Hive partitioned Parquet datasets
+    # eg. folder/backtest.fx.dukascopy.tick.NYC/ticker=EURUSD/year=2021/
+    # month=3/part-....parquet
+
+    # Locks for each partition folder (so appends, overwrites and compaction
+    # of the same partition don't interleave) and background compaction
+    _partition_locks = {}
+    _partition_locks_lock = threading.Lock()
+
+    _compaction_executor = None
+    _compaction_futures = {}
+
+    def _get_parquet_dataset_path(self, fname: str, engine: str):
+        # eg. engine="parquet_dataset:folder" stores fname under folder
+        if engine.startswith("parquet_dataset:"):
+            return self.path_join(engine.replace("parquet_dataset:", "", 1),
+                                  fname)
+
+        return fname
+
+    def _get_partition_lock(self, partition_path: str):
+        with IOEngine._partition_locks_lock:
+            if partition_path not in IOEngine._partition_locks:
+                IOEngine._partition_locks[partition_path] = threading.Lock()
+
+            return IOEngine._partition_locks[partition_path]
+
+    def _split_ticker_field(self, column: str):
+        # Columns without a field (eg. "EURUSD") are treated as close
+        if "." not in column:
+            return column, "close"
+
+        ticker, field = column.rsplit(".", 1)
+
+        return ticker, field
+
+    def _get_ticker_folder(self, path: str, ticker: str):
+        return os.path.join(path, f"ticker={urllib.parse.quote(ticker, safe='')}")
+
+    def _get_parquet_dataset_tickers(self, path: str):
+        if not os.path.isdir(path):
+            return []
+
+        return [urllib.parse.unquote(f.replace("ticker=", "", 1))
+                for f in sorted(os.listdir(path)) if f.startswith("ticker=")]
+
+    def _get_partition_files(self, partition_path: str):
+        if not os.path.isdir(partition_path):
+            return []
+
+        # Files are named by the time they were written, so are in order
+        return sorted([os.path.join(partition_path, f)
+                       for f in os.listdir(partition_path)
+                       if f.startswith("part-") and f.endswith(".parquet")])
+
+    def _get_ticker_partitions(self, ticker_folder: str):
+        # (year, month, folder) of each partition of a ticker, in order
+        partition_list = []
+
+        if not os.path.isdir(ticker_folder):
+            return partition_list
+
+        for year_folder in os.listdir(ticker_folder):
+            if not year_folder.startswith("year="):
+                continue
+
+            for month_folder in os.listdir(
+                    os.path.join(ticker_folder, year_folder)):
+                if month_folder.startswith("month="):
+                    partition_list.append(
+                        (int(year_folder.replace("year=", "")),
+                         int(month_folder.replace("month=", "")),
+                         os.path.join(ticker_folder, year_folder,
+                                      month_folder)))
+
+        return sorted(partition_list)
+
+    def _write_partition_file(self, table, partition_path: str,
+                              parquet_compression: str, name: str = None):
+        os.makedirs(partition_path, exist_ok=True)
+
+        if name is None:
+            name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+
+        # Files starting with "." are ignored when reading the dataset, so
+        # readers never see a partially written file
+        path_temp = os.path.join(partition_path, f".{name}")
+        path = os.path.join(partition_path, name)
+
+        pq.write_table(table, path_temp, compression=parquet_compression,
+                       coerce_timestamps=constants.default_time_units,
+                       allow_truncated_timestamps=True,
+                       row_group_size=constants.parquet_row_group_size)
+
+        os.replace(path_temp, path)
+
+        return path
+
+    def write_parquet_dataset(self, data_frame: pd.DataFrame, path: str,
+                              mode: str = "overwrite",
+                              parquet_compression: str =
+                              constants.parquet_compression,
+                              compact: bool = True):
+        """Writes a DataFrame to a local Hive partitioned Parquet dataset,
+        laid out as ticker=/year=/month=, where the columns of the DataFrame
+        are of the form ticker.field (eg. EURUSD.bid). Only the partitions
+        in the DataFrame's date range are touched.
+
+        Parameters
+        ----------
+        data_frame : DataFrame
+            Data to be written
+        path : str
+            Folder of the dataset
+        mode : str
+            "overwrite" - replaces the partitions in the DataFrame
+            "append" - adds a file to each partition in the DataFrame (eg.
+            for daily appends), partitions with many small files are
+            compacted in the background
+        parquet_compression : str (optional)
+            Parquet compression type to use when writing
+        compact : bool
+            Compact partitions with many files in the background after
+            appending
+
+        Returns
+        -------
+        list of str
+            Partition folders written
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        if data_frame is None or data_frame.empty:
+            return []
+
+        data_frame = data_frame.sort_index(kind="mergesort")
+
+        if data_frame.index.name is None:
+            data_frame = data_frame.rename_axis("Date")
+
+        ticker_columns = {}
+
+        for c in data_frame.columns:
+            ticker, field = self._split_ticker_field(c)
+
+            ticker_columns.setdefault(ticker, {})[c] = field
+
+        partition_list = []
+
+        for ticker, columns in ticker_columns.items():
+            df_ticker = data_frame[list(columns.keys())].rename(
+                columns=columns)
+
+            for (year, month), df_partition in df_ticker.groupby(
+                    [df_ticker.index.year, df_ticker.index.month],
+                    sort=True):
+
+                partition_path = os.path.join(
+                    self._get_ticker_folder(path, ticker), f"year={year}",
+                    f"month={month}")
+
+                table = pa.Table.from_pandas(df_partition)
+
+                with self._get_partition_lock(partition_path):
+                    old_files = self._get_partition_files(partition_path)
+
+                    self._write_partition_file(table, partition_path,
+                                               parquet_compression)
+
+                    if mode == "overwrite":
+                        for f in old_files:
+                            os.remove(f)
+
+                if mode == "append" and compact and len(old_files) + 1 \
+                        >= constants.parquet_dataset_compact_files:
+                    self._submit_compaction(partition_path,
+                                            parquet_compression)
+
+                partition_list.append(partition_path)
+
+        logger.info(f"Written {len(partition_list)} partitions to {path}")
+
+        return partition_list
+
+    def read_parquet_dataset(self, path: str, tickers: List[str] = None,
+                             columns: List[str] = None, start_date=None,
+                             finish_date=None) -> pd.DataFrame:
+        """Reads a local Hive partitioned Parquet dataset (written by
+        write_parquet_dataset), only reading the ticker and year/month
+        partitions overlapping the request, and within those, only the row
+        groups in the date range and the fields requested
+
+        Parameters
+        ----------
+        path : str
+            Folder of the dataset
+        tickers : str (list)
+            Tickers to read (default: every ticker), or taken from columns
+        columns : str (list)
+            Columns to read, of the form ticker.field (columns which aren't
+            in the dataset are ignored, and if none of them are, every field
+            of those tickers is read)
+        start_date : str/datetime (optional)
+            Start date (inclusive)
+        finish_date : str/datetime (optional)
+            Finish date (inclusive)
+
+        Returns
+        -------
+        DataFrame
+            With columns of the form ticker.field, None if there's no data
+        """
+        fields = {}
+
+        if columns is not None:
+            for c in columns:
+                ticker, field = self._split_ticker_field(c)
+
+                fields.setdefault(ticker, []).append(field)
+
+            if tickers is None:
+                tickers = list(fields.keys())
+
+        if tickers is None:
+            tickers = self._get_parquet_dataset_tickers(path)
+
+        first_partition = (0, 0)
+        last_partition = (9999, 12)
+
+        if start_date is not None:
+            start_date = pd.Timestamp(start_date)
+            first_partition = (start_date.year, start_date.month)
+
+        if finish_date is not None:
+            finish_date = pd.Timestamp(finish_date)
+            last_partition = (finish_date.year, finish_date.month)
+
+        data_frame_list = []
+
+        for ticker in tickers:
+            # Prune the year/month partitions outside the date range (from
+            # the folder names, without opening any files)
+            df_partition_list = []
+
+            for year, month, partition_path in self._get_ticker_partitions(
+                    self._get_ticker_folder(path, ticker)):
+                if first_partition <= (year, month) <= last_partition:
+                    df_partition = self._read_parquet_dataset_partition(
+                        partition_path, fields=fields.get(ticker),
+                        start_date=start_date, finish_date=finish_date)
+
+                    if df_partition is not None and not df_partition.empty:
+                        df_partition_list.append(df_partition)
+
+            if df_partition_list == []:
+                continue
+
+            df = pd.concat(df_partition_list).sort_index(kind="mergesort")
+            df.columns = [f"{ticker}.{c}" for c in df.columns]
+
+            data_frame_list.append(df)
+
+        if data_frame_list == []:
+            return None
+
+        if len(data_frame_list) == 1:
+            return data_frame_list[0]
+
+        return pd.concat(data_frame_list, axis=1)
+
+    def _read_parquet_dataset_partition(self, partition_path: str,
+                                        fields: List[str] = None,
+                                        start_date=None, finish_date=None):
+        # Hold the partition's lock whilst reading, so we never see its files
+        # part way through being replaced (eg. by an overwrite or compaction)
+        with self._get_partition_lock(partition_path):
+            files = self._get_partition_files(partition_path)
+
+            if files == []:
+                return None
+
+            dataset = pds.dataset(files, format="parquet")
+
+            schema = dataset.schema
+
+            index_columns = self._get_parquet_index_columns(schema)
+
+            selected = [c for c in schema.names if c not in index_columns]
+
+            if fields is not None:
+                requested = [f for f in selected if f in fields]
+
+                if requested != []:
+                    selected = requested
+
+            date_filter = None
+
+            if index_columns != []:
+                date_filter = self._get_parquet_date_filter(
+                    schema, index_columns[0], start_date=start_date,
+                    finish_date=finish_date)
+
+            table = dataset.to_table(columns=index_columns + selected,
+                                     filter=date_filter)
+
+        return table.to_pandas()
+
+    def _read_last_parquet_dataset_date(self, path: str):
+        last_date_dict = self._read_last_parquet_dataset_dates(path)
+
+        last_date_list = [d for d in last_date_dict.values() if d is not None]
+
+        if last_date_list == []:
+            return None
+
+        return max(last_date_list)
+
+    def _read_last_parquet_dataset_dates(self, path: str,
+                                         tickers: List[str] = None):
+        # Last date stored for each ticker (None if it isn't stored)
+        if tickers is None:
+            tickers = self._get_parquet_dataset_tickers(path)
+
+        last_date_dict = {}
+
+        for ticker in tickers:
+            last_date_dict[ticker] = None
+
+            partition_list = self._get_ticker_partitions(
+                self._get_ticker_folder(path, ticker))
+
+            # Only the latest year/month partition needs to be read
+            for year, month, partition_path in reversed(partition_list):
+                with self._get_partition_lock(partition_path):
+                    files = self._get_partition_files(partition_path)
+
+                    if files == []:
+                        continue
+
+                    index = self.read_parquet(files[0], columns=[]).index
+
+                    for f in files[1:]:
+                        index = index.append(
+                            self.read_parquet(f, columns=[]).index)
 
-        # Tends to be slower than using pandas/pyarrow directly, but for very
-        # large files, we might have to split before writing to disk
-        def pyarrow_dump(df_dump, dump_path):
-            # Trying to convert large Pandas DataFrames in one go to Arrow
-            # tables can result in out-of-memory messages, so chunk them first,
-            # convert them one by one, and write to disk in chunks
-            df_list = self.chunk_dataframes(df_dump)
+                if len(index) > 0:
+                    last_date_dict[ticker] = index.max()
 
-            # Using pandas.to_parquet, does not let us pass in parameters to
-            # allow coercion of timestamps hence have to do it this way,
-            # using underlying pyarrow interface (/)
-            # ie. ns -> us
-            if not (isinstance(df_list, list)):
-                df_list = [df_list]
+                    break
 
-            for path_ in dump_path:
-                path_ = self.sanitize_path(path_)
+        return last_date_dict
 
-                # Reference:
-                # https://stackoverflow.com/questions/47113813/using-pyarrow-how-do-you-append-to-parquet-file
-                # https://arrow.apache.org/docs/python/filesystems.html
+    def compact_parquet_dataset(self, path: str, min_files: int = None,
+                                parquet_compression: str =
+                                constants.parquet_compression):
+        """Compacts partitions of a Hive partitioned Parquet dataset (or a
+        single partition folder) with many small files (eg. from daily
+        appends) into one file each
 
-                pqwriter = None
-                counter = 1
+        Parameters
+        ----------
+        path : str
+            Folder of the dataset or of a partition
+        min_files : int (optional)
+            Only compact partitions with at least this many files (default:
+            parquet_dataset_compact_files)
+        parquet_compression : str (optional)
+            Parquet compression type to use when writing
 
-                if "s3://" in path_:
-                    s3 = self._create_cloud_filesystem(cloud_credentials_,
-                                                       "s3_pyarrow")
+        Returns
+        -------
+        int
+            Number of partitions compacted
+        """
+        logger = LoggerManager().getLogger(__name__)
 
-                    path_in_s3 = path_.replace("s3://", "")
+        if min_files is None:
+            min_files = constants.parquet_dataset_compact_files
 
-                    for df_ in df_list:
-                        logger.info(
-                            f"S3 chunk... {str(counter)} of {str(len(df_list))}")
-                        table = pa.Table.from_pandas(df_)
+        compacted = 0
 
-                        if pqwriter is None:
-                            pqwriter = pq.ParquetWriter(
-                                path_in_s3, table.schema,
-                                compression=parquet_compression,
-                                coerce_timestamps=constants.default_time_units,
-                                allow_truncated_timestamps=True,
-                                filesystem=s3)
+        for partition_path, folders, files in os.walk(path):
+            if not os.path.basename(partition_path).startswith("month="):
+                continue
 
-                        pqwriter.write_table(table)
+            with self._get_partition_lock(partition_path):
+                old_files = self._get_partition_files(partition_path)
 
-                        counter = counter + 1
+                if len(old_files) < max(min_files, 2):
+                    continue
 
-                else:
-                    for df_ in df_list:
-                        logger.info(
-                            f"Local chunk... {str(counter)} of {str(len(df_list))}")
-                        table = pa.Table.from_pandas(df_)
+                table = pa.concat_tables(
+                    [pq.read_table(f) for f in old_files],
+                    promote_options="default")
 
-                        if pqwriter is None:
-                            pqwriter = pq.ParquetWriter(
-                                path_, table.schema,
-                                compression=parquet_compression,
-                                coerce_timestamps=constants.default_time_units,
-                                allow_truncated_timestamps=True)
+                # Replace the newest file, so the compacted file is still
+                # before any files appended afterwards
+                self._write_partition_file(
+                    table, partition_path, parquet_compression,
+                    name=os.path.basename(old_files[-1]))
 
-                        pqwriter.write_table(table)
+                for f in old_files[:-1]:
+                    os.remove(f)
 
-                        counter = counter + 1
+            compacted = compacted + 1
 
-                # Close the parquet writer
-                if pqwriter:
-                    pqwriter.close()
+        logger.debug(f"Compacted {compacted} partitions in {path}")
 
-                    # df.to_parquet(path, compression=parquet_compression)
+        return compacted
 
-        if engine == "pyarrow_chunked" or use_pyarrow_directly:
-            pyarrow_dump(df, path)
-        elif engine == "pandas" or engine == "polars":
-            # First try to use Pandas/pyarrow, if fails, which can occur with
-            # large DataFrames use chunked write
-            try:
-                for p in path:
-                    p = self.sanitize_path(p)
+    def _submit_compaction(self, partition_path: str,
+                           parquet_compression: str):
+        with IOEngine._partition_locks_lock:
+            future = IOEngine._compaction_futures.get(partition_path)
 
-                    if "s3://" in p:
-                        # Use pyarrow's native S3FileSystem to
-                        # avoid fsspec/aiohttp asyncio issues on
-                        # Python 3.14+
-                        s3_fs = self._create_cloud_filesystem(
-                            cloud_credentials, "s3_pyarrow")
-                        p_no_scheme = p.replace("s3://", "")
+            # Already waiting to be compacted
+            if future is not None and not future.running() \
+                    and not future.done():
+                return
 
-                        if engine == "pandas":
-                            table = pa.Table.from_pandas(df)
-                            pq.write_table(
-                                table, p_no_scheme,
-                                filesystem=s3_fs,
-                                compression=parquet_compression,
-                                coerce_timestamps=constants.default_time_units,
-                                allow_truncated_timestamps=True)
-                    else:
-                        if engine == "pandas":
-                            df.to_parquet(
-                                p, compression=parquet_compression,
-                                coerce_timestamps=constants.default_time_units,
-                                allow_truncated_timestamps=True)
+            if IOEngine._compaction_executor is None:
+                IOEngine._compaction_executor = \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
-            except pyarrow.lib.ArrowMemoryError as e:
-                logger.warning(
-                    f"Could not dump using Pandas/pyarrow, will instead try chunking with pyarrow directly {str(e)}")
+            IOEngine._compaction_futures[partition_path] = \
+                IOEngine._compaction_executor.submit(
+                    self._compact_parquet_partition, partition_path,
+                    parquet_compression)
 
-                pyarrow_dump(df, path)
+    def _compact_parquet_partition(self, partition_path: str,
+                                   parquet_compression: str):
+        # Nothing waits on the result of background compaction, so log any
+        # failures (otherwise they'd be lost in the future)
+        try:
+            self.compact_parquet_dataset(
+                partition_path, parquet_compression=parquet_compression)
+        except Exception as e:
+            logger = LoggerManager().getLogger(__name__)
+            logger.warning(f"Failed to compact {partition_path}: {str(e)}")
+
+    @staticmethod
+    def wait_for_compaction():
+        """Waits for any background compaction of Parquet datasets to
+        finish
+        """
+        with IOEngine._partition_locks_lock:
+            futures = list(IOEngine._compaction_futures.values())
+            IOEngine._compaction_futures = {}
+
+        concurrent.futures.wait(futures)
 
     def split_array_chunks(self, array,
                            chunks: int = None,
@@ -1599,6 +3688,13 @@ class IOEngine(object):
             # if isinstance(array, pd.DataFrame):
             #    array = [array[i:i + chunk_size] for i in range(0, array.shape[0], chunk_size)]
 
+            # Newer versions of NumPy/Pandas return NumPy arrays when calling
+            # np.array_split on a DataFrame, so split on row positions instead
+            if isinstance(array, (pd.DataFrame, pd.Series)):
+                return [array.iloc[ind[0]:ind[-1] + 1] for ind in
+                        np.array_split(np.arange(array.shape[0]), chunks)
+                        if len(ind) > 0]
+
             return np.array_split(array, chunks)
 
         return array
@@ -2317,34 +4413,157 @@ class SpeedCache(object):
     repopulate each time we restart Python. Also can let us share cache easily
     across threads, without replicating.
 
+    With engine="arrow:folder", DataFrames are instead cached locally as
+    Arrow IPC files, which are memory mapped when read. With
+    cache_format="arrow", they are stored in Redis as Arrow IPC buffers
+    (rather than Parquet).
+
     """
 
+    # In-process memory tiers, one for each backend (engine, server and
+    # port), shared by the SpeedCache instances which use that backend
+    _memory_caches = {}
+    _memory_cache_lock = threading.Lock()
+
     def __init__(self, db_cache_server: str = None,
                  db_cache_port: int = None,
                  db_cache_timeout: int = None,
-                 engine: str = "redis"):
+                 engine: str = "redis",
+                 range_aware: bool = None,
+                 memory_size_mb: int = None,
+                 cache_format: str = None):
 
         if db_cache_server is None:
-            self.db_cache_server = constants.db_cache_server
+            db_cache_server = constants.db_cache_server
 
         if db_cache_port is None:
-            self.db_cache_port = constants.db_cache_port
+            db_cache_port = constants.db_cache_port
 
         if db_cache_timeout is None:
-            self.db_cache_timeout = constants.db_cache_timeout
+            db_cache_timeout = constants.db_cache_timeout
+
+        if range_aware is None:
+            range_aware = constants.speed_cache_range_aware
+
+        if cache_format is None:
+            cache_format = constants.cache_format
+
+        self.db_cache_server = db_cache_server
+        self.db_cache_port = db_cache_port
+        self.db_cache_timeout = db_cache_timeout
 
         self.engine = engine
+        self.range_aware = range_aware
+        self.cache_format = cache_format
         self.io_engine = IOEngine()
 
+        self.memory_cache = None
+
+        if engine != "no_cache":
+            self.memory_cache = SpeedCache._get_memory_cache(
+                (engine, str(db_cache_server), str(db_cache_port)),
+                memory_size_mb)
+
+    @staticmethod
+    def _get_memory_cache(backend: tuple, memory_size_mb: int = None):
+        if memory_size_mb is None:
+            memory_size_mb = constants.speed_cache_memory_size_mb
+
+        if memory_size_mb is None or memory_size_mb <= 0:
+            return None
+
+        # The size is set by the first instance for a backend, later ones
+        # don't resize it
+        with SpeedCache._memory_cache_lock:
+            if backend not in SpeedCache._memory_caches:
+                SpeedCache._memory_caches[backend] = MemoryCache(
+                    max_bytes=int(memory_size_mb * 1024 * 1024))
+
+            return SpeedCache._memory_caches[backend]
+
+    def _get_memory_ttl(self, key: str):
+        # Keys from MarketDataRequest contain the freq (eg. freq-daily), so
+        # intraday data can expire more quickly than daily data
+        ttl = constants.speed_cache_memory_ttl
+
+        freq = re.search(r"freq-([a-z]+)", key)
+
+        if freq is not None and freq.group(1) in ttl:
+            return ttl[freq.group(1)]
+
+        return ttl.get("default")
+
+    def _put_memory(self, key: str, obj, meta_data: dict = None):
+        if self.memory_cache is not None:
+            self.memory_cache.put(key, obj, meta_data=meta_data,
+                                  ttl=self._get_memory_ttl(key))
+
+    def get_memory_cache_stats(self) -> dict:
+        """Gets the hit/miss/eviction counters and the bytes used by the
+        in-process memory tier
+
+        Returns
+        -------
+        dict
+        """
+        if self.memory_cache is None:
+            return {}
+
+        return self.memory_cache.get_stats()
+
     def put_dataframe(self, key: str, obj, meta_data: dict = None):
         if self.engine != "no_cache":
+            key = key.replace("/", "_")
+
+            # Replaces any older version in the memory tier
+            self._put_memory(key, obj, meta_data=meta_data)
+
             try:
                 self.io_engine.write_time_series_cache_to_disk(
-                    key.replace("/", "_"), obj, meta_data=meta_data,
+                    key, obj, meta_data=meta_data,
                     engine=self.engine, db_server=self.db_cache_server,
-                    db_port=self.db_cache_port)
-            except:
-               pass
+                    db_port=self.db_cache_port, timeout=self.db_cache_timeout,
+                    cache_format=self.cache_format)
+            except Exception as e:
+                logger = LoggerManager().getLogger(__name__)
+                logger.warning(f"Couldn't write {key} to the cache: {str(e)}")
+
+    def put_dataframes(self, obj_dict: dict, meta_data_dict: dict = None):
+        """Writes several DataFrames to the cache in one round trip
+
+        Parameters
+        ----------
+        obj_dict : dict
+            DataFrames keyed by cache key
+        meta_data_dict : dict (optional)
+            Metadata keyed by cache key
+        """
+        if self.engine != "no_cache":
+            obj_dict = {k.replace("/", "_"): v for k, v in obj_dict.items()}
+
+            if meta_data_dict is not None:
+                meta_data_dict = {k.replace("/", "_"): v
+                                  for k, v in meta_data_dict.items()}
+
+            for k, v in obj_dict.items():
+                meta_data = None
+
+                if meta_data_dict is not None:
+                    meta_data = meta_data_dict.get(k)
+
+                self._put_memory(k, v, meta_data=meta_data)
+
+            try:
+                self.io_engine.write_time_series_cache_batch_to_disk(
+                    obj_dict, meta_data_dict=meta_data_dict,
+                    engine=self.engine, db_server=self.db_cache_server,
+                    db_port=self.db_cache_port,
+                    timeout=self.db_cache_timeout,
+                    cache_format=self.cache_format)
+            except Exception as e:
+                logger = LoggerManager().getLogger(__name__)
+                logger.warning(f"Couldn't write {len(obj_dict)} DataFrames "
+                               f"to the cache: {str(e)}")
 
     def exists_key(self, key: str):
         if self.engine == "no_cache": return False
@@ -2353,20 +4572,114 @@ class SpeedCache(object):
             return self.io_engine.exists_time_series_cache_on_disk(
                 key.replace("/", "_"),
                 engine=self.engine, db_server=self.db_cache_server,
-                db_port=self.db_cache_port)
+                db_port=self.db_cache_port, timeout=self.db_cache_timeout)
         except:
             pass
 
     def get_dataframe(self, key: str):
         if self.engine == "no_cache": return None
 
+        key = key.replace("/", "_")
+
+        if self.memory_cache is not None:
+            data_frame, _ = self.memory_cache.get(key)
+
+            if data_frame is not None:
+                return data_frame
+
         try:
-            return self.io_engine.read_time_series_cache_from_disk(
-                key.replace("/", "_"),
+            data_frame = self.io_engine.read_time_series_cache_from_disk(
+                key,
                 engine=self.engine, db_server=self.db_cache_server,
-                db_port=self.db_cache_port)
+                db_port=self.db_cache_port, timeout=self.db_cache_timeout)
         except:
-            pass
+            return None
+
+        self._put_memory(key, data_frame)
+
+        return data_frame
+
+    def get_dataframes(self, keys: List[str]):
+        """Reads several DataFrames from the cache in one round trip
+
+        Parameters
+        ----------
+        keys : str (list)
+            Cache keys
+
+        Returns
+        -------
+        DataFrame (list)
+            None for any keys which are not in the cache
+        """
+        if self.engine == "no_cache": return [None] * len(keys)
+
+        keys = [k.replace("/", "_") for k in keys]
+        data_frame_list = [None] * len(keys)
+
+        if self.memory_cache is not None:
+            for i, k in enumerate(keys):
+                data_frame_list[i], _ = self.memory_cache.get(k)
+
+        # Only go to the external cache for those not in memory
+        missing = [i for i, df in enumerate(data_frame_list) if df is None]
+
+        if not missing:
+            return data_frame_list
+
+        try:
+            df_missing_list = \
+                self.io_engine.read_time_series_cache_batch_from_disk(
+                    [keys[i] for i in missing],
+                    engine=self.engine, db_server=self.db_cache_server,
+                    db_port=self.db_cache_port, timeout=self.db_cache_timeout)
+        except:
+            return data_frame_list
+
+        for i, data_frame in zip(missing, df_missing_list):
+            data_frame_list[i] = data_frame
+
+            self._put_memory(keys[i], data_frame)
+
+        return data_frame_list
+
+    def get_dataframe_and_meta_data(self, key: str):
+        """Reads a DataFrame and its metadata from the cache in one round
+        trip
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+
+        Returns
+        -------
+        DataFrame, dict
+        """
+        if self.engine == "no_cache": return None, None
+
+        key = key.replace("/", "_")
+
+        if self.memory_cache is not None:
+            data_frame, meta_data = self.memory_cache.get(key)
+
+            # Entries cached without metadata may still have it externally
+            if data_frame is not None and meta_data is not None:
+                return data_frame, meta_data
+
+        try:
+            data_frame, meta_data = self.io_engine.\
+                read_time_series_cache_with_meta_data_from_disk(
+                    key,
+                    engine=self.engine, db_server=self.db_cache_server,
+                    db_port=self.db_cache_port,
+                    timeout=self.db_cache_timeout)
+        except:
+            return None, None
+
+        self._put_memory(key, data_frame, meta_data=meta_data)
+
+        return data_frame, meta_data
 
     def get_meta_data(self, key: str):
         if self.engine == "no_cache": return None
@@ -2375,10 +4688,154 @@ class SpeedCache(object):
             return self.io_engine.read_time_series_meta_data_from_disk(
                 key.replace("/", "_"),
                 engine=self.engine, db_server=self.db_cache_server,
-                db_port=self.db_cache_port)
+                db_port=self.db_cache_port, timeout=self.db_cache_timeout)
         except:
             pass
 
+    ### range aware caching (keys exclude the start/finish dates)
+    def get_dataframe_range(self, key: str):
+        """Gets a DataFrame stored with put_dataframe_range, alongside the
+        date range it covers
+
+        Parameters
+        ----------
+        key : str
+            Range key (eg. from MarketDataRequest.generate_range_key)
+
+        Returns
+        -------
+        DataFrame, Timestamp, Timestamp
+            None, None, None if there is no cached range
+        """
+        data_frame, meta_data = self.get_dataframe_and_meta_data(key)
+
+        if data_frame is None or meta_data is None:
+            return None, None, None
+
+        try:
+            cache_start_date = pd.Timestamp(meta_data["start_date"])
+            cache_finish_date = pd.Timestamp(meta_data["finish_date"])
+        except:
+            return None, None, None
+
+        return data_frame, cache_start_date, cache_finish_date
+
+    def put_dataframe_range(self, key: str, obj, start_date, finish_date):
+        """Stores a DataFrame recording the date range that it covers, so
+        that later requests for sub-ranges can be sliced out of it
+
+        Parameters
+        ----------
+        key : str
+            Range key (eg. from MarketDataRequest.generate_range_key)
+        obj : DataFrame
+            Data to be cached
+        start_date : datetime
+            Start of date range covered by obj
+        finish_date : datetime
+            Finish of date range covered by obj
+        """
+        meta_data = {
+            "start_date": self.to_naive_timestamp(start_date).isoformat(),
+            "finish_date": self.to_naive_timestamp(finish_date).isoformat()}
+
+        self.put_dataframe(key, obj, meta_data=meta_data)
+
+    def get_missing_ranges(self, start_date, finish_date,
+                           cache_start_date, cache_finish_date):
+        """Finds which parts of a requested date range are not covered by
+        a cached date range (assumes that they overlap)
+
+        Returns
+        -------
+        (datetime, datetime), (datetime, datetime)
+            Missing head and tail ranges (None if not missing)
+        """
+        start_date = self.to_naive_timestamp(start_date)
+        finish_date = self.to_naive_timestamp(finish_date)
+        cache_start_date = self.to_naive_timestamp(cache_start_date)
+        cache_finish_date = self.to_naive_timestamp(cache_finish_date)
+
+        head_range = None
+        tail_range = None
+
+        if start_date < cache_start_date:
+            head_range = (start_date, cache_start_date)
+
+        if finish_date > cache_finish_date:
+            tail_range = (cache_finish_date, finish_date)
+
+        return head_range, tail_range
+
+    def is_range_overlapping(self, start_date, finish_date,
+                             cache_start_date, cache_finish_date) -> bool:
+        return self.to_naive_timestamp(start_date) <= \
+            self.to_naive_timestamp(cache_finish_date) and \
+            self.to_naive_timestamp(finish_date) >= \
+            self.to_naive_timestamp(cache_start_date)
+
+    def merge_dataframe_range(self, df_list: List[pd.DataFrame]):
+        """Concatenates DataFrames covering consecutive date ranges. Where
+        the ranges overlap at their boundaries, the later DataFrame in the
+        list takes precedence.
+
+        Parameters
+        ----------
+        df_list : DataFrame (list)
+            DataFrames ordered by date range
+
+        Returns
+        -------
+        DataFrame
+        """
+        df_list = [x for x in df_list if x is not None and not x.empty]
+
+        if not df_list:
+            return None
+
+        if len(df_list) == 1:
+            return df_list[0]
+
+        data_frame = pd.concat(df_list)
+        data_frame = data_frame[
+            ~data_frame.index.duplicated(keep="last")].sort_index()
+
+        return data_frame
+
+    @staticmethod
+    def to_naive_timestamp(date):
+        date = pd.Timestamp(date)
+
+        if date.tzinfo is not None:
+            date = date.tz_convert("UTC").tz_localize(None)
+
+        return date
+
+    def list_keys(self, match: str = None):
+        """Lists the keys in the cache (optionally filtered by a glob style
+        pattern)
+
+        Parameters
+        ----------
+        match : str (optional)
+            Pattern to filter keys by
+
+        Returns
+        -------
+        str (list)
+        """
+        if self.engine == "no_cache":
+            return []
+
+        try:
+            return list(self.io_engine.list_time_series_cache_keys(
+                engine=self.engine, match=match,
+                db_server=self.db_cache_server,
+                db_port=self.db_cache_port,
+                timeout=self.db_cache_timeout))
+        except:
+            return []
+
     def dump_all_keys(self):
         self.dump_key("flush_all_keys")
 
@@ -2386,16 +4843,21 @@ class SpeedCache(object):
         if self.engine == "no_cache":
             return
 
+        # Keys can be patterns, so simplest to clear all of the memory tier
+        if self.memory_cache is not None:
+            self.memory_cache.flush()
+
         try:
             return self.io_engine.remove_time_series_cache_on_disk(
                 key,
                 engine=self.engine,
                 db_server=self.db_cache_server,
-                db_port=self.db_cache_port)
+                db_port=self.db_cache_port,
+                timeout=self.db_cache_timeout)
         except:
             pass
 
-    def generate_key(self, obj, key_drop: List[str] = []):
+    def generate_key(self, obj, key_drop: List[str] = None):
         """Create a unique hash key for object from its attributes (excluding
         those attributes in key drop), which can be used as a hashkey in the
         Redis hashtable
@@ -2412,8 +4874,12 @@ class SpeedCache(object):
         hashkey
         """
 
-        # never want to include Logger object!
-        key_drop.append("logger")
+        # never want to include Logger object! (copy the list, so the
+        # caller's list isn't changed)
+        if key_drop is None:
+            key_drop = []
+
+        key_drop = list(key_drop) + ["logger"]
         key = []
 
         for k in obj.__dict__:
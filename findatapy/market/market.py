@@ -19,7 +19,10 @@ __author__ = "saeedamen"  # Saeed Amen
 import copy
 from findatapy.util import ConfigManager
 from findatapy.util import DataConstants
-from findatapy.market.ioengine import SpeedCache
+from findatapy.market.ioengine import SpeedCache, RedisConnectionManager
+from findatapy.util.singleflight import SingleFlight
+from findatapy.util.taskgraph import TaskGraph
+from findatapy.market.batchplanner import BatchPlanner
 
 import concurrent.futures
 
@@ -39,6 +42,10 @@ class Market(object):
     or FX volatility surfaces.
     """
 
+    # Shared by all Market instances, so identical concurrent requests are
+    # only fetched once in this process
+    _single_flight = SingleFlight()
+
     def __init__(self, market_data_generator=None, md_request=None):
         if market_data_generator is None:
             if constants.default_market_data_generator\
@@ -187,40 +194,26 @@ class Market(object):
         # If we've got a list MarketDataRequest objects, use threading to 
         # independently call them
         if isinstance(md_request, list):
-            if len(md_request) > 0:
-
-                with concurrent.futures.ThreadPoolExecutor(
-                        max_workers=md_request[0].list_threads) as executor:
-                    df_list = list(executor.map(self.fetch_market, md_request))
-
-                df_filtered_list = []
-
-                for md, df in zip(md_request, df_list):
-
-                    columns = []
-
-                    for tick in md.tickers:
-                        for fiel in md.fields:
-                            columns.append(tick + "." + fiel)
-
-                    if df is not None:
-                        if df.empty:
-                            df = pd.DataFrame(columns=columns)
-                    else:
-                        df = pd.DataFrame(columns=columns)
-
-                    df_filtered_list.append(df)
-
-                return self._calculations.join(df_filtered_list)
-            else:
-                return None
+            return self._fetch_market_list(
+                md_request, use_batch_planner=constants.market_batch_planner)
 
         key = md_request.generate_key()
 
+        is_cache = "cache_algo" in md_request.cache_algo \
+                   and md_request.push_to_cache
+
         # If internet_load has been specified don't bother going to cache,
         # might end up calling lower level cache though through 
         # MarketDataGenerator)
-        if "cache_algo" in md_request.cache_algo and md_request.push_to_cache:
+        if is_cache:
+            # Serve sub-ranges out of a larger cached range, and only fetch
+            # the missing head/tail from the data source (requests split
+            # into chunks use the normal path)
+            if self.speed_cache.range_aware \
+                    and md_request.split_request_chunks == 0:
+                return self._fetch_market_single_flight(
+                    key, self._fetch_market_range_cache, md_request)
+
             data_frame = self.speed_cache.get_dataframe(key)
 
         if data_frame is not None:
@@ -242,7 +235,210 @@ class Market(object):
 
                     md_request_list.append(md)
 
-            return self.fetch_market(md_request_list)
+            # Don't let the batch planner merge the chunks back together
+            return self._fetch_market_list(md_request_list,
+                                           use_batch_planner=False)
+
+        return self._fetch_market_single_flight(
+            key, self._fetch_market_and_push_to_cache, md_request, key,
+            is_cache)
+
+    def _fetch_market_list(self, md_request_list, use_batch_planner=True):
+        if len(md_request_list) == 0:
+            return None
+
+        if use_batch_planner:
+            df_list = self._fetch_market_batches(md_request_list)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=md_request_list[0].list_threads) as executor:
+                df_list = list(executor.map(self.fetch_market,
+                                            md_request_list))
+
+        df_filtered_list = []
+
+        for md, df in zip(md_request_list, df_list):
+
+            columns = []
+
+            for tick in md.tickers:
+                for fiel in md.fields:
+                    columns.append(tick + "." + fiel)
+
+            if df is not None:
+                if df.empty:
+                    df = pd.DataFrame(columns=columns)
+            else:
+                df = pd.DataFrame(columns=columns)
+
+            df_filtered_list.append(df)
+
+        return self._calculations.join(df_filtered_list)
+
+    def _fetch_market_batches(self, md_request_list):
+        """Fetches a list of MarketDataRequests, merging those which only
+        differ by their tickers into fewer calls (see BatchPlanner), and
+        then splits the results back out for each request
+
+        Parameters
+        ----------
+        md_request_list : list of MarketDataRequest
+            Requests to fetch
+
+        Returns
+        -------
+        list of DataFrame
+            One for each MarketDataRequest
+        """
+        batch_planner = BatchPlanner()
+
+        request_batch_list = batch_planner.plan(md_request_list)
+
+        logger = LoggerManager().getLogger(__name__)
+        logger.debug(f"Fetching {len(md_request_list)} requests with "
+                     f"{len(request_batch_list)} calls")
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=md_request_list[0].list_threads) as executor:
+            df_batch_list = list(executor.map(
+                self.fetch_market,
+                [b.md_request for b in request_batch_list]))
+
+        df_list = [None] * len(md_request_list)
+
+        for request_batch, df in zip(request_batch_list, df_batch_list):
+            if len(request_batch.indices) == 1:
+                df_list[request_batch.indices[0]] = df
+            else:
+                for i in request_batch.indices:
+                    df_list[i] = batch_planner.split(md_request_list[i], df)
+
+        return df_list
+
+    def explain_plan(self, md_request_list):
+        """Explains how a list of MarketDataRequests would be fetched by
+        fetch_market, with one row for each call to the data source
+
+        Parameters
+        ----------
+        md_request_list : list of MarketDataRequest
+            Requests to fetch
+
+        Returns
+        -------
+        DataFrame
+        """
+        return BatchPlanner().explain(
+            self.flatten_list_of_lists(md_request_list))
+
+    def _fetch_market_and_push_to_cache(self, md_request, key,
+                                        is_cache=False):
+        # Another caller (in this process or another) may have filled the
+        # cache whilst we were waiting to fetch
+        if is_cache:
+            data_frame = self.speed_cache.get_dataframe(key)
+
+            if data_frame is not None:
+                return data_frame
+
+        data_frame = self._fetch_market_data_frame(md_request)
+
+        # Push into cache
+        if md_request.push_to_cache:
+            if data_frame is not None:
+                self.speed_cache.put_dataframe(key, data_frame)
+
+        return data_frame
+
+    def _fetch_market_single_flight(self, key, fn, md_request, *args):
+        """Calls fn to fetch market data, unless an identical request (with
+        the same key) is already being fetched, in which case we wait for
+        that and share its result. Optionally, also holds a Redis lock (with
+        a lease) whilst fetching, so other processes wait for us and can
+        then read our result from the cache.
+
+        Parameters
+        ----------
+        key : str
+            Key from MarketDataRequest.generate_key
+        fn : function
+            Fetches the market data for md_request
+
+        Returns
+        -------
+        DataFrame
+        """
+        if not constants.market_single_flight:
+            return fn(md_request, *args)
+
+        data_frame, is_leader = Market._single_flight.do(
+            key, self._fetch_market_with_lock, key, fn, md_request, *args)
+
+        # Give callers who waited their own copy, so they cannot modify
+        # each other's DataFrames
+        if not is_leader and data_frame is not None:
+            data_frame = data_frame.copy()
+
+        return data_frame
+
+    def _fetch_market_with_lock(self, key, fn, md_request, *args):
+        lock = None
+
+        if constants.market_single_flight_redis \
+                and "cache_algo" in md_request.cache_algo \
+                and md_request.push_to_cache \
+                and self.speed_cache.engine == "redis":
+            logger = LoggerManager().getLogger(__name__)
+
+            try:
+                r = RedisConnectionManager.get_client(
+                    db_server=self.speed_cache.db_cache_server,
+                    db_port=self.speed_cache.db_cache_port,
+                    timeout=self.speed_cache.db_cache_timeout)
+
+                lock = r.lock(
+                    f"{constants.db_cache_namespace}_lock_{key}",
+                    timeout=constants.market_single_flight_lease,
+                    sleep=0.05,
+                    blocking_timeout=constants.market_single_flight_wait)
+
+                # If we time out waiting for another process, fetch anyway
+                if not lock.acquire():
+                    logger.warning(
+                        "Timed out waiting for another process to fetch "
+                        "the same request, will fetch it instead")
+
+                    lock = None
+            except Exception as e:
+                logger.warning(
+                    f"Could not use Redis lock for request: {str(e)}")
+
+                lock = None
+
+        try:
+            return fn(md_request, *args)
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except:
+                    # Lease may have already expired
+                    pass
+
+    def _fetch_market_data_frame(self, md_request):
+        """Fetches market data for a single MarketDataRequest from the
+        underlying data sources (ie. bypassing SpeedCache)
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Describing what market data to fetch
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        data_frame = None
 
         # Special cases when a predefined category has been asked
         if md_request.category is not None:
@@ -330,139 +526,15 @@ class Market(object):
             # forward points, deposit rates
             if md_request.category == "fx-vol-market":
                 if md_request.tickers is not None:
-                    df = []
-
-                    fxcf = FXCrossFactory(
-                        market_data_generator=self._market_data_generator)
-                    fxvf = FXVolFactory(
-                        market_data_generator=self._market_data_generator)
-                    rates = RatesFactory(
-                        market_data_generator=self._market_data_generator)
-
-                    # For each FX cross fetch the spot, vol and forward points
-                    for t in md_request.tickers:
-                        if len(t) == 6:
-                            # Spot
-                            df.append(
-                                fxcf.get_fx_cross(
-                                    start=md_request.start_date,
-                                    end=md_request.finish_date,
-                                    cross=t,
-                                    cut=md_request.cut,
-                                    data_source=md_request.data_source,
-                                    freq=md_request.freq,
-                                    cache_algo=md_request.cache_algo,
-                                    type='spot',
-                                    environment=md_request.environment,
-                                    fields=md_request.fields,
-                                    data_engine=md_request.data_engine,
-                                    md_request_default=md_request))
-
-                            # Entire FX vol surface
-                            df.append(
-                                fxvf.get_fx_implied_vol(
-                                    md_request.start_date,
-                                    md_request.finish_date,
-                                    t,
-                                    md_request.fx_vol_tenor,
-                                    cut=md_request.cut,
-                                    data_source=md_request.data_source,
-                                    part=md_request.fx_vol_part,
-                                    cache_algo=md_request.cache_algo,
-                                    environment=md_request.environment,
-                                    field=md_request.fields,
-                                    data_engine=md_request.data_engine,
-                                    md_request_default=md_request))
-
-                            # FX forward points for every point on curve
-                            df.append(rates.get_fx_forward_points(
-                                md_request.start_date, md_request.finish_date,
-                                t,
-                                md_request.fx_forwards_tenor,
-                                cut=md_request.cut,
-                                data_source=md_request.data_source,
-                                environment=md_request.environment,
-                                cache_algo=md_request.cache_algo,
-                                field=md_request.fields,
-                                data_engine=md_request.data_engine,
-                                md_request_default=md_request))
-
-                    # Lastly fetch the base depos
-                    df.append(rates.get_base_depos(
-                        md_request.start_date,
-                        md_request.finish_date,
-                        self._get_base_depo_currencies(
-                           md_request.tickers),
-                        md_request.base_depos_tenor,
-                        environment=md_request.environment,
-                        cut=md_request.cut,
-                        data_source=md_request.data_source,
-                        cache_algo=md_request.cache_algo,
-                        field=md_request.fields,
-                        data_engine=md_request.data_engine,
-                        md_request_default=md_request))
-
-                    if df != []:
-                        data_frame = Calculations().join(df, how='outer')
+                    data_frame = self._fetch_fx_market(md_request,
+                                                       fetch_vol=True)
 
+            # For FX forwards market return FX spot, forward points and
+            # deposit rates
             if md_request.category == "fx-forwards-market":
                 if md_request.tickers is not None:
-                    df = []
-
-                    fxcf = FXCrossFactory(
-                        market_data_generator=self._market_data_generator)
-                    rates = RatesFactory(
-                        market_data_generator=self._market_data_generator)
-
-                    # For each FX cross fetch the spot and forward points
-                    for t in md_request.tickers:
-                        if len(t) == 6:
-                            # Spot
-                            df.append(
-                                fxcf.get_fx_cross(
-                                    start=md_request.start_date,
-                                    end=md_request.finish_date,
-                                    cross=t,
-                                    cut=md_request.cut,
-                                    data_source=md_request.data_source,
-                                    freq=md_request.freq,
-                                    cache_algo=md_request.cache_algo,
-                                    type='spot',
-                                    environment=md_request.environment,
-                                    fields=md_request.fields,
-                                    data_engine=md_request.data_engine,
-                                    md_request_default=md_request))
-
-                            # FX forward points for every point on curve
-                            df.append(rates.get_fx_forward_points(
-                                md_request.start_date, md_request.finish_date,
-                                t,
-                                md_request.fx_forwards_tenor,
-                                cut=md_request.cut,
-                                data_source=md_request.data_source,
-                                environment=md_request.environment,
-                                cache_algo=md_request.cache_algo,
-                                field=md_request.fields,
-                                data_engine=md_request.data_engine,
-                                md_request_default=md_request))
-
-                    # Lastly fetch the base depos
-                    df.append(rates.get_base_depos(
-                        md_request.start_date,
-                        md_request.finish_date,
-                        self._get_base_depo_currencies(
-                           md_request.tickers),
-                        md_request.base_depos_tenor,
-                        cut=md_request.cut,
-                        data_source=md_request.data_source,
-                        cache_algo=md_request.cache_algo,
-                        environment=md_request.environment,
-                        field=md_request.fields,
-                        data_engine=md_request.data_engine,
-                        md_request_default=md_request))
-
-                    if df:
-                        data_frame = Calculations().join(df, how='outer')
+                    data_frame = self._fetch_fx_market(md_request,
+                                                       fetch_vol=False)
 
             # eg. for calculating total return indices from first principles (
             # rather than downloading them from a data vendor)
@@ -491,12 +563,248 @@ class Market(object):
         if md_request.freq == "intraday" and md_request.cut == "BSTP":
             data_frame = self._filter.remove_duplicate_indices(data_frame)
 
-        # Push into cache
-        if md_request.push_to_cache:
+        return data_frame
+
+    def _fetch_fx_market(self, md_request, fetch_vol=True):
+        """Fetches FX spot, forward points, deposit rates and optionally the
+        FX vol surface for every cross. These sub-fetches are independent, so
+        they are run concurrently as a TaskGraph (up to market_thread_no for
+        the data source), where identical sub-fetches (eg. a cross which
+        appears twice) are only run once. Each DataFrame is joined as soon
+        as it is returned.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            For "fx-vol-market" or "fx-forwards-market"
+        fetch_vol : bool
+            Should we fetch the FX vol surface
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        fxcf = FXCrossFactory(
+            market_data_generator=self._market_data_generator)
+        fxvf = FXVolFactory(
+            market_data_generator=self._market_data_generator)
+        rates = RatesFactory(
+            market_data_generator=self._market_data_generator)
+
+        thread_no = constants.market_thread_no["other"]
+
+        if md_request.data_source in constants.market_thread_no:
+            thread_no = constants.market_thread_no[md_request.data_source]
+
+        task_graph = TaskGraph(thread_no=thread_no)
+
+        crosses = []
+
+        for t in md_request.tickers:
+            if len(t) == 6 and t not in crosses:
+                crosses.append(t)
+
+        # Spot for every cross in one task, so legs shared by several
+        # crosses (eg. USDJPY for EURJPY and GBPJPY) are only downloaded
+        # once, except for tick data, where each cross is downloaded
+        # directly (rather than from its legs)
+        if md_request.data_source in ["gain", "dukascopy"] \
+                or md_request.freq == "tick":
+            spot_list = [("spot_" + t, t) for t in crosses]
+        else:
+            spot_list = [("spot", crosses)]
+
+        for key, cross in spot_list:
+            if cross:
+                task_graph.add(
+                    key, fxcf.get_fx_cross,
+                    start=md_request.start_date,
+                    end=md_request.finish_date,
+                    cross=cross,
+                    cut=md_request.cut,
+                    data_source=md_request.data_source,
+                    freq=md_request.freq,
+                    cache_algo=md_request.cache_algo,
+                    type='spot',
+                    environment=md_request.environment,
+                    fields=md_request.fields,
+                    data_engine=md_request.data_engine,
+                    md_request_default=md_request)
+
+        # For each FX cross fetch the vol and forward points
+        for t in crosses:
+            # Entire FX vol surface
+            if fetch_vol:
+                task_graph.add(
+                    "vol_" + t, fxvf.get_fx_implied_vol,
+                    md_request.start_date,
+                    md_request.finish_date,
+                    t,
+                    md_request.fx_vol_tenor,
+                    cut=md_request.cut,
+                    data_source=md_request.data_source,
+                    part=md_request.fx_vol_part,
+                    cache_algo=md_request.cache_algo,
+                    environment=md_request.environment,
+                    field=md_request.fields,
+                    data_engine=md_request.data_engine,
+                    md_request_default=md_request)
+
+            # FX forward points for every point on curve
+            task_graph.add(
+                "forwards_" + t, rates.get_fx_forward_points,
+                md_request.start_date, md_request.finish_date,
+                t,
+                md_request.fx_forwards_tenor,
+                cut=md_request.cut,
+                data_source=md_request.data_source,
+                environment=md_request.environment,
+                cache_algo=md_request.cache_algo,
+                field=md_request.fields,
+                data_engine=md_request.data_engine,
+                md_request_default=md_request)
+
+        # Base depos for every currency (only once, even if a currency is in
+        # several crosses)
+        task_graph.add(
+            "depos", rates.get_base_depos,
+            md_request.start_date,
+            md_request.finish_date,
+            self._get_base_depo_currencies(md_request.tickers),
+            md_request.base_depos_tenor,
+            environment=md_request.environment,
+            cut=md_request.cut,
+            data_source=md_request.data_source,
+            cache_algo=md_request.cache_algo,
+            field=md_request.fields,
+            data_engine=md_request.data_engine,
+            md_request_default=md_request)
+
+        columns = {}
+        data_frame = [None]
+
+        def join(key, df):
+            if df is None:
+                return
+
+            columns[key] = list(df.columns)
+            data_frame[0] = self._calculations.join([data_frame[0], df],
+                                                    how='outer')
+
+        task_graph.run(callback=join)
+
+        if data_frame[0] is None:
+            return None
+
+        # Order the columns as if we had fetched everything serially (ie.
+        # the spot, vol and forward points of each cross in turn)
+        ordered_columns = []
+
+        for t in crosses:
+            ordered_columns.extend(
+                [c for c in columns.get("spot", []) if c.startswith(t + ".")]
+                + columns.get("spot_" + t, [])
+                + columns.get("vol_" + t, [])
+                + columns.get("forwards_" + t, []))
+
+        for k in task_graph.get_keys():
+            ordered_columns.extend(
+                [c for c in columns.get(k, []) if c not in ordered_columns])
+
+        return data_frame[0][ordered_columns]
+
+    def _fetch_market_range_cache(self, md_request):
+        """Fetches market data using the range aware SpeedCache. Entries are
+        keyed without their start/finish dates, so we can slice a request out
+        of a larger cached range. Where the cached range only partly covers
+        the request, we only fetch the missing head/tail from the data
+        source, and merge it back into the cache.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            Describing what market data to fetch
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        range_key = md_request.generate_range_key()
+
+        start_date = md_request.start_date
+        finish_date = md_request.finish_date
+
+        data_frame_cache, cache_start_date, cache_finish_date = \
+            self.speed_cache.get_dataframe_range(range_key)
+
+        # If the cached range doesn't touch the requested range, ignore it,
+        # so we don't end up downloading the whole gap in between
+        if data_frame_cache is not None:
+            if not self.speed_cache.is_range_overlapping(
+                    start_date, finish_date,
+                    cache_start_date, cache_finish_date):
+                data_frame_cache = None
+
+        if data_frame_cache is None:
+            head_range, tail_range = (start_date, finish_date), None
+        else:
+            head_range, tail_range = self.speed_cache.get_missing_ranges(
+                start_date, finish_date, cache_start_date, cache_finish_date)
+
+        if head_range is None and tail_range is None:
+            logger.debug(f"Range cache hit for {range_key}")
+
+            data_frame = data_frame_cache
+        else:
+            # Order matters when merging: on overlapping boundaries the
+            # cached data overrides the head, and the tail overrides the
+            # cached data (which picks up any revisions to the last points)
+            df_list = [self._fetch_market_missing_range(md_request,
+                                                        head_range),
+                       data_frame_cache,
+                       self._fetch_market_missing_range(md_request,
+                                                        tail_range)]
+
+            data_frame = self.speed_cache.merge_dataframe_range(df_list)
+
             if data_frame is not None:
-                self.speed_cache.put_dataframe(key, data_frame)
+                if data_frame_cache is None:
+                    cache_start_date, cache_finish_date = \
+                        start_date, finish_date
+                else:
+                    cache_start_date = min(
+                        self.speed_cache.to_naive_timestamp(start_date),
+                        cache_start_date)
+                    cache_finish_date = max(
+                        self.speed_cache.to_naive_timestamp(finish_date),
+                        cache_finish_date)
 
-        return data_frame
+                self.speed_cache.put_dataframe_range(
+                    range_key, data_frame, cache_start_date, cache_finish_date)
+
+        if data_frame is None:
+            return None
+
+        return self._filter.filter_time_series_by_date(
+            start_date, finish_date, data_frame)
+
+    def _fetch_market_missing_range(self, md_request, date_range):
+        """Fetches the part of a MarketDataRequest which is missing from the
+        range aware cache (if any)
+        """
+        if date_range is None:
+            return None
+
+        LoggerManager().getLogger(__name__).debug(
+            f"Range cache fetching {date_range[0]} to {date_range[1]}")
+
+        md_request_missing = MarketDataRequest(md_request=md_request)
+        md_request_missing.start_date = date_range[0]
+        md_request_missing.finish_date = date_range[1]
+
+        return self._fetch_market_data_frame(md_request_missing)
 
     def create_md_request_from_dataframe(self, md_request_df, md_request=None,
                                          start_date=None, finish_date=None,
@@ -1056,227 +1364,285 @@ class FXCrossFactory(object):
         if isinstance(cross, str):
             cross = [cross]
 
-        md_request_list = []
-        freq_list = []
-        type_list = []
+        md_request = MarketDataRequest(
+            freq_mult=1,
+            cut=cut,
+            fields=fields,
+            freq=freq,
+            cache_algo=cache_algo,
+            start_date=start,
+            finish_date=end,
+            data_source=data_source,
+            environment=environment,
+            data_engine=data_engine)
 
-        for cr in cross:
-            md_request_ind = MarketDataRequest(
-                freq_mult=1,
-                cut=cut,
-                fields=fields,
-                freq=freq,
-                cache_algo=cache_algo,
-                start_date=start,
-                finish_date=end,
-                data_source=data_source,
-                environment=environment,
-                data_engine=data_engine)
+        md_request = Market.populate_default_md_request_prop(
+            md_request_ind=md_request,
+            md_request_default=md_request_default
+        )
 
-            md_request_ind = Market.populate_default_md_request_prop(
-                md_request_ind=md_request_ind,
-                md_request_default=md_request_default
-            )
+        md_request.type = type
 
-            md_request_ind.type = type
-            md_request_ind.cross = cr
+        if freq == 'intraday':
+            md_request.gran_freq = "minute"  # intraday
 
-            if freq == 'intraday':
-                md_request_ind.gran_freq = "minute"  # intraday
+        elif freq == 'daily':
+            md_request.gran_freq = "daily"  # daily
 
-            elif freq == 'daily':
-                md_request_ind.gran_freq = "daily"  # daily
+        # Download every leg (eg. USDJPY) once, in a single request, even if
+        # it is shared by many crosses (eg. EURJPY, GBPJPY, AUDJPY...), and
+        # then construct all the crosses from them
+        if type == 'spot':
+            data_frame_agg = self._get_fx_crosses_spot(md_request, cross)
+        elif type[0:3] == 'tot':
+            data_frame_agg = self._get_fx_crosses_tot(md_request, cross)
+        else:
+            data_frame_agg = None
 
-            md_request_list.append(md_request_ind)
+        if data_frame_agg is None:
+            return None
 
-        data_frame_agg = []
+        # Strip the nan elements
+        data_frame_agg = data_frame_agg.dropna(how='all')
 
-        # Depends on the nature of operation as to whether we should use
-        # threading or multiprocessing library
-        if constants.market_thread_technique == "thread":
-            from multiprocessing.dummy import Pool
-        else:
-            # Most of the time is spend waiting for Bloomberg to return, so can
-            # use threads rather than multiprocessing must use the multiprocess
-            # library otherwise can't pickle objects correctly
-            # note: currently not very stable
-            from multiprocess import Pool
+        # self.speed_cache.put_dataframe(key, data_frame_agg)
 
-        # For time being do not use multithreading
-        # thread_no = constants.market_thread_no['other']
-        #
-        # if market_data_request_list[
-        #     0].data_source in constants.market_thread_no:
-        #     thread_no = constants.market_thread_no[
-        #         market_data_request_list[0].data_source]
+        return data_frame_agg
 
-        thread_no = 0
+    def get_fx_cross_legs(self, cross, type="spot"):
+        """Gets the minimal set of tickers (legs) which need to be
+        downloaded to construct a list of FX crosses, where legs shared by
+        several crosses are only included once. For spot, these are the USD
+        crosses in market convention (eg. EURJPY and GBPJPY both need
+        USDJPY) and for total returns the xxxUSD indices.
 
-        if thread_no > 0:
-            pool = Pool(thread_no)
+        Parameters
+        ----------
+        cross : str or list of str
+            FX crosses eg. ["EURJPY", "GBPJPY"]
+        type : str
+            "spot" or total returns eg. "tot"
 
-            # Open the market data downloads in their own threads and return
-            # the results
-            df_list = pool.map_async(self._get_individual_fx_cross,
-                                     md_request_list).get()
+        Returns
+        -------
+        list of str
+        """
+        if isinstance(cross, str):
+            cross = [cross]
 
-            data_frame_agg = self._calculations.join(df_list, how='outer')
+        legs = []
 
-            # data_frame_agg = self._calculations.pandas_outer_join(result.get())
+        for cr in cross:
+            for leg in self._get_cross_legs(cr, type):
+                if leg not in legs:
+                    legs.append(leg)
 
-            try:
-                pool.close()
-                pool.join()
-            except:
-                pass
-        else:
-            for md_request in md_request_list:
-                data_frame_agg.append(
-                    self._get_individual_fx_cross(md_request))
+        return legs
 
-            data_frame_agg = self._calculations.join(data_frame_agg,
-                                                     how='outer')
+    def _get_cross_legs(self, cr, type):
+        base = cr[0:3]
+        terms = cr[3:6]
 
-        # Strip the nan elements
-        data_frame_agg = data_frame_agg.dropna(how='all')
+        if type == 'spot':
+            if base != 'USD' and terms != 'USD':
+                return [self._fxconv.correct_notation('USD' + base),
+                        self._fxconv.correct_notation('USD' + terms)]
 
-        # self.speed_cache.put_dataframe(key, data_frame_agg)
+            return [self._fxconv.correct_notation(cr)]
 
-        return data_frame_agg
+        # Total return indices are in xxxUSD form, USD legs have zero returns
+        # so only need USDUSD for the USDUSD cross itself
+        if base + terms == 'USDUSD':
+            return ['USDUSD']
 
-    def _get_individual_fx_cross(self, md_request):
-        cr = md_request.cross
-        type = md_request.type
-        freq = md_request.freq
+        return [c + 'USD' for c in [base, terms] if c != 'USD']
 
-        base = cr[0:3]
-        terms = cr[3:6]
+    def _get_fx_crosses_spot(self, md_request, cross):
+        logger = LoggerManager().getLogger(__name__)
 
-        if (type == 'spot'):
-            # Non-USD crosses
-            if base != 'USD' and terms != 'USD':
-                base_USD = self._fxconv.correct_notation('USD' + base)
-                terms_USD = self._fxconv.correct_notation('USD' + terms)
+        field = md_request.fields[0]
 
-                # TODO check if the cross exists in the database
+        md_request.tickers = self.get_fx_cross_legs(cross, 'spot')
+        md_request.category = 'fx'
 
-                # Download base USD cross
-                md_request.tickers = base_USD
-                md_request.category = 'fx'
+        leg_vals = self._market_data_generator.fetch_market_data(md_request)
 
-                base_vals = self._market_data_generator.fetch_market_data(
-                    md_request)
+        if leg_vals is None:
+            return None
 
-                # Download terms USD cross
-                md_request.tickers = terms_USD
-                md_request.category = 'fx'
+        leg_cols = {}
 
-                terms_vals = self._market_data_generator.fetch_market_data(
-                    md_request)
+        def get_leg(leg):
+            # Legs are converted into USD terms (eg. USDJPY to JPYUSD) once
+            col = leg + '.' + field
 
-                # If quoted USD/base flip to get USD terms
-                if base_USD[0:3] == 'USD':
-                    base_vals = 1 / base_vals
+            if col not in leg_vals.columns:
+                return None
 
-                # If quoted USD/terms flip to get USD terms
-                if terms_USD[0:3] == 'USD':
-                    terms_vals = 1 / terms_vals
+            if col not in leg_cols:
+                leg_cols[col] = leg_vals[col].to_numpy(dtype=float)
 
-                base_vals.columns = ['temp'];
-                terms_vals.columns = ['temp']
+            return leg_cols[col]
 
-                cross_vals = base_vals.div(terms_vals, axis='index')
-                cross_vals.columns = [cr + '.' + md_request.fields[0]]
+        numerator_list = []
+        denominator_list = []
+        columns = []
+        df_usd_list = []
 
-                base_vals.columns = [
-                    base_USD + '.' + md_request.fields[0]]
-                terms_vals.columns = [
-                    terms_USD + '.' + md_request.fields[0]]
-            else:
-                # if base == 'USD': non_USD = terms
-                # if terms == 'USD': non_USD = base
+        ones = np.ones(len(leg_vals.index))
 
-                correct_cr = self._fxconv.correct_notation(cr)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for cr in cross:
+                base = cr[0:3]
+                terms = cr[3:6]
 
-                md_request.tickers = correct_cr
-                md_request.category = 'fx'
+                cr_legs = self._get_cross_legs(cr, 'spot')
+                vals = [get_leg(leg) for leg in cr_legs]
 
-                cross_vals = self._market_data_generator.fetch_market_data(
-                    md_request)
+                if any(v is None for v in vals):
+                    logger.warning(f"Couldn't construct {cr}, as "
+                                   f"{', '.join(cr_legs)} weren't all "
+                                   f"returned")
+                    continue
 
                 # Special case for USDUSD!
                 if base + terms == 'USDUSD':
-                    if freq == 'daily':
+                    cross_vals = leg_vals[[cr_legs[0] + '.' + field]].dropna()
+
+                    if md_request.freq == 'daily':
                         cross_vals = pd.DataFrame(1, index=cross_vals.index,
                                                   columns=cross_vals.columns)
                         filter = Filter()
                         cross_vals = filter.filter_time_series_by_holidays(
                             cross_vals, cal='WEEKDAY')
+
+                    cross_vals.columns = [cr + '.' + field]
+                    df_usd_list.append(cross_vals)
+
+                    continue
+
+                if len(cr_legs) == 2:
+                    # Non-USD crosses: if quoted USD/base or USD/terms, flip
+                    # to get USD terms, then divide
+                    base_vals, terms_vals = vals
+
+                    if cr_legs[0][0:3] == 'USD':
+                        base_vals = 1 / base_vals
+
+                    if cr_legs[1][0:3] == 'USD':
+                        terms_vals = 1 / terms_vals
                 else:
                     # Flip if not convention (eg. JPYUSD)
-                    if (correct_cr != cr):
-                        cross_vals = 1 / cross_vals
+                    base_vals = vals[0]
+                    terms_vals = ones
 
-                cross_vals.columns = [cr + '.' + md_request.fields[0]]
+                    if cr_legs[0] != cr:
+                        base_vals = 1 / base_vals
 
-        elif type[0:3] == "tot":
-            if freq == 'daily':
-                # Download base USD cross
-                md_request.tickers = base + 'USD'
-                md_request.category = 'fx-' + type
+                numerator_list.append(base_vals)
+                denominator_list.append(terms_vals)
+                columns.append(cr + '.' + field)
 
-                if type[0:3] == "tot":
-                    base_vals = self._market_data_generator.fetch_market_data(
-                        md_request)
+            data_frame = None
 
-                # Download terms USD cross
-                md_request.tickers = terms + 'USD'
-                md_request.category = 'fx-' + type
+            # Divide all the crosses in one go
+            if columns:
+                data_frame = pd.DataFrame(
+                    np.column_stack(numerator_list)
+                    / np.column_stack(denominator_list),
+                    index=leg_vals.index, columns=columns)
 
-                if type[0:3] == "tot":
-                    terms_vals = self._market_data_generator.fetch_market_data(
-                        md_request)
+        if df_usd_list:
+            if data_frame is not None:
+                df_usd_list = [data_frame] + df_usd_list
 
-                # base_rets = self._calculations.calculate_returns(base_vals)
-                # terms_rets = self._calculations.calculate_returns(terms_vals)
+            data_frame = self._calculations.join(df_usd_list, how='outer')
 
-                # Special case for USDUSD case (and if base or terms USD are
-                # USDUSD
-                if base + terms == 'USDUSD':
-                    base_rets = self._calculations.calculate_returns(base_vals)
-                    cross_rets = pd.DataFrame(0, index=base_rets.index,
-                                              columns=base_rets.columns)
-                elif base + 'USD' == 'USDUSD':
-                    cross_rets = -self._calculations.calculate_returns(
-                        terms_vals)
-                elif terms + 'USD' == 'USDUSD':
-                    cross_rets = self._calculations.calculate_returns(
-                        base_vals)
-                else:
-                    base_rets = self._calculations.calculate_returns(base_vals)
-                    terms_rets = self._calculations.calculate_returns(
-                        terms_vals)
+            # Keep the crosses in the order they were asked for
+            data_frame = data_frame[[c + '.' + field for c in cross
+                                     if c + '.' + field
+                                     in data_frame.columns]]
 
-                    cross_rets = base_rets.sub(terms_rets.iloc[:, 0], axis=0)
+        return data_frame
 
-                # First returns of a time series will by NaN, given we don't
-                # know previous point
-                cross_rets.iloc[0] = 0
+    def _get_fx_crosses_tot(self, md_request, cross):
+        logger = LoggerManager().getLogger(__name__)
 
-                cross_vals = self._calculations.create_mult_index(cross_rets)
-                cross_vals.columns = [
-                    cr + '-' + type + '.' + md_request.fields[0]]
+        if md_request.freq == 'intraday':
+            logger.info(
+                'Total calculated returns for intraday not implemented yet')
+            return None
 
-            elif freq == 'intraday':
-                LoggerManager().getLogger(__name__).info(
-                    'Total calculated returns for intraday not implemented yet')
+        field = md_request.fields[0]
+        type = md_request.type
+
+        md_request.tickers = self.get_fx_cross_legs(cross, type)
+        md_request.category = 'fx-' + type
+
+        leg_vals = self._market_data_generator.fetch_market_data(md_request)
+
+        if leg_vals is None:
+            return None
+
+        leg_rets = {}
+
+        def get_leg_rets(leg):
+            # Returns for each leg are only calculated once
+            col = leg + '.' + field
+
+            if col not in leg_vals.columns:
                 return None
 
-        return cross_vals
+            if col not in leg_rets:
+                leg_rets[col] = self._calculations.calculate_returns(
+                    leg_vals[[col]].dropna())
+
+            return leg_rets[col]
+
+        df_list = []
+
+        for cr in cross:
+            base = cr[0:3]
+            terms = cr[3:6]
+
+            cr_legs = self._get_cross_legs(cr, type)
+            rets = [get_leg_rets(leg) for leg in cr_legs]
+
+            if any(r is None for r in rets):
+                logger.warning(f"Couldn't construct {cr}-{type}, as "
+                               f"{', '.join(cr_legs)} weren't all returned")
+                continue
+
+            # Special case for USDUSD case (and if base or terms USD are
+            # USDUSD
+            if base + terms == 'USDUSD':
+                cross_rets = pd.DataFrame(0, index=rets[0].index,
+                                          columns=rets[0].columns)
+            elif base == 'USD':
+                cross_rets = -rets[0]
+            elif terms == 'USD':
+                cross_rets = rets[0].copy()
+            else:
+                cross_rets = rets[0].sub(rets[1].iloc[:, 0], axis=0)
+
+            # First returns of a time series will by NaN, given we don't
+            # know previous point
+            cross_rets.iloc[0] = 0
+
+            cross_vals = self._calculations.create_mult_index(cross_rets)
+            cross_vals.columns = [cr + '-' + type + '.' + field]
+
+            df_list.append(cross_vals)
+
+        if not df_list:
+            return None
+
+        return self._calculations.join(df_list, how='outer')
 
 
 ###############################################################################
 
+import numpy as np
 import pandas as pd
 
 from findatapy.market.marketdatarequest import MarketDataRequest
@@ -26,7 +26,7 @@ from findatapy.market.ioengine import IOEngine
 from findatapy.market.marketdatarequest import MarketDataRequest
 from findatapy.timeseries import Filter, Calculations
 from findatapy.util import DataConstants, LoggerManager, ConfigManager, \
-    SwimPool
+    SwimPool, RequestGovernor, SharedFrame
 
 constants = DataConstants()
 
@@ -232,8 +232,13 @@ class MarketDataGenerator(object):
                     md_request.pretransformation = \
                         df_tickers["pretransformation"].tolist()
 
+        # Only download data after what is already in the data_engine, and
+        # update it
+        if "incremental_load" in md_request.cache_algo:
+            df_agg = self.download_incremental(md_request)
+
         # intraday or tick: only one ticker per cache file
-        if md_request.freq in ["intraday", "tick", "second", "hour",
+        elif md_request.freq in ["intraday", "tick", "second", "hour",
                                 "minute"]:
             df_agg = self.download_intraday_tick(md_request)
 
@@ -326,6 +331,16 @@ class MarketDataGenerator(object):
             MarketDataRequest().create_category_key(
                 md_request=md_request, ticker=ticker))
 
+    def _is_arcticdb_ticker_batch(self, md_request):
+        # Same conditions as DataVendorFlatFile being used in get_data_vendor
+        return constants.arcticdb_batch_read_tickers \
+               and md_request.freq in ["intraday", "tick"] \
+               and len(md_request.tickers) > 1 \
+               and md_request.data_engine is not None \
+               and str(md_request.data_engine).startswith("arcticdb:") \
+               and md_request.category is not None \
+               and "internet_load" not in md_request.cache_algo
+
     def download_intraday_tick(self, md_request):
         """Loads intraday time series from specified data provider
 
@@ -347,6 +362,11 @@ class MarketDataGenerator(object):
 
         df_group = []
 
+        # Tickers stored as separate ArcticDB symbols are read together in
+        # one batch by DataVendorFlatFile, rather than one request per ticker
+        if self._is_arcticdb_ticker_batch(md_request):
+            return self.fetch_single_time_series(md_request)
+
         # Single threaded version
         # handle intraday ticker calls separately one by one
         if len(md_request.tickers) == 1 or constants.market_thread_no[
@@ -459,8 +479,20 @@ class MarketDataGenerator(object):
         df_single = None
 
         if len(md_request.tickers) > 0:
-            df_single = self.get_data_vendor(
-                md_request).load_ticker(md_request)
+            data_vendor = self.get_data_vendor(md_request)
+
+            governor = None
+
+            if not getattr(data_vendor, "governs_own_requests", False):
+                governor = RequestGovernor.get_governor(
+                    md_request.data_source)
+
+            if governor is None:
+                df_single = data_vendor.load_ticker(md_request)
+            else:
+                # Limits the requests to the data source across all threads
+                with governor.request():
+                    df_single = data_vendor.load_ticker(md_request)
 
         if df_single is not None:
             if df_single.empty == False:
@@ -496,9 +528,17 @@ class MarketDataGenerator(object):
 
             # Open the market data downloads in their own threads and return 
             # the results
-            result = pool.map_async(self.fetch_single_time_series,
-                                    market_data_request_list)
-            df_group = result.get()
+            if constants.market_thread_technique == "multiprocessing" \
+                    and constants.market_shared_frame_transport:
+                # Large DataFrames are returned from the worker processes via
+                # shared memory, rather than being pickled
+                df_group = SharedFrame.map(pool,
+                                           self.fetch_single_time_series,
+                                           market_data_request_list)
+            else:
+                result = pool.map_async(self.fetch_single_time_series,
+                                        market_data_request_list)
+                df_group = result.get()
 
             pool.close()
             pool.join()
@@ -610,6 +650,154 @@ class MarketDataGenerator(object):
 
         return df_agg
 
+    def download_incremental(self, md_request):
+        """Refreshes the time series stored in the data_engine, by reading
+        the last stored date and downloading only the data after that (with
+        an overlap for revisions) from the data provider, which is appended
+        to/updates the store. Then returns the requested dates from the
+        store.
+
+        Parameters
+        ----------
+        md_request : MarketDataRequest
+            contains various properties describing time series to fetched,
+            including ticker, start & finish date etc.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        logger = LoggerManager().getLogger(__name__)
+
+        md_request_internet = MarketDataRequest(md_request=md_request)
+        md_request_internet.cache_algo = \
+            md_request.cache_algo.replace("incremental_load", "internet_load")
+
+        if md_request.data_engine is None:
+            logger.warning("No data_engine specified for incremental "
+                           "loading, so downloading all data")
+
+            return self._download(md_request_internet)
+
+        # Intraday/tick data stores each ticker separately
+        if md_request.freq in ["intraday", "tick"] \
+                and len(md_request.tickers) > 1:
+            md_request_list = []
+
+            for i, ticker in enumerate(md_request.tickers):
+                md_request_single = MarketDataRequest(md_request=md_request)
+                md_request_single.tickers = [ticker]
+
+                if md_request.vendor_tickers is not None:
+                    md_request_single.vendor_tickers = [
+                        md_request.vendor_tickers[i]]
+
+                md_request_list.append(md_request_single)
+
+            return self._calculations.join(
+                [self.download_incremental(md) for md in md_request_list],
+                how="outer")
+
+        from findatapy.market.datavendorweb import DataVendorFlatFile
+
+        full_path = DataVendorFlatFile().get_data_engine_path(md_request)
+
+        engine = md_request.data_engine
+
+        if "*" in engine:
+            engine = {"h5": "hdf5_table"}.get(
+                engine.split("*.")[-1], engine.split("*.")[-1])
+
+        columns = [f"{t}.{f}" for t in md_request.tickers
+                   for f in md_request.fields]
+
+        last_date_dict = \
+            self._io_engine.read_last_time_series_dates_from_disk(
+                full_path, columns, engine=engine,
+                arcticdb_dict=md_request.arcticdb_dict)
+
+        # Tickers which aren't stored yet (or are missing any fields) need
+        # their whole history, the others only the dates after the earliest
+        # of their last stored dates (eg. if some lag behind the others)
+        tickers_uncovered = [
+            t for t in md_request.tickers
+            if any(last_date_dict[f"{t}.{f}"] is None
+                   for f in md_request.fields)]
+
+        tickers_covered = [t for t in md_request.tickers
+                           if t not in tickers_uncovered]
+
+        df_new_list = []
+
+        if tickers_uncovered:
+            logger.info(f"Full load of {str(tickers_uncovered)} into "
+                        f"{full_path}")
+
+            df_new_list.append(self._download(self._select_tickers(
+                md_request_internet, tickers_uncovered)))
+
+        if tickers_covered:
+            last_date = min([last_date_dict[f"{t}.{f}"]
+                             for t in tickers_covered
+                             for f in md_request.fields])
+
+            overlap = constants.incremental_load_overlap.get(
+                md_request.freq, constants.incremental_load_overlap["default"])
+
+            start_date = pd.Timestamp(last_date) - pd.Timedelta(overlap)
+
+            if start_date.tzinfo is not None:
+                start_date = start_date.tz_convert("UTC").tz_localize(None)
+
+            md_request_covered = self._select_tickers(md_request_internet,
+                                                      tickers_covered)
+            md_request_covered.start_date = start_date
+
+            logger.info(f"Incremental load of {full_path} from "
+                        f"{str(start_date)}, last stored {str(last_date)}")
+
+            if md_request_covered.start_date \
+                    <= md_request_covered.finish_date:
+                df_new_list.append(self._download(md_request_covered))
+
+        df_new_list = [df for df in df_new_list if df is not None]
+
+        if df_new_list:
+            self._io_engine.update_time_series_cache_on_disk(
+                full_path, self._calculations.join(df_new_list, how="outer"),
+                engine=engine, arcticdb_dict=md_request.arcticdb_dict)
+
+        # Read back the requested dates from the store
+        md_request_store = MarketDataRequest(md_request=md_request)
+        md_request_store.cache_algo = "cache_algo_return"
+
+        return self._download(md_request_store)
+
+    def _select_tickers(self, md_request, tickers):
+        # Copy of a MarketDataRequest for only some of its tickers
+        md_request_select = MarketDataRequest(md_request=md_request)
+        md_request_select.tickers = tickers
+
+        if md_request.vendor_tickers is not None:
+            md_request_select.vendor_tickers = [
+                v for t, v in zip(md_request.tickers,
+                                  md_request.vendor_tickers) if t in tickers]
+
+        if isinstance(md_request.pretransformation, list):
+            md_request_select.pretransformation = [
+                p for t, p in zip(md_request.tickers,
+                                  md_request.pretransformation)
+                if t in tickers]
+
+        return md_request_select
+
+    def _download(self, md_request):
+        if md_request.freq in ["intraday", "tick", "second", "hour",
+                               "minute"]:
+            return self.download_intraday_tick(md_request)
+
+        return self.download_daily(md_request)
+
     def refine_expiry_date(self, market_data_request):
 
         # Expiry date
@@ -22,6 +22,14 @@ from typing import List
 from findatapy.util.dataconstants import DataConstants
 from findatapy.util.loggermanager import LoggerManager
 
+# Attributes which don't change the data returned, so are left out of the
+# cache keys
+_key_exclude_list = ["logger",
+                     "_MarketDataRequest__abstract_curve",
+                     "_MarketDataRequest__cache_algo",
+                     "_MarketDataRequest__overrides",
+                     "_MarketDataRequest__data_vendor_custom"]
+
 class MarketDataRequest:
     """Provides parameters for requesting market data.
 
@@ -46,7 +54,8 @@ class MarketDataRequest:
     # vendor_tickers (optional)
     # vendor_fields (optional)
     # cache_algo (eg. internet, disk, memory) - internet will forcibly download 
-    # from the internet
+    # from the internet, incremental will only download data after the last
+    # date in the data_engine and update it
     # abstract_curve (optional)
     # environment (eg. prod, backtest) - old data is saved with prod, backtest 
     # will overwrite the last data point
@@ -73,13 +82,60 @@ class MarketDataRequest:
         self.__category_key = self.create_category_key(
             md_request=self, ticker=ticker)
 
+        return SpeedCache().generate_key(self, list(_key_exclude_list)) \
+            + "_df"
+
+    def generate_batch_key(self) -> str:
+        """Generate a key to describe this MarketDataRequest object, which
+        ignores the tickers. Requests with the same batch key (ie. the same
+        data_source, freq, cut, fields, dates etc.) can be fetched together
+        in one call to the data source.
+
+        Returns
+        -------
+        str
+            Key to describe this MarketDataRequest (without tickers)
+
+        """
+        from findatapy.market.ioengine import SpeedCache
+
         return SpeedCache().generate_key(
                 self,
              ["logger",
-              "_MarketDataRequest__abstract_curve",
-              "_MarketDataRequest__cache_algo",
-              "_MarketDataRequest__overrides",
-              "_MarketDataRequest__data_vendor_custom"]) + "_df"
+              "_MarketDataRequest__category_key",
+              "_MarketDataRequest__list_threads",
+              "_MarketDataRequest__tickers",
+              "_MarketDataRequest__old_tickers",
+              "_MarketDataRequest__vendor_tickers"]) \
+            + f"_vendor_tickers-{self.vendor_tickers is not None}_batch"
+
+    def generate_range_key(self) -> str:
+        """Generate a key to describe this MarketDataRequest object, which
+        ignores the start and finish dates. Hence, it identifies the
+        environment, category, data_source, freq, cut, tickers and fields,
+        and can be used by a range aware cache.
+
+        Returns
+        -------
+        str
+            Key to describe this MarketDataRequest (without dates)
+
+        """
+        from findatapy.market.ioengine import SpeedCache
+
+        if self.freq == "daily":
+            ticker = None
+        else:
+            ticker = self.tickers[0]
+
+        self.__category_key = self.create_category_key(
+            md_request=self, ticker=ticker)
+
+        return SpeedCache().generate_key(
+                self,
+                _key_exclude_list + ["_MarketDataRequest__start_date",
+                                     "_MarketDataRequest__finish_date"]) \
+            + "_range_df"
 
     def __init__(self, data_source: str = None,
                  start_date="year", finish_date=datetime.datetime.utcnow(),
@@ -680,7 +736,8 @@ class MarketDataRequest:
         cache_algo = cache_algo.lower()
 
         valid_cache_algo = ["internet_load", "internet_load_return", 
-                            "cache_algo", "cache_algo_return"]
+                            "cache_algo", "cache_algo_return",
+                            "incremental_load", "incremental_load_return"]
 
         if not cache_algo in valid_cache_algo:
             LoggerManager().getLogger(__name__).warning(cache_algo + 
@@ -1229,8 +1229,25 @@ class Calculations(object):
 
         return df_list[0]
 
-    def iterative_outer_join(self, df_list, pool=None):
+    def iterative_outer_join(self, df_list, pool=None, shared_frame=False):
+        """Outer joins a list of DataFrames in pairs, in parallel, until only
+        one DataFrame is left
 
+        Parameters
+        ----------
+        df_list : DataFrame (list)
+            DataFrames to be joined
+        pool : Pool (optional)
+            Thread or process pool (eg. from SwimPool) to do the joins
+        shared_frame : bool (default: False)
+            For process pools, pass the DataFrames to and from the worker
+            processes in shared memory (see SharedFrame), rather than pickling
+            them
+
+        Returns
+        -------
+        DataFrame
+        """
         if not (isinstance(df_list, list)):
             return df_list
 
@@ -1241,6 +1258,9 @@ class Calculations(object):
         if (len(df_list) < 3):
             return self.join(df_list, how='outer')
 
+        if shared_frame:
+            return self._iterative_outer_join_shared(df_list, pool)
+
         while (True):
             # split into two
             length = len(df_list)
@@ -1256,6 +1276,44 @@ class Calculations(object):
 
         return df_list[0]
 
+    def _iterative_outer_join_shared(self, df_list, pool):
+        from findatapy.util.sharedframe import SharedFrame
+
+        shared_list = [SharedFrame.put(df) for df in df_list
+                       if df is not None]
+
+        try:
+            while len(shared_list) > 1:
+                # Any odd DataFrame is carried over to the next round as it is
+                carry = shared_list[len(shared_list) // 2 * 2:]
+                pairs = [shared_list[i:i + 2]
+                         for i in range(0, len(shared_list) - len(carry), 2)]
+
+                joined = SharedFrame.map(pool, self.join_shared_aux, pairs,
+                                         read=False)
+
+                # Each round's inputs are deleted once they've been joined
+                SharedFrame.release(shared_list[:len(shared_list)
+                                                - len(carry)])
+
+                shared_list = joined + carry
+
+            if len(shared_list) == 0:
+                return None
+
+            return SharedFrame.get(shared_list[0])
+        finally:
+            SharedFrame.release(shared_list)
+
+            pool.close()
+            pool.join()
+
+    def join_shared_aux(self, shared_list):
+        from findatapy.util.sharedframe import SharedFrame
+
+        return self.join([SharedFrame.get(s, release=False)
+                          for s in shared_list], how="outer")
+
     def join_aux_helper(self, args):
         return self.join_aux(*args)
 
@@ -4,6 +4,7 @@ import importlib
 
 _LAZY_IMPORTS = {
     "CacheManager":   ("findatapy.util.cachemanager",  "CacheManager"),
+    "MemoryCache":    ("findatapy.util.cachemanager",  "MemoryCache"),
     "CommonMan":      ("findatapy.util.commonman",      "CommonMan"),
     "ConfigManager":  ("findatapy.util.configmanager",  "ConfigManager"),
     "DataConstants":  ("findatapy.util.dataconstants",  "DataConstants"),
@@ -13,6 +14,12 @@ _LAZY_IMPORTS = {
     "TickerFactory":  ("findatapy.util.tickerfactory",  "TickerFactory"),
     "Twitter":        ("findatapy.util.twitter",        "Twitter"),
     "SwimPool":       ("findatapy.util.swimpool",       "SwimPool"),
+    "SingleFlight":   ("findatapy.util.singleflight",   "SingleFlight"),
+    "AsyncHTTPEngine": ("findatapy.util.asynchttp",     "AsyncHTTPEngine"),
+    "TokenBucket":    ("findatapy.util.asynchttp",      "TokenBucket"),
+    "RequestGovernor": ("findatapy.util.governor",      "RequestGovernor"),
+    "TaskGraph":      ("findatapy.util.taskgraph",      "TaskGraph"),
+    "SharedFrame":    ("findatapy.util.sharedframe",    "SharedFrame"),
 }
 
 
@@ -0,0 +1,263 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import threading
+import time
+import concurrent.futures
+
+from findatapy.util.loggermanager import LoggerManager
+
+try:
+    import aiohttp
+except:
+    aiohttp = None
+
+
+class TokenBucket(object):
+    """Paces requests with a token bucket, so we make at most rate requests
+    per second on average, with bursts of up to capacity requests, rather
+    than sleeping for longer and longer before each request
+    """
+
+    def __init__(self, rate, capacity=None):
+        self._rate = float(rate)
+
+        if capacity is None:
+            capacity = max(1.0, self._rate)
+
+        self._capacity = float(capacity)
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    def get_rate(self):
+        return self._rate
+
+    def _refill(self):
+        now = time.monotonic()
+
+        self._tokens = min(self._capacity,
+                           self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def try_acquire(self):
+        """Takes a token if there's one available
+
+        Returns
+        -------
+        float
+            0 if we got a token, otherwise seconds to wait before trying again
+        """
+        if self._rate <= 0:
+            return 0
+
+        with self._lock:
+            self._refill()
+
+            if self._tokens >= 1:
+                self._tokens = self._tokens - 1
+
+                return 0
+
+            return (1 - self._tokens) / self._rate
+
+    async def acquire_async(self):
+        while True:
+            wait = self.try_acquire()
+
+            if wait == 0:
+                return
+
+            await asyncio.sleep(wait)
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+
+            if wait == 0:
+                return
+
+            time.sleep(wait)
+
+
+class AsyncHTTPEngine(object):
+    """Downloads many URLs with asyncio, using a single pooled HTTP client
+    (keep-alive) with a cap on concurrent requests, token bucket pacing and
+    per request timeouts. Parsing of the downloaded content is done in a
+    worker pool, so the event loop is never blocked by decompression or
+    parsing.
+
+    If a RequestGovernor is given, every request also goes through it (and
+    429/503 responses are reported to it), so the limits for the data
+    source are shared with other downloads.
+
+    Needs aiohttp to be installed.
+    """
+
+    def __init__(self, max_concurrency=8, requests_per_second=None,
+                 timeout_seconds=10, retries=5, retry_sleep_seconds=0.5,
+                 parse_thread_no=4, headers=None, governor=None):
+        self._max_concurrency = max_concurrency
+        self._token_bucket = None
+
+        if requests_per_second is not None:
+            self._token_bucket = TokenBucket(requests_per_second,
+                                             capacity=max_concurrency)
+
+        self._governor = governor
+        self._timeout_seconds = timeout_seconds
+        self._retries = retries
+        self._retry_sleep_seconds = retry_sleep_seconds
+        self._parse_thread_no = parse_thread_no
+        self._headers = headers
+
+    @staticmethod
+    def is_available():
+        return aiohttp is not None
+
+    def fetch_all(self, url_list, parse_func=None, is_valid_func=None,
+                  not_found_content=None):
+        """Downloads a list of URLs, returning the (parsed) content in the
+        same order as the URLs
+
+        Parameters
+        ----------
+        url_list : list of str
+            URLs to download
+        parse_func : function
+            Called in the worker pool with (index, content) for each
+            downloaded URL (content is None if it failed), eg. to decompress
+            and parse into a DataFrame
+        is_valid_func : function
+            Called with the content, returns False if we should retry (eg.
+            if we got back an error page)
+        not_found_content : bytes
+            Content for URLs which don't exist (404), eg. b"" if that means
+            there's no data (by default None, ie. it failed)
+
+        Returns
+        -------
+        list
+        """
+        return self.run(self.fetch_all_async(
+            url_list, parse_func=parse_func, is_valid_func=is_valid_func,
+            not_found_content=not_found_content))
+
+    async def fetch_all_async(self, url_list, parse_func=None,
+                              is_valid_func=None, not_found_content=None):
+        if aiohttp is None:
+            raise Exception("aiohttp needs to be installed for the "
+                            "asyncio HTTP engine")
+
+        loop = asyncio.get_running_loop()
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self._max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self._timeout_seconds)
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._parse_thread_no) as executor:
+            async with aiohttp.ClientSession(connector=connector,
+                                             timeout=timeout,
+                                             headers=self._headers) \
+                    as session:
+
+                async def fetch_and_parse(i, url):
+                    async with semaphore:
+                        content = await self._fetch(session, url,
+                                                    is_valid_func,
+                                                    not_found_content)
+
+                    if parse_func is None:
+                        return content
+
+                    return await loop.run_in_executor(
+                        executor, parse_func, i, content)
+
+                return await asyncio.gather(
+                    *[fetch_and_parse(i, url)
+                      for i, url in enumerate(url_list)])
+
+    async def _fetch(self, session, url, is_valid_func,
+                     not_found_content=None):
+        logger = LoggerManager.getLogger(__name__)
+
+        for i in range(0, self._retries):
+            if self._token_bucket is not None:
+                await self._token_bucket.acquire_async()
+
+            if self._governor is not None:
+                await self._governor.acquire_async()
+
+            throttled = False
+
+            try:
+                async with session.get(url) as response:
+                    throttled = response.status in [429, 503]
+
+                    # No point retrying if the file doesn't exist
+                    if response.status == 404:
+                        logger.warning(
+                            f"Error downloading.. {url} returned 404 URL "
+                            f"not found message!")
+
+                        return not_found_content
+
+                    if response.status == 200:
+                        content = await response.read()
+
+                        if is_valid_func is None or is_valid_func(content):
+                            return content
+
+                        logger.warning(f"Error downloading.. {url} invalid "
+                                       f"content, will try again {i} "
+                                       f"occasion")
+                    else:
+                        logger.warning(f"Error downloading.. {url} returned "
+                                       f"{response.status}, will try again "
+                                       f"{i} occasion")
+            except Exception as e:
+                logger.warning(f"Problem downloading.. {url} {e}.. will try "
+                               f"again {i} occasion")
+            finally:
+                if self._governor is not None:
+                    self._governor.release(throttled=throttled)
+
+            # Back off a bit, so we don't overload the server with retries
+            await asyncio.sleep(self._retry_sleep_seconds * (i + 1))
+
+        logger.warning(f"Failed to download from {url}")
+
+        return None
+
+    def run(self, coroutine):
+        """Runs a coroutine to completion, in a separate thread if there's
+        already an event loop running (eg. in Jupyter)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
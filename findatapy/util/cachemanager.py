@@ -15,6 +15,11 @@ __author__ = "saeedamen"  # Saeed Amen
 # limitations under the License.
 #
 
+import threading
+import time
+
+from collections import OrderedDict
+
 from findatapy.util.singleton import Singleton
 
 
@@ -50,4 +55,164 @@ class CacheManager(object):
 
     @staticmethod
     def flush_cache():
-        CacheManager._dict_cache = {}
\ No newline at end of file
+        CacheManager._dict_cache = {}
+
+
+class MemoryCache(object):
+    """Bounded in-process cache for DataFrames, with least recently used
+    eviction, once the total memory usage of the objects exceeds a byte
+    budget. Each entry can also have a time to live. Keeps track of hits,
+    misses and evictions. It is thread safe.
+
+    Objects are copied on the way in and out, so callers modifying a
+    DataFrame cannot change what is in the cache.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self._max_bytes = max_bytes
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    @staticmethod
+    def get_obj_size_bytes(obj):
+        try:
+            size = obj.memory_usage(deep=True)
+
+            if hasattr(size, "sum"):
+                size = size.sum()
+
+            return int(size)
+        except:
+            return None
+
+    def put(self, key, obj, meta_data: dict = None, ttl: float = None):
+        """Adds an object to the cache, replacing any older version
+
+        Parameters
+        ----------
+        key : str
+            Key for the object
+        obj : DataFrame
+            Object to be cached
+        meta_data : dict (optional)
+            Metadata stored alongside object
+        ttl : float (optional)
+            Time to live in seconds (default: never expires)
+        """
+        with self._lock:
+            self._remove(key)
+
+        if obj is None or self._max_bytes <= 0:
+            return
+
+        size = self.get_obj_size_bytes(obj)
+
+        # Don't cache objects we can't measure or which would evict everything
+        if size is None or size > self._max_bytes:
+            return
+
+        expiry = None if ttl is None else time.monotonic() + ttl
+
+        obj = obj.copy()
+
+        with self._lock:
+            self._remove(key)
+            self._cache[key] = (obj, meta_data, size, expiry)
+            self._bytes = self._bytes + size
+            self._evict()
+
+    def get(self, key):
+        """Gets an object (and its metadata) from the cache
+
+        Parameters
+        ----------
+        key : str
+            Key for the object
+
+        Returns
+        -------
+        DataFrame, dict
+            None, None if not in the cache (or if expired)
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+
+            if entry is not None and entry[3] is not None \
+                    and entry[3] < time.monotonic():
+                self._remove(key)
+                self._expired = self._expired + 1
+
+                entry = None
+
+            if entry is None:
+                self._misses = self._misses + 1
+
+                return None, None
+
+            self._cache.move_to_end(key)
+            self._hits = self._hits + 1
+
+        return entry[0].copy(), entry[1]
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def flush(self):
+        with self._lock:
+            self._cache = OrderedDict()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+        """Gets the counters for the cache
+
+        Returns
+        -------
+        dict
+        """
+        with self._lock:
+            return {"hits": self._hits,
+                    "misses": self._misses,
+                    "evictions": self._evictions,
+                    "expired": self._expired,
+                    "entries": len(self._cache),
+                    "bytes": self._bytes,
+                    "max_bytes": self._max_bytes}
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expired = 0
+
+    def _remove(self, key):
+        entry = self._cache.pop(key, None)
+
+        if entry is not None:
+            self._bytes = self._bytes - entry[2]
+
+    def _evict(self):
+        # Remove the least recently used entries until within budget
+        while self._bytes > self._max_bytes and len(self._cache) > 0:
+            _, entry = self._cache.popitem(last=False)
+
+            self._bytes = self._bytes - entry[2]
+            self._evictions = self._evictions + 1
@@ -90,9 +90,14 @@ class DataConstants(object):
         "write_style": "write", # "write" / "append" / "update"
         "force_create_library": False,
         "allow_on_disk_filter": True,
-        "query_builder": None
+        "query_builder": None,
+        "library": None # None = each symbol in its own library, otherwise the library for every symbol (eg. so
+                        # batch reads/writes of many tickers go to the same library)
     }
 
+    # Read intraday/tick tickers stored as separate ArcticDB symbols with one batch read, rather than one per ticker
+    arcticdb_batch_read_tickers = True
+
     ###### FOR TEMPORARY IN-MEMORY CACHE (Redis)
     db_cache_server = "127.0.0.1"
     db_cache_port = "6379"
@@ -100,17 +105,76 @@ class DataConstants(object):
 
     write_cache_engine = "redis"  # 'redis' or 'no_cache' means we don't use cache
 
+    # Name of the Redis set which indexes all the keys we write, so we can
+    # list and flush them without scanning the whole keyspace
+    db_cache_namespace = "findatapy"
+
     use_cache_compression = True
 
+    # Format of DataFrames cached in Redis, "parquet" or "arrow" (Arrow IPC,
+    # which is read without decoding, using arrow_cache_compression for keys
+    # which are compressed)
+    cache_format = "parquet"
+    arrow_cache_compression = "lz4"
+
     # Cache MarketDataRequest to Redis
     push_to_cache = True
 
+    # Range aware cache, where keys exclude start/finish dates, so requests
+    # for sub-ranges are sliced out of a larger cached range, and only the
+    # missing head/tail is fetched from the data source
+    speed_cache_range_aware = False
+
+    # In-process memory tier in front of the SpeedCache (eg. Redis), which
+    # avoids the round trip/Parquet decode for keys requested repeatedly,
+    # bounded by the memory usage of the DataFrames (0 disables it)
+    speed_cache_memory_size_mb = 256
+
+    # Time to live (seconds) for the memory tier, per freq
+    speed_cache_memory_ttl = {"tick": 60,
+                              "intraday": 300,
+                              "daily": 3600,
+                              "default": 600}
+
+    # Coalesce identical concurrent requests in Market.fetch_market, so only
+    # the first caller fetches from the data source and the others share it
+    market_single_flight = True
+
+    # Also coalesce across processes using a Redis lock (only for requests
+    # which use the cache, so other processes can read the result from it)
+    market_single_flight_redis = False
+    market_single_flight_lease = 300  # seconds before lock expires
+    market_single_flight_wait = 300  # seconds to wait for another process
+
+    # For cache_algo="incremental_load_return", how far before the last
+    # stored date to download again (eg. to pick up revisions)
+    incremental_load_overlap = {"daily": "5D",
+                                "intraday": "1h",
+                                "tick": "5min",
+                                "default": "1D"}
+
     # Cache Parquet reads from MarketDataRequest to Redis
     cache_flat_files = False
 
+    # SpeedCache engine for caching flat files, "redis" or eg.
+    # "arrow:/tmp/findatapy_cache" for memory mapped Arrow IPC files
+    cache_flat_files_engine = "redis"
+
+    # Longer cache keys are shortened with a hash when used as the names of
+    # Arrow IPC files (most file systems allow at most 255 bytes)
+    arrow_max_file_name_bytes = 200
+
     cache_compression = "zstd"
     parquet_compression = "zstd" # 'gzip' or 'snappy'
 
+    # Max rows in each Parquet row group, the statistics of which let reads
+    # with a start/finish date skip row groups outside the date range
+    parquet_row_group_size = 100000
+
+    # Partitions of Parquet datasets (engine="parquet_dataset") with at least
+    # this many files (eg. from daily appends) are compacted in the background
+    parquet_dataset_compact_files = 8
+
     # Ignore very large flat file files for caching (eg. tick data), as can cause issues
     # with Redis when trying to cache large files, so set a maximum file size for caching (in bytes)
     cache_max_file_size_bytes = 100 * 1024 * 1024 # 100 MB
@@ -182,6 +246,16 @@ class DataConstants(object):
 
     multiprocessing_library = 'multiprocess' # 'multiprocessing_on_dill' or 'multiprocess' or 'multiprocessing'
 
+    # With "multiprocessing", return DataFrames from worker processes as memory mapped Arrow files in shared memory
+    # (see SharedFrame), rather than pickling them
+    market_shared_frame_transport = True
+
+    # Folder for these files (None = /dev/shm where available, otherwise the temp folder)
+    shared_frame_folder = None
+
+    # DataFrames smaller than this (in bytes) are pickled anyway
+    shared_frame_min_bytes = 1024 * 1024
+
     # How many threads to use for loading external data (don't do too many on slow machines!)
     # also some data sources will complain if you start too many parallel threads to call data!
     # for some data providers might get better performance from 1 thread only!
@@ -193,7 +267,8 @@ class DataConstants(object):
                         'fxcm'        : 4}
 
     # Seconds for timeout
-    timeout_downloader = {'dukascopy' : 120}
+    timeout_downloader = {'dukascopy' : 120,
+                          'fxcm'      : 120}
 
     # Dukascopy specific settings
     dukascopy_retries = 20
@@ -202,6 +277,92 @@ class DataConstants(object):
     dukascopy_try_time = 0 # Usually values of 0-1/8-1/4-1 are reasonable
     # smaller values => quicker retry, but don't want to poll server too much
 
+    # HTTP engine for Dukascopy/FXCM tick downloads, "asyncio" (one pooled
+    # aiohttp client, falls back to "thread" if aiohttp isn't installed) or
+    # "thread" (one request per thread pool task)
+    market_http_engine = {'dukascopy' : 'asyncio',
+                          'fxcm'      : 'asyncio'}
+
+    # Max number of concurrent requests with the asyncio HTTP engine
+    market_http_max_concurrency = {'dukascopy' : 8,
+                                   'fxcm'      : 4}
+
+    # Threads for decompressing/parsing files with the asyncio HTTP engine
+    market_http_parse_thread_no = 4
+
+    # Record the completed units (eg. hours/weeks) of tick downloads in a
+    # manifest under temp_folder/ledger, so reruns only download the
+    # failed/missing units (rather than the whole date range) - retries
+    # within a download only fetch the failed units, even if this is False
+    market_download_ledger = False
+    market_download_ledger_retries = 9
+
+    # Long intraday/tick requests to these data sources are split into time
+    # windows of this size, which are downloaded in parallel (up to
+    # market_thread_no for the data source), can be retried individually and
+    # are then stitched back together
+    market_window_size = {'bloomberg'   : {'tick' : '1D', 'intraday' : '7D'},
+                          'eikon'       : {'tick' : '1D', 'intraday' : '30D'},
+                          'databento'   : {'intraday' : '30D'}}
+    market_window_retries = 3
+    market_window_retry_sleep = 5
+
+    # Max number of rows (eg. klines) crypto exchanges return for each
+    # request, used to compute the page windows for a request up front
+    crypto_page_limit = {'binance'  : 1000,
+                         'bitfinex' : 1000,
+                         'gdax'     : 300,
+                         'bitmex'   : 500}
+    crypto_page_retries = 5
+    crypto_page_retry_sleep = 2
+
+    # When Market.fetch_market is given a list of MarketDataRequests, merge
+    # those which only differ by tickers into fewer calls to the data source
+    market_batch_planner = True
+
+    # Max tickers in each merged call to a data source (otherwise "other")
+    market_batch_max_tickers = {'bloomberg'   : 100,
+                                'other'       : 50}
+
+    # Limits on the requests made to each data source (by RequestGovernor),
+    # shared by every thread, however the threads are nested (and by every
+    # process with the "redis" backend). Data sources which aren't listed
+    # aren't limited. Where a data source is in market_thread_no, the limit
+    # is the same, so it only stops nested threads multiplying the requests
+    market_governor_max_in_flight = {'quandl'      : 4,
+                                     'bloomberg'   : 4,
+                                     'yahoo'       : 1,
+                                     'dukascopy'   : 3,
+                                     'fxcm'        : 4,
+                                     'binance'     : 4,
+                                     'bitfinex'    : 1,
+                                     'gdax'        : 3,
+                                     'kraken'      : 1,
+                                     'bitmex'      : 1}
+
+    # Average requests per second (token bucket)
+    market_governor_requests_per_second = {'dukascopy' : 20,
+                                           'fxcm'      : 10,
+                                           'binance'   : 10,
+                                           'bitfinex'  : 0.5,  # 30 / minute
+                                           'gdax'      : 3,
+                                           'kraken'    : 1,
+                                           'bitmex'    : 0.5}  # 150 / 5 minutes
+
+    market_governor_backend = "local" # "local" or "redis"
+
+    # Seconds to pause requests after a data source throttles us (eg. 429)
+    market_governor_backoff_seconds = 5
+
+    # Seconds before the lease for a request in flight in Redis expires (if
+    # a process dies without releasing it), so it should be longer than any
+    # request takes
+    market_governor_lease = 300
+
+    # Seconds between polls of Redis, whilst waiting for a request in flight
+    # to finish (with some jitter)
+    market_governor_redis_poll_seconds = 0.1
+
     # We can override the thread count and drop back to single thread for certain market data downloads, as can have issues with
     # quite large daily datasets from Bloomberg (and other data vendors) when doing multi-threading, so can override and use
     # single threading on these (and also split into several chunks)
@@ -224,6 +385,14 @@ class DataConstants(object):
     # Dataframe chunk size
     chunk_size_mb = 500
 
+    # DataFrames larger than this (in memory) are stored in Redis as several
+    # Parquet chunks under numbered keys, with a manifest key listing them
+    redis_max_object_size_mb = 500
+    redis_chunk_size_mb = 64
+
+    # Number of threads to decode Redis chunks in parallel
+    redis_chunk_read_threads = 4
+
     # Log config file
     logging_conf = path_join(config_root_folder, "logging.conf")
 
@@ -231,6 +400,18 @@ class DataConstants(object):
     bbg_server = "localhost"       # needs changing if you use Bloomberg Server API
     bbg_server_port = 8194
 
+    # Keep a pool of Bloomberg sessions open (with //blp/refdata), rather
+    # than starting a new session for every request, and send requests from
+    # many threads on the same sessions at the same time
+    bbg_session_pool = True
+    bbg_session_pool_size = 2
+
+    # Seconds to wait for the next response to a request on a pooled session
+    bbg_session_request_timeout = 600
+
+    # Attempts for each request, if its session is terminated
+    bbg_session_retries = 3
+
     # These fields are BDS style fields to be downloaded using Bloomberg's Reference Data interface
     # You may need to add to this list
     bbg_ref_fields = {'release-date-time-full' : 'ECO_FUTURE_RELEASE_DATE_LIST',
@@ -259,6 +440,12 @@ class DataConstants(object):
     dukascopy_base_url = "https://www.dukascopy.com/datafeed/"
     dukascopy_write_temp_tick_disk = False
 
+    # Reuse the raw bi5 files written to temp_folder/dkticks (only hours
+    # fully in the past are written), rather than downloading them again -
+    # files which weren't written after their hour finished, or which aren't
+    # valid bi5 files, are ignored
+    dukascopy_read_temp_tick_disk = False
+
     #######  FXCM settings
     fxcm_base_url = 'https://tickdata.fxcorporate.com/'
     fxcm_write_temp_tick_disk = False
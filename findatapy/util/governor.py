@@ -0,0 +1,432 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+
+from findatapy.util.dataconstants import DataConstants
+from findatapy.util.loggermanager import LoggerManager
+from findatapy.util.asynchttp import TokenBucket
+
+constants = DataConstants()
+
+
+class RequestGovernor(object):
+    """Limits the requests made to a data source, with a max number of
+    requests in flight and a max number of requests per second (token
+    bucket). There is one governor for each data source, which is shared by
+    every thread, so nested fan-out (eg. several tickers, each split into
+    chunks) can't multiply the number of requests made to the data source.
+    With the "redis" backend, the limits are shared across processes too,
+    where each request in flight holds a lease in Redis (which expires after
+    market_governor_lease, in case a process dies without releasing it).
+
+    If the data source throttles us (eg. HTTP 429/503), calling throttled
+    pauses requests for a while and halves the request rate, which then
+    recovers gradually as requests succeed.
+
+    Use get_governor to get the governor for a data source.
+    """
+
+    _governors = {}
+    _governors_lock = threading.Lock()
+
+    def __init__(self, data_source, max_in_flight=None,
+                 requests_per_second=None, backend="local",
+                 backoff_seconds=5, min_rate_fraction=0.1,
+                 redis_server=None, redis_port=None):
+        self._data_source = data_source
+        self._max_in_flight = max_in_flight
+        self._base_rate = requests_per_second
+        self._backend = backend
+        self._backoff_seconds = backoff_seconds
+        self._min_rate_fraction = min_rate_fraction
+
+        self._rate_fraction = 1.0
+        self._paused_until = 0
+        self._in_flight = 0
+
+        self._token_bucket = None
+
+        if requests_per_second is not None:
+            self._token_bucket = TokenBucket(requests_per_second)
+
+        self._lock = threading.Lock()
+
+        self._stats = {"requests": 0, "waiting": 0, "max_waiting": 0,
+                       "throttled": 0, "total_wait_seconds": 0.0,
+                       "max_wait_seconds": 0.0}
+
+        # Leases held in Redis by this process for requests in flight
+        self._redis_leases = []
+
+        self._redis_server = redis_server
+        self._redis_port = redis_port
+
+        if self._redis_server is None:
+            self._redis_server = constants.db_cache_server
+
+        if self._redis_port is None:
+            self._redis_port = constants.db_cache_port
+
+    @staticmethod
+    def get_governor(data_source):
+        """Gets the governor for a data source, using the limits in
+        DataConstants (market_governor_max_in_flight and
+        market_governor_requests_per_second)
+
+        Parameters
+        ----------
+        data_source : str
+            Data source eg. "bloomberg"
+
+        Returns
+        -------
+        RequestGovernor
+            None if there are no limits for this data source
+        """
+        data_source = str(data_source)
+
+        with RequestGovernor._governors_lock:
+            if data_source not in RequestGovernor._governors:
+                max_in_flight = constants.market_governor_max_in_flight.get(
+                    data_source)
+                requests_per_second = \
+                    constants.market_governor_requests_per_second.get(
+                        data_source)
+
+                governor = None
+
+                if max_in_flight is not None \
+                        or requests_per_second is not None:
+                    governor = RequestGovernor(
+                        data_source, max_in_flight=max_in_flight,
+                        requests_per_second=requests_per_second,
+                        backend=constants.market_governor_backend,
+                        backoff_seconds=
+                        constants.market_governor_backoff_seconds)
+
+                RequestGovernor._governors[data_source] = governor
+
+            return RequestGovernor._governors[data_source]
+
+    @staticmethod
+    def reset_governors():
+        with RequestGovernor._governors_lock:
+            RequestGovernor._governors = {}
+
+    @staticmethod
+    def get_all_stats():
+        """Gets the stats for every governor
+
+        Returns
+        -------
+        dict
+        """
+        with RequestGovernor._governors_lock:
+            governors = dict(RequestGovernor._governors)
+
+        return {k: v.get_stats() for k, v in governors.items()
+                if v is not None}
+
+    def _get_redis_key(self, name):
+        return f"{constants.db_cache_namespace}_governor_" \
+               f"{self._data_source}_{name}"
+
+    def _get_redis_client(self):
+        from findatapy.market.ioengine import RedisConnectionManager
+
+        return RedisConnectionManager.get_client(
+            db_server=self._redis_server, db_port=self._redis_port)
+
+    def _get_rate(self):
+        return self._base_rate * self._rate_fraction
+
+    def try_acquire(self):
+        """Tries to start a request
+
+        Returns
+        -------
+        float
+            0 if the request can go ahead, otherwise seconds to wait before
+            trying again
+        """
+        if self._backend == "redis":
+            return self._try_acquire_redis()
+
+        with self._lock:
+            wait = self._paused_until - time.monotonic()
+
+            if wait > 0:
+                return wait
+
+            if self._max_in_flight is not None \
+                    and self._in_flight >= self._max_in_flight:
+                return 0.01
+
+            if self._token_bucket is not None:
+                wait = self._token_bucket.try_acquire()
+
+                if wait > 0:
+                    return wait
+
+            self._in_flight = self._in_flight + 1
+
+            return 0
+
+    def _get_redis_poll_seconds(self):
+        # Jitter, so blocked processes don't all poll Redis at the same time
+        poll_seconds = constants.market_governor_redis_poll_seconds
+
+        return poll_seconds * (0.5 + random.random())
+
+    def _try_acquire_redis(self):
+        r = self._get_redis_client()
+
+        pause_key = self._get_redis_key("pause")
+        in_flight_key = self._get_redis_key("in_flight")
+
+        pause_ms = r.pttl(pause_key)
+
+        if pause_ms is not None and pause_ms > 0:
+            return pause_ms / 1000.0
+
+        lease = None
+
+        if self._max_in_flight is not None:
+            # Each request in flight is a member of a sorted set, scored by
+            # when its lease expires. In one transaction, remove the expired
+            # leases (eg. from processes which died), add ours and count them
+            now = time.time()
+            lease = f"{socket.gethostname()}_{os.getpid()}_{uuid.uuid4().hex}"
+            lease_seconds = constants.market_governor_lease
+
+            pipe = r.pipeline(transaction=True)
+            pipe.zremrangebyscore(in_flight_key, "-inf", now)
+            pipe.zadd(in_flight_key, {lease: now + lease_seconds})
+            pipe.zcard(in_flight_key)
+            pipe.expire(in_flight_key, lease_seconds)
+
+            in_flight = pipe.execute()[2]
+
+            if in_flight > self._max_in_flight:
+                r.zrem(in_flight_key, lease)
+
+                return self._get_redis_poll_seconds()
+
+        if self._base_rate is not None:
+            # Count the requests in each one second window
+            now = time.time()
+            rate_key = self._get_redis_key(f"rate_{int(now)}")
+
+            pipe = r.pipeline(transaction=True)
+            pipe.incr(rate_key)
+            pipe.expire(rate_key, 2)
+
+            requests = pipe.execute()[0]
+
+            if requests > max(1, int(self._get_rate())):
+                if lease is not None:
+                    r.zrem(in_flight_key, lease)
+
+                return int(now) + 1 - now
+
+        with self._lock:
+            self._in_flight = self._in_flight + 1
+
+            if lease is not None:
+                self._redis_leases.append(lease)
+
+        return 0
+
+    def _record_wait(self, wait_seconds):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_wait_seconds"] += wait_seconds
+            self._stats["max_wait_seconds"] = max(
+                self._stats["max_wait_seconds"], wait_seconds)
+
+    def _add_waiting(self, n):
+        with self._lock:
+            self._stats["waiting"] += n
+            self._stats["max_waiting"] = max(self._stats["max_waiting"],
+                                             self._stats["waiting"])
+
+    def acquire(self):
+        """Waits until a request can go ahead (call release once it has
+        finished)
+        """
+        start = time.monotonic()
+
+        wait = self.try_acquire()
+
+        if wait > 0:
+            self._add_waiting(1)
+
+            try:
+                while wait > 0:
+                    time.sleep(min(wait, 0.25))
+                    wait = self.try_acquire()
+            finally:
+                self._add_waiting(-1)
+
+        self._record_wait(time.monotonic() - start)
+
+    async def acquire_async(self):
+        start = time.monotonic()
+
+        wait = self.try_acquire()
+
+        if wait > 0:
+            self._add_waiting(1)
+
+            try:
+                while wait > 0:
+                    await asyncio.sleep(min(wait, 0.25))
+                    wait = self.try_acquire()
+            finally:
+                self._add_waiting(-1)
+
+        self._record_wait(time.monotonic() - start)
+
+    def release(self, throttled=False):
+        """Finishes a request
+
+        Parameters
+        ----------
+        throttled : bool
+            Was the request throttled by the data source (eg. HTTP 429/503)
+        """
+        lease = None
+
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+
+            # Leases held by this process are interchangeable
+            if self._redis_leases:
+                lease = self._redis_leases.pop(0)
+
+        if lease is not None:
+            self._get_redis_client().zrem(self._get_redis_key("in_flight"),
+                                          lease)
+
+        if throttled:
+            self.throttled()
+        elif self._base_rate is not None and self._rate_fraction < 1.0:
+            # Gradually recover the rate after being throttled
+            with self._lock:
+                self._rate_fraction = min(1.0, self._rate_fraction + 0.05)
+
+                if self._token_bucket is not None:
+                    self._token_bucket.set_rate(self._get_rate())
+
+        if self._backend == "redis" and self._stats["requests"] % 100 == 0:
+            self.publish_stats()
+
+    @contextmanager
+    def request(self):
+        """Context manager around a request, which waits until it can go
+        ahead and releases it afterwards
+        """
+        self.acquire()
+
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def throttled(self, retry_after=None):
+        """Backs off after the data source has throttled us, pausing
+        requests for a while and halving the request rate
+
+        Parameters
+        ----------
+        retry_after : float (optional)
+            Seconds to pause (eg. from a Retry-After header)
+        """
+        logger = LoggerManager.getLogger(__name__)
+
+        if retry_after is None:
+            retry_after = self._backoff_seconds
+
+        with self._lock:
+            self._stats["throttled"] += 1
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + retry_after)
+
+            if self._base_rate is not None:
+                self._rate_fraction = max(self._min_rate_fraction,
+                                          self._rate_fraction / 2.0)
+
+                if self._token_bucket is not None:
+                    self._token_bucket.set_rate(self._get_rate())
+
+        if self._backend == "redis":
+            self._get_redis_client().set(self._get_redis_key("pause"), 1,
+                                         px=int(retry_after * 1000))
+
+        logger.warning(f"{self._data_source} throttled our requests, "
+                       f"pausing for {retry_after}s")
+
+        self.publish_stats()
+
+    def get_stats(self):
+        """Gets the stats for this governor, including the number of
+        requests waiting (queue depth) and the time spent waiting
+
+        Returns
+        -------
+        dict
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+
+        stats["avg_wait_seconds"] = stats["total_wait_seconds"] \
+            / max(stats["requests"], 1)
+
+        if self._base_rate is not None:
+            stats["requests_per_second"] = self._get_rate()
+
+        return stats
+
+    def publish_stats(self):
+        """Logs the stats and with the "redis" backend also writes them to
+        Redis (one field for each process), so they can be monitored
+        """
+        logger = LoggerManager.getLogger(__name__)
+
+        stats = self.get_stats()
+
+        logger.debug(f"Governor stats for {self._data_source}: {stats}")
+
+        if self._backend == "redis":
+            try:
+                self._get_redis_client().hset(
+                    self._get_redis_key("stats"),
+                    f"{socket.gethostname()}_{os.getpid()}",
+                    json.dumps(stats))
+            except Exception as e:
+                logger.debug(f"Couldn't publish governor stats: {e}")
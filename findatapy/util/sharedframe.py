@@ -0,0 +1,232 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import tempfile
+import uuid
+
+import pandas as pd
+
+from findatapy.util.dataconstants import DataConstants
+from findatapy.util.loggermanager import LoggerManager
+
+# pyarrow is an optional dependency
+try:
+    import pyarrow as pa
+except:
+    pass
+
+constants = DataConstants()
+
+
+class SharedFrame(object):
+    """Hands DataFrames between processes (eg. from SwimPool worker
+    processes back to the parent) as uncompressed Arrow IPC files in shared
+    memory (/dev/shm where available), so only the path of each file is
+    pickled. The reader memory maps the file, so the Arrow columns aren't
+    copied or deserialized until they are converted to pandas, and the file
+    is deleted as soon as it has been read.
+
+    Small DataFrames (or anything which isn't a DataFrame) are returned
+    as they are, to be pickled as usual.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f"SharedFrame({self.path})"
+
+    @staticmethod
+    def get_folder():
+        folder = constants.shared_frame_folder
+
+        if folder is None:
+            if os.path.isdir("/dev/shm"):
+                folder = "/dev/shm"
+            else:
+                folder = tempfile.gettempdir()
+
+        return folder
+
+    @staticmethod
+    def put(data_frame, folder=None, min_bytes=None):
+        """Writes a DataFrame to shared memory
+
+        Parameters
+        ----------
+        data_frame : DataFrame
+            To be handed to another process
+        folder : str (optional)
+            Where to write the file (default: shared_frame_folder)
+        min_bytes : int (optional)
+            DataFrames smaller than this are returned as they are (default:
+            shared_frame_min_bytes)
+
+        Returns
+        -------
+        SharedFrame (or the original object)
+        """
+        if not isinstance(data_frame, pd.DataFrame):
+            return data_frame
+
+        if min_bytes is None:
+            min_bytes = constants.shared_frame_min_bytes
+
+        if data_frame.memory_usage(index=True).sum() < min_bytes:
+            return data_frame
+
+        if folder is None:
+            folder = SharedFrame.get_folder()
+
+        path = os.path.join(folder, f"findatapy_shared_{os.getpid()}_"
+                                    f"{uuid.uuid4().hex}.arrow")
+
+        try:
+            table = pa.Table.from_pandas(data_frame)
+
+            with pa.OSFile(path, "wb") as f:
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+        except Exception as e:
+            # eg. columns with mixed types, which Arrow can't store
+            logger = LoggerManager().getLogger(__name__)
+            logger.debug(f"Couldn't write DataFrame to shared memory, so "
+                         f"will be pickled: {str(e)}")
+
+            SharedFrame._remove(path)
+
+            return data_frame
+
+        return SharedFrame(path)
+
+    @staticmethod
+    def get(shared_frame, release=True):
+        """Reads a DataFrame written by put
+
+        Parameters
+        ----------
+        shared_frame : SharedFrame (or any other object)
+            Returned by put
+        release : bool (default: True)
+            Delete the file after it has been read
+
+        Returns
+        -------
+        DataFrame
+        """
+        if not isinstance(shared_frame, SharedFrame):
+            return shared_frame
+
+        try:
+            with pa.memory_map(shared_frame.path, "r") as source:
+                data_frame = pa.ipc.open_file(source).read_all().to_pandas()
+        finally:
+            if release:
+                SharedFrame.release(shared_frame)
+
+        return data_frame
+
+    @staticmethod
+    def release(shared_frame_list):
+        """Deletes the files of SharedFrames, ignoring any other objects
+
+        Parameters
+        ----------
+        shared_frame_list : SharedFrame (list)
+            To be deleted
+        """
+        if not isinstance(shared_frame_list, list):
+            shared_frame_list = [shared_frame_list]
+
+        for s in shared_frame_list:
+            if isinstance(s, SharedFrame):
+                SharedFrame._remove(s.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger = LoggerManager().getLogger(__name__)
+            logger.warning(f"Couldn't delete shared memory file {path}: "
+                           f"{str(e)}")
+
+    @staticmethod
+    def map(pool, func, iterable, read=True):
+        """Calls func for each element in a (process) pool, returning the
+        DataFrames via shared memory. If any call fails, the files written by
+        the other calls are deleted before its exception is raised.
+
+        Parameters
+        ----------
+        pool : Pool
+            eg. created by SwimPool
+        func : function
+            Called with each element and returns a DataFrame (must be
+            picklable)
+        iterable : list
+            Arguments for each call
+        read : bool (default: True)
+            Read the DataFrames (deleting their files), otherwise returns the
+            SharedFrames (eg. to be passed to another round of workers)
+
+        Returns
+        -------
+        list of DataFrame (or SharedFrame)
+        """
+        func = _SharedFrameCall(func, SharedFrame.get_folder(),
+                                constants.shared_frame_min_bytes)
+
+        async_list = [pool.apply_async(func, (x,)) for x in iterable]
+
+        shared_frame_list = []
+        error = None
+
+        for a in async_list:
+            try:
+                shared_frame_list.append(a.get())
+            except Exception as e:
+                if error is None:
+                    error = e
+
+        try:
+            if error is not None:
+                raise error
+
+            if not read:
+                return shared_frame_list
+
+            return [SharedFrame.get(s) for s in shared_frame_list]
+        except Exception:
+            SharedFrame.release(shared_frame_list)
+
+            raise
+
+
+class _SharedFrameCall(object):
+    # Picklable wrapper which is called in the worker process
+    def __init__(self, func, folder, min_bytes):
+        self.func = func
+        self.folder = folder
+        self.min_bytes = min_bytes
+
+    def __call__(self, *args):
+        return SharedFrame.put(self.func(*args), folder=self.folder,
+                               min_bytes=self.min_bytes)
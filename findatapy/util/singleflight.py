@@ -0,0 +1,88 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls for the same key, so that only the first
+    caller (the leader) runs the function, and any other callers which
+    arrive whilst it is running wait for and share its result (or its
+    exception). Once the call has finished, the next caller for that key
+    will run the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) unless a call for the same key is
+        already in flight, in which case waits for that call to finish
+
+        Parameters
+        ----------
+        key : str
+            Key identifying duplicate calls
+        fn : function
+            Function to call
+
+        Returns
+        -------
+        object, bool
+            Result of the function and whether this caller ran it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.event.wait()
+
+            if call.exception is not None:
+                raise call.exception
+
+            return call.result, False
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.exception = e
+
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+            call.event.set()
+
+        return call.result, True
+
+    def in_flight(self):
+        with self._lock:
+            return list(self._calls.keys())
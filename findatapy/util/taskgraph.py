@@ -0,0 +1,149 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import concurrent.futures
+
+from findatapy.util.loggermanager import LoggerManager
+
+
+class _Task(object):
+    def __init__(self, key, func, args, kwargs, depends_on):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.depends_on = depends_on
+
+
+class TaskGraph(object):
+    """Runs a graph of tasks (eg. the sub-fetches needed for an FX vol
+    market) in a thread pool, starting each task as soon as the tasks it
+    depends on have finished. Tasks are identified by a key, so adding the
+    same task twice (eg. the same deposit currency for several crosses) only
+    runs it once. Results can be consumed as each task finishes, eg. to join
+    DataFrames incrementally, rather than waiting for every task.
+    """
+
+    def __init__(self, thread_no=4):
+        self._thread_no = thread_no
+        self._tasks = {}
+
+    def add(self, key, func, *args, depends_on=None, **kwargs):
+        """Adds a task, unless a task with the same key has already been
+        added
+
+        Parameters
+        ----------
+        key : str
+            Identifies the task (identical tasks should have the same key)
+        func : function
+            Called with *args and **kwargs
+        depends_on : list of str (optional)
+            Keys of tasks which need to finish before this one starts
+
+        Returns
+        -------
+        str
+            Key of the task
+        """
+        if key not in self._tasks:
+            self._tasks[key] = _Task(key, func, args, kwargs,
+                                     list(depends_on or []))
+
+        return key
+
+    def get_keys(self):
+        """Gets the keys of the tasks, in the order they were added
+
+        Returns
+        -------
+        list of str
+        """
+        return list(self._tasks.keys())
+
+    def run(self, callback=None):
+        """Runs every task, with up to thread_no at the same time. If a task
+        fails, the tasks which haven't started are cancelled and its
+        exception is raised.
+
+        Parameters
+        ----------
+        callback : function (optional)
+            Called with (key, result) in the calling thread as each task
+            finishes
+
+        Returns
+        -------
+        dict
+            Result of each task, keyed by task key
+        """
+        logger = LoggerManager.getLogger(__name__)
+
+        for task in self._tasks.values():
+            for d in task.depends_on:
+                if d not in self._tasks:
+                    raise Exception(f"Task {task.key} depends on {d}, which "
+                                    f"hasn't been added")
+
+        results = {}
+        waiting = dict(self._tasks)
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(self._thread_no, 1))
+
+        futures = {}
+
+        def submit_ready():
+            for key, task in list(waiting.items()):
+                if all(d in results for d in task.depends_on):
+                    del waiting[key]
+
+                    futures[executor.submit(
+                        task.func, *task.args, **task.kwargs)] = key
+
+        try:
+            submit_ready()
+
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    list(futures.keys()),
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for f in done:
+                    key = futures.pop(f)
+
+                    results[key] = f.result()
+
+                    if callback is not None:
+                        callback(key, results[key])
+
+                submit_ready()
+
+            if waiting:
+                raise Exception(f"Tasks {list(waiting.keys())} have cyclic "
+                                f"dependencies")
+        except Exception:
+            for f in futures:
+                f.cancel()
+
+            logger.warning("Task failed, cancelled any remaining tasks")
+
+            raise
+        finally:
+            executor.shutdown(wait=False)
+
+        return results
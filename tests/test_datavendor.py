@@ -0,0 +1,693 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import gzip
+import os
+import lzma
+import struct
+import datetime
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pandas as pd
+
+from findatapy.market import DataVendor, MarketDataRequest
+from findatapy.market.ioengine import IOEngine
+from findatapy.market.datavendorweb import DataVendorDukasCopy, \
+    DataVendorFXCM
+from findatapy.market.datavendorcrypto import DataVendorBinance
+from findatapy.util import DataConstants, RequestGovernor, TokenBucket
+
+
+def _create_bi5_payload(ticks):
+    return b"".join([struct.pack(">LLLff", *t) for t in ticks])
+
+
+def test_dukascopy_parse_tick_data():
+    epoch = datetime.datetime(2021, 3, 1, 10)
+
+    ticks = [(0, 121005, 121001, 1.5, 2.25),
+             (250, 121010, 121003, 0.75, 1.0),
+             (3599999, 121020, 121015, 3.0, 4.5)]
+
+    dukascopy = DataVendorDukasCopy()
+
+    df = dukascopy.retrieve_df(_create_bi5_payload(ticks), "EURUSD", epoch)
+
+    assert list(df.columns) == ["ask", "bid", "askv", "bidv"]
+    assert df.index[0] == pd.Timestamp(epoch)
+    assert df.index[1] == pd.Timestamp(epoch) + pd.Timedelta(milliseconds=250)
+    assert df.index[-1] == pd.Timestamp(epoch) \
+           + pd.Timedelta(milliseconds=3599999)
+
+    assert df["ask"].iloc[0] == pytest.approx(1.21005)
+    assert df["bid"].iloc[1] == pytest.approx(1.21003)
+    assert df["bidv"].iloc[2] == pytest.approx(4.5)
+
+    # JPY crosses use a different divisor
+    df = dukascopy.retrieve_df(_create_bi5_payload(ticks), "USDJPY", epoch)
+
+    assert df["ask"].iloc[0] == pytest.approx(121.005)
+
+    # Empty hours should not break the parser
+    df = dukascopy.retrieve_df(b"", "EURUSD", epoch)
+
+    assert df.empty
+
+
+class OfflineDataVendorDukasCopy(DataVendorDukasCopy):
+    """Creates two ticks for each hour, rather than downloading them"""
+
+    def fetch_file(self, time, symbol, do_retrieve_df, try_time):
+        ticks = [(0, 121005, 121001, 1.5, 2.25),
+                 (1000, 121010, 121003, 0.75, 1.0)]
+
+        return self.retrieve_df(_create_bi5_payload(ticks), symbol, time)
+
+
+def test_dukascopy_stream_to_parquet(tmp_path):
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="03 Mar 2021 00:00",
+                                   data_source="dukascopy", category="fx",
+                                   freq="tick", tickers=["EURUSD"],
+                                   vendor_tickers=["EURUSD"],
+                                   fields=["bid", "ask"],
+                                   vendor_fields=["bid", "ask"])
+
+    dukascopy = OfflineDataVendorDukasCopy()
+
+    df_list = list(dukascopy.load_ticker_stream(md_request))
+
+    assert len(df_list) == 48
+    assert list(df_list[0].columns) == ["EURUSD.bid", "EURUSD.ask"]
+
+    df_list = list(dukascopy.load_ticker_stream(md_request, freq="day"))
+
+    assert len(df_list) == 2
+    assert len(df_list[0].index) == 48
+
+    # Write the stream straight to disk, without holding it all in memory
+    io_engine = IOEngine()
+
+    rows = io_engine.write_parquet_stream(
+        dukascopy.load_ticker_stream(md_request), str(tmp_path),
+        md_request=md_request)
+
+    df = io_engine.read_parquet(
+        str(tmp_path / "backtest.fx.dukascopy.tick.NYC.EURUSD.parquet"))
+
+    assert rows == 96
+    assert len(df.index) == 96
+    assert df.index.is_monotonic_increasing
+    assert df["EURUSD.bid"].iloc[0] == pytest.approx(1.21001)
+
+
+class CountingDataVendorDukasCopy(DataVendorDukasCopy):
+    """Returns a compressed bi5 file for each hour, counting how many times
+    we've gone to the network"""
+
+    def __init__(self):
+        super(CountingDataVendorDukasCopy, self).__init__()
+
+        self.fetch_count = 0
+
+    def fetch_tick(self, tick_url, try_time):
+        self.fetch_count = self.fetch_count + 1
+
+        ticks = [(0, 121005, 121001, 1.5, 2.25)]
+
+        return lzma.compress(_create_bi5_payload(ticks))
+
+
+def test_dukascopy_tick_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataConstants, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "dukascopy_write_temp_tick_disk", True)
+    monkeypatch.setattr(DataConstants, "dukascopy_read_temp_tick_disk", True)
+    monkeypatch.setattr(DataConstants, "dukascopy_multithreading", False)
+
+    start_date = datetime.datetime(2021, 3, 1, 0)
+    finish_date = datetime.datetime(2021, 3, 1, 6)
+
+    dukascopy = CountingDataVendorDukasCopy()
+
+    assert len(dukascopy.get_missing_hours(
+        "EURUSD", start_date, finish_date)) == 6
+
+    df_list = [dukascopy.fetch_file(t, "EURUSD", True, 0)
+               for t in dukascopy.hour_range(start_date, finish_date)]
+
+    assert dukascopy.fetch_count == 6
+    assert dukascopy.get_missing_hours("EURUSD", start_date, finish_date) == []
+
+    # Second time around should come from disk, not the network
+    df_cached_list = [dukascopy.fetch_file(t, "EURUSD", True, 0)
+                      for t in dukascopy.hour_range(start_date, finish_date)]
+
+    assert dukascopy.fetch_count == 6
+    assert all(df.equals(df_c) for df, df_c in zip(df_list, df_cached_list))
+
+    # The index should be rebuilt from the folder if it is deleted
+    DataVendorDukasCopy._tick_cache_index.clear()
+    (tmp_path / "dkticks" / "EURUSD" / "index.txt").unlink()
+
+    assert len(dukascopy.get_cached_hours("EURUSD")) == 6
+
+    # Hours which haven't finished yet could still get more ticks, so
+    # shouldn't be cached
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    dukascopy.fetch_file(now, "EURUSD", True, 0)
+    dukascopy.fetch_file(now, "EURUSD", True, 0)
+
+    assert dukascopy.fetch_count == 8
+
+    # Files written by older versions (eg. error pages or hours which
+    # hadn't finished when written) shouldn't be trusted
+    legacy_time = datetime.datetime(2021, 3, 2, 0)
+    legacy_path = dukascopy.get_tick_cache_folder() \
+                  + dukascopy.get_tick_path(legacy_time, "EURUSD")
+
+    os.makedirs(os.path.dirname(legacy_path), exist_ok=True)
+
+    with open(legacy_path, "wb") as f:
+        f.write(b"<html>error</html>")
+
+    assert dukascopy.read_cached_tick(legacy_time, "EURUSD") is None
+
+    with open(legacy_path, "wb") as f:
+        f.write(lzma.compress(_create_bi5_payload(
+            [(0, 121005, 121001, 1.5, 2.25)])))
+
+    assert dukascopy.read_cached_tick(legacy_time, "EURUSD") is not None
+
+    written_time = (legacy_time + datetime.timedelta(minutes=30)).replace(
+        tzinfo=datetime.timezone.utc).timestamp()
+    os.utime(legacy_path, (written_time, written_time))
+
+    assert dukascopy.read_cached_tick(legacy_time, "EURUSD") is None
+
+    DataVendorDukasCopy._tick_cache_index.clear()
+
+
+@pytest.fixture
+def tick_server():
+    """Local HTTP server serving Dukascopy bi5 files and FXCM csv.gz files,
+    which records the max number of concurrent requests (the Dukascopy file
+    for 05:00 doesn't exist)"""
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"],
+                                             stats["in_flight"])
+
+            time.sleep(0.02)
+
+            if self.path.endswith("05h_ticks.bi5"):
+                content = None
+            elif self.path.endswith(".bi5"):
+                content = lzma.compress(_create_bi5_payload(
+                    [(0, 121005, 121001, 1.5, 2.25)]))
+            elif self.path.endswith(".csv.gz"):
+                content = gzip.compress(
+                    ("DateTime,Bid,Ask\n"
+                     "03/01/2021 10:00:00.250,1.21001,1.21005\n"
+                     "03/01/2021 10:00:01.500,1.21002,1.21006\n")
+                    .encode("utf-16"))
+            else:
+                content = None
+
+            with lock:
+                stats["in_flight"] -= 1
+
+            if content is None:
+                self.send_response(404)
+                self.end_headers()
+
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}/", stats
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_token_bucket():
+    token_bucket = TokenBucket(rate=100, capacity=5)
+
+    # Can burst up to the capacity, then need to wait for a token
+    assert all(token_bucket.try_acquire() == 0 for _ in range(5))
+    assert token_bucket.try_acquire() > 0
+
+    start = time.monotonic()
+
+    for _ in range(10):
+        token_bucket.acquire()
+
+    assert time.monotonic() - start >= 0.08
+
+
+def test_async_http_dukascopy_fxcm(tick_server, tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp")
+
+    url, stats = tick_server
+
+    monkeypatch.setattr(DataConstants, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "dukascopy_base_url", url)
+    monkeypatch.setattr(DataConstants, "fxcm_base_url", url)
+    monkeypatch.setattr(DataConstants, "dukascopy_read_temp_tick_disk", False)
+    monkeypatch.setattr(DataConstants, "market_http_engine",
+                        {"dukascopy": "asyncio", "fxcm": "asyncio"})
+    monkeypatch.setattr(DataConstants, "market_http_max_concurrency",
+                        {"dukascopy": 4, "fxcm": 4})
+    monkeypatch.setattr(DataConstants, "market_governor_requests_per_second",
+                        {"dukascopy": 1000, "fxcm": 1000})
+
+    RequestGovernor.reset_governors()
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="02 Mar 2021 00:00",
+                                   data_source="dukascopy", category="fx",
+                                   freq="tick", tickers=["EURUSD"])
+
+    df = DataVendorDukasCopy().download_tick(md_request)
+
+    # The missing hour has no data (rather than being retried)
+    assert stats["requests"] == 24
+    assert 1 < stats["max_in_flight"] <= 4
+    assert len(df.index) == 23
+    assert df.index.is_monotonic_increasing
+    assert df["bid"].iloc[0] == pytest.approx(1.21001)
+
+    # Files which don't exist come back as None (without retrying), unless
+    # we say that means there's no data
+    http_engine = DataVendorDukasCopy().create_async_http_engine("dukascopy")
+
+    assert http_engine.fetch_all([url + "missing.txt"]) == [None]
+    assert http_engine.fetch_all([url + "missing.txt"],
+                                 not_found_content=b"") == [b""]
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021",
+                                   finish_date="02 Mar 2021",
+                                   data_source="fxcm", category="fx",
+                                   freq="tick", tickers=["EURUSD"])
+
+    df = DataVendorFXCM().download_tick(md_request)
+
+    assert list(df.columns) == ["bid", "ask"]
+    assert df.index[0] == pd.Timestamp("2021-03-01 10:00:00.250")
+    assert df["ask"].iloc[1] == pytest.approx(1.21006)
+
+    RequestGovernor.reset_governors()
+
+
+def test_dukascopy_missing_hour(tick_server, tmp_path, monkeypatch):
+    url, stats = tick_server
+
+    monkeypatch.setattr(DataConstants, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "dukascopy_base_url", url)
+    monkeypatch.setattr(DataConstants, "dukascopy_read_temp_tick_disk", False)
+    monkeypatch.setattr(DataConstants, "dukascopy_multithreading", False)
+    monkeypatch.setattr(DataConstants, "market_http_engine",
+                        {"dukascopy": "thread"})
+    monkeypatch.setattr(DataConstants, "market_download_ledger", True)
+    monkeypatch.setattr(DataConstants, "market_governor_requests_per_second",
+                        {"dukascopy": 1000})
+
+    RequestGovernor.reset_governors()
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 03:00",
+                                   finish_date="01 Mar 2021 08:00",
+                                   data_source="dukascopy", category="fx",
+                                   freq="tick", tickers=["EURUSD"])
+
+    try:
+        df = DataVendorDukasCopy().download_tick(md_request)
+    finally:
+        RequestGovernor.reset_governors()
+
+    # The missing hour (404) has no data, so it isn't retried or left in
+    # the ledger as failed
+    assert stats["requests"] == 5
+    assert len(df.index) == 4
+    assert not any((tmp_path / "ledger").iterdir())
+
+
+class FlakyDataVendorDukasCopy(DataVendorDukasCopy):
+    """Fails to download some hours (raising or returning None), counting
+    the downloads for each hour"""
+
+    def __init__(self, fail_hours, none_hours=None):
+        super(FlakyDataVendorDukasCopy, self).__init__()
+
+        self.fail_hours = fail_hours
+        self.none_hours = none_hours if none_hours is not None else {}
+        self.fetch_count = {}
+        self.lock = threading.Lock()
+
+    def fetch_file(self, time, symbol, do_retrieve_df, try_time):
+        with self.lock:
+            self.fetch_count[time.hour] = self.fetch_count.get(time.hour, 0) + 1
+
+            if self.fail_hours.get(time.hour, 0) > 0:
+                self.fail_hours[time.hour] -= 1
+
+                raise Exception("Connection reset")
+
+            if self.none_hours.get(time.hour, 0) > 0:
+                self.none_hours[time.hour] -= 1
+
+                return None
+
+        ticks = [(0, 121005, 121001, 1.5, 2.25)]
+
+        return self.retrieve_df(_create_bi5_payload(ticks), symbol, time)
+
+
+def test_dukascopy_download_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataConstants, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "market_http_engine",
+                        {"dukascopy": "thread"})
+    monkeypatch.setattr(DataConstants, "dukascopy_read_temp_tick_disk", False)
+    monkeypatch.setattr(DataConstants, "market_download_ledger", True)
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="01 Mar 2021 06:00",
+                                   data_source="dukascopy", category="fx",
+                                   freq="tick", tickers=["EURUSD"])
+
+    # Hour 2 fails on every attempt, so the download can't complete
+    monkeypatch.setattr(DataConstants, "market_download_ledger_retries", 1)
+
+    dukascopy = FlakyDataVendorDukasCopy({2: 100})
+
+    df = dukascopy.download_tick(md_request)
+
+    assert len(df.index) == 5
+    assert dukascopy.fetch_count == {h: 1 for h in range(6)}
+
+    # Each date range has its own ledger, so concurrent downloads of the
+    # same ticker don't share one
+    ledger_folder = tmp_path / "ledger" \
+                    / "dukascopy_EURUSD_20210301000000_20210301060000"
+
+    assert (ledger_folder / "manifest.jsonl").exists()
+    assert len((ledger_folder / "manifest.jsonl").read_text()
+               .splitlines()) == 5
+
+    # Rerunning (eg. after a restart) should only download the missing hour
+    # and the ledger is removed once everything has been downloaded
+    dukascopy = FlakyDataVendorDukasCopy({})
+
+    df = dukascopy.download_tick(md_request)
+
+    assert len(df.index) == 6
+    assert df.index.is_monotonic_increasing
+    assert dukascopy.fetch_count == {2: 1}
+    assert not ledger_folder.exists()
+
+    # Retries within a download only fetch the hours which failed
+    monkeypatch.setattr(DataConstants, "market_download_ledger_retries", 3)
+
+    dukascopy = FlakyDataVendorDukasCopy({1: 1, 4: 2})
+
+    download_ledger = dukascopy.create_download_ledger("dukascopy", "EURUSD")
+
+    df_list = download_ledger.download(
+        dukascopy.hour_range(md_request.start_date, md_request.finish_date),
+        fetch_func=lambda t: dukascopy.fetch_file(t, "EURUSD", True, 0),
+        key_func=dukascopy.get_hour_key, thread_no=3, retries=3,
+        retry_sleep=0)
+
+    assert all(df is not None for df in df_list)
+    assert dukascopy.fetch_count == {0: 1, 1: 2, 2: 1, 3: 1, 4: 3, 5: 1}
+
+    # Hours which return None have failed too, so are retried (and not
+    # silently missing from the output)
+    monkeypatch.setattr(DataConstants, "market_download_ledger_retries", 2)
+
+    dukascopy = FlakyDataVendorDukasCopy({}, none_hours={3: 1})
+
+    df = dukascopy.download_tick(md_request)
+
+    assert len(df.index) == 6
+    assert dukascopy.fetch_count == {0: 1, 1: 1, 2: 1, 3: 2, 4: 1, 5: 1}
+    assert not ledger_folder.exists()
+
+
+
+class WindowedDataVendor(DataVendor):
+    """Returns minute bars for each window (including the end of the
+    window), failing the first attempt for some windows and returning None
+    (no data) for others"""
+
+    def __init__(self, fail_days, none_days=None, sleep=0):
+        super(WindowedDataVendor, self).__init__()
+
+        self.fail_days = fail_days
+        self.none_days = none_days if none_days is not None else []
+        self.sleep = sleep
+        self.windows = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def download_intraday(self, md_request):
+        with self.lock:
+            self.in_flight = self.in_flight + 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(self.sleep)
+
+        with self.lock:
+            self.in_flight = self.in_flight - 1
+            self.windows.append((md_request.start_date,
+                                 md_request.finish_date))
+
+            if md_request.start_date.day in self.fail_days:
+                self.fail_days.remove(md_request.start_date.day)
+
+                raise Exception("Request timed out")
+
+            if md_request.start_date.day in self.none_days:
+                self.none_days.remove(md_request.start_date.day)
+
+                return None
+
+        index = pd.date_range(md_request.start_date, md_request.finish_date,
+                              freq="1min")
+
+        return pd.DataFrame({"close": index.minute.astype(float)},
+                            index=index)
+
+
+def test_download_windowed(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataConstants, "temp_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "market_window_size",
+                        {"bloomberg": {"intraday": "1D"}})
+    monkeypatch.setattr(DataConstants, "market_window_retry_sleep", 0)
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="08 Mar 2021 00:00",
+                                   data_source="bloomberg", freq="intraday",
+                                   tickers=["EURUSD"])
+
+    data_vendor = WindowedDataVendor(fail_days=[3, 5])
+
+    df = data_vendor.download_windowed(md_request,
+                                       data_vendor.download_intraday,
+                                       "bloomberg")
+
+    # 7 daily windows, where only the 2 failed windows were downloaded again
+    assert len(data_vendor.windows) == 7 + 2
+    assert sorted(set(data_vendor.windows))[2] == (
+        datetime.datetime(2021, 3, 3), datetime.datetime(2021, 3, 4))
+
+    # Stitched in order, without the overlapping end of each window
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert len(df.index) == 7 * 24 * 60 + 1
+
+    # A window with no data (eg. a weekend) isn't downloaded again
+    data_vendor = WindowedDataVendor(fail_days=[], none_days=[6])
+
+    df = data_vendor.download_windowed(md_request,
+                                       data_vendor.download_intraday,
+                                       "bloomberg")
+
+    assert len(data_vendor.windows) == 7
+
+    # Missing 6 Mar, apart from its first minute (the end of 5 Mar's window)
+    assert len(df.index) == 7 * 24 * 60 + 1 - (24 * 60 - 1)
+
+    # The ledger isn't written to disk by default
+    assert not (tmp_path / "ledger").exists()
+
+    # Otherwise a window which keeps failing is kept in a ledger for the
+    # date range of the request
+    monkeypatch.setattr(DataConstants, "market_download_ledger", True)
+    monkeypatch.setattr(DataConstants, "market_window_retries", 1)
+
+    data_vendor = WindowedDataVendor(fail_days=[4])
+
+    df = data_vendor.download_windowed(md_request,
+                                       data_vendor.download_intraday,
+                                       "bloomberg")
+
+    # Missing 4 Mar, apart from its first minute (the end of 3 Mar's window)
+    assert len(df.index) == 7 * 24 * 60 + 1 - (24 * 60 - 1)
+
+    ledger_folder, = list((tmp_path / "ledger").iterdir())
+
+    assert ledger_folder.name.endswith("_20210301000000_20210308000000")
+
+    df = data_vendor.download_windowed(md_request,
+                                       data_vendor.download_intraday,
+                                       "bloomberg")
+
+    assert len(data_vendor.windows) == 7 + 1
+    assert len(df.index) == 7 * 24 * 60 + 1
+    assert not ledger_folder.exists()
+
+    # Short requests are sent as they are
+    data_vendor = WindowedDataVendor(fail_days=[])
+
+    md_request.finish_date = "01 Mar 2021 12:00"
+
+    data_vendor.download_windowed(md_request, data_vendor.download_intraday,
+                                  "bloomberg")
+
+    assert len(data_vendor.windows) == 1
+
+
+def test_download_windowed_governor(monkeypatch):
+    monkeypatch.setattr(DataConstants, "market_window_size",
+                        {"bloomberg": {"intraday": "1D"}})
+    monkeypatch.setattr(DataConstants, "market_thread_no",
+                        {"bloomberg": 4, "other": 4})
+    monkeypatch.setattr(DataConstants, "market_governor_max_in_flight",
+                        {"bloomberg": 2})
+
+    RequestGovernor.reset_governors()
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="08 Mar 2021 00:00",
+                                   data_source="bloomberg", freq="intraday",
+                                   tickers=["EURUSD"])
+
+    data_vendor = WindowedDataVendor(fail_days=[], sleep=0.2)
+
+    try:
+        df = data_vendor.download_windowed(md_request,
+                                           data_vendor.download_intraday,
+                                           "bloomberg")
+
+        stats = RequestGovernor.get_governor("bloomberg").get_stats()
+    finally:
+        RequestGovernor.reset_governors()
+
+    # Each window holds a request from the governor, so the window threads
+    # can't make more requests than the governor allows
+    assert stats["requests"] == 7
+    assert data_vendor.max_in_flight == 2
+    assert len(df.index) == 7 * 24 * 60 + 1
+
+
+class FakeKlines(object):
+    """Returns 1 minute Binance klines for the window in a URL, failing the
+    first request for some windows
+    """
+
+    def __init__(self, fail_no=1):
+        self.urls = []
+        self.fail_no = fail_no
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        params = dict(p.split("=") for p in url.split("?")[1].split("&"))
+
+        with self.lock:
+            self.urls.append(url)
+
+            if self.fail_no > 0:
+                self.fail_no = self.fail_no - 1
+
+                raise Exception("HTTP Error 429: Too Many Requests")
+
+        start, end = int(params["startTime"]), int(params["endTime"])
+
+        open_times = list(range(start, end + 1, 60 * 1000))[
+                     :int(params["limit"])]
+
+        return pd.DataFrame([[t, 1.0, 2.0, 0.5, t / 1e12, 10.0, t + 59999,
+                              1.0, 5, 1.0, 1.0, 0] for t in open_times])
+
+
+def test_crypto_paged_klines(monkeypatch):
+    monkeypatch.setattr(DataConstants, "market_governor_backoff_seconds", 0)
+    monkeypatch.setattr(DataConstants, "market_governor_requests_per_second",
+                        {"binance": 1000})
+
+    fake_klines = FakeKlines(fail_no=1)
+    monkeypatch.setattr(pd, "read_json", fake_klines)
+
+    RequestGovernor.reset_governors()
+
+    md_request = MarketDataRequest(start_date="01 Mar 2021 00:00",
+                                   finish_date="03 Mar 2021 23:59",
+                                   data_source="binance", freq="intraday",
+                                   tickers=["BTCUSDT"],
+                                   vendor_tickers=["BTCUSDT"],
+                                   fields=["close"], vendor_fields=["close"])
+
+    try:
+        df = DataVendorBinance().load_ticker(md_request)
+    finally:
+        RequestGovernor.reset_governors()
+
+    # Page windows are computed up front (3 days of minutes in pages of
+    # 1000), with the throttled page retried
+    assert len(fake_klines.urls) == 5 + 1
+    assert len(set(fake_klines.urls)) == 5
+
+    assert list(df.columns) == ["BTCUSDT.close"]
+    assert len(df.index) == 3 * 24 * 60
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert df.index[0] == pd.Timestamp("01 Mar 2021 00:00")
+    assert df.index[-1] == pd.Timestamp("03 Mar 2021 23:59")
+
+
+if __name__ == '__main__':
+    pytest.main()
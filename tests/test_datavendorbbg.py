@@ -0,0 +1,409 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+import threading
+import time
+import types
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from findatapy.market import MarketDataRequest
+from findatapy.market import datavendorbbg
+from findatapy.market.datavendorbbg import BBGLowLevelDaily, \
+    BBGLowLevelIntraday, BBGSessionManager, ColumnarBlock
+from findatapy.util import DataConstants
+
+###############################################################################
+# Local fake of the parts of blpapi we use, which returns daily data for any
+# security, interleaving the responses for the requests in flight
+
+
+class FakeName(str):
+    pass
+
+
+class FakeEventType(object):
+    PARTIAL_RESPONSE = 6
+    RESPONSE = 5
+    SESSION_STATUS = 2
+    TIMEOUT = 10
+
+
+class FakeCorrelationId(object):
+    def __init__(self, value=None):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+
+class FakeElement(object):
+    def __init__(self, name, value=None, elements=None, values=None):
+        self._name = FakeName(name)
+        self._value = value
+        self._elements = elements or []
+        self._values = values or []
+
+    def name(self):
+        return self._name
+
+    def getElement(self, key):
+        if isinstance(key, int):
+            return self._elements[key]
+
+        return [e for e in self._elements if e.name() == key][0]
+
+    def hasElement(self, key):
+        return any(e.name() == key for e in self._elements)
+
+    def numElements(self):
+        return len(self._elements)
+
+    def numValues(self):
+        return len(self._values)
+
+    def getValue(self, i=None):
+        if i is None:
+            return self._value
+
+        return self._values[i]
+
+    def values(self):
+        return self._values
+
+    def getElementAsFloat(self, key):
+        return float(self.getElement(key).getValue())
+
+    def getElementAsInteger(self, key):
+        return int(self.getElement(key).getValue())
+
+    def getElementAsDatetime(self, key):
+        return self.getElement(key).getValue()
+
+
+class FakeMessage(FakeElement):
+    def __init__(self, cid, message_type, elements=None):
+        super(FakeMessage, self).__init__(message_type, elements=elements)
+
+        self._cid = cid
+
+    def correlationIds(self):
+        return [self._cid]
+
+    def messageType(self):
+        return self.name()
+
+
+class FakeEvent(object):
+    def __init__(self, event_type, messages):
+        self._event_type = event_type
+        self._messages = messages
+
+    def eventType(self):
+        return self._event_type
+
+    def __iter__(self):
+        return iter(self._messages)
+
+
+class FakeRequestElement(object):
+    def __init__(self):
+        self.values = []
+
+    def appendValue(self, value):
+        self.values.append(value)
+
+    def appendElement(self):
+        element = FakeRequestElement()
+        element.setElement = lambda k, v: None
+
+        return element
+
+
+class FakeRequest(object):
+    def __init__(self, name):
+        self.name = name
+        self.elements = {}
+
+    def set(self, key, value):
+        self.elements[key] = value
+
+    def getElement(self, key):
+        return self.elements.setdefault(key, FakeRequestElement())
+
+
+class FakeService(object):
+    def createRequest(self, name):
+        return FakeRequest(name)
+
+
+class FakeSession(object):
+    started = 0
+    services_opened = 0
+    max_in_flight = 0
+
+    # Terminate the session after this many more responses
+    terminate_after = None
+
+    def __init__(self, options=None):
+        self._lock = threading.Lock()
+        self._responses = []
+
+    def start(self):
+        FakeSession.started = FakeSession.started + 1
+
+        return True
+
+    def openService(self, name):
+        FakeSession.services_opened = FakeSession.services_opened + 1
+
+        return True
+
+    def getService(self, name):
+        return FakeService()
+
+    def sendRequest(self, request=None, correlationId=None):
+        if request.name == "IntradayBarRequest":
+            messages = self._create_bar_messages(request, correlationId)
+        else:
+            messages = self._create_daily_messages(request, correlationId)
+
+        with self._lock:
+            self._responses.append(messages)
+
+            FakeSession.max_in_flight = max(FakeSession.max_in_flight,
+                                            len(self._responses))
+
+    def _create_bar_messages(self, request, correlationId):
+        start = request.elements["startDateTime"]
+
+        bars = [FakeElement("barTickData", elements=[
+            FakeElement("time", value=start + datetime.timedelta(minutes=i))]
+            + [FakeElement(f, value=i + k) for k, f in enumerate(
+            ["open", "high", "low", "close", "volume", "numEvents"])])
+                for i in range(2500)]
+
+        # Split into several (partial) responses
+        return [FakeMessage(correlationId, "IntradayBarResponse", elements=[
+            FakeElement("barData", elements=[
+                FakeElement("barTickData", values=bars[i:i + 1000])])])
+                for i in range(0, len(bars), 1000)]
+
+    def _create_daily_messages(self, request, correlationId):
+        start = datetime.datetime.strptime(request.elements["startDate"],
+                                           "%Y%m%d")
+        dates = [start + datetime.timedelta(days=i) for i in range(5)]
+
+        messages = []
+
+        # One message (ie. response) for each security
+        for security in request.getElement("securities").values:
+            rows = [FakeElement("fieldData", elements=[
+                FakeElement("date", value=d)] + [
+                FakeElement(f, value=get_fake_value(security, d))
+                for f in request.getElement("fields").values])
+                for d in dates]
+
+            messages.append(FakeMessage(correlationId, "HistoricalDataResponse",
+                                        elements=[FakeElement(
+                                            "securityData", elements=[
+                                                FakeElement("security",
+                                                            value=security),
+                                                FakeElement("fieldData",
+                                                            values=rows)])]))
+
+        return messages
+
+    def nextEvent(self, timeout=0):
+        with self._lock:
+            if FakeSession.terminate_after is not None and self._responses:
+                FakeSession.terminate_after -= 1
+
+                if FakeSession.terminate_after < 0:
+                    FakeSession.terminate_after = None
+                    self._responses = []
+
+                    return FakeEvent(FakeEventType.SESSION_STATUS, [
+                        FakeMessage(None, "SessionTerminated")])
+
+            if self._responses:
+                # Interleave the responses to the requests in flight
+                messages = self._responses.pop(0)
+                msg = messages.pop(0)
+
+                if messages:
+                    self._responses.append(messages)
+
+                    return FakeEvent(FakeEventType.PARTIAL_RESPONSE, [msg])
+
+                return FakeEvent(FakeEventType.RESPONSE, [msg])
+
+        time.sleep(0.01)
+
+        return FakeEvent(FakeEventType.TIMEOUT, [])
+
+    def stop(self):
+        pass
+
+
+class FakeSessionOptions(object):
+    def setServerHost(self, host):
+        pass
+
+    def setServerPort(self, port):
+        pass
+
+
+def get_fake_value(security, date):
+    return float(sum(map(ord, security)) + date.day)
+
+
+@pytest.fixture
+def fake_blpapi(monkeypatch):
+    fake = types.SimpleNamespace(Name=FakeName, Event=FakeEventType,
+                                 CorrelationId=FakeCorrelationId,
+                                 Session=FakeSession,
+                                 SessionOptions=FakeSessionOptions)
+
+    monkeypatch.setattr(datavendorbbg, "blpapi", fake, raising=False)
+
+    FakeSession.started = 0
+    FakeSession.services_opened = 0
+    FakeSession.max_in_flight = 0
+    FakeSession.terminate_after = None
+
+    BBGSessionManager.shutdown_session_manager()
+
+    yield fake
+
+    BBGSessionManager.shutdown_session_manager()
+
+###############################################################################
+
+
+def _create_md_request(tickers):
+    return MarketDataRequest(start_date="04 Jan 2021",
+                             finish_date="08 Jan 2021",
+                             tickers=tickers, fields=["PX_LAST"],
+                             data_source="bloomberg")
+
+
+def _check_daily(df, tickers):
+    assert len(df.index) == 5
+
+    for t in tickers:
+        assert [get_fake_value(t, d) for d in df.index] \
+               == list(df[("PX_LAST", t)].values)
+
+
+def test_bbg_pooled_sessions(fake_blpapi, monkeypatch):
+    monkeypatch.setattr(DataConstants, "bbg_session_pool_size", 2)
+
+    tickers_list = [[f"TICKER{i}{j} Curncy" for j in range(3)]
+                    for i in range(8)]
+
+    df_list = [None] * len(tickers_list)
+
+    def load(i):
+        df_list[i] = BBGLowLevelDaily().load_time_series(
+            _create_md_request(tickers_list[i]))
+
+    threads = [threading.Thread(target=load, args=(i,))
+               for i in range(len(tickers_list))]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    # Sessions are reused (with refdata already open) and requests are
+    # multiplexed on them
+    assert FakeSession.started <= 2
+    assert FakeSession.services_opened == FakeSession.started
+    assert FakeSession.max_in_flight > 1
+
+    for df, tickers in zip(df_list, tickers_list):
+        _check_daily(df, tickers)
+
+
+def test_bbg_pooled_session_terminated(fake_blpapi):
+    tickers = ["EURUSD Curncy", "USDJPY Curncy"]
+
+    _check_daily(BBGLowLevelDaily().load_time_series(
+        _create_md_request(tickers)), tickers)
+
+    # Session is terminated after the first partial response, so the request
+    # is sent again on a new session
+    FakeSession.terminate_after = 1
+
+    _check_daily(BBGLowLevelDaily().load_time_series(
+        _create_md_request(tickers)), tickers)
+
+    assert FakeSession.started == 2
+
+
+
+def test_columnar_block():
+    block = ColumnarBlock(capacity=2)
+
+    dates = pd.date_range("01 Jan 2021", periods=5)
+
+    # Grows past its capacity, with missing fields as NaN and
+    # non-numerical fields as objects
+    for i, d in enumerate(dates):
+        row = block.add_row(d.to_pydatetime().date())
+        block.set("PX_LAST", row, float(i))
+
+        if i % 2 == 0:
+            block.set("PX_OPEN", row, i)
+
+        if i == 3:
+            block.set("NAME", row, "EURUSD")
+
+    df = block.to_data_frame()
+
+    assert list(df.index) == list(dates)
+    assert list(df["PX_LAST"]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(df["PX_OPEN"].iloc[1])
+    assert df["NAME"].iloc[3] == "EURUSD" and pd.isna(df["NAME"].iloc[0])
+
+
+def test_bbg_intraday_columnar(fake_blpapi):
+    md_request = MarketDataRequest(start_date="04 Jan 2021 00:00",
+                                   finish_date="06 Jan 2021 00:00",
+                                   tickers=["EURUSD Curncy"],
+                                   freq="intraday",
+                                   data_source="bloomberg")
+
+    df = BBGLowLevelIntraday().load_time_series(md_request)
+
+    # Partial responses are appended into the same columnar builder
+    assert len(df.index) == 2500
+    assert df.index[0] == pd.Timestamp("04 Jan 2021 00:00")
+    assert df.index.is_monotonic_increasing
+    assert list(df.columns) == ["open", "high", "low", "close", "volume",
+                                "events"]
+    assert df["volume"].dtype == np.int64
+    assert list(df.iloc[1999]) == [1999, 2000, 2001, 2002, 2003, 2004]
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -18,9 +18,12 @@ __author__ = "saeedamen"  # Saeed Amen
 import pytest
 import pandas as pd
 
-from findatapy.market.ioengine import IOEngine
+from findatapy.market.ioengine import IOEngine, SpeedCache, \
+    ArcticDBConnectionManager, RedisConnectionManager
 
+from findatapy.market import MarketDataRequest
 from findatapy.util.dataconstants import DataConstants
+from findatapy.util.loggermanager import LoggerManager
 
 data_constants = DataConstants()
 
@@ -48,6 +51,285 @@ def test_redis_caching():
 
         pd.testing.assert_frame_equal(df, df_out)
 
+def test_redis_chunked_caching():
+    # Note: you need to install Redis in order for this to work!
+    df = pd.read_csv("S&P500.csv", parse_dates=['Date'], index_col=['Date'])
+    df.index = pd.to_datetime(df.index)
+
+    io = IOEngine()
+
+    # Force the DataFrame to be split into several chunks/keys in Redis
+    r = io._get_redis_client(redis_server, redis_port, 10)
+    io._write_redis_chunked(r, 'test_chunked_key', df, chunk_size_mb=0.01)
+
+    df_out = io.read_time_series_cache_from_disk('test_chunked_key', engine='redis', db_server=redis_server,
+                                                 db_port=redis_port)
+
+    pd.testing.assert_frame_equal(df, df_out)
+
+    # Only chunks overlapping the dates should be read and then trimmed
+    df_out = io.read_time_series_cache_from_disk('test_chunked_key', engine='redis', db_server=redis_server,
+                                                 db_port=redis_port, start_date='01 Jan 2010',
+                                                 finish_date='31 Dec 2010')
+
+    pd.testing.assert_frame_equal(df.loc['2010-01-01':'2010-12-31'], df_out)
+
+    io.remove_time_series_cache_on_disk('test_chunked_key', engine='redis', db_server=redis_server,
+                                        db_port=redis_port)
+
+    assert not io.exists_time_series_cache_on_disk('test_chunked_key', engine='redis', db_server=redis_server,
+                                                   db_port=redis_port)
+
+
+def test_redis_connection_reuse(monkeypatch):
+    import redis
+
+    RedisConnectionManager.close_all()
+
+    # Connection errors are caught, so we shouldn't PING before every
+    # read/write
+    pings = []
+    monkeypatch.setattr(redis.Redis, "ping", lambda self, **kwargs: pings.append(1))
+
+    io = IOEngine()
+
+    df = pd.DataFrame({"EURUSD.close": [1.0, 2.0, 3.0]},
+                      index=pd.bdate_range("01 Jan 2021", periods=3))
+
+    for i in range(10):
+        io.write_time_series_cache_to_disk('test_pool_key', df, engine='redis', db_server=redis_server,
+                                           db_port=redis_port)
+        io.read_time_series_cache_from_disk('test_pool_key', engine='redis', db_server=redis_server,
+                                            db_port=redis_port)
+
+    pd.testing.assert_frame_equal(df, io.read_time_series_cache_from_disk(
+        'test_pool_key', engine='redis', db_server=redis_server, db_port=redis_port), check_freq=False)
+
+    assert pings == []
+
+    # Every call shares one pool, which only needed a single connection
+    assert len(RedisConnectionManager._connection_pools) == 1
+
+    connection_pool = list(RedisConnectionManager._connection_pools.values())[0]
+
+    assert connection_pool._created_connections == 1
+    assert RedisConnectionManager.get_client(redis_server, redis_port).connection_pool is connection_pool
+
+    RedisConnectionManager.close_all()
+
+
+def test_redis_batch_get_put(monkeypatch):
+    import redis
+
+    round_trips = []
+
+    execute = redis.client.Pipeline.execute
+
+    def counting_execute(self, *args, **kwargs):
+        round_trips.append(len(self.command_stack))
+
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(redis.client.Pipeline, "execute", counting_execute)
+
+    speed_cache = SpeedCache(db_cache_server=redis_server, db_cache_port=redis_port, memory_size_mb=0)
+
+    df_dict = {f"test_batch_key_{i}": pd.DataFrame(
+        {"EURUSD.close": [float(i), 2.0]}, index=pd.bdate_range("01 Jan 2021", periods=2)) for i in range(5)}
+
+    speed_cache.put_dataframes(df_dict, meta_data_dict={k: {"i": i} for i, k in enumerate(df_dict.keys())})
+
+    # Written with one MSET in a single round trip
+    assert len(round_trips) == 1
+
+    keys = list(df_dict.keys()) + ["test_batch_key_missing"]
+
+    df_list = speed_cache.get_dataframes(keys)
+
+    # Read with MGETs in a single round trip
+    assert len(round_trips) == 2
+
+    for k, df_out in zip(keys, df_list[:-1]):
+        pd.testing.assert_frame_equal(df_dict[k], df_out, check_freq=False)
+
+    assert df_list[-1] is None
+    assert speed_cache.get_meta_data("test_batch_key_3") == {"i": 3}
+
+
+def test_redis_key_index(monkeypatch):
+    import redis
+
+    commands = []
+
+    execute = redis.client.Pipeline.execute
+
+    def recording_execute(self, *args, **kwargs):
+        commands.extend(c[0][0].upper() for c in self.command_stack)
+
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(redis.client.Pipeline, "execute", recording_execute)
+
+    io = IOEngine()
+
+    df = pd.DataFrame({"EURUSD.close": [1.0, 2.0, 3.0]},
+                      index=pd.bdate_range("01 Jan 2021", periods=3))
+
+    key_list = ['test_index_daily_a', 'test_index_daily_b', 'test_index_intraday_a']
+
+    for k in key_list:
+        io.write_time_series_cache_to_disk(k, df, engine='redis', db_server=redis_server, db_port=redis_port)
+
+    # A key written before the index existed
+    r = io._get_redis_client(redis_server, redis_port, 10)
+    r.set('test_index_legacy', b'legacy')
+
+    # Keys are listed from our index (with SSCAN), so the older key isn't
+    assert set(io.list_time_series_cache_keys(match='test_index_*', db_server=redis_server,
+                                              db_port=redis_port)) == set(key_list)
+
+    # Delete by pattern, with UNLINK rather than DEL
+    commands.clear()
+
+    io.remove_time_series_cache_on_disk('test_index_daily_*', engine='redis', db_server=redis_server,
+                                        db_port=redis_port)
+
+    assert 'UNLINK' in commands and 'DEL' not in commands
+
+    for k in key_list:
+        assert io.exists_time_series_cache_on_disk(k, engine='redis', db_server=redis_server,
+                                                   db_port=redis_port) == ('intraday' in k)
+
+    assert list(io.list_time_series_cache_keys(match='test_index_*', db_server=redis_server,
+                                               db_port=redis_port)) == ['test_index_intraday_a']
+
+    # flush_all_keys removes every key in the index, but not keys written
+    # before the index (which can still be removed by their exact name)
+    io.remove_time_series_cache_on_disk('flush_all_keys', engine='redis', db_server=redis_server,
+                                        db_port=redis_port)
+
+    assert list(io.list_time_series_cache_keys(db_server=redis_server, db_port=redis_port)) == []
+    assert not io.exists_time_series_cache_on_disk('test_index_intraday_a', engine='redis',
+                                                   db_server=redis_server, db_port=redis_port)
+    assert r.get('test_index_legacy') == b'legacy'
+
+    io.remove_time_series_cache_on_disk('test_index_legacy', engine='redis', db_server=redis_server,
+                                        db_port=redis_port)
+
+    assert r.get('test_index_legacy') is None
+
+
+def test_arrow_caching(tmp_path):
+    # Note: you need to install Redis in order for this to work!
+    df = pd.read_csv("S&P500.csv", parse_dates=['Date'], index_col=['Date'])
+    df.index = pd.to_datetime(df.index)
+
+    io = IOEngine()
+    r = io._get_redis_client(redis_server, redis_port, 10)
+
+    # Arrow IPC buffers in Redis, either uncompressed or LZ4 for each key
+    for u in [True, False]:
+        io.write_time_series_cache_to_disk('test_arrow_key', df, engine='redis', db_server=redis_server,
+                                           db_port=redis_port, use_cache_compression=u, cache_format='arrow')
+
+        key = 'comp_test_arrow_key' if u else 'test_arrow_key'
+
+        assert r.get(key)[:6] == b'ARROW1'
+        assert r.exists('test_arrow_key') + r.exists('comp_test_arrow_key') == 1
+
+        df_out = io.read_time_series_cache_from_disk('test_arrow_key', engine='redis', db_server=redis_server,
+                                                     db_port=redis_port)
+
+        pd.testing.assert_frame_equal(df, df_out)
+
+    io.remove_time_series_cache_on_disk('test_arrow_key', engine='redis', db_server=redis_server,
+                                        db_port=redis_port)
+
+    # Memory mapped Arrow IPC files, with metadata in the schema
+    speed_cache = SpeedCache(engine=f'arrow:{tmp_path}', memory_size_mb=0)
+    speed_cache.put_dataframe('folder/test_arrow_file', df, meta_data={'source': 'S&P500.csv'})
+
+    assert (tmp_path / 'folder_test_arrow_file.arrow').exists()
+    assert speed_cache.exists_key('folder/test_arrow_file')
+
+    df_out, meta_data = speed_cache.get_dataframe_and_meta_data('folder/test_arrow_file')
+
+    pd.testing.assert_frame_equal(df, df_out)
+    assert meta_data == {'source': 'S&P500.csv'}
+    assert speed_cache.get_meta_data('folder/test_arrow_file') == meta_data
+
+    # Keys from a MarketDataRequest are longer than the max file name
+    md_request = MarketDataRequest(start_date='01 Jan 2021', finish_date='31 Jan 2021',
+                                   data_source='bloomberg', category='fx', tickers=['EURUSD'])
+
+    key = md_request.generate_key()
+
+    assert len(key) > 255
+
+    speed_cache.put_dataframe(key, df)
+
+    assert speed_cache.exists_key(key)
+    pd.testing.assert_frame_equal(df, speed_cache.get_dataframe(key))
+    assert all(len(f.name) <= 255 for f in tmp_path.iterdir())
+
+
+def test_arcticdb_batch(tmp_path):
+    io = IOEngine()
+
+    engine = f"arcticdb:lmdb://{str(tmp_path)}"
+    tickers = ["EURUSD", "USDJPY", "GBPUSD"]
+
+    index = pd.date_range("04 Jan 2021", periods=100, freq="1min")
+
+    df_dict = {f"intraday.{t}": pd.DataFrame(
+        {f"{t}.close": range(100), f"{t}.open": range(100)},
+        index=index).astype("float64") for t in tickers}
+
+    for library in [None, "intraday"]:
+        arcticdb_dict = {"library": library}
+
+        io.write_time_series_cache_batch_to_disk(
+            df_dict, engine=engine, arcticdb_dict=arcticdb_dict)
+
+        # Append the next hour to every symbol
+        index_new = index + pd.Timedelta(minutes=100)
+
+        io.write_time_series_cache_batch_to_disk(
+            {k: df.set_axis(index_new) for k, df in df_dict.items()},
+            engine=engine,
+            arcticdb_dict={"library": library, "write_style": "append"})
+
+        # Different date range/columns for each symbol
+        fname_list = list(df_dict.keys()) + ["intraday.missing"]
+
+        df_list = io.read_time_series_cache_batch_from_disk(
+            fname_list, engine=engine,
+            start_date={"intraday.EURUSD": index[10]},
+            finish_date={"intraday.EURUSD": index_new[-1]},
+            columns={f: [f"{t}.close"] for f, t in zip(fname_list, tickers)},
+            arcticdb_dict=arcticdb_dict)
+
+        assert df_list[3] is None
+        assert len(df_list[0].index) == 190
+        assert len(df_list[1].index) == 200
+        assert list(df_list[1].columns) == ["USDJPY.close"]
+
+        assert io.read_last_time_series_date_from_disk(
+            "intraday.GBPUSD", engine=engine,
+            arcticdb_dict=arcticdb_dict) == index_new[-1]
+
+    # Connection and libraries are reused
+    assert len(ArcticDBConnectionManager._connections) == 1
+
+    io.remove_time_series_cache_on_disk("intraday.EURUSD", engine=engine,
+                                        arcticdb_dict={"library": "intraday"})
+
+    assert io.read_time_series_cache_batch_from_disk(
+        ["intraday.EURUSD"], engine=engine,
+        arcticdb_dict={"library": "intraday"}) == [None]
+
+    ArcticDBConnectionManager.close_all()
+
 
 def test_path_join():
 
@@ -266,5 +548,207 @@ def test_timezone_independence():
             os.remove(temp_file)
 
 
+def test_update_time_series_cache_on_disk(tmp_path):
+    io = IOEngine()
+
+    index = pd.bdate_range("01 Jan 2021", "29 Jan 2021")
+    df = pd.DataFrame({"EURUSD.close": 1.0, "USDJPY.close": 100.0}, index=index)
+
+    for engine, fname in [("parquet", "daily.parquet"), ("hdf5_table", "daily.h5")]:
+        fname = str(tmp_path / fname)
+
+        io.update_time_series_cache_on_disk(fname, df, engine=engine)
+
+        assert io.read_last_time_series_date_from_disk(fname, engine=engine) == index[-1]
+
+        # Revise the last week and append new dates, for only one of the columns
+        index_new = pd.bdate_range("25 Jan 2021", "05 Feb 2021")
+        df_new = pd.DataFrame({"EURUSD.close": 2.0}, index=index_new)
+
+        io.update_time_series_cache_on_disk(fname, df_new, engine=engine)
+
+        df_out = io.read_time_series_cache_from_disk(fname, engine=engine)
+
+        assert io.read_last_time_series_date_from_disk(fname, engine=engine) == index_new[-1]
+        assert list(df_out.columns) == ["EURUSD.close", "USDJPY.close"]
+        assert len(df_out.index) == len(index.union(index_new))
+        assert (df_out.loc[:"22 Jan 2021", "EURUSD.close"] == 1.0).all()
+        assert (df_out.loc["25 Jan 2021":, "EURUSD.close"] == 2.0).all()
+        assert (df_out.loc[:"29 Jan 2021", "USDJPY.close"] == 100.0).all()
+
+        # USDJPY lags behind EURUSD, and GBPUSD isn't stored
+        assert io.read_last_time_series_dates_from_disk(
+            fname, ["EURUSD.close", "USDJPY.close", "GBPUSD.close"], engine=engine) == \
+               {"EURUSD.close": index_new[-1], "USDJPY.close": index[-1], "GBPUSD.close": None}
+
+
+def test_read_parquet_pushdown(tmp_path, monkeypatch):
+    import numpy as np
+    import pyarrow.dataset as pds
+
+    monkeypatch.setattr(DataConstants, "parquet_row_group_size", 250)
+
+    io = IOEngine()
+
+    index = pd.bdate_range("01 Jan 2011", "31 Dec 2020", name="Date")
+    df = pd.DataFrame(np.random.randn(len(index), 300), index=index,
+                      columns=[f"T{i}.close" for i in range(300)])
+
+    fname = str(tmp_path / "backtest.fx.flat.daily.NYC.parquet")
+    io.to_parquet(df, fname)
+
+    # Missing columns are ignored
+    df_out = io.read_parquet(fname, columns=["T7.close", "MISSING.close"],
+                             start_date="01 Mar 2015",
+                             finish_date="31 Mar 2015")
+
+    pd.testing.assert_frame_equal(df.loc["2015-03-01":"2015-03-31", ["T7.close"]],
+                                  df_out, check_freq=False,
+                                  check_index_type=False)
+
+    # Only the row group(s) overlapping the dates need to be read
+    fragment = list(pds.dataset(fname).get_fragments())[0]
+    row_groups = fragment.split_by_row_group(
+        io._get_parquet_date_filter(fragment.physical_schema, "Date",
+                                    "01 Mar 2015", "31 Mar 2015"))
+
+    assert fragment.num_row_groups > 10 and len(row_groups) <= 2
+
+    # If none of the columns are in the file, every column is read
+    df_out = io.read_time_series_cache_from_disk(fname, engine="parquet",
+                                                 columns=["MISSING.close"],
+                                                 start_date="01 Mar 2015",
+                                                 finish_date="31 Mar 2015")
+
+    assert df_out.shape == (22, 300)
+
+
+def test_parquet_dataset(tmp_path, monkeypatch):
+    import numpy as np
+
+    monkeypatch.setattr(DataConstants, "parquet_dataset_compact_files", 4)
+
+    io = IOEngine()
+    engine = f"parquet_dataset:{tmp_path}"
+
+    index = pd.date_range("01 Nov 2020", "31 Mar 2021 23:00", freq="h")
+    df = pd.DataFrame({"EURUSD.bid": np.arange(len(index), dtype=float),
+                       "EURUSD.ask": 1.0, "USDJPY.close": 2.0}, index=index)
+
+    io.write_time_series_cache_to_disk("backtest.fx.tick", df, engine=engine)
+
+    path = tmp_path / "backtest.fx.tick"
+
+    assert (path / "ticker=EURUSD" / "year=2020" / "month=11").is_dir()
+    assert (path / "ticker=USDJPY" / "year=2021" / "month=3").is_dir()
+
+    # Partitions outside the dates/tickers requested are never opened
+    for f in (path / "ticker=EURUSD" / "year=2020").rglob("*.parquet"):
+        f.write_bytes(b"corrupt")
+
+    df_out = io.read_time_series_cache_from_disk(
+        "backtest.fx.tick", engine=engine, columns=["EURUSD.bid"],
+        start_date="15 Jan 2021", finish_date="20 Feb 2021 05:00")
+
+    pd.testing.assert_frame_equal(
+        df.loc["15 Jan 2021":"20 Feb 2021 05:00", ["EURUSD.bid"]], df_out,
+        check_freq=False, check_index_type=False, check_names=False)
+
+    # Revisions only rewrite the partitions touched
+    df_new = pd.DataFrame({"EURUSD.bid": -1.0}, index=pd.date_range(
+        "30 Mar 2021", "02 Apr 2021", freq="h"))
+
+    io.update_time_series_cache_on_disk("backtest.fx.tick", df_new,
+                                        engine=engine)
+
+    assert io.read_last_time_series_date_from_disk(
+        "backtest.fx.tick", engine=engine) == pd.Timestamp("02 Apr 2021")
+
+    # ...but USDJPY still ends earlier
+    assert io.read_last_time_series_dates_from_disk(
+        "backtest.fx.tick", ["EURUSD.bid", "USDJPY.close"], engine=engine) \
+           == {"EURUSD.bid": pd.Timestamp("02 Apr 2021"),
+               "USDJPY.close": pd.Timestamp("31 Mar 2021 23:00")}
+
+    df_out = io.read_time_series_cache_from_disk(
+        "backtest.fx.tick", engine=engine, start_date="01 Mar 2021")
+
+    assert df_out.index.is_unique
+    assert (df_out.loc["30 Mar 2021":, "EURUSD.bid"] == -1.0).all()
+    assert (df_out.loc[:"29 Mar 2021", "EURUSD.ask"] == 1.0).all()
+    assert (df_out.loc[:"31 Mar 2021", "USDJPY.close"] == 2.0).all()
+
+    # Small appended files are compacted in the background
+    for i in range(5):
+        io.write_time_series_cache_to_disk(
+            "backtest.fx.tick", pd.DataFrame(
+                {"EURUSD.bid": float(i), "EURUSD.ask": 1.0},
+                index=[pd.Timestamp("05 Apr 2021") + pd.Timedelta(hours=i)]),
+            engine=engine, append_data=True)
+
+    IOEngine.wait_for_compaction()
+
+    assert len(list((path / "ticker=EURUSD" / "year=2021" / "month=4")
+                    .glob("*.parquet"))) < 6
+
+    df_out = io.read_time_series_cache_from_disk(
+        "backtest.fx.tick", engine=engine, start_date="05 Apr 2021")
+
+    assert list(df_out["EURUSD.bid"]) == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_parquet_dataset_concurrent_read(tmp_path, monkeypatch):
+    import threading
+
+    io = IOEngine()
+
+    path = str(tmp_path / "backtest.fx.tick")
+
+    for r in range(5):
+        index = pd.date_range(pd.Timestamp("01 Apr 2021")
+                              + pd.DateOffset(months=r), periods=20, freq="h")
+
+        for i in range(20):
+            io.write_parquet_dataset(
+                pd.DataFrame({"EURUSD.bid": float(i)}, index=index[i:i + 1]),
+                path, mode="append", compact=False)
+
+        # Readers never see the compacted file alongside the files it
+        # replaces (or files which have just been deleted)
+        compaction = threading.Thread(
+            target=io.compact_parquet_dataset, args=(path,),
+            kwargs={"min_files": 2})
+        compaction.start()
+
+        while compaction.is_alive():
+            df_out = io.read_parquet_dataset(path, start_date=index[0],
+                                             finish_date=index[-1])
+
+            assert df_out.index.is_unique
+            assert len(df_out.index) == 20
+
+        compaction.join()
+
+    # Failures in background compaction are logged
+    def compact_parquet_dataset(self, *args, **kwargs):
+        raise Exception("Disk full")
+
+    warnings = []
+
+    class RecordingLogger(object):
+        def warning(self, msg):
+            warnings.append(msg)
+
+    monkeypatch.setattr(IOEngine, "compact_parquet_dataset",
+                        compact_parquet_dataset)
+    monkeypatch.setattr(LoggerManager, "getLogger",
+                        lambda *args: RecordingLogger())
+
+    io._submit_compaction(path, "snappy")
+    IOEngine.wait_for_compaction()
+
+    assert any("Disk full" in w for w in warnings)
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,723 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import threading
+import time
+
+from findatapy.market import Market, MarketDataRequest, MarketDataGenerator, \
+    FXCrossFactory
+from findatapy.market.ioengine import SpeedCache
+from findatapy.util.cachemanager import MemoryCache
+from findatapy.util.dataconstants import DataConstants
+from findatapy.util.governor import RequestGovernor
+from findatapy.util.fxconv import FXConv
+from findatapy.timeseries import Calculations
+
+
+class DictSpeedCache(SpeedCache):
+    """SpeedCache which stores everything in a dict, rather than Redis"""
+
+    def __init__(self, **kwargs):
+        super(DictSpeedCache, self).__init__(**kwargs)
+
+        self._store = {}
+
+    def put_dataframe(self, key, obj, meta_data=None):
+        self._store[key] = (obj, meta_data)
+
+    def get_dataframe(self, key):
+        return self._store.get(key, (None, None))[0]
+
+    def get_meta_data(self, key):
+        return self._store.get(key, (None, None))[1]
+
+    def get_dataframe_and_meta_data(self, key):
+        return self._store.get(key, (None, None))
+
+    def exists_key(self, key):
+        return key in self._store
+
+
+class CountingMarketDataGenerator(object):
+    """Returns business day data, recording each date range requested"""
+
+    def __init__(self, delay=0):
+        self.requested = []
+        self.delay = delay
+
+    def fetch_market_data(self, md_request):
+        self.requested.append((md_request.start_date, md_request.finish_date))
+
+        time.sleep(self.delay)
+
+        index = pd.bdate_range(md_request.start_date, md_request.finish_date)
+
+        return pd.DataFrame({f"{md_request.tickers[0]}.close":
+                                 range(len(index))},
+                            index=index, dtype="float64")
+
+
+def _create_md_request(start_date, finish_date):
+    return MarketDataRequest(start_date=start_date, finish_date=finish_date,
+                             data_source="bloomberg", category="fx",
+                             tickers=["EURUSD"],
+                             vendor_tickers=["EURUSD Curncy"],
+                             cache_algo="cache_algo_return")
+
+
+def test_range_aware_speed_cache():
+    market_data_generator = CountingMarketDataGenerator()
+
+    market = Market(market_data_generator=market_data_generator)
+    market.speed_cache = DictSpeedCache(range_aware=True)
+
+    df = market.fetch_market(_create_md_request("01 Jan 2021", "31 Jan 2021"))
+
+    assert len(market_data_generator.requested) == 1
+    assert df.index[0] == pd.Timestamp("01 Jan 2021")
+    assert df.index[-1] == pd.Timestamp("29 Jan 2021")
+
+    # A sub-range should be served entirely from the cache
+    df = market.fetch_market(_create_md_request("10 Jan 2021", "20 Jan 2021"))
+
+    assert len(market_data_generator.requested) == 1
+    assert df.index[0] == pd.Timestamp("11 Jan 2021")
+    assert df.index[-1] == pd.Timestamp("20 Jan 2021")
+
+    # Shifting the finish date should only fetch the missing tail
+    df = market.fetch_market(_create_md_request("01 Jan 2021", "05 Feb 2021"))
+
+    assert len(market_data_generator.requested) == 2
+    assert market_data_generator.requested[-1] == \
+           (pd.Timestamp("31 Jan 2021"), pd.Timestamp("05 Feb 2021"))
+    assert df.index[-1] == pd.Timestamp("05 Feb 2021")
+    assert not df.index.duplicated().any()
+
+    # ...and moving the start date earlier only the missing head
+    market.fetch_market(_create_md_request("15 Dec 2020", "05 Feb 2021"))
+
+    assert market_data_generator.requested[-1] == \
+           (pd.Timestamp("15 Dec 2020"), pd.Timestamp("01 Jan 2021"))
+
+
+def test_range_key():
+    md_request = _create_md_request("01 Jan 2021", "31 Jan 2021")
+
+    md_request_other = _create_md_request("10 Jan 2021", "20 Jan 2021")
+    md_request_other.cache_algo = "internet_load_return"
+
+    # Range key ignores the dates, and both keys ignore the same attributes
+    # eg. cache_algo
+    assert md_request.generate_range_key() \
+           == md_request_other.generate_range_key()
+    assert md_request.generate_key() != md_request_other.generate_key()
+
+    md_request_other.start_date = md_request.start_date
+    md_request_other.finish_date = md_request.finish_date
+
+    assert md_request.generate_key() == md_request_other.generate_key()
+
+    # Generating keys doesn't change the shared list of excluded attributes
+    from findatapy.market.marketdatarequest import _key_exclude_list
+
+    key_exclude_list = list(_key_exclude_list)
+
+    for i in range(5):
+        md_request.generate_key()
+        md_request.generate_range_key()
+
+    assert _key_exclude_list == key_exclude_list
+
+
+def test_range_aware_split_request_chunks():
+    market_data_generator = CountingMarketDataGenerator()
+
+    market = Market(market_data_generator=market_data_generator)
+    market.speed_cache = DictSpeedCache(range_aware=True)
+
+    # Not fx, which would construct the crosses instead
+    md_request = _create_md_request("01 Jan 2021", "31 Jan 2021")
+    md_request.category = "equities"
+    md_request.tickers = ["EURUSD", "GBPUSD"]
+    md_request.vendor_tickers = ["EURUSD Curncy", "GBPUSD Curncy"]
+    md_request.split_request_chunks = 1
+
+    df = market.fetch_market(md_request)
+
+    # Split into a request per ticker, rather than ignoring
+    # split_request_chunks
+    assert len(market_data_generator.requested) == 2
+    assert sorted(df.columns) == ["EURUSD.close", "GBPUSD.close"]
+
+
+def test_memory_cache():
+    df = pd.DataFrame({"EURUSD.close": [1.0, 2.0, 3.0]},
+                      index=pd.bdate_range("01 Jan 2021", periods=3))
+
+    size = MemoryCache.get_obj_size_bytes(df)
+
+    # Room for two DataFrames
+    memory_cache = MemoryCache(max_bytes=size * 2)
+
+    memory_cache.put("a", df)
+    memory_cache.put("b", df)
+
+    # Touch "a", so "b" is least recently used and evicted
+    assert memory_cache.get("a")[0] is not None
+
+    memory_cache.put("c", df)
+
+    assert memory_cache.get("b") == (None, None)
+    assert memory_cache.get("c")[0] is not None
+
+    # Modifying returned objects shouldn't change the cache
+    df_out, _ = memory_cache.get("a")
+    df_out.iloc[0, 0] = 100.0
+
+    pd.testing.assert_frame_equal(memory_cache.get("a")[0], df)
+
+    # Expired entries are treated as misses
+    memory_cache.put("d", df, meta_data={"x": 1}, ttl=-1)
+
+    assert memory_cache.get("d") == (None, None)
+
+    stats = memory_cache.get_stats()
+
+    assert stats["evictions"] == 2
+    assert stats["expired"] == 1
+    assert stats["misses"] == 2
+    assert stats["bytes"] == size
+
+
+def test_speed_cache_memory_tier():
+    df = pd.DataFrame({"EURUSD.close": [1.0, 2.0, 3.0]},
+                      index=pd.bdate_range("01 Jan 2021", periods=3))
+
+    # Nothing running on this port, so can only be served from memory
+    speed_cache = SpeedCache(db_cache_port=1, memory_size_mb=1)
+    speed_cache.memory_cache.flush()
+
+    speed_cache.put_dataframe("test_memory_key", df)
+
+    pd.testing.assert_frame_equal(
+        speed_cache.get_dataframe("test_memory_key"), df)
+
+    # Newer version replaces older one
+    speed_cache.put_dataframe("test_memory_key", df * 2)
+
+    pd.testing.assert_frame_equal(
+        speed_cache.get_dataframe("test_memory_key"), df * 2)
+
+    speed_cache.dump_key("test_memory_key")
+
+    assert speed_cache.get_dataframe("test_memory_key") is None
+
+    # A different backend has its own memory tier, which isn't resized by
+    # instances asking for another size
+    speed_cache.put_dataframe("test_memory_key", df)
+
+    speed_cache_other = SpeedCache(db_cache_port=2, memory_size_mb=2)
+
+    assert speed_cache_other.get_dataframe("test_memory_key") is None
+    assert speed_cache.memory_cache.max_bytes == 1024 * 1024
+    assert SpeedCache(db_cache_port=1, memory_size_mb=2).memory_cache \
+           is speed_cache.memory_cache
+    assert speed_cache.memory_cache.max_bytes == 1024 * 1024
+
+
+def test_single_flight_fetch_market():
+    market_data_generator = CountingMarketDataGenerator(delay=0.5)
+
+    market = Market(market_data_generator=market_data_generator)
+
+    md_request = _create_md_request("01 Jan 2021", "31 Jan 2021")
+    md_request.cache_algo = "internet_load_return"
+
+    df_list = [None] * 5
+
+    def fetch(i):
+        df_list[i] = market.fetch_market(md_request)
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(5)]
+
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    # Identical concurrent requests should only hit the data source once
+    assert len(market_data_generator.requested) == 1
+
+    for df in df_list:
+        pd.testing.assert_frame_equal(df, df_list[0])
+
+    # Once finished, the next request is fetched again
+    market.fetch_market(md_request)
+
+    assert len(market_data_generator.requested) == 2
+
+
+class CountingDataVendor(object):
+    """Data vendor returning business day data, recording each date range
+    requested"""
+
+    def __init__(self):
+        self.requested = []
+        self.requested_tickers = []
+
+    def load_ticker(self, md_request):
+        self.requested.append((md_request.start_date, md_request.finish_date))
+        self.requested_tickers.append(list(md_request.tickers))
+
+        index = pd.bdate_range(md_request.start_date, md_request.finish_date)
+
+        return pd.DataFrame({f"{t}.close": range(len(index))
+                             for t in md_request.tickers},
+                            index=index, dtype="float64")
+
+    def kill_session(self):
+        pass
+
+
+def test_incremental_load(tmp_path):
+    data_vendor = CountingDataVendor()
+
+    market = Market(market_data_generator=MarketDataGenerator(
+        data_vendor_dict={"countingvendor": data_vendor}))
+
+    def create_md_request(start_date, finish_date, tickers=["EURUSD"]):
+        return MarketDataRequest(start_date=start_date,
+                                 finish_date=finish_date,
+                                 data_source="countingvendor", category="fx",
+                                 tickers=tickers, fields=["close"],
+                                 cache_algo="incremental_load_return",
+                                 data_engine=str(tmp_path / "*.parquet"))
+
+    df = market.fetch_market(create_md_request("01 Jan 2021", "31 Jan 2021"))
+
+    assert len(df.index) == 21
+
+    # Should only download from the last stored date (less the overlap)
+    df = market.fetch_market(create_md_request("01 Jan 2021", "28 Feb 2021"))
+
+    assert data_vendor.requested[-1][0] == pd.Timestamp("29 Jan 2021") - \
+           pd.Timedelta(DataConstants().incremental_load_overlap["daily"])
+    assert df.index[0] == pd.Timestamp("01 Jan 2021")
+    assert df.index[-1] == pd.Timestamp("26 Feb 2021")
+
+    # A ticker new to the store needs its whole history, even though the
+    # other ticker is up to date
+    df = market.fetch_market(create_md_request("01 Jan 2021", "28 Feb 2021",
+                                               tickers=["EURUSD", "USDJPY"]))
+
+    assert data_vendor.requested_tickers[-2:] == [["USDJPY"], ["EURUSD"]]
+    assert data_vendor.requested[-2][0] == pd.Timestamp("01 Jan 2021")
+    assert df["USDJPY.close"].first_valid_index() == pd.Timestamp("01 Jan 2021")
+    assert df["USDJPY.close"].notna().all()
+
+
+class SlowDataVendor(CountingDataVendor):
+    """Data vendor which takes a while to return, recording the max number
+    of concurrent requests"""
+
+    def __init__(self):
+        super(SlowDataVendor, self).__init__()
+
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def load_ticker(self, md_request):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        time.sleep(0.05)
+
+        with self.lock:
+            self.in_flight -= 1
+
+        return super(SlowDataVendor, self).load_ticker(md_request)
+
+
+def test_request_governor(monkeypatch):
+    monkeypatch.setattr(DataConstants, "market_governor_max_in_flight",
+                        {"slowvendor": 2})
+    monkeypatch.setattr(DataConstants, "market_governor_requests_per_second",
+                        {"slowvendor": 1000})
+
+    RequestGovernor.reset_governors()
+
+    data_vendor = SlowDataVendor()
+
+    market_data_generator = MarketDataGenerator(
+        data_vendor_dict={"slowvendor": data_vendor})
+
+    def fetch(ticker):
+        market_data_generator.fetch_single_time_series(
+            MarketDataRequest(start_date="01 Jan 2021",
+                              finish_date="31 Jan 2021",
+                              data_source="slowvendor", category="fx",
+                              tickers=[ticker], fields=["close"]))
+
+    # However many threads call the data source, only 2 requests should be
+    # in flight at any time
+    threads = [threading.Thread(target=fetch, args=(f"EURUSD{i}",))
+               for i in range(8)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    governor = RequestGovernor.get_governor("slowvendor")
+    stats = governor.get_stats()
+
+    assert len(data_vendor.requested) == 8
+    assert data_vendor.max_in_flight == 2
+    assert stats["requests"] == 8
+    assert stats["in_flight"] == 0
+    assert stats["max_waiting"] > 0
+    assert stats["max_wait_seconds"] > 0
+
+    # Being throttled should pause requests and halve the rate
+    governor.throttled(retry_after=0.2)
+
+    assert governor.get_stats()["requests_per_second"] == 500
+    assert governor.get_stats()["throttled"] == 1
+
+    start = time.monotonic()
+
+    with governor.request():
+        pass
+
+    assert time.monotonic() - start >= 0.15
+
+    # ...which then recovers as requests succeed
+    assert governor.get_stats()["requests_per_second"] == 550
+
+    # Data sources without limits aren't governed
+    assert RequestGovernor.get_governor("countingvendor") is None
+
+    RequestGovernor.reset_governors()
+
+
+def test_request_governor_redis(monkeypatch):
+    monkeypatch.setattr(DataConstants, "market_governor_lease", 1)
+    monkeypatch.setattr(DataConstants, "market_governor_redis_poll_seconds",
+                        0.01)
+
+    governor = RequestGovernor("redisvendor", max_in_flight=2,
+                               backend="redis")
+
+    r = governor._get_redis_client()
+    in_flight_key = governor._get_redis_key("in_flight")
+
+    r.delete(in_flight_key)
+
+    # Each request in flight holds a lease, which expires on its own
+    assert governor.try_acquire() == 0
+    assert governor.try_acquire() == 0
+    assert 0 < governor.try_acquire() < 0.1
+    assert r.zcard(in_flight_key) == 2
+    assert 0 < r.ttl(in_flight_key) <= 1
+
+    governor.release()
+
+    assert r.zcard(in_flight_key) == 1
+    assert governor.try_acquire() == 0
+
+    # If a process dies without releasing its requests, its leases expire
+    # (rather than leaking), whilst other processes keep acquiring
+    governor._redis_leases = []
+
+    time.sleep(1.1)
+
+    assert governor.try_acquire() == 0
+    assert r.zcard(in_flight_key) == 1
+
+    governor.release()
+
+    assert r.zcard(in_flight_key) == 0
+
+
+class TickerMarketDataGenerator(object):
+    """Returns a column for each ticker/field (with values which only depend
+    on the ticker), recording the tickers in each call"""
+
+    def __init__(self):
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def fetch_market_data(self, md_request):
+        with self.lock:
+            self.requested.append(list(md_request.tickers))
+
+        index = pd.bdate_range(md_request.start_date, md_request.finish_date)
+
+        return pd.DataFrame(
+            {f"{t}.{f}": float(sum(ord(c) for c in t))
+             for t in md_request.tickers for f in md_request.fields},
+            index=index)
+
+
+def test_batch_planner(monkeypatch):
+    monkeypatch.setattr(DataConstants, "market_batch_max_tickers",
+                        {"bloomberg": 4, "other": 50})
+
+    def create_md_request(ticker, freq="daily"):
+        return MarketDataRequest(start_date="01 Jan 2021",
+                                 finish_date="31 Jan 2021",
+                                 data_source="bloomberg", category="equities",
+                                 freq=freq, tickers=[ticker],
+                                 vendor_tickers=[ticker + " Equity"],
+                                 fields=["close"],
+                                 cache_algo="internet_load_return")
+
+    tickers = ["AAPL", "MSFT", "AMZN", "GOOG", "META", "NFLX"]
+
+    md_request_list = [create_md_request(t) for t in tickers] \
+                      + [create_md_request("IBM", freq="intraday")]
+
+    market_data_generator = TickerMarketDataGenerator()
+    market = Market(market_data_generator=market_data_generator)
+
+    # Daily requests only differ by ticker, so they are merged into calls of
+    # up to 4 tickers, but the intraday request can't be merged
+    df_plan = market.explain_plan(md_request_list)
+
+    assert list(df_plan["no_of_tickers"]) == [4, 2, 1]
+    assert df_plan["requests"].iloc[0] == [0, 1, 2, 3]
+    assert df_plan["requests"].iloc[1] == [4, 5]
+
+    df = market.fetch_market(md_request_list)
+
+    assert len(market_data_generator.requested) == 3
+    assert ["AAPL", "MSFT", "AMZN", "GOOG"] in market_data_generator.requested
+
+    # Same result as fetching each request on its own
+    monkeypatch.setattr(DataConstants, "market_batch_planner", False)
+
+    df_unbatched = Market(market_data_generator=TickerMarketDataGenerator()) \
+        .fetch_market(md_request_list)
+
+    pd.testing.assert_frame_equal(df, df_unbatched)
+
+
+class LegMarketDataGenerator(TickerMarketDataGenerator):
+    """Returns a different trending series for each ticker"""
+
+    def fetch_market_data(self, md_request):
+        tickers = md_request.tickers
+
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        with self.lock:
+            self.requested.append(list(tickers))
+
+        index = pd.bdate_range(md_request.start_date, md_request.finish_date)
+
+        return pd.DataFrame(
+            {f"{t}.{f}": (1 + sum(map(ord, t)) % 97 / 10.0)
+                         * np.linspace(1, 1.1, len(index))
+             for t in tickers for f in md_request.fields}, index=index)
+
+
+def get_individual_fx_cross(market_data_generator, cr, type="spot"):
+    """Constructs a single FX cross from its legs, downloading each leg on
+    its own, as a reference for FXCrossFactory.get_fx_cross"""
+    fx_conv = FXConv()
+    calculations = Calculations()
+
+    def fetch(ticker, category):
+        md_request = MarketDataRequest(start_date="01 Jan 2021",
+                                       finish_date="31 Jan 2021",
+                                       data_source="bloomberg", freq="daily",
+                                       category=category, tickers=[ticker],
+                                       fields=["close"])
+
+        return market_data_generator.fetch_market_data(md_request).iloc[:, 0]
+
+    base = cr[0:3]
+    terms = cr[3:6]
+
+    if type == "spot":
+        if base != "USD" and terms != "USD":
+            usd_vals = []
+
+            # Both legs in USD terms
+            for c in [base, terms]:
+                leg = fx_conv.correct_notation("USD" + c)
+                vals = fetch(leg, "fx")
+
+                usd_vals.append(1 / vals if leg[0:3] == "USD" else vals)
+
+            return usd_vals[0] / usd_vals[1]
+
+        leg = fx_conv.correct_notation(cr)
+        vals = fetch(leg, "fx")
+
+        return vals if leg == cr else 1 / vals
+
+    # Total returns from the xxxUSD indices (where USD has zero returns)
+    cross_rets = 0
+
+    if base != "USD":
+        cross_rets = cross_rets + calculations.calculate_returns(
+            fetch(base + "USD", "fx-" + type))
+
+    if terms != "USD":
+        cross_rets = cross_rets - calculations.calculate_returns(
+            fetch(terms + "USD", "fx-" + type))
+
+    cross_rets.iloc[0] = 0
+
+    return calculations.create_mult_index(pd.DataFrame(cross_rets)).iloc[:, 0]
+
+
+def test_fx_cross_shared_legs():
+    g10 = ["EUR", "GBP", "AUD", "NZD", "USD", "CAD", "CHF", "NOK", "SEK",
+           "JPY"]
+
+    cross = [a + b for i, a in enumerate(g10) for b in g10[i + 1:]]
+
+    market_data_generator = LegMarketDataGenerator()
+    fx_cross_factory = FXCrossFactory(
+        market_data_generator=market_data_generator)
+
+    # 45 crosses only need the 9 USD crosses, downloaded in one request
+    assert len(fx_cross_factory.get_fx_cross_legs(cross)) == 9
+
+    df = fx_cross_factory.get_fx_cross("01 Jan 2021", "31 Jan 2021", cross,
+                                       data_source="bloomberg", freq="daily")
+
+    assert len(market_data_generator.requested) == 1
+    assert len(market_data_generator.requested[0]) == 9
+    assert list(df.columns) == [cr + ".close" for cr in cross]
+
+    # Same as constructing each cross on its own
+    for cr in ["EURJPY", "USDJPY", "JPYUSD", "EURUSD", "GBPNOK"]:
+        df_cr = fx_cross_factory.get_fx_cross(
+            "01 Jan 2021", "31 Jan 2021", cr, data_source="bloomberg",
+            freq="daily")
+
+        np.testing.assert_allclose(
+            df_cr[cr + ".close"].values,
+            get_individual_fx_cross(market_data_generator, cr).values)
+
+    for cr in ["EURJPY", "USDJPY", "EURUSD", "GBPNOK"]:
+        np.testing.assert_allclose(
+            df[cr + ".close"].values,
+            get_individual_fx_cross(market_data_generator, cr).values)
+
+    # Total returns only need the xxxUSD indices
+    market_data_generator.requested = []
+
+    df_tot = fx_cross_factory.get_fx_cross(
+        "01 Jan 2021", "31 Jan 2021", ["EURJPY", "USDJPY", "GBPJPY"],
+        data_source="bloomberg", freq="daily", type="tot")
+
+    assert market_data_generator.requested == [["EURUSD", "JPYUSD",
+                                                "GBPUSD"]]
+
+    for cr in ["EURJPY", "USDJPY", "GBPJPY"]:
+        np.testing.assert_allclose(
+            df_tot[cr + "-tot.close"].values,
+            get_individual_fx_cross(market_data_generator, cr,
+                                    type="tot").values)
+
+
+class SlowLegMarketDataGenerator(LegMarketDataGenerator):
+    """Takes a while to return, recording the max concurrent calls"""
+
+    def __init__(self):
+        super(SlowLegMarketDataGenerator, self).__init__()
+
+        self.active = 0
+        self.max_active = 0
+
+    def fetch_market_data(self, md_request):
+        with self.lock:
+            self.active = self.active + 1
+            self.max_active = max(self.max_active, self.active)
+
+        try:
+            time.sleep(0.1)
+
+            return super(SlowLegMarketDataGenerator, self).fetch_market_data(
+                md_request)
+        finally:
+            with self.lock:
+                self.active = self.active - 1
+
+
+def test_fx_vol_market_task_graph(monkeypatch):
+    md_request = MarketDataRequest(start_date="01 Jan 2021",
+                                   finish_date="31 Jan 2021",
+                                   data_source="bloomberg",
+                                   category="fx-vol-market",
+                                   tickers=["EURUSD", "USDJPY", "EURUSD",
+                                            "GBPUSD"],
+                                   freq="daily", fields=["close"],
+                                   cache_algo="internet_load_return",
+                                   push_to_cache=False)
+
+    market_data_generator = SlowLegMarketDataGenerator()
+
+    df = Market(market_data_generator=market_data_generator)\
+        .fetch_market(md_request)
+
+    # Spot for every cross together, vol and forwards for each cross (the
+    # duplicate EURUSD is only fetched once) and the depos, several at the
+    # same time
+    assert len(market_data_generator.requested) == 1 + 3 * 2 + 1
+    assert ["EURUSD", "USDJPY", "GBPUSD"] in market_data_generator.requested
+    assert market_data_generator.max_active > 1
+    assert list(df.columns[:2]) == ["EURUSD.close", "EURUSDVON.close"]
+
+    # Same as fetching serially
+    monkeypatch.setattr(DataConstants, "market_thread_no",
+                        {"bloomberg": 1, "other": 1})
+
+    market_data_generator = SlowLegMarketDataGenerator()
+
+    df_serial = Market(market_data_generator=market_data_generator)\
+        .fetch_market(md_request)
+
+    assert market_data_generator.max_active == 1
+
+    pd.testing.assert_frame_equal(df, df_serial)
+
+    # Legs shared by several crosses are only downloaded once
+    md_request.category = "fx-forwards-market"
+    md_request.tickers = ["EURJPY", "GBPJPY", "AUDJPY"]
+
+    market_data_generator = SlowLegMarketDataGenerator()
+
+    Market(market_data_generator=market_data_generator)\
+        .fetch_market(md_request)
+
+    assert sum(t == "USDJPY" for r in market_data_generator.requested
+               for t in r) == 1
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,91 @@
+__author__ = "saeedamen"  # Saeed Amen
+
+#
+# Copyright 2026 Cuemacro
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on a "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from findatapy.timeseries import Calculations
+from findatapy.util import DataConstants, SwimPool
+from findatapy.util.sharedframe import SharedFrame
+
+
+def create_data_frame(ticker):
+    if ticker == "FAIL":
+        raise Exception("Failed to download")
+
+    index = pd.date_range("01 Jan 2021", periods=100000, freq="1min",
+                          name="Date")
+
+    return pd.DataFrame({f"{ticker}.close": np.arange(len(index)) * 1.0},
+                        index=index)
+
+
+@pytest.fixture
+def shared_frame_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataConstants, "shared_frame_folder", str(tmp_path))
+    monkeypatch.setattr(DataConstants, "shared_frame_min_bytes", 0)
+
+    yield tmp_path
+
+
+def test_shared_frame_map(shared_frame_folder):
+    tickers = ["EURUSD", "USDJPY", "GBPUSD"]
+
+    pool = SwimPool(multiprocessing_library="multiprocessing").create_pool(
+        thread_technique="multiprocessing", thread_no=2)
+
+    try:
+        df_list = SharedFrame.map(pool, create_data_frame, tickers)
+
+        for df, t in zip(df_list, tickers):
+            pd.testing.assert_frame_equal(df, create_data_frame(t),
+                                          check_freq=False)
+
+        # Files are deleted once they've been read, or if any call fails
+        assert os.listdir(shared_frame_folder) == []
+
+        with pytest.raises(Exception, match="Failed to download"):
+            SharedFrame.map(pool, create_data_frame, tickers + ["FAIL"])
+
+        assert os.listdir(shared_frame_folder) == []
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_iterative_outer_join_shared(shared_frame_folder):
+    tickers = ["EURUSD", "USDJPY", "GBPUSD", "AUDUSD", "NZDUSD"]
+
+    df_list = [create_data_frame(t).iloc[i:] for i, t in enumerate(tickers)]
+
+    pool = SwimPool(multiprocessing_library="multiprocessing").create_pool(
+        thread_technique="multiprocessing", thread_no=2)
+
+    df = Calculations().iterative_outer_join(df_list, pool=pool,
+                                             shared_frame=True)
+
+    pd.testing.assert_frame_equal(
+        df, Calculations().join(df_list, how="outer"), check_freq=False)
+
+    assert os.listdir(shared_frame_folder) == []
+
+
+if __name__ == '__main__':
+    pytest.main()